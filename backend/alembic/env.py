@@ -15,6 +15,15 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Without sqlalchemy.url in alembic.ini, migrate the database the app uses
+if not config.get_main_option("sqlalchemy.url"):
+    from app.db.session import DATABASE_URL
+
+    config.set_main_option(
+        "sqlalchemy.url",
+        DATABASE_URL.render_as_string(hide_password=False).replace("%", "%%"),
+    )
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -0,0 +1,41 @@
+"""Add composite indexes for list queries
+
+Revision ID: 5b2d9c41e7a3
+Revises: 487acf86f8f3
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2d9c41e7a3"
+down_revision: str | None = "487acf86f8f3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sessions_updated_at", "sessions", ["updated_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_conversations_session_id_updated_at",
+        "conversations",
+        ["session_id", "updated_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_exchanges_conversation_id_created_at",
+        "exchanges",
+        ["conversation_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_exchanges_conversation_id_created_at", table_name="exchanges")
+    op.drop_index("ix_conversations_session_id_updated_at", table_name="conversations")
+    op.drop_index("ix_sessions_updated_at", table_name="sessions")
@@ -0,0 +1,32 @@
+"""Add cache versions
+
+Revision ID: 7c1e5b9a3f24
+Revises: d6a2f8c4b791
+Create Date: 2026-10-17 21:05:37.512804
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e5b9a3f24"
+down_revision: str | None = "d6a2f8c4b791"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
@@ -0,0 +1,77 @@
+"""Add maintained aggregate counters to sessions and conversations
+
+Revision ID: 9e4f1a6c2d08
+Revises: 5b2d9c41e7a3
+Create Date: 2026-10-17 10:03:27.904512
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4f1a6c2d08"
+down_revision: str | None = "5b2d9c41e7a3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+CONVERSATION_COUNTERS = ["exchange_count", "total_input_tokens", "total_output_tokens"]
+SESSION_COUNTERS = ["conversation_count"] + CONVERSATION_COUNTERS
+
+
+def upgrade() -> None:
+    for name in SESSION_COUNTERS:
+        op.add_column(
+            "sessions",
+            sa.Column(name, sa.Integer(), server_default="0", nullable=False),
+        )
+    for name in CONVERSATION_COUNTERS:
+        op.add_column(
+            "conversations",
+            sa.Column(name, sa.Integer(), server_default="0", nullable=False),
+        )
+
+    # Backfill from existing rows: exchanges -> conversations -> sessions
+    op.execute(
+        """
+        UPDATE conversations SET
+            exchange_count = (
+                SELECT COUNT(*) FROM exchanges
+                WHERE exchanges.conversation_id = conversations.id),
+            total_input_tokens = (
+                SELECT COALESCE(SUM(input_tokens), 0) FROM exchanges
+                WHERE exchanges.conversation_id = conversations.id),
+            total_output_tokens = (
+                SELECT COALESCE(SUM(output_tokens), 0) FROM exchanges
+                WHERE exchanges.conversation_id = conversations.id)
+        """
+    )
+    op.execute(
+        """
+        UPDATE sessions SET
+            conversation_count = (
+                SELECT COUNT(*) FROM conversations
+                WHERE conversations.session_id = sessions.id),
+            exchange_count = (
+                SELECT COALESCE(SUM(exchange_count), 0) FROM conversations
+                WHERE conversations.session_id = sessions.id),
+            total_input_tokens = (
+                SELECT COALESCE(SUM(total_input_tokens), 0) FROM conversations
+                WHERE conversations.session_id = sessions.id),
+            total_output_tokens = (
+                SELECT COALESCE(SUM(total_output_tokens), 0) FROM conversations
+                WHERE conversations.session_id = sessions.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        for name in reversed(CONVERSATION_COUNTERS):
+            batch_op.drop_column(name)
+    with op.batch_alter_table("sessions") as batch_op:
+        for name in reversed(SESSION_COUNTERS):
+            batch_op.drop_column(name)
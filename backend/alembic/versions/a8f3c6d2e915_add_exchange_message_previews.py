@@ -0,0 +1,109 @@
+"""Add exchange message previews and lengths
+
+Revision ID: a8f3c6d2e915
+Revises: e5d1a9b36c42
+Create Date: 2026-10-17 14:21:37.508664
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.orm import aliased
+
+from alembic import op
+from app.db.compression import get_codec
+
+# revision identifiers, used by Alembic.
+revision: str = "a8f3c6d2e915"
+down_revision: str | None = "e5d1a9b36c42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MESSAGE_COLUMNS = ["user_message", "assistant_message"]
+PREVIEW_LENGTH = 200
+CHUNK_SIZE = 1000
+
+exchanges = sa.table(
+    "exchanges",
+    sa.column("id", sa.Integer),
+    *(sa.column(f"{name}_hash", sa.String) for name in MESSAGE_COLUMNS),
+)
+message_blobs = sa.table(
+    "message_blobs", sa.column("hash", sa.String), sa.column("content")
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in MESSAGE_COLUMNS:
+            batch_op.add_column(
+                sa.Column(
+                    f"{name}_preview",
+                    sa.String(length=PREVIEW_LENGTH),
+                    server_default="",
+                    nullable=False,
+                )
+            )
+            batch_op.add_column(
+                sa.Column(
+                    f"{name}_length", sa.Integer(), server_default="0", nullable=False
+                )
+            )
+
+    codec = get_codec()
+    conn = op.get_bind()
+    user_blob = aliased(message_blobs)
+    assistant_blob = aliased(message_blobs)
+    target = sa.table(
+        "exchanges",
+        sa.column("id", sa.Integer),
+        *(
+            sa.column(f"{name}_{suffix}")
+            for name in MESSAGE_COLUMNS
+            for suffix in ("preview", "length")
+        ),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(exchanges.c.id, user_blob.c.content, assistant_blob.c.content)
+            .join(user_blob, user_blob.c.hash == exchanges.c.user_message_hash)
+            .join(
+                assistant_blob,
+                assistant_blob.c.hash == exchanges.c.assistant_message_hash,
+            )
+            .where(exchanges.c.id > last_id)
+            .order_by(exchanges.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for row_id, *contents in rows:
+            value = {"row_id": row_id}
+            for name, content in zip(MESSAGE_COLUMNS, contents):
+                text = codec.decode(content)
+                value[f"new_{name}_preview"] = text[:PREVIEW_LENGTH]
+                value[f"new_{name}_length"] = len(text)
+            values.append(value)
+        conn.execute(
+            target.update()
+            .where(target.c.id == sa.bindparam("row_id"))
+            .values(
+                {
+                    f"{name}_{suffix}": sa.bindparam(f"new_{name}_{suffix}")
+                    for name in MESSAGE_COLUMNS
+                    for suffix in ("preview", "length")
+                }
+            ),
+            values,
+        )
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in reversed(MESSAGE_COLUMNS):
+            batch_op.drop_column(f"{name}_length")
+            batch_op.drop_column(f"{name}_preview")
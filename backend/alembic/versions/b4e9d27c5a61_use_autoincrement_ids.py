@@ -0,0 +1,41 @@
+"""Use AUTOINCREMENT ids so archived ids are never reused
+
+Revision ID: b4e9d27c5a61
+Revises: f2c7a4e8b153
+Create Date: 2026-10-17 16:48:03.925117
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e9d27c5a61"
+down_revision: str | None = "f2c7a4e8b153"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ["sessions", "conversations", "exchanges"]
+
+
+def _recreate(autoincrement: bool) -> None:
+    # Without AUTOINCREMENT SQLite hands out max(id) + 1, which can repeat
+    # the id of a row moved to an archive; other databases never reuse ids
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table in TABLES:
+        with op.batch_alter_table(
+            table,
+            recreate="always",
+            table_kwargs={"sqlite_autoincrement": autoincrement},
+        ):
+            pass
+
+
+def upgrade() -> None:
+    _recreate(True)
+
+
+def downgrade() -> None:
+    _recreate(False)
@@ -0,0 +1,114 @@
+"""Compress exchange messages
+
+Revision ID: c3b8e1f47a20
+Revises: 9e4f1a6c2d08
+Create Date: 2026-10-17 11:42:08.316275
+
+"""
+
+from collections.abc import Callable, Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.compression import MessageCodec, get_codec
+
+# revision identifiers, used by Alembic.
+revision: str = "c3b8e1f47a20"
+down_revision: str | None = "9e4f1a6c2d08"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MESSAGE_COLUMNS = ["user_message", "assistant_message"]
+CHUNK_SIZE = 1000
+
+exchanges = sa.table(
+    "exchanges",
+    sa.column("id", sa.Integer),
+    *(sa.column(name) for name in MESSAGE_COLUMNS),
+)
+
+
+def _rewrite_messages(transform: Callable[[object], object]) -> None:
+    """Rewrite every message through ``transform``, CHUNK_SIZE rows at a time."""
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(exchanges)
+            .where(exchanges.c.id > last_id)
+            .order_by(exchanges.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            exchanges.update()
+            .where(exchanges.c.id == sa.bindparam("row_id"))
+            .values({name: sa.bindparam(f"new_{name}") for name in MESSAGE_COLUMNS}),
+            [
+                {
+                    "row_id": row.id,
+                    **{
+                        f"new_{name}": transform(getattr(row, name))
+                        for name in MESSAGE_COLUMNS
+                    },
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    codec = get_codec()
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite stores bytes in a TEXT column as-is, so compress first; the
+        # type change then copies the values without converting them
+        _rewrite_messages(lambda value: codec.encode(codec.decode(value)))
+        with op.batch_alter_table("exchanges") as batch_op:
+            for name in MESSAGE_COLUMNS:
+                batch_op.alter_column(
+                    name,
+                    existing_type=sa.Text(),
+                    type_=sa.LargeBinary(),
+                    existing_nullable=False,
+                )
+    else:
+        # Convert to raw-marker bytes in the type change, then compress
+        for name in MESSAGE_COLUMNS:
+            op.alter_column(
+                "exchanges",
+                name,
+                existing_type=sa.Text(),
+                type_=sa.LargeBinary(),
+                existing_nullable=False,
+                postgresql_using=f"decode('00', 'hex') || convert_to({name}, 'UTF8')",
+            )
+        _rewrite_messages(lambda value: codec.encode(codec.decode(value)))
+
+
+def downgrade() -> None:
+    codec = get_codec()
+    if op.get_bind().dialect.name == "sqlite":
+        _rewrite_messages(codec.decode)
+        with op.batch_alter_table("exchanges") as batch_op:
+            for name in MESSAGE_COLUMNS:
+                batch_op.alter_column(
+                    name,
+                    existing_type=sa.LargeBinary(),
+                    type_=sa.Text(),
+                    existing_nullable=False,
+                )
+    else:
+        raw = MessageCodec(enabled=False)
+        _rewrite_messages(lambda value: raw.encode(codec.decode(value)))
+        for name in MESSAGE_COLUMNS:
+            op.alter_column(
+                "exchanges",
+                name,
+                existing_type=sa.LargeBinary(),
+                type_=sa.Text(),
+                existing_nullable=False,
+                postgresql_using=f"convert_from(substring({name} from 2), 'UTF8')",
+            )
@@ -0,0 +1,39 @@
+"""Index exchange body message hashes
+
+Revision ID: d6a2f8c4b791
+Revises: b4e9d27c5a61
+Create Date: 2026-10-17 19:42:08.226917
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d6a2f8c4b791"
+down_revision: str | None = "b4e9d27c5a61"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_exchange_bodies_user_message_hash",
+        "exchange_bodies",
+        ["user_message_hash"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_exchange_bodies_assistant_message_hash",
+        "exchange_bodies",
+        ["assistant_message_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_exchange_bodies_assistant_message_hash", table_name="exchange_bodies"
+    )
+    op.drop_index("ix_exchange_bodies_user_message_hash", table_name="exchange_bodies")
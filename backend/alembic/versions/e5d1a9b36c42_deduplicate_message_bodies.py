@@ -0,0 +1,176 @@
+"""Deduplicate message bodies into content-addressed blobs
+
+Revision ID: e5d1a9b36c42
+Revises: c3b8e1f47a20
+Create Date: 2026-10-17 13:05:51.740193
+
+"""
+
+from collections import Counter
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.compression import get_codec
+from app.models.message_blob import content_hash
+
+# revision identifiers, used by Alembic.
+revision: str = "e5d1a9b36c42"
+down_revision: str | None = "c3b8e1f47a20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MESSAGE_COLUMNS = ["user_message", "assistant_message"]
+CHUNK_SIZE = 1000
+
+exchanges = sa.table(
+    "exchanges",
+    sa.column("id", sa.Integer),
+    *(sa.column(name) for name in MESSAGE_COLUMNS),
+    *(sa.column(f"{name}_hash", sa.String) for name in MESSAGE_COLUMNS),
+)
+message_blobs = sa.table(
+    "message_blobs",
+    sa.column("hash", sa.String),
+    sa.column("content"),
+    sa.column("size", sa.Integer),
+    sa.column("ref_count", sa.Integer),
+)
+
+
+def _chunks(conn, query):
+    """Yield rows of ``query`` (ordered by exchanges.id) CHUNK_SIZE at a time."""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            query.where(exchanges.c.id > last_id)
+            .order_by(exchanges.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.create_table(
+        "message_blobs",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("content", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    for name in MESSAGE_COLUMNS:
+        op.add_column(
+            "exchanges", sa.Column(f"{name}_hash", sa.String(length=64), nullable=True)
+        )
+
+    codec = get_codec()
+    conn = op.get_bind()
+    query = sa.select(exchanges.c.id, *(exchanges.c[name] for name in MESSAGE_COLUMNS))
+    for rows in _chunks(conn, query):
+        counts = Counter()
+        # Stored values are already encoded by the compression migration
+        stored = {}
+        assignments = []
+        for row in rows:
+            assignment = {"row_id": row.id}
+            for name in MESSAGE_COLUMNS:
+                value = getattr(row, name)
+                text = codec.decode(value)
+                digest = content_hash(text)
+                counts[digest] += 1
+                if digest not in stored:
+                    encoded = value if isinstance(value, bytes) else codec.encode(text)
+                    stored[digest] = (encoded, len(text.encode("utf-8")))
+                assignment[f"new_{name}_hash"] = digest
+            assignments.append(assignment)
+
+        existing = set(
+            conn.execute(
+                sa.select(message_blobs.c.hash).where(
+                    message_blobs.c.hash.in_(list(counts))
+                )
+            ).scalars()
+        )
+        if existing:
+            conn.execute(
+                message_blobs.update()
+                .where(message_blobs.c.hash == sa.bindparam("b_hash"))
+                .values(ref_count=message_blobs.c.ref_count + sa.bindparam("b_count")),
+                [{"b_hash": digest, "b_count": counts[digest]} for digest in existing],
+            )
+        new = [digest for digest in counts if digest not in existing]
+        if new:
+            conn.execute(
+                message_blobs.insert(),
+                [
+                    {
+                        "hash": digest,
+                        "content": stored[digest][0],
+                        "size": stored[digest][1],
+                        "ref_count": counts[digest],
+                    }
+                    for digest in new
+                ],
+            )
+        conn.execute(
+            exchanges.update()
+            .where(exchanges.c.id == sa.bindparam("row_id"))
+            .values(
+                {
+                    f"{name}_hash": sa.bindparam(f"new_{name}_hash")
+                    for name in MESSAGE_COLUMNS
+                }
+            ),
+            assignments,
+        )
+
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in MESSAGE_COLUMNS:
+            batch_op.drop_column(name)
+            batch_op.alter_column(
+                f"{name}_hash", existing_type=sa.String(length=64), nullable=False
+            )
+            batch_op.create_foreign_key(
+                f"fk_exchanges_{name}_hash_message_blobs",
+                "message_blobs",
+                [f"{name}_hash"],
+                ["hash"],
+            )
+
+
+def downgrade() -> None:
+    for name in MESSAGE_COLUMNS:
+        op.add_column("exchanges", sa.Column(name, sa.LargeBinary(), nullable=True))
+
+    conn = op.get_bind()
+    for name in MESSAGE_COLUMNS:
+        # Blob content is stored in the same encoding the columns used
+        conn.execute(
+            exchanges.update().values(
+                {
+                    name: sa.select(message_blobs.c.content)
+                    .where(message_blobs.c.hash == exchanges.c[f"{name}_hash"])
+                    .scalar_subquery()
+                }
+            )
+        )
+
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in MESSAGE_COLUMNS:
+            batch_op.drop_constraint(
+                f"fk_exchanges_{name}_hash_message_blobs", type_="foreignkey"
+            )
+            batch_op.drop_column(f"{name}_hash")
+            batch_op.alter_column(name, existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_table("message_blobs")
@@ -0,0 +1,134 @@
+"""Split exchange message references into exchange_bodies
+
+Revision ID: f2c7a4e8b153
+Revises: a8f3c6d2e915
+Create Date: 2026-10-17 15:02:19.318405
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c7a4e8b153"
+down_revision: str | None = "a8f3c6d2e915"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MESSAGE_COLUMNS = ["user_message", "assistant_message"]
+BODY_COLUMNS = [
+    f"{name}_{suffix}" for name in MESSAGE_COLUMNS for suffix in ("hash", "preview")
+]
+PREVIEW_LENGTH = 200
+CHUNK_SIZE = 1000
+
+exchanges = sa.table(
+    "exchanges",
+    sa.column("id", sa.Integer),
+    *(sa.column(name) for name in BODY_COLUMNS),
+)
+exchange_bodies = sa.table(
+    "exchange_bodies",
+    sa.column("exchange_id", sa.Integer),
+    *(sa.column(name) for name in BODY_COLUMNS),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exchange_bodies",
+        sa.Column("exchange_id", sa.Integer(), nullable=False),
+        sa.Column("user_message_hash", sa.String(length=64), nullable=False),
+        sa.Column("assistant_message_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "user_message_preview",
+            sa.String(length=PREVIEW_LENGTH),
+            server_default="",
+            nullable=False,
+        ),
+        sa.Column(
+            "assistant_message_preview",
+            sa.String(length=PREVIEW_LENGTH),
+            server_default="",
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["exchange_id"], ["exchanges.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_message_hash"], ["message_blobs.hash"]),
+        sa.ForeignKeyConstraint(["assistant_message_hash"], ["message_blobs.hash"]),
+        sa.PrimaryKeyConstraint("exchange_id"),
+    )
+
+    # Copy set-based, CHUNK_SIZE exchanges per statement
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        chunk = (
+            sa.select(exchanges.c.id)
+            .where(exchanges.c.id > last_id)
+            .order_by(exchanges.c.id)
+            .limit(CHUNK_SIZE)
+        ).subquery()
+        upper = conn.execute(sa.select(sa.func.max(chunk.c.id))).scalar()
+        if upper is None:
+            break
+        conn.execute(
+            exchange_bodies.insert().from_select(
+                ["exchange_id", *BODY_COLUMNS],
+                sa.select(
+                    exchanges.c.id, *(exchanges.c[name] for name in BODY_COLUMNS)
+                ).where(exchanges.c.id > last_id, exchanges.c.id <= upper),
+            )
+        )
+        last_id = upper
+
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in MESSAGE_COLUMNS:
+            batch_op.drop_constraint(
+                f"fk_exchanges_{name}_hash_message_blobs", type_="foreignkey"
+            )
+            batch_op.drop_column(f"{name}_hash")
+            batch_op.drop_column(f"{name}_preview")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in MESSAGE_COLUMNS:
+            batch_op.add_column(
+                sa.Column(f"{name}_hash", sa.String(length=64), nullable=True)
+            )
+            batch_op.add_column(
+                sa.Column(
+                    f"{name}_preview",
+                    sa.String(length=PREVIEW_LENGTH),
+                    server_default="",
+                    nullable=False,
+                )
+            )
+
+    conn = op.get_bind()
+    conn.execute(
+        exchanges.update().values(
+            {
+                name: sa.select(exchange_bodies.c[name])
+                .where(exchange_bodies.c.exchange_id == exchanges.c.id)
+                .scalar_subquery()
+                for name in BODY_COLUMNS
+            }
+        )
+    )
+
+    with op.batch_alter_table("exchanges") as batch_op:
+        for name in MESSAGE_COLUMNS:
+            batch_op.alter_column(
+                f"{name}_hash", existing_type=sa.String(length=64), nullable=False
+            )
+            batch_op.create_foreign_key(
+                f"fk_exchanges_{name}_hash_message_blobs",
+                "message_blobs",
+                [f"{name}_hash"],
+                ["hash"],
+            )
+    op.drop_table("exchange_bodies")
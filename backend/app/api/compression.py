@@ -0,0 +1,298 @@
+"""Negotiated response compression.
+
+An ASGI middleware compressing response bodies with the best codec the
+client's ``Accept-Encoding`` allows: zstd (with the zstandard package),
+brotli (with the brotli package) or gzip. Not to be confused with
+app.db.compression, which compresses stored messages.
+
+Whole bodies shorter than a threshold are sent as they are. Streamed
+bodies (those without a Content-Length) are compressed chunk by chunk, and
+their headers go out at once rather than with the first chunk, so an idle
+stream is still open to the client. Each chunk is flushed so that the
+client can decode it as soon as it arrives (NDJSON lines, server-sent
+events). Strong ETags of compressed responses become weak, since the bytes
+sent depend on the negotiated coding while If-None-Match compares weakly.
+"""
+
+import asyncio
+import zlib
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.settings import PerformanceSettings
+
+try:  # pragma: no cover - exercised only when zstandard is installed
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - exercised only when brotli is installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Content codings in the server's order of preference
+CODECS = ("zstd", "br", "gzip")
+
+# Chunks at least this large are compressed off the event loop
+THREAD_MIN_SIZE = 128 * 1024
+
+# Media types (or type/ prefixes) that are already compressed
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/zstd",
+)
+
+# Partial content, and statuses that carry no body
+UNCOMPRESSED_STATUSES = (204, 206, 304)
+
+# Highest zstd level whose window stays within the 8 MiB browsers decode
+ZSTD_MAX_LEVEL = 19
+
+
+class GzipEncoder:
+    """gzip stream for one response."""
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk and flush it; ``final`` ends the stream."""
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class ZstdEncoder:  # pragma: no cover - exercised only when zstandard is installed
+    """zstd stream for one response."""
+
+    def __init__(self, level: int) -> None:
+        compressor = zstandard.ZstdCompressor(level=min(level, ZSTD_MAX_LEVEL))
+        self._compressor = compressor.compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk and flush it; ``final`` ends the stream."""
+        flush_mode = (
+            zstandard.COMPRESSOBJ_FLUSH_FINISH
+            if final
+            else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class BrotliEncoder:  # pragma: no cover - exercised only when brotli is installed
+    """brotli stream for one response."""
+
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk and flush it; ``final`` ends the stream."""
+        output: bytes = self._compressor.process(data)
+        end = self._compressor.finish if final else self._compressor.flush
+        tail: bytes = end()
+        return output + tail
+
+
+def available_encoders() -> dict[str, Callable[[int], Any]]:
+    """Encoder classes by content coding, for the codecs installed."""
+    encoders: dict[str, Callable[[int], Any]] = {"gzip": GzipEncoder}
+    if zstandard is not None:  # pragma: no cover
+        encoders["zstd"] = ZstdEncoder
+    if brotli is not None:  # pragma: no cover
+        encoders["br"] = BrotliEncoder
+    return encoders
+
+
+def negotiate(accept_encoding: str, codecs: Sequence[str]) -> str | None:
+    """Pick the content coding for an ``Accept-Encoding`` header.
+
+    Codings are ranked by their q-value, ties by the order of ``codecs``;
+    ``q=0`` refuses a coding and ``*`` stands for the codings not named.
+
+    Returns:
+        One of ``codecs``, or None to send the body as it is
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, parameters = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for codec in codecs:
+        weight = weights.get(codec, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = codec, weight
+    return best
+
+
+def compression_options(performance: PerformanceSettings) -> dict[str, Any]:
+    """CompressionMiddleware arguments from the performance settings."""
+    return {
+        "codecs": performance.response_compression_codecs,
+        "minimum_size": performance.response_compression_min_size,
+        "levels": {
+            "gzip": performance.response_gzip_level,
+            "zstd": performance.response_zstd_level,
+            "br": performance.response_brotli_quality,
+        },
+    }
+
+
+class CompressionMiddleware:
+    """Compress HTTP responses with the client's preferred available codec."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        codecs: Sequence[str] = CODECS,
+        minimum_size: int = 1024,
+        levels: Mapping[str, int] | None = None,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The application to wrap
+            codecs: Content codings to offer, most preferred first; ones
+                whose package is not installed are skipped
+            minimum_size: Whole bodies shorter than this many bytes are not
+                compressed (streamed bodies always are)
+            levels: Compression level per coding (gzip 1-9, zstd 1-19,
+                br 0-11); codecs left out use 6, 3 and 4
+
+        Raises:
+            ValueError: If a codec is not a known content coding
+        """
+        unknown = set(codecs) - set(CODECS)
+        if unknown:
+            raise ValueError(f"Unknown response compression codecs: {sorted(unknown)}")
+        encoders = available_encoders()
+        self.app = app
+        self.codecs = [codec for codec in codecs if codec in encoders]
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "zstd": 3, "br": 4, **(levels or {})}
+        self._encoders = encoders
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(
+            send,
+            codec,
+            lambda: self._encoders[codec](self.levels[codec]),
+            self.minimum_size,
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """``send`` wrapper compressing one response."""
+
+    def __init__(
+        self,
+        send: Send,
+        codec: str,
+        make_encoder: Callable[[], Any],
+        minimum_size: int,
+    ) -> None:
+        self._send = send
+        self._codec = codec
+        self._make_encoder = make_encoder
+        self._minimum_size = minimum_size
+        # A whole body's start message is held until the body shows
+        # whether it gets compressed
+        self._start: Message | None = None
+        self._encoder: Any = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            await self._on_start(message)
+        elif self._passthrough or kind != "http.response.body":
+            await self._flush_start()
+            await self._send(message)
+        else:
+            await self._on_body(message)
+
+    async def _on_start(self, message: Message) -> None:
+        headers = MutableHeaders(raw=list(message["headers"]))
+        message["headers"] = headers.raw
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        if (
+            "content-encoding" in headers
+            or message["status"] in UNCOMPRESSED_STATUSES
+            or media_type.startswith(INCOMPRESSIBLE_TYPES)
+        ):
+            self._passthrough = True
+            await self._send(message)
+            return
+        headers.add_vary_header("Accept-Encoding")
+        self._start = message
+        if "content-length" not in headers:
+            self._begin(message)
+            await self._flush_start()
+
+    async def _on_body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start is not None:
+            if not more_body and len(body) < self._minimum_size:
+                self._passthrough = True
+                await self._flush_start()
+                await self._send(message)
+                return
+            headers = self._begin(self._start)
+            body = await self._compress(body, final=not more_body)
+            if not more_body:
+                headers["Content-Length"] = str(len(body))
+            await self._flush_start()
+        else:
+            body = await self._compress(body, final=not more_body)
+        await self._send({**message, "body": body})
+
+    def _begin(self, start: Message) -> MutableHeaders:
+        """Mark the start message compressed; returns its headers."""
+        self._encoder = self._make_encoder()
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self._codec
+        del headers["Content-Length"]
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        return headers
+
+    async def _compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= THREAD_MIN_SIZE:
+            return await asyncio.to_thread(self._encoder.compress, body, final)
+        compressed: bytes = self._encoder.compress(body, final)
+        return compressed
+
+    async def _flush_start(self) -> None:
+        if self._start is not None:
+            start, self._start = self._start, None
+            await self._send(start)
@@ -0,0 +1,55 @@
+"""Conditional GET support: ETags, If-None-Match and Cache-Control.
+
+Collection routes derive their ETag from a cheap version query (see
+SessionService.get_sessions_version and friends) plus the request's query
+string, and answer 304 before loading any rows. Single-resource routes
+hash the body they are about to send.
+"""
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+# Clients may keep responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag (a quoted digest) identifying ``parts``."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match lists ``etag`` (or is ``*``).
+
+    If-None-Match uses the weak comparison, so a ``W/`` prefix is ignored.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in tags)
+
+
+def add_validators(response: Response, etag: str) -> Response:
+    """Set the ETag and Cache-Control headers of a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response confirming the client's copy."""
+    return add_validators(Response(status_code=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def conditional_response(request: Request, model: BaseModel) -> Response:
+    """JSON response for a single resource, 304 if the client has this body."""
+    body = model.model_dump_json().encode()
+    etag = make_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return add_validators(Response(body, media_type="application/json"), etag)
@@ -1 +1,27 @@
 """API dependencies for dependency injection."""
+
+from fastapi import Request
+
+from app.services.archive_service import ArchiveService
+from app.services.deletion_service import DeletionService
+from app.services.ingest_writer import ExchangeBatchWriter
+
+
+def get_exchange_writer(request: Request) -> ExchangeBatchWriter | None:
+    """Get the running exchange batch writer, if batched ingest is enabled."""
+    writer: ExchangeBatchWriter | None = getattr(
+        request.app.state, "exchange_writer", None
+    )
+    if writer is not None and writer.running:
+        return writer
+    return None
+
+
+def get_archiver(request: Request) -> ArchiveService | None:
+    """Get the application's archiver, if one is configured."""
+    return getattr(request.app.state, "archiver", None)
+
+
+def get_deleter(request: Request) -> DeletionService | None:
+    """Get the application's background deleter, if one is running."""
+    return getattr(request.app.state, "deleter", None)
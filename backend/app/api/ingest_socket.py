@@ -0,0 +1,249 @@
+"""The ingest WebSocket: pipelined, credit-limited exchange recording.
+
+A recorder keeps one connection open and sends exchange records, each a
+JSON object or an array of them in one frame, without waiting for earlier
+ones to commit. Flow control is by credit, one per record: the first
+message grants ``ingest_ws_credits`` and every ack returns the credit of
+the records it covers. A client that sends beyond its credit is
+disconnected (1008), so no connection ever has more than that many records
+waiting for the database.
+
+Records are written ``ingest_batch_size`` at a time through
+SessionService.create_exchanges_bulk, at most ``ingest_batch_delay_ms``
+after the writer starts waiting on a partial batch; the next batch fills
+while one commits. An ack lists the committed records' sequence numbers
+with their exchange ids and the rejected ones (invalid, or for an unknown
+conversation) with the reason. Records not acknowledged when the
+connection drops may or may not have been written.
+"""
+
+import asyncio
+import json
+import logging
+
+from fastapi import WebSocket, status
+from pydantic import TypeAdapter, ValidationError
+
+from app.schemas.ingest import (
+    IngestAck,
+    IngestRecord,
+    IngestRecordAck,
+    IngestRecordError,
+)
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings
+
+logger = logging.getLogger(__name__)
+
+_FRAME = TypeAdapter(IngestRecord | list[IngestRecord])
+
+
+class ProtocolError(ValueError):
+    """A frame that is not a JSON record or array of records."""
+
+
+def _error_detail(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def parse_records(
+    frame: str | bytes,
+) -> tuple[list[IngestRecord], list[IngestRecordError]]:
+    """Validate a frame's records against the exchange schema.
+
+    A valid frame is validated in one pass; otherwise each record is
+    checked on its own, so one bad record rejects only itself.
+
+    Raises:
+        ProtocolError: If the frame is not JSON, or holds something other
+            than an object or an array of them
+    """
+    try:
+        records = _FRAME.validate_json(frame)
+    except ValidationError:
+        pass
+    else:
+        return (records if isinstance(records, list) else [records]), []
+
+    try:
+        payload = json.loads(frame)
+    except ValueError as exc:
+        raise ProtocolError("Frames must be JSON") from exc
+    items = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(item, dict) for item in items):
+        raise ProtocolError("Frames must hold a record or an array of records")
+
+    records, errors = [], []
+    for item in items:
+        try:
+            records.append(IngestRecord.model_validate(item))
+        except ValidationError as exc:
+            seq = item.get("seq")
+            errors.append(
+                IngestRecordError(
+                    seq=seq if isinstance(seq, int) else None,
+                    detail=_error_detail(exc),
+                )
+            )
+    return records, errors
+
+
+class IngestSocket:
+    """One ingest WebSocket connection: a receiver and a batch writer."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        service: SessionService,
+        credits: int = 2000,
+        max_batch_size: int = 500,
+        max_delay_ms: int = 10,
+    ) -> None:
+        """Initialize the connection handler (call :meth:`run` to serve it).
+
+        Args:
+            websocket: The connection, not yet accepted
+            service: Service whose session writes every batch
+            credits: Records the client may have sent and not had acked
+            max_batch_size: Write once this many records are waiting
+            max_delay_ms: Write a partial batch after waiting this long
+        """
+        self.websocket = websocket
+        self.service = service
+        self.credits = credits
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._pending: list[IngestRecord] = []
+        # Records received and not yet acknowledged
+        self._outstanding = 0
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closed = False
+        self._send_lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(
+        cls,
+        websocket: WebSocket,
+        service: SessionService,
+        performance: PerformanceSettings,
+    ) -> "IngestSocket":
+        """Create a handler sized by PerformanceSettings."""
+        return cls(
+            websocket,
+            service,
+            credits=performance.ingest_ws_credits,
+            max_batch_size=performance.ingest_batch_size,
+            max_delay_ms=performance.ingest_batch_delay_ms,
+        )
+
+    async def run(self) -> None:
+        """Serve the connection until the client leaves or breaks protocol."""
+        await self.websocket.accept()
+        await self._send(IngestAck(credit=self.credits))
+        receiver = asyncio.create_task(self._receive_records())
+        writer = asyncio.create_task(self._write_batches())
+        await asyncio.wait({receiver, writer}, return_when=asyncio.FIRST_COMPLETED)
+
+        if not receiver.done():
+            # A batch failed to commit: its records' fate is unknown
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+            self._closed = True
+            await self.websocket.close(
+                status.WS_1011_INTERNAL_ERROR, "Exchange write failed"
+            )
+            exc = writer.exception()
+            logger.exception("Ingest batch failed to commit", exc_info=exc)
+            return
+
+        # Records still waiting are dropped; the batch being written finishes
+        self._closed = True
+        self._pending.clear()
+        self._arrived.set()
+        self._full.set()
+        await writer
+
+    async def _receive_records(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            frame = message.get("text")
+            if frame is None:
+                frame = message.get("bytes") or b""
+            try:
+                records, errors = parse_records(frame)
+            except ProtocolError as exc:
+                await self._close(status.WS_1007_INVALID_FRAME_PAYLOAD_DATA, str(exc))
+                return
+
+            received = len(records) + len(errors)
+            if self._outstanding + received > self.credits:
+                await self._close(status.WS_1008_POLICY_VIOLATION, "Credit exceeded")
+                return
+            self._outstanding += received
+            if errors:
+                await self._acknowledge([], errors)
+            if records:
+                self._pending.extend(records)
+                self._arrived.set()
+                if len(self._pending) >= self.max_batch_size:
+                    self._full.set()
+
+    async def _write_batches(self) -> None:
+        while True:
+            await self._arrived.wait()
+            if self._closed:
+                return
+            if len(self._pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+                if self._closed:
+                    return
+
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            if not self._pending:
+                self._arrived.clear()
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+
+            exchanges, rejected = await self.service.create_exchanges_bulk(batch)
+            acks = [
+                IngestRecordAck(seq=record.seq, id=exchange.id)
+                for record, exchange in zip(batch, exchanges)
+                if exchange is not None
+            ]
+            # The session lives as long as the connection: don't let it
+            # accumulate every row written
+            self.service.db.expunge_all()
+            await self._acknowledge(
+                acks,
+                [
+                    IngestRecordError(seq=batch[index].seq, detail=detail)
+                    for index, detail in rejected
+                ],
+            )
+
+    async def _acknowledge(
+        self, acks: list[IngestRecordAck], errors: list[IngestRecordError]
+    ) -> None:
+        """Report records done and give their credit back."""
+        credit = len(acks) + len(errors)
+        self._outstanding -= credit
+        await self._send(IngestAck(acks=acks, errors=errors, credit=credit))
+
+    async def _send(self, ack: IngestAck) -> None:
+        async with self._send_lock:
+            if not self._closed:
+                await self.websocket.send_text(ack.model_dump_json())
+
+    async def _close(self, code: int, reason: str) -> None:
+        async with self._send_lock:
+            self._closed = True
+            await self.websocket.close(code, reason)
@@ -0,0 +1,92 @@
+"""JSON responses encoded straight from database rows.
+
+List routes select their response schema's columns as plain Core rows (see
+SessionService._response_select) and encode them here, skipping ORM
+instances and response-model validation. The bytes match what FastAPI
+writes for the response models: compact separators, UTF-8 rather than
+``\\u`` escapes, and ISO 8601 datetimes (the database's naive datetimes
+carry no offset to format differently).
+"""
+
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Collection, Sequence
+from datetime import datetime
+from typing import Any
+
+from fastapi.responses import Response, StreamingResponse
+
+try:  # pragma: no cover - exercised only when orjson is installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _encode_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` as JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_encode_default,
+    ).encode("utf-8")
+
+
+class RowsResponse(Response):
+    """JSON response rendered with ``dumps``, without response-model validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def page_response(
+    rows: Sequence[Sequence[Any]],
+    fields: Collection[str],
+    total: int,
+    page: int,
+    page_size: int,
+    next_cursor: str | None,
+) -> RowsResponse:
+    """A list response (items, total, page, page_size, next_cursor) from rows.
+
+    Each row holds the values of ``fields`` in order; trailing columns, such
+    as the ``sort_key`` of a pagination query, are dropped.
+    """
+    return RowsResponse(
+        {
+            "items": [dict(zip(fields, row)) for row in rows],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def ndjson_response(
+    batches: AsyncIterable[Sequence[Sequence[Any]]], fields: Collection[str]
+) -> StreamingResponse:
+    """A streamed NDJSON response: one object of ``fields`` per row.
+
+    Each batch of rows goes out as one chunk as soon as it is encoded, so
+    only a batch is ever held in memory.
+    """
+    names = list(fields)
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for rows in batches:
+            yield b"".join(dumps(dict(zip(names, row))) + b"\n" for row in rows)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,55 @@
+"""Archive administration routes."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_archiver
+from app.schemas import ArchiveStatusResponse
+from app.services.archive_service import ArchiveService
+
+router = APIRouter(prefix="/archive", tags=["archive"])
+
+
+def _require(archiver: ArchiveService | None) -> ArchiveService:
+    if archiver is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Archiving is not available",
+        )
+    return archiver
+
+
+@router.get(
+    "/status",
+    response_model=ArchiveStatusResponse,
+    summary="Get archiver progress",
+)
+async def get_archive_status(
+    archiver: ArchiveService | None = Depends(get_archiver),
+) -> ArchiveStatusResponse:
+    """Get the progress of the current or last archive pass and the archive files."""
+    return _require(archiver).status()
+
+
+@router.post(
+    "/run",
+    response_model=ArchiveStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start an archive pass",
+)
+async def run_archive(
+    older_than_days: int | None = Query(
+        None, ge=0, description="Override archive_after_days for this pass"
+    ),
+    archiver: ArchiveService | None = Depends(get_archiver),
+) -> ArchiveStatusResponse:
+    """Start moving old exchanges into the monthly archive files.
+
+    The pass runs in the background; poll ``GET /api/archive/status``.
+    """
+    archiver = _require(archiver)
+    if not archiver.start(older_than_days):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An archive pass is already running",
+        )
+    return archiver.status()
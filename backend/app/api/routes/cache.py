@@ -0,0 +1,18 @@
+"""Cache reporting routes."""
+
+from fastapi import APIRouter
+
+from app.schemas import LookupCacheMetricsResponse
+from app.services.lookup_cache import lookup_cache
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get(
+    "/metrics",
+    response_model=LookupCacheMetricsResponse,
+    summary="Get lookup cache metrics",
+)
+async def get_cache_metrics() -> LookupCacheMetricsResponse:
+    """Get this process's session/conversation lookup cache size and hit rate."""
+    return lookup_cache.metrics()
@@ -1,15 +1,31 @@
 """Conversation management routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_async_db
+from app.api.conditional import (
+    add_validators,
+    conditional_response,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from app.api.deps import get_deleter
+from app.api.responses import NDJSON_MEDIA_TYPE, ndjson_response, page_response
+from app.api.sse import EVENT_STREAM_MEDIA_TYPE, event_stream, resume_after
+from app.db.session import get_async_db, get_async_read_db
 from app.schemas import (
     ConversationCreate,
     ConversationListResponse,
     ConversationResponse,
     ConversationUpdate,
+    DeletionStatusResponse,
+    ExchangeResponse,
 )
+from app.services.deletion_service import DeletionService
+from app.services.pagination import InvalidCursorError
 from app.services.session_service import SessionService
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
@@ -20,6 +36,13 @@ def get_session_service(db: AsyncSession = Depends(get_async_db)) -> SessionServ
     return SessionService(db)
 
 
+def get_read_session_service(
+    db: AsyncSession = Depends(get_async_read_db),
+) -> SessionService:
+    """Dependency to get a session service on the read-only database."""
+    return SessionService(db)
+
+
 @router.post(
     "",
     response_model=ConversationResponse,
@@ -47,28 +70,54 @@ async def create_conversation(
 )
 async def list_conversations_by_session(
     session_id: int,
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    service: SessionService = Depends(get_session_service),
-) -> ConversationListResponse:
-    """Get a paginated list of conversations for a session."""
+    cursor: str | None = Query(
+        None, description="Cursor from a previous page's next_cursor (overrides page)"
+    ),
+    service: SessionService = Depends(get_read_session_service),
+) -> Response:
+    """Get a paginated list of conversations for a session.
+
+    Answers 304 to an ``If-None-Match`` naming the current ETag without
+    loading any conversation. Archived sessions are listed without an ETag.
+    """
+    version = await service.get_conversations_version(session_id)
+    etag = None
+    if version is not None:
+        etag = make_etag("conversations", session_id, version, request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
     # Verify session exists
-    session = await service.get_session(session_id)
-    if not session:
+    if not await service.session_exists(session_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session with id {session_id} not found",
         )
 
-    conversations, total = await service.get_conversations_by_session(
-        session_id=session_id, page=page, page_size=page_size
-    )
-    return ConversationListResponse(
-        items=[ConversationResponse.model_validate(c) for c in conversations],
+    try:
+        conversations, total, next_cursor = await service.get_conversations_by_session(
+            session_id=session_id,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            rows=True,
+            # The version query read the session's counters already
+            total=version[0] if version is not None else None,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = page_response(
+        conversations,
+        ConversationResponse.model_fields,
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
+    return add_validators(response, etag) if etag else response
 
 
 @router.get(
@@ -78,8 +127,9 @@ async def list_conversations_by_session(
 )
 async def get_conversation(
     conversation_id: int,
-    service: SessionService = Depends(get_session_service),
-) -> ConversationResponse:
+    request: Request,
+    service: SessionService = Depends(get_read_session_service),
+) -> Response:
     """Get a specific conversation by its ID."""
     conversation = await service.get_conversation(conversation_id)
     if not conversation:
@@ -87,7 +137,80 @@ async def get_conversation(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation with id {conversation_id} not found",
         )
-    return ConversationResponse.model_validate(conversation)
+    return conditional_response(
+        request, ConversationResponse.model_validate(conversation)
+    )
+
+
+@router.get(
+    "/{conversation_id}/exchanges.ndjson",
+    response_class=StreamingResponse,
+    summary="Stream a conversation's exchanges as NDJSON",
+    responses={
+        status.HTTP_200_OK: {
+            "content": {NDJSON_MEDIA_TYPE: {}},
+            "description": "One ExchangeResponse object per line, oldest first",
+        }
+    },
+)
+async def stream_conversation_exchanges(
+    conversation_id: int,
+    service: SessionService = Depends(get_read_session_service),
+) -> StreamingResponse:
+    """Stream every exchange of a conversation, one JSON object per line.
+
+    Rows are read through a server-side cursor and sent a batch at a time,
+    so the first lines go out at once and memory does not grow with the
+    conversation's length.
+    """
+    if not await service.conversation_exists(conversation_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Conversation with id {conversation_id} not found",
+        )
+    return ndjson_response(
+        service.stream_exchanges(conversation_id), ExchangeResponse.model_fields
+    )
+
+
+@router.get(
+    "/{conversation_id}/events",
+    response_class=StreamingResponse,
+    summary="Follow a conversation's exchanges as server-sent events",
+    responses={
+        status.HTTP_200_OK: {
+            "content": {EVENT_STREAM_MEDIA_TYPE: {}},
+            "description": "exchange.created and exchange.deleted events",
+        }
+    },
+)
+async def conversation_events(
+    conversation_id: int,
+    request: Request,
+    last_event_id: int | None = Query(
+        None, description="Replay exchanges created after this id"
+    ),
+    service: SessionService = Depends(get_read_session_service),
+) -> StreamingResponse:
+    """Stream the conversation's new and deleted exchanges as they are committed.
+
+    Each ``exchange.created`` event carries the exchange (as GET
+    /api/exchanges/{id} returns it) with its id as the event id, so a
+    reconnecting client resumes where it left off.
+    """
+    if not await service.conversation_exists(conversation_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Conversation with id {conversation_id} not found",
+        )
+    return event_stream(
+        ("conversation", conversation_id),
+        service,
+        resume_after(request, last_event_id),
+        lambda after_id: service.stream_exchanges_after(
+            after_id, conversation_id=conversation_id
+        ),
+    )
 
 
 @router.put(
@@ -113,16 +236,37 @@ async def update_conversation(
 @router.delete(
     "/{conversation_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    response_model=None,
     summary="Delete a conversation",
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": DeletionStatusResponse,
+            "description": "Too large for one transaction; deleting in the background",
+        }
+    },
 )
 async def delete_conversation(
     conversation_id: int,
     service: SessionService = Depends(get_session_service),
-) -> None:
-    """Delete a conversation and all its exchanges."""
-    deleted = await service.delete_conversation(conversation_id)
-    if not deleted:
+    deleter: DeletionService | None = Depends(get_deleter),
+) -> JSONResponse | None:
+    """Delete a conversation and all its exchanges.
+
+    Conversations with more than ``delete_chunk_size`` exchanges are deleted in
+    the background: the response is 202 with the deletion's progress, which
+    ``GET /api/deletions/{id}`` keeps reporting.
+    """
+    conversation = await service.get_conversation(conversation_id)
+    if conversation is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation with id {conversation_id} not found",
         )
+    exchange_count = conversation.exchange_count
+    if deleter is not None and deleter.needs_background(exchange_count):
+        deletion = deleter.start("conversation", conversation_id, exchange_count)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(deletion)
+        )
+    await service.delete_conversation(conversation_id)
+    return None
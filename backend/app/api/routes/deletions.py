@@ -0,0 +1,49 @@
+"""Background deletion progress routes."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import get_deleter
+from app.schemas import DeletionListResponse, DeletionStatusResponse
+from app.services.deletion_service import DeletionService
+
+router = APIRouter(prefix="/deletions", tags=["deletions"])
+
+
+def _require(deleter: DeletionService | None) -> DeletionService:
+    if deleter is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background deletion is not available",
+        )
+    return deleter
+
+
+@router.get(
+    "",
+    response_model=DeletionListResponse,
+    summary="List background deletions",
+)
+async def list_deletions(
+    deleter: DeletionService | None = Depends(get_deleter),
+) -> DeletionListResponse:
+    """List running and recently finished background deletions, newest first."""
+    return DeletionListResponse(items=_require(deleter).list())
+
+
+@router.get(
+    "/{deletion_id}",
+    response_model=DeletionStatusResponse,
+    summary="Get a background deletion's progress",
+)
+async def get_deletion(
+    deletion_id: int,
+    deleter: DeletionService | None = Depends(get_deleter),
+) -> DeletionStatusResponse:
+    """Get the progress of a background deletion started by a DELETE request."""
+    deletion = _require(deleter).status(deletion_id)
+    if deletion is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Deletion with id {deletion_id} not found",
+        )
+    return deletion
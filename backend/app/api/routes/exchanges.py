@@ -1,14 +1,32 @@
 """Exchange management routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_async_db
+from app.api.conditional import (
+    add_validators,
+    conditional_response,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from app.api.deps import get_exchange_writer
+from app.api.responses import page_response
+from app.db.session import get_async_db, get_async_read_db
 from app.schemas import (
+    ExchangeBulkCreate,
+    ExchangeBulkError,
+    ExchangeBulkResponse,
     ExchangeCreate,
     ExchangeListResponse,
     ExchangeResponse,
+    ExchangeSummaryListResponse,
+    ExchangeSummaryResponse,
 )
+from app.services.ingest_writer import ExchangeBatchWriter
+from app.services.pagination import InvalidCursorError
 from app.services.session_service import SessionService
 
 router = APIRouter(prefix="/exchanges", tags=["exchanges"])
@@ -19,6 +37,13 @@ def get_session_service(db: AsyncSession = Depends(get_async_db)) -> SessionServ
     return SessionService(db)
 
 
+def get_read_session_service(
+    db: AsyncSession = Depends(get_async_read_db),
+) -> SessionService:
+    """Dependency to get a session service on the read-only database."""
+    return SessionService(db)
+
+
 @router.post(
     "",
     response_model=ExchangeResponse,
@@ -28,9 +53,17 @@ def get_session_service(db: AsyncSession = Depends(get_async_db)) -> SessionServ
 async def create_exchange(
     data: ExchangeCreate,
     service: SessionService = Depends(get_session_service),
+    writer: ExchangeBatchWriter | None = Depends(get_exchange_writer),
 ) -> ExchangeResponse:
-    """Create a new exchange (user message + assistant response) within a conversation."""
-    exchange = await service.create_exchange(data)
+    """Create a new exchange (user message + assistant response) within a conversation.
+
+    With batched ingest enabled the exchange is group-committed with other
+    concurrent writes; the response is sent once it has been committed.
+    """
+    if writer is not None:
+        exchange = await writer.submit(data)
+    else:
+        exchange = await service.create_exchange(data)
     if not exchange:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,35 +72,92 @@ async def create_exchange(
     return ExchangeResponse.model_validate(exchange)
 
 
+@router.post(
+    "/bulk",
+    response_model=ExchangeBulkResponse,
+    summary="Create exchanges in bulk",
+)
+async def create_exchanges_bulk(
+    data: ExchangeBulkCreate,
+    service: SessionService = Depends(get_session_service),
+) -> ExchangeBulkResponse:
+    """Create a batch of exchanges, possibly for many conversations, in one transaction.
+
+    Items whose conversation does not exist are reported in ``errors`` and
+    get a null id; the rest are created.
+    """
+    exchanges, errors = await service.create_exchanges_bulk(data.items)
+    return ExchangeBulkResponse(
+        ids=[exchange.id if exchange else None for exchange in exchanges],
+        errors=[
+            ExchangeBulkError(index=index, detail=detail) for index, detail in errors
+        ],
+    )
+
+
 @router.get(
     "/by-conversation/{conversation_id}",
-    response_model=ExchangeListResponse,
+    response_model=ExchangeListResponse | ExchangeSummaryListResponse,
     summary="List exchanges by conversation",
 )
 async def list_exchanges_by_conversation(
     conversation_id: int,
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=200, description="Items per page"),
-    service: SessionService = Depends(get_session_service),
-) -> ExchangeListResponse:
-    """Get a paginated list of exchanges for a conversation."""
+    cursor: str | None = Query(
+        None, description="Cursor from a previous page's next_cursor (overrides page)"
+    ),
+    view: Literal["full", "summary"] = Query(
+        "full",
+        description="summary returns previews and lengths instead of full messages",
+    ),
+    service: SessionService = Depends(get_read_session_service),
+) -> Response:
+    """Get a paginated list of exchanges for a conversation.
+
+    ``view=summary`` skips the message bodies, which can be fetched one at a
+    time from ``GET /exchanges/{id}``. Answers 304 to an ``If-None-Match``
+    naming the current ETag without loading any exchange; archived
+    conversations are listed without an ETag.
+    """
+    version = await service.get_exchanges_version(conversation_id)
+    etag = None
+    if version is not None:
+        etag = make_etag("exchanges", conversation_id, version, request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
     # Verify conversation exists
-    conversation = await service.get_conversation(conversation_id)
-    if not conversation:
+    if not await service.conversation_exists(conversation_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation with id {conversation_id} not found",
         )
 
-    exchanges, total = await service.get_exchanges_by_conversation(
-        conversation_id=conversation_id, page=page, page_size=page_size
-    )
-    return ExchangeListResponse(
-        items=[ExchangeResponse.model_validate(e) for e in exchanges],
+    try:
+        exchanges, total, next_cursor = await service.get_exchanges_by_conversation(
+            conversation_id=conversation_id,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            summary=view == "summary",
+            rows=True,
+            # The version query read the conversation's counters already
+            total=version[0] if version is not None else None,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    schema = ExchangeSummaryResponse if view == "summary" else ExchangeResponse
+    response = page_response(
+        exchanges,
+        schema.model_fields,
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
+    return add_validators(response, etag) if etag else response
 
 
 @router.get(
@@ -77,8 +167,9 @@ async def list_exchanges_by_conversation(
 )
 async def get_exchange(
     exchange_id: int,
-    service: SessionService = Depends(get_session_service),
-) -> ExchangeResponse:
+    request: Request,
+    service: SessionService = Depends(get_read_session_service),
+) -> Response:
     """Get a specific exchange by its ID."""
     exchange = await service.get_exchange(exchange_id)
     if not exchange:
@@ -86,7 +177,7 @@ async def get_exchange(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Exchange with id {exchange_id} not found",
         )
-    return ExchangeResponse.model_validate(exchange)
+    return conditional_response(request, ExchangeResponse.model_validate(exchange))
 
 
 @router.delete(
@@ -0,0 +1,47 @@
+"""Exchange ingest routes."""
+
+from fastapi import APIRouter, Depends, WebSocket
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_exchange_writer
+from app.api.ingest_socket import IngestSocket
+from app.db.session import get_async_db
+from app.schemas import IngestMetricsResponse
+from app.services.ingest_writer import ExchangeBatchWriter
+from app.services.session_service import SessionService
+from app.services.settings import get_settings
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+
+
+@router.get(
+    "/metrics",
+    response_model=IngestMetricsResponse,
+    summary="Get ingest writer metrics",
+)
+async def get_ingest_metrics(
+    writer: ExchangeBatchWriter | None = Depends(get_exchange_writer),
+) -> IngestMetricsResponse:
+    """Get queue depth, batch size and flush latency of the batched writer.
+
+    In direct mode (no writer running) only ``mode`` is meaningful.
+    """
+    if writer is None:
+        return IngestMetricsResponse(mode="direct")
+    return writer.metrics()
+
+
+@router.websocket("/ws")
+async def ingest_websocket(
+    websocket: WebSocket, db: AsyncSession = Depends(get_async_db)
+) -> None:
+    """Record exchanges sent over a persistent connection.
+
+    Frames carry IngestRecord objects (or arrays of them); the server writes
+    them in batches and answers with IngestAck messages holding the assigned
+    ids and the credit for further records. See app.api.ingest_socket.
+    """
+    handler = IngestSocket.from_settings(
+        websocket, SessionService(db), get_settings().performance
+    )
+    await handler.run()
@@ -1,15 +1,30 @@
 """Session management routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_async_db
+from app.api.conditional import (
+    add_validators,
+    conditional_response,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from app.api.deps import get_deleter
+from app.api.responses import page_response
+from app.api.sse import EVENT_STREAM_MEDIA_TYPE, event_stream, resume_after
+from app.db.session import get_async_db, get_async_read_db
 from app.schemas import (
+    DeletionStatusResponse,
     SessionCreate,
     SessionListResponse,
     SessionResponse,
     SessionUpdate,
 )
+from app.services.deletion_service import DeletionService
+from app.services.pagination import InvalidCursorError
 from app.services.session_service import SessionService
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
@@ -20,6 +35,13 @@ def get_session_service(db: AsyncSession = Depends(get_async_db)) -> SessionServ
     return SessionService(db)
 
 
+def get_read_session_service(
+    db: AsyncSession = Depends(get_async_read_db),
+) -> SessionService:
+    """Dependency to get a session service on the read-only database."""
+    return SessionService(db)
+
+
 @router.post(
     "",
     response_model=SessionResponse,
@@ -41,18 +63,38 @@ async def create_session(
     summary="List all sessions",
 )
 async def list_sessions(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    service: SessionService = Depends(get_session_service),
-) -> SessionListResponse:
-    """Get a paginated list of all sessions."""
-    sessions, total = await service.get_sessions(page=page, page_size=page_size)
-    return SessionListResponse(
-        items=[SessionResponse.model_validate(s) for s in sessions],
+    cursor: str | None = Query(
+        None, description="Cursor from a previous page's next_cursor (overrides page)"
+    ),
+    service: SessionService = Depends(get_read_session_service),
+) -> Response:
+    """Get a paginated list of all sessions.
+
+    Answers 304 to an ``If-None-Match`` naming the current ETag without
+    loading any session.
+    """
+    version = await service.get_sessions_version()
+    etag = make_etag("sessions", version, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    try:
+        sessions, total, next_cursor = await service.get_sessions(
+            page=page, page_size=page_size, cursor=cursor, rows=True
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = page_response(
+        sessions,
+        SessionResponse.model_fields,
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
+    return add_validators(response, etag)
 
 
 @router.get(
@@ -62,8 +104,9 @@ async def list_sessions(
 )
 async def get_session(
     session_id: int,
-    service: SessionService = Depends(get_session_service),
-) -> SessionResponse:
+    request: Request,
+    service: SessionService = Depends(get_read_session_service),
+) -> Response:
     """Get a specific session by its ID."""
     session = await service.get_session(session_id)
     if not session:
@@ -71,7 +114,47 @@ async def get_session(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session with id {session_id} not found",
         )
-    return SessionResponse.model_validate(session)
+    return conditional_response(request, SessionResponse.model_validate(session))
+
+
+@router.get(
+    "/{session_id}/events",
+    response_class=StreamingResponse,
+    summary="Follow a session's exchanges as server-sent events",
+    responses={
+        status.HTTP_200_OK: {
+            "content": {EVENT_STREAM_MEDIA_TYPE: {}},
+            "description": "exchange.created and exchange.deleted events",
+        }
+    },
+)
+async def session_events(
+    session_id: int,
+    request: Request,
+    last_event_id: int | None = Query(
+        None, description="Replay exchanges created after this id"
+    ),
+    service: SessionService = Depends(get_read_session_service),
+) -> StreamingResponse:
+    """Stream the session's new and deleted exchanges as they are committed.
+
+    Each ``exchange.created`` event carries the exchange (as GET
+    /api/exchanges/{id} returns it) with its id as the event id, so a
+    reconnecting client resumes where it left off.
+    """
+    if not await service.session_exists(session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session with id {session_id} not found",
+        )
+    return event_stream(
+        ("session", session_id),
+        service,
+        resume_after(request, last_event_id),
+        lambda after_id: service.stream_exchanges_after(
+            after_id, session_id=session_id
+        ),
+    )
 
 
 @router.put(
@@ -97,16 +180,36 @@ async def update_session(
 @router.delete(
     "/{session_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    response_model=None,
     summary="Delete a session",
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": DeletionStatusResponse,
+            "description": "Too large for one transaction; deleting in the background",
+        }
+    },
 )
 async def delete_session(
     session_id: int,
     service: SessionService = Depends(get_session_service),
-) -> None:
-    """Delete a session and all its conversations and exchanges."""
-    deleted = await service.delete_session(session_id)
-    if not deleted:
+    deleter: DeletionService | None = Depends(get_deleter),
+) -> JSONResponse | None:
+    """Delete a session and all its conversations and exchanges.
+
+    Sessions with more than ``delete_chunk_size`` exchanges are deleted in
+    the background: the response is 202 with the deletion's progress, which
+    ``GET /api/deletions/{id}`` keeps reporting.
+    """
+    session = await service.get_session(session_id)
+    if session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session with id {session_id} not found",
         )
+    if deleter is not None and deleter.needs_background(session.exchange_count):
+        deletion = deleter.start("session", session_id, session.exchange_count)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(deletion)
+        )
+    await service.delete_session(session_id)
+    return None
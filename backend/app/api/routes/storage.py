@@ -0,0 +1,29 @@
+"""Storage reporting routes."""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_read_db
+from app.schemas import StorageReportResponse
+from app.services.storage_service import StorageService
+
+router = APIRouter(prefix="/storage", tags=["storage"])
+
+
+def get_storage_service(
+    db: AsyncSession = Depends(get_async_read_db),
+) -> StorageService:
+    """Dependency to get storage service on the read-only database."""
+    return StorageService(db)
+
+
+@router.get(
+    "/report",
+    response_model=StorageReportResponse,
+    summary="Get message storage savings",
+)
+async def get_storage_report(
+    service: StorageService = Depends(get_storage_service),
+) -> StorageReportResponse:
+    """Report how much deduplication and compression save on message bodies."""
+    return await service.get_report()
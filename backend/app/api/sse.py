@@ -0,0 +1,111 @@
+"""Server-sent event streams of new and deleted exchanges.
+
+A stream subscribes to its topic first, then replays the exchanges created
+after the client's ``Last-Event-ID`` (event ids are exchange ids) and
+releases its database connection before tailing the broker, so idle
+subscribers hold no connection. Live events the replay already covered
+are skipped. A ``retry:`` line is sent as soon as the stream opens, so the
+response is committed at once, and comment lines keep idle connections
+open through proxies.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.schemas.exchange import ExchangeResponse
+from app.services.events import (
+    EXCHANGE_CREATED,
+    Topic,
+    event_frame,
+    exchange_events,
+)
+from app.services.session_service import SessionService
+from app.services.settings import get_settings
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+KEEPALIVE = b": keepalive\n\n"
+
+# First frame of every stream: EventSource's reconnect delay, in ms
+OPENING = b"retry: 3000\n\n"
+
+# Don't let proxies cache or buffer the stream
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def resume_after(request: Request, last_event_id: int | None) -> int | None:
+    """Exchange id to replay from: the Last-Event-ID header, else the query.
+
+    EventSource sends the header when it reconnects; the ``last_event_id``
+    query parameter serves the first connection. Non-numeric ids are ignored.
+    """
+    header = request.headers.get("last-event-id")
+    if header is not None and header.strip().isdigit():
+        return int(header)
+    return last_event_id
+
+
+def _replay_frames(rows: Sequence[Any]) -> bytes:
+    return b"".join(
+        event_frame(
+            EXCHANGE_CREATED,
+            ExchangeResponse.model_validate(row).model_dump_json(),
+            row.id,
+        )
+        for row in rows
+    )
+
+
+def event_stream(
+    topic: Topic,
+    service: SessionService,
+    after_id: int | None,
+    replay: Callable[[int], AsyncIterator[Sequence[Any]]],
+) -> StreamingResponse:
+    """Stream ``topic``'s events, first replaying exchanges after ``after_id``.
+
+    Args:
+        topic: Broker topic to follow
+        service: The request's service, whose connection is released once
+            the replay is done
+        after_id: Last exchange id the client has seen, None to start live
+        replay: Streams batches of exchange rows created after an id
+    """
+    performance = get_settings().performance
+
+    async def frames() -> AsyncIterator[bytes]:
+        subscription = exchange_events.subscribe(topic, performance.events_queue_size)
+        try:
+            yield OPENING
+            last_id = after_id or 0
+            if after_id is not None:
+                async for rows in replay(after_id):
+                    yield _replay_frames(rows)
+                    last_id = rows[-1].id
+            await service.db.close()
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        subscription.get(), performance.events_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                if item is None:
+                    # Dropped for falling behind: the client reconnects and
+                    # resumes from its Last-Event-ID
+                    return
+                event_id, frame = item
+                if event_id is None or event_id > last_id:
+                    yield frame
+        finally:
+            exchange_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(), media_type=EVENT_STREAM_MEDIA_TYPE, headers=EVENT_STREAM_HEADERS
+    )
@@ -0,0 +1,464 @@
+"""Time-partitioned SQLite archive databases.
+
+Old exchanges, and sessions/conversations with nothing newer, are moved out
+of the live database into one SQLite file per month under the archive
+directory (``clouseau-2024-01.db``). Every pooled connection ATTACHes the
+archive files as schemas (``archive_2024_01``), so reads can span live and
+archived rows with UNION, and the move itself is a set of
+``INSERT INTO archive.t SELECT ... FROM main.t`` statements.
+
+SQLite can attach at most MAX_ATTACHED databases, so once a run would
+exceed that, the months of the oldest year are merged into one yearly
+file (``clouseau-2024.db``) that takes that year's later moves too.
+
+The row helpers run on a synchronous Session (use ``AsyncSession.run_sync``
+from async code) whose connection has the archives attached.
+"""
+
+import os
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import Any, cast
+
+from sqlalchemy import (
+    MetaData,
+    Table,
+    bindparam,
+    create_engine,
+    delete,
+    event,
+    insert,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import CursorResult, Engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.blobs import release_blobs
+
+ARCHIVE_DIRECTORY = "archive"
+
+# Compile-time default of SQLITE_MAX_ATTACHED
+MAX_ATTACHED = 10
+
+# Connection info key listing the attached archive schemas, newest first
+ATTACHED_ARCHIVES = "archive_schemas"
+
+# Instance attribute naming the archive schema a row was loaded from
+ARCHIVED_IN = "_archived_in"
+_DIRECTORY_STAMP = "archive_directory_stamp"
+
+# Rows per IN (...) list, well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+_FILE_PATTERN = re.compile(r"^clouseau-(\d{4})(?:-(\d{2}))?\.db$")
+
+
+def archive_schema(year: int, month: int | None = None) -> str:
+    """Schema name an archive file is attached as."""
+    return f"archive_{year:04d}" if month is None else f"archive_{year:04d}_{month:02d}"
+
+
+def archive_filename(year: int, month: int | None = None) -> str:
+    """File name of the archive for a month (or a whole, compacted year)."""
+    return (
+        f"clouseau-{year:04d}.db"
+        if month is None
+        else f"clouseau-{year:04d}-{month:02d}.db"
+    )
+
+
+def list_archives(directory: Path) -> dict[str, Path]:
+    """Archive files in ``directory`` by schema name, newest first."""
+    found = []
+    if directory.is_dir():
+        for path in directory.iterdir():
+            match = _FILE_PATTERN.match(path.name)
+            if match:
+                year, month = int(match[1]), int(match[2]) if match[2] else None
+                found.append(((year, month or 13), archive_schema(year, month), path))
+    return {schema: path for _, schema, path in sorted(found, reverse=True)}
+
+
+@lru_cache
+def archive_metadata() -> MetaData:
+    """The app schema without foreign keys, for creating archive files.
+
+    A row's parent may live in another partition, so archive files only
+    keep the tables and indexes.
+    """
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.foreign_key_constraints):
+            copy.constraints.discard(constraint)
+        for column in copy.columns:
+            column.foreign_keys.clear()
+    return metadata
+
+
+@cache
+def partition_table(table: Table, schema: str | None) -> Table:
+    """``table`` qualified with an attached archive schema (None: the live table)."""
+    if schema is None:
+        return table
+    return table.to_metadata(MetaData(), schema=schema)
+
+
+def create_archive(path: Path) -> None:
+    """Create an empty archive file with the archive schema."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        archive_metadata().create_all(engine)
+    finally:
+        engine.dispose()
+
+
+def attach_archives(engine: Engine, directory: Path) -> None:
+    """Register a checkout hook keeping the archive files ATTACHed.
+
+    Each checkout compares the directory's mtime with the one the connection
+    last saw, so files created or compacted by another process are picked
+    up on the next checkout for the cost of one stat call. Non-SQLite
+    engines are left untouched. For an AsyncEngine pass
+    ``async_engine.sync_engine``.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _sync_attachments(
+        dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        try:
+            stamp = os.stat(directory).st_mtime_ns
+        except OSError:
+            stamp = None
+        info = connection_record.info
+        if info.get(_DIRECTORY_STAMP, "unset") == stamp:
+            return
+
+        wanted = list_archives(directory)
+        attached = info.get(ATTACHED_ARCHIVES, [])
+        cursor = dbapi_connection.cursor()
+        try:
+            for schema in attached:
+                if schema not in wanted:
+                    cursor.execute(f"DETACH DATABASE {schema}")
+            for schema, path in wanted.items():
+                if schema not in attached:
+                    cursor.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+        finally:
+            cursor.close()
+        info[ATTACHED_ARCHIVES] = list(wanted)
+        info[_DIRECTORY_STAMP] = stamp
+
+
+def attached_archives(session: Session) -> list[str]:
+    """Archive schemas attached to the session's connection, newest first."""
+    return list(session.connection().info.get(ATTACHED_ARCHIVES, []))
+
+
+def _chunks(items: Sequence[Any]) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start : start + CHUNK_SIZE]
+
+
+def move_rows(
+    session: Session, table_name: str, ids: Sequence[int], schema: str
+) -> None:
+    """Move sessions or conversations, by id, from the live database to ``schema``."""
+    live = Base.metadata.tables[table_name]
+    archived = partition_table(live, schema)
+    for chunk in _chunks(ids):
+        session.execute(
+            insert(archived).from_select(
+                list(live.c.keys()), select(live).where(live.c.id.in_(chunk))
+            )
+        )
+        session.execute(delete(live).where(live.c.id.in_(chunk)))
+
+
+def restore_rows(session: Session, table_name: str, ids: Sequence[int]) -> int:
+    """Move archived sessions or conversations, by id, back to the live database.
+
+    Returns:
+        Number of rows restored
+    """
+    live = Base.metadata.tables[table_name]
+    restored = 0
+    for schema in attached_archives(session):
+        archived = partition_table(live, schema)
+        for chunk in _chunks(ids):
+            result = cast(
+                CursorResult[Any],
+                session.execute(
+                    insert(live).from_select(
+                        list(live.c.keys()),
+                        select(archived).where(archived.c.id.in_(chunk)),
+                    )
+                ),
+            )
+            restored += result.rowcount
+            session.execute(delete(archived).where(archived.c.id.in_(chunk)))
+    return restored
+
+
+def move_exchanges(session: Session, ids: Sequence[int], schema: str) -> None:
+    """Move exchanges, with their bodies and blob references, to ``schema``.
+
+    Each archive file keeps its own reference-counted message_blobs. The
+    stored (already encoded) content is copied once per blob and the live
+    references are released.
+    """
+    tables = Base.metadata.tables
+    exchanges, bodies, blobs = (
+        tables["exchanges"],
+        tables["exchange_bodies"],
+        tables["message_blobs"],
+    )
+    archived_blobs = partition_table(blobs, schema)
+    for chunk in _chunks(ids):
+        hashes = [
+            digest
+            for row in session.execute(
+                select(
+                    bodies.c.user_message_hash, bodies.c.assistant_message_hash
+                ).where(bodies.c.exchange_id.in_(chunk))
+            )
+            for digest in row
+        ]
+        counts = Counter(hashes)
+        copy_blob = sqlite_insert(archived_blobs).from_select(
+            ["hash", "content", "size", "ref_count", "created_at"],
+            select(
+                blobs.c.hash,
+                blobs.c.content,
+                blobs.c.size,
+                bindparam("b_count"),
+                blobs.c.created_at,
+            ).where(blobs.c.hash == bindparam("b_hash")),
+        )
+        session.execute(
+            copy_blob.on_conflict_do_update(
+                index_elements=["hash"],
+                set_={
+                    "ref_count": archived_blobs.c.ref_count
+                    + copy_blob.excluded.ref_count
+                },
+            ),
+            [
+                {"b_hash": digest, "b_count": count}
+                for digest, count in sorted(counts.items())
+            ],
+        )
+        for table, key in ((exchanges, exchanges.c.id), (bodies, bodies.c.exchange_id)):
+            session.execute(
+                insert(partition_table(table, schema)).from_select(
+                    list(table.c.keys()), select(table).where(key.in_(chunk))
+                )
+            )
+        session.execute(delete(bodies).where(bodies.c.exchange_id.in_(chunk)))
+        session.execute(delete(exchanges).where(exchanges.c.id.in_(chunk)))
+        release_blobs(session, hashes)
+
+
+def purge_archived(
+    session: Session,
+    session_ids: Sequence[int] = (),
+    conversation_ids: Sequence[int] = (),
+    exchange_ids: Sequence[int] = (),
+) -> None:
+    """Delete archived rows of the given sessions, conversations and exchanges.
+
+    Covers archived descendants of live rows too, so call it before the live
+    rows are deleted: the conversations of ``session_ids`` are looked up in
+    every partition.
+    """
+    schemas = attached_archives(session)
+    if not schemas:
+        return
+
+    tables = Base.metadata.tables
+    sessions, conversations = tables["sessions"], tables["conversations"]
+    exchanges, bodies = tables["exchanges"], tables["exchange_bodies"]
+    purged_conversation_ids = set(conversation_ids)
+    if session_ids:
+        for schema in (None, *schemas):
+            table = partition_table(conversations, schema)
+            purged_conversation_ids.update(
+                session.execute(
+                    select(table.c.id).where(table.c.session_id.in_(session_ids))
+                ).scalars()
+            )
+
+    for schema in schemas:
+        archived = partition_table(exchanges, schema)
+        archived_bodies = partition_table(bodies, schema)
+        condition = or_(
+            archived.c.id.in_(exchange_ids),
+            archived.c.conversation_id.in_(sorted(purged_conversation_ids)),
+        )
+        ids = session.execute(select(archived.c.id).where(condition)).scalars().all()
+        hashes: list[str] = []
+        for chunk in _chunks(ids):
+            hashes.extend(
+                digest
+                for row in session.execute(
+                    select(
+                        archived_bodies.c.user_message_hash,
+                        archived_bodies.c.assistant_message_hash,
+                    ).where(archived_bodies.c.exchange_id.in_(chunk))
+                )
+                for digest in row
+            )
+            session.execute(
+                delete(archived_bodies).where(archived_bodies.c.exchange_id.in_(chunk))
+            )
+            session.execute(delete(archived).where(archived.c.id.in_(chunk)))
+        release_blobs(session, hashes, schema=schema)
+
+        for table, row_ids in (
+            (conversations, purged_conversation_ids),
+            (sessions, session_ids),
+        ):
+            if row_ids:
+                archived_table = partition_table(table, schema)
+                session.execute(
+                    delete(archived_table).where(
+                        archived_table.c.id.in_(sorted(row_ids))
+                    )
+                )
+
+
+def merge_archives(target: Path, sources: Sequence[Path]) -> None:
+    """Merge archive files into ``target`` (created if missing) and delete them.
+
+    Other connections may still have the sources attached until their next
+    checkout. The copy and the dropping of the sources' tables commit as one
+    transaction, so a write to a source either lands before the merge (and
+    is copied) or fails with "no such table"; none is lost with the file.
+    """
+    if not target.exists():
+        create_archive(target)
+    engine = create_engine(f"sqlite:///{target}")
+    try:
+        with engine.connect() as conn:
+            for index, source in enumerate(sources):
+                conn.exec_driver_sql(
+                    f"ATTACH DATABASE ? AS merge_{index}", (str(source),)
+                )
+            for table in archive_metadata().sorted_tables:
+                for index in range(len(sources)):
+                    source_table = partition_table(table, f"merge_{index}")
+                    statement = sqlite_insert(table).from_select(
+                        list(table.c.keys()), select(source_table).where(true())
+                    )
+                    if table.name == "message_blobs":
+                        statement = statement.on_conflict_do_update(
+                            index_elements=["hash"],
+                            set_={
+                                "ref_count": table.c.ref_count
+                                + statement.excluded.ref_count
+                            },
+                        )
+                    conn.execute(statement)
+            for table in archive_metadata().sorted_tables:
+                for index in range(len(sources)):
+                    conn.exec_driver_sql(f"DROP TABLE merge_{index}.{table.name}")
+            conn.commit()
+    finally:
+        engine.dispose()
+    for source in sources:
+        source.unlink()
+
+
+def compact_archives(
+    directory: Path, needed: Iterable[datetime], limit: int = MAX_ATTACHED
+) -> None:
+    """Merge the oldest years' month files until the archives fit ``limit``.
+
+    ``needed`` are the months about to be written; those that will go to a
+    month file not created yet count against the limit too.
+    """
+    while True:
+        existing = list_archives(directory)
+        missing = {
+            archive_schema(when.year, when.month)
+            for when in needed
+            if archive_schema(when.year) not in existing
+            and archive_schema(when.year, when.month) not in existing
+        }
+        if len(existing) + len(missing) <= limit:
+            return
+        years = sorted(
+            {int(schema.split("_")[1]) for schema in existing if schema.count("_") == 2}
+        )
+        if not years:
+            raise RuntimeError(f"More than {limit} yearly archive files in {directory}")
+        year = years[0]
+        months = [
+            path
+            for schema, path in existing.items()
+            if schema.startswith(f"{archive_schema(year)}_")
+        ]
+        merge_archives(directory / archive_filename(year), months)
+
+
+def archive_for(directory: Path, when: datetime) -> str:
+    """Schema that rows dated ``when`` are archived into, creating its file if needed.
+
+    A compacted yearly file, when there is one, takes that year's rows.
+    """
+    existing = list_archives(directory)
+    if archive_schema(when.year) in existing:
+        return archive_schema(when.year)
+    schema = archive_schema(when.year, when.month)
+    if schema not in existing:
+        create_archive(directory / archive_filename(when.year, when.month))
+    return schema
+
+
+def main() -> None:  # pragma: no cover
+    """Run one archive pass against the configured database."""
+    import argparse
+    import asyncio
+
+    from app.db.session import ARCHIVE_PATH, AsyncSessionLocal
+    from app.services.archive_service import ArchiveService
+    from app.services.settings import get_settings
+
+    performance = get_settings().performance
+    parser = argparse.ArgumentParser(
+        description="Move old exchanges into monthly archive files"
+    )
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=performance.archive_after_days,
+        help="Archive exchanges created more than this many days ago",
+    )
+    args = parser.parse_args()
+
+    archiver = ArchiveService.from_settings(
+        AsyncSessionLocal, ARCHIVE_PATH, performance
+    )
+    status = asyncio.run(archiver.run(after_days=args.older_than_days))
+    print(
+        f"Moved {status.exchanges_moved} exchanges, {status.conversations_moved}"
+        f" conversations and {status.sessions_moved} sessions in {status.chunks} chunks"
+    )
+    if status.last_error:
+        raise SystemExit(status.last_error)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,211 @@
+"""Content-addressed, reference-counted message storage.
+
+Exchange messages are stored once per distinct text in ``message_blobs``
+and referenced by hash. These helpers take and drop references; they run
+on a synchronous Session (use ``AsyncSession.run_sync`` from async code).
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import groupby
+from typing import Any, cast
+
+from sqlalchemy import (
+    Table,
+    bindparam,
+    delete,
+    event,
+    func,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from app.models.message_blob import PENDING_BLOBS, MessageBlob, content_hash
+
+# Hashes per IN (...) list, well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+_RELEASED_BLOBS = "released_blobs"
+
+blobs = cast(Table, MessageBlob.__table__)
+
+
+def _chunks(items: Sequence[str]) -> Iterable[Sequence[str]]:
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start : start + CHUNK_SIZE]
+
+
+def _insert_or_add_references(dialect_name: str) -> Any:
+    """INSERT of new blobs that adds to ref_count if a concurrent writer won."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(blobs)
+    return stmt.on_conflict_do_update(
+        index_elements=[blobs.c.hash],
+        set_={"ref_count": blobs.c.ref_count + stmt.excluded.ref_count},
+    )
+
+
+def acquire_blobs(session: Session, texts: Iterable[str]) -> list[str]:
+    """Take one reference per text, storing texts not seen before.
+
+    Texts that already have a blob only get their ref_count raised, so a
+    repeated message is neither compressed nor written again.
+
+    Returns:
+        The hash of each text, in input order
+    """
+    hashes: list[str] = []
+    counts: Counter[str] = Counter()
+    contents: dict[str, str] = {}
+    for text in texts:
+        digest = content_hash(text)
+        hashes.append(digest)
+        counts[digest] += 1
+        contents.setdefault(digest, text)
+    if not counts:
+        return hashes
+
+    # Sorted so concurrent writers lock rows in the same order
+    ordered = sorted(counts)
+    existing: set[str] = set()
+    for chunk in _chunks(ordered):
+        existing.update(
+            session.execute(
+                select(blobs.c.hash).where(blobs.c.hash.in_(chunk))
+            ).scalars()
+        )
+
+    # Updates and inserts go out in runs that keep the overall hash order:
+    # a blob another writer inserted since the check above is locked by the
+    # upsert, and taking it out of order could deadlock on PostgreSQL
+    add_references = (
+        update(blobs)
+        .where(blobs.c.hash == bindparam("b_hash"))
+        .values(ref_count=blobs.c.ref_count + bindparam("b_count"))
+    )
+    insert_new = _insert_or_add_references(session.get_bind().dialect.name)
+    for is_existing, run in groupby(ordered, key=existing.__contains__):
+        if is_existing:
+            session.execute(
+                add_references,
+                [{"b_hash": digest, "b_count": counts[digest]} for digest in run],
+            )
+        else:
+            session.execute(
+                insert_new,
+                [
+                    {
+                        "hash": digest,
+                        "content": contents[digest],
+                        "size": len(contents[digest].encode("utf-8")),
+                        "ref_count": counts[digest],
+                    }
+                    for digest in run
+                ],
+            )
+    return hashes
+
+
+def release_blobs(
+    session: Session, hashes: Iterable[str], schema: str | None = None
+) -> int:
+    """Drop one reference per hash and delete blobs left unreferenced.
+
+    Only the blobs whose counts changed are examined, so garbage collection
+    costs in proportion to what was deleted. Call it after the referencing
+    rows are gone. ``schema`` selects an attached archive's blobs.
+
+    Returns:
+        Number of blobs deleted
+    """
+    return release_blob_counts(
+        session, Counter(digest for digest in hashes if digest), schema
+    )
+
+
+def release_blob_counts(
+    session: Session, counts: Mapping[str, int], schema: str | None = None
+) -> int:
+    """release_blobs for references already counted per hash.
+
+    Returns:
+        Number of blobs deleted
+    """
+    if not counts:
+        return 0
+
+    options = {"schema_translate_map": {None: schema}} if schema else {}
+    ordered = sorted(counts)
+    session.execute(
+        update(blobs)
+        .where(blobs.c.hash == bindparam("b_hash"))
+        .values(ref_count=blobs.c.ref_count - bindparam("b_count")),
+        [{"b_hash": digest, "b_count": counts[digest]} for digest in ordered],
+        execution_options=options,
+    )
+    collected = 0
+    for chunk in _chunks(ordered):
+        result = cast(
+            CursorResult[Any],
+            session.execute(
+                delete(blobs).where(blobs.c.hash.in_(chunk), blobs.c.ref_count <= 0),
+                execution_options=options,
+            ),
+        )
+        collected += result.rowcount
+    return collected
+
+
+def storage_report(session: Session) -> dict[str, int]:
+    """Aggregate blob statistics (see StorageReportResponse)."""
+    row = session.execute(
+        select(
+            func.count().label("blob_count"),
+            func.coalesce(func.sum(blobs.c.ref_count), 0).label("reference_count"),
+            func.coalesce(func.sum(blobs.c.size), 0).label("unique_bytes"),
+            func.coalesce(func.sum(blobs.c.size * blobs.c.ref_count), 0).label(
+                "logical_bytes"
+            ),
+            func.coalesce(func.sum(func.length(blobs.c.content)), 0).label(
+                "stored_bytes"
+            ),
+        )
+    ).one()
+    return dict(row._mapping)
+
+
+@event.listens_for(Session, "before_flush")
+def _acquire_pending_blobs(
+    session: Session, flush_context: Any, instances: Any
+) -> None:
+    """Store blobs for messages assigned through the ORM.
+
+    Runs before the rows referencing them are flushed.
+    """
+    acquire: list[str] = []
+    release: list[str] = []
+    for obj in (*session.new, *session.dirty):
+        pending = obj.__dict__.pop(PENDING_BLOBS, None)
+        if not pending:
+            continue
+        state = inspect(obj)
+        for attribute, text in pending.items():
+            acquire.append(text)
+            if state.persistent:
+                release.extend(state.attrs[attribute].history.deleted)
+    if acquire:
+        acquire_blobs(session, acquire)
+    if release:
+        session.info.setdefault(_RELEASED_BLOBS, []).extend(release)
+
+
+@event.listens_for(Session, "after_flush")
+def _release_replaced_blobs(session: Session, flush_context: Any) -> None:
+    """Drop references to blobs replaced by the flush, once no row points at them."""
+    released = session.info.pop(_RELEASED_BLOBS, None)
+    if released:
+        release_blobs(session, released)
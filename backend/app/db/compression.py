@@ -0,0 +1,309 @@
+"""Transparent compression of large text columns.
+
+Values are stored as bytes prefixed with a one-byte format marker, so rows
+written with different codecs, levels or dictionaries can be read side by
+side, and rows from before compression was enabled (plain text) still load.
+"""
+
+import argparse
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator
+
+from app.services.settings import PerformanceSettings, get_settings
+
+try:  # pragma: no cover - exercised only when zstandard is installed
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+# Format markers (first byte of every stored value)
+RAW = 0x00
+ZLIB = 0x01
+ZLIB_DICT = 0x02
+ZSTD = 0x03
+ZSTD_DICT = 0x04
+
+CODECS = ("zlib", "zstd")
+
+# zlib only looks back 32 KiB, so a larger preset dictionary is wasted
+ZLIB_MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+class CompressionError(ValueError):
+    """Raised when a stored value cannot be decoded or a codec is unusable."""
+
+
+def dictionary_id(dictionary: bytes) -> int:
+    """Identifier recorded with values compressed against a dictionary."""
+    return zlib.crc32(dictionary)
+
+
+class MessageCodec:
+    """Encode text into marker-prefixed, optionally compressed bytes."""
+
+    def __init__(
+        self,
+        codec: str = "zlib",
+        level: int = 6,
+        min_size: int = 128,
+        dictionary: bytes | None = None,
+        enabled: bool = True,
+    ) -> None:
+        """Initialize the codec.
+
+        Args:
+            codec: "zlib" or "zstd" (needs the zstandard package)
+            level: Compression level for the codec
+            min_size: Values shorter than this many bytes are stored raw
+            dictionary: Optional preset dictionary (see train_dictionary)
+            enabled: When False every value is stored raw
+
+        Raises:
+            CompressionError: If the codec is unknown or unavailable
+        """
+        if codec not in CODECS:
+            raise CompressionError(f"Unknown compression codec: {codec!r}")
+        if codec == "zstd" and zstandard is None:
+            raise CompressionError(
+                "The zstd codec requires the zstandard package (pip install zstandard)"
+            )
+        self.codec = codec
+        self.level = level
+        self.min_size = min_size
+        self.dictionary = dictionary
+        self.enabled = enabled
+        self._dictionary_id = (
+            dictionary_id(dictionary) if dictionary is not None else None
+        )
+        self._zstd_dictionary = (
+            zstandard.ZstdCompressionDict(dictionary)
+            if zstandard is not None and dictionary is not None
+            else None
+        )
+        # Loading a dictionary is costly, so primed compressors are reused:
+        # zlib ones are copied per value, zstd ones cached per thread
+        self._zlib_primed = (
+            zlib.compressobj(level, zdict=dictionary)
+            if dictionary is not None
+            else None
+        )
+        self._local = threading.local()
+
+    @classmethod
+    def from_settings(cls, performance: PerformanceSettings) -> "MessageCodec":
+        """Create a codec from PerformanceSettings."""
+        dictionary = None
+        if performance.compression_dictionary:
+            dictionary = (
+                Path(performance.compression_dictionary).expanduser().read_bytes()
+            )
+        return cls(
+            codec=performance.compression_codec,
+            level=performance.compression_level,
+            min_size=performance.compression_min_size,
+            dictionary=dictionary,
+            enabled=performance.compress_data,
+        )
+
+    def encode(self, text: str) -> bytes:
+        """Encode text for storage, compressing it when worthwhile."""
+        data = text.encode("utf-8")
+        raw = bytes([RAW]) + data
+        if not self.enabled or len(data) < self.min_size:
+            return raw
+
+        if self.codec == "zstd":
+            encoded = self._compress_zstd(data)
+        else:
+            encoded = self._compress_zlib(data)
+        # Incompressible input (already compressed, random) is kept raw
+        return encoded if len(encoded) < len(raw) else raw
+
+    def decode(self, value: Any) -> str:
+        """Decode a stored value back to text.
+
+        Accepts plain strings written before compression was enabled.
+
+        Raises:
+            CompressionError: If the value is malformed or needs a codec or
+                dictionary that is not available
+        """
+        if isinstance(value, str):
+            return value
+        stored = bytes(value)
+        if not stored:
+            raise CompressionError("Empty compressed value")
+
+        marker, payload = stored[0], stored[1:]
+        if marker == RAW:
+            data = payload
+        elif marker == ZLIB:
+            data = zlib.decompress(payload)
+        elif marker == ZLIB_DICT:
+            dictionary = self._require_dictionary(payload[:4])
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            data = decompressor.decompress(payload[4:]) + decompressor.flush()
+        elif marker in (ZSTD, ZSTD_DICT):
+            if zstandard is None:
+                raise CompressionError(
+                    "Value was compressed with zstd; install the zstandard package"
+                )
+            if marker == ZSTD_DICT:
+                self._require_dictionary(payload[:4])
+                payload = payload[4:]
+            data = self._zstd("decompressor", marker == ZSTD_DICT).decompress(payload)
+        else:
+            raise CompressionError(f"Unknown compression marker: {marker:#04x}")
+        return data.decode("utf-8")
+
+    def _compress_zlib(self, data: bytes) -> bytes:
+        if self._zlib_primed is None or self._dictionary_id is None:
+            return bytes([ZLIB]) + zlib.compress(data, self.level)
+        compressor = self._zlib_primed.copy()
+        return (
+            bytes([ZLIB_DICT])
+            + self._dictionary_id.to_bytes(4, "big")
+            + compressor.compress(data)
+            + compressor.flush()
+        )
+
+    def _compress_zstd(self, data: bytes) -> bytes:
+        if self._zstd_dictionary is None or self._dictionary_id is None:
+            compressed: bytes = self._zstd("compressor", False).compress(data)
+            return bytes([ZSTD]) + compressed
+        compressed = self._zstd("compressor", True).compress(data)
+        return bytes([ZSTD_DICT]) + self._dictionary_id.to_bytes(4, "big") + compressed
+
+    def _zstd(self, kind: str, with_dictionary: bool) -> Any:
+        """Per-thread zstd (de)compressor; they are not safe to share across threads."""
+        key = f"{kind}_{with_dictionary}"
+        instance = getattr(self._local, key, None)
+        if instance is None:
+            dict_data = self._zstd_dictionary if with_dictionary else None
+            if kind == "compressor":
+                instance = zstandard.ZstdCompressor(
+                    level=self.level, dict_data=dict_data
+                )
+            else:
+                instance = zstandard.ZstdDecompressor(dict_data=dict_data)
+            setattr(self._local, key, instance)
+        return instance
+
+    def _require_dictionary(self, id_bytes: bytes) -> bytes:
+        wanted = int.from_bytes(id_bytes, "big")
+        if self.dictionary is None or wanted != self._dictionary_id:
+            raise CompressionError(
+                f"Value needs compression dictionary {wanted:08x},"
+                " which is not configured"
+            )
+        return self.dictionary
+
+
+@lru_cache
+def get_codec() -> MessageCodec:
+    """Codec configured by PerformanceSettings (cached; call cache_clear to reload)."""
+    return MessageCodec.from_settings(get_settings().performance)
+
+
+class CompressedText(TypeDecorator[str]):
+    """Text column stored compressed, read and written as str.
+
+    The stored bytes are not comparable to text, so filtering or searching on
+    these columns in SQL does not work; do that in Python or on a derived
+    column instead.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> bytes | None:
+        if value is None:
+            return None
+        return get_codec().encode(value)
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> str | None:
+        if value is None:
+            return None
+        return get_codec().decode(value)
+
+
+def train_dictionary(
+    samples: Iterable[str], codec: str = "zlib", size: int = ZLIB_MAX_DICTIONARY_SIZE
+) -> bytes:
+    """Train a preset dictionary from sample values.
+
+    zstd uses zstandard's trainer. For zlib the dictionary is built from the
+    most frequently repeated samples, most common last (zlib favours content
+    near the end of its window).
+
+    Args:
+        samples: Representative stored values (e.g. recent messages)
+        codec: Codec the dictionary will be used with
+        size: Target dictionary size in bytes
+
+    Returns:
+        Dictionary bytes to save and point compression_dictionary at
+    """
+    encoded = [sample.encode("utf-8") for sample in samples if sample]
+    if codec == "zstd":
+        if zstandard is None:
+            raise CompressionError("Training a zstd dictionary requires zstandard")
+        training: list[bytes | bytearray | memoryview] = list(encoded)
+        return zstandard.train_dictionary(size, training).as_bytes()
+
+    size = min(size, ZLIB_MAX_DICTIONARY_SIZE)
+    counts = Counter(encoded)
+    chunks: list[bytes] = []
+    total = 0
+    for sample, _ in counts.most_common():
+        piece = sample[: size - total]
+        if not piece:
+            break
+        chunks.append(piece)
+        total += len(piece)
+    return b"".join(reversed(chunks))
+
+
+def main() -> None:
+    """Train a dictionary from the configured database's exchanges."""
+    parser = argparse.ArgumentParser(
+        description="Train a message compression dictionary"
+    )
+    parser.add_argument("output", type=Path, help="File to write the dictionary to")
+    parser.add_argument("--samples", type=int, default=10000, help="Messages to sample")
+    parser.add_argument("--codec", choices=CODECS, default=None)
+    parser.add_argument("--size", type=int, default=ZLIB_MAX_DICTIONARY_SIZE)
+    args = parser.parse_args()
+
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.message_blob import MessageBlob
+
+    codec = args.codec or get_settings().performance.compression_codec
+    with SessionLocal() as db:
+        samples = list(
+            db.execute(
+                select(MessageBlob.content)
+                .order_by(MessageBlob.created_at.desc())
+                .limit(args.samples)
+            ).scalars()
+        )
+    dictionary = train_dictionary(samples, codec=codec, size=args.size)
+    args.output.write_bytes(dictionary)
+    print(
+        f"Wrote {len(dictionary)} byte {codec} dictionary from {len(samples)} samples"
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
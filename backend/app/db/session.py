@@ -1,26 +1,145 @@
 """Database session management."""
 
+import os
 from collections.abc import AsyncGenerator
-from typing import Optional
+from pathlib import Path
+from typing import Any
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-# Default database URL (SQLite for development)
-DATABASE_URL = "sqlite:///./clouseau.db"
-ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./clouseau.db"
+from app.db.archive import ARCHIVE_DIRECTORY, attach_archives
+from app.db.sqlite import apply_foreign_keys, apply_read_only, apply_storage_profile
+from app.services.settings import AppSettings, DatabaseSettings, get_settings
+
+DATABASE_FILENAME = "clouseau.db"
+
+# Override database.url and database.read_url from settings.yaml
+DATABASE_URL_ENV = "CLOUSEAU_DATABASE_URL"
+DATABASE_READ_URL_ENV = "CLOUSEAU_DATABASE_READ_URL"
+
+# Drivers used when a URL names only the database ("postgresql://...")
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+SYNC_DRIVERS = {"sqlite": "pysqlite", "postgresql": "psycopg"}
+
+
+def get_database_path(data_directory: str | None = None) -> Path:
+    """Resolve the SQLite database file from the configured data directory.
+
+    Args:
+        data_directory: GeneralSettings.data_directory (None or empty means
+            the current working directory)
+
+    Returns:
+        Path to the database file
+    """
+    if not data_directory:
+        return Path(".") / DATABASE_FILENAME
+    return Path(data_directory).expanduser() / DATABASE_FILENAME
+
+
+def get_database_url(settings: AppSettings) -> str:
+    """Resolve the configured database URL.
+
+    ``$CLOUSEAU_DATABASE_URL`` wins over ``database.url``; without either
+    the SQLite file in the data directory is used.
+    """
+    url = os.environ.get(DATABASE_URL_ENV) or settings.database.url
+    if url:
+        return url
+    return f"sqlite:///{get_database_path(settings.general.data_directory)}"
+
+
+def get_read_database_url(settings: AppSettings) -> str:
+    """Resolve the URL GET requests read from: the replica, else the primary."""
+    url = os.environ.get(DATABASE_READ_URL_ENV) or settings.database.read_url
+    return url or get_database_url(settings)
+
+
+def driver_url(url: str, asynchronous: bool) -> URL:
+    """``url`` with the async (or sync) driver this app uses for its backend.
+
+    An explicit sync driver (e.g. ``postgresql+psycopg2``) is kept for the
+    sync engine; the async engine always uses aiosqlite or asyncpg.
+
+    Raises:
+        ValueError: If the database is neither SQLite nor PostgreSQL
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database backend: {backend}")
+    explicit = parsed.get_driver_name() if "+" in parsed.drivername else None
+    if asynchronous:
+        driver = ASYNC_DRIVERS[backend]
+    elif explicit and explicit != ASYNC_DRIVERS[backend]:
+        driver = explicit
+    else:
+        driver = SYNC_DRIVERS[backend]
+    return parsed.set(drivername=f"{backend}+{driver}")
+
+
+def engine_options(
+    url: URL, database: DatabaseSettings, asynchronous: bool, read_only: bool = False
+) -> dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine.
+
+    PostgreSQL gets the configured pool and, with asyncpg, the prepared
+    statement cache size; ``read_only`` asyncpg sessions default to
+    read-only transactions. SQLite keeps SQLAlchemy's default pool (see
+    apply_read_only for its read-only connections).
+    """
+    options: dict[str, Any] = {"echo": database.echo}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        pool_size=database.pool_size,
+        max_overflow=database.max_overflow,
+        pool_timeout=database.pool_timeout,
+        pool_recycle=database.pool_recycle,
+        pool_pre_ping=database.pool_pre_ping,
+    )
+    if asynchronous:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": database.statement_cache_size
+        }
+        if read_only:
+            options["connect_args"]["server_settings"] = {
+                "default_transaction_read_only": "on"
+            }
+    return options
+
+
+_settings = get_settings()
+DATABASE_PATH = get_database_path(_settings.general.data_directory)
+# Monthly archive databases, attached to every SQLite connection
+ARCHIVE_PATH = DATABASE_PATH.parent / ARCHIVE_DIRECTORY
+
+# Database URLs (by default SQLite, located in the configured data directory)
+DATABASE_URL = driver_url(get_database_url(_settings), asynchronous=False)
+ASYNC_DATABASE_URL = driver_url(get_database_url(_settings), asynchronous=True)
 
 # Sync engine and session (for migrations and some operations)
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    DATABASE_URL, **engine_options(DATABASE_URL, _settings.database, False)
+)
+apply_storage_profile(engine, _settings.performance)
+apply_foreign_keys(engine)
+attach_archives(engine, ARCHIVE_PATH)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Async engine and session (for API operations)
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=False,
+    **engine_options(ASYNC_DATABASE_URL, _settings.database, True),
 )
+apply_storage_profile(async_engine.sync_engine, _settings.performance)
+apply_foreign_keys(async_engine.sync_engine)
+attach_archives(async_engine.sync_engine, ARCHIVE_PATH)
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
@@ -29,6 +148,26 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only async engine and session (for GET routes), with its own pool so
+# reads never wait behind ingest for a connection
+ASYNC_READ_DATABASE_URL = driver_url(
+    get_read_database_url(_settings), asynchronous=True
+)
+read_engine = create_async_engine(
+    ASYNC_READ_DATABASE_URL,
+    **engine_options(ASYNC_READ_DATABASE_URL, _settings.database, True, read_only=True),
+)
+apply_storage_profile(read_engine.sync_engine, _settings.performance)
+apply_read_only(read_engine.sync_engine)
+attach_archives(read_engine.sync_engine, ARCHIVE_PATH)
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 
 def get_db() -> Session:  # pragma: no cover
     """Get synchronous database session (used for migrations)."""
@@ -48,10 +187,21 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:  # pragma: no co
             await session.close()
 
 
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:  # pragma: no cover
+    """Get a read-only async database session for GET routes."""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db() -> None:  # pragma: no cover
     """Initialize database tables."""
     from app.db.base import Base
 
+    if async_engine.dialect.name == "sqlite":
+        DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
@@ -0,0 +1,186 @@
+"""SQLite storage profile and busy handling."""
+
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any, TypeVar
+
+from sqlalchemy import DateTime, event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app.services.settings import PerformanceSettings, get_settings
+
+T = TypeVar("T")
+
+# Substrings of sqlite3.OperationalError messages raised for SQLITE_BUSY/LOCKED
+BUSY_ERROR_MARKERS = ("database is locked", "database table is locked", "busy")
+
+# PostgreSQL SQLSTATEs of transactions aborted by a deadlock or a
+# serialization failure, which succeed when run again
+RETRYABLE_SQLSTATES = ("40P01", "40001")
+
+
+def storage_pragmas(performance: PerformanceSettings) -> list[str]:
+    """Build the PRAGMA statements for a storage profile.
+
+    Args:
+        performance: Performance settings holding the profile values
+
+    Returns:
+        PRAGMA statements to run on each new connection (empty for the
+        "default" profile)
+    """
+    if performance.storage_profile != "production":
+        return []
+
+    return [
+        f"PRAGMA journal_mode={performance.sqlite_journal_mode}",
+        f"PRAGMA synchronous={performance.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(performance.sqlite_busy_timeout)}",
+        f"PRAGMA mmap_size={int(performance.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(performance.sqlite_cache_size)}",
+        f"PRAGMA temp_store={performance.sqlite_temp_store}",
+    ]
+
+
+def apply_storage_profile(engine: Engine, performance: PerformanceSettings) -> None:
+    """Register a connect hook applying the storage profile to an engine.
+
+    The pragmas are per-connection state, so they are set on every DBAPI
+    connection the pool opens. Non-SQLite engines are left untouched. For an
+    AsyncEngine pass ``async_engine.sync_engine``.
+
+    Args:
+        engine: Synchronous engine (or the sync_engine of an AsyncEngine)
+        performance: Performance settings holding the profile values
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = storage_pragmas(performance)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def apply_foreign_keys(engine: Engine) -> None:
+    """Register a connect hook enforcing foreign keys on an engine's SQLite connections.
+
+    SQLite ignores foreign keys, and so their ON DELETE CASCADE clauses,
+    unless ``PRAGMA foreign_keys`` is on for the connection. Deletes rely
+    on the database cascading to child rows. Non-SQLite engines are left
+    untouched.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_foreign_keys(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA foreign_keys=ON")
+        finally:
+            cursor.close()
+
+
+def apply_read_only(engine: Engine) -> None:
+    """Register a connect hook making an engine's SQLite connections read-only.
+
+    ``PRAGMA query_only`` makes any write on the connection fail, and lets
+    readers run without ever queueing for the write lock. Register it after
+    apply_storage_profile, whose journal_mode pragma may need to write.
+    Non-SQLite engines are left untouched.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_query_only(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+class precise_now(FunctionElement[datetime]):  # noqa: N801 - used like func.now()
+    """Current time with sub-second precision, for ``onupdate`` timestamps.
+
+    ``func.now()`` renders CURRENT_TIMESTAMP on SQLite, which stops at whole
+    seconds, so two edits of a row within a second would leave the same
+    updated_at (and the same list ETag). On SQLite this renders milliseconds,
+    padded to the six fractional digits SQLAlchemy parses; elsewhere it is
+    ``now()``.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(precise_now)
+def _compile_precise_now(element: precise_now, compiler: Any, **kw: Any) -> str:
+    sql: str = compiler.process(func.now(), **kw)
+    return sql
+
+
+@compiles(precise_now, "sqlite")
+def _compile_precise_now_sqlite(element: precise_now, compiler: Any, **kw: Any) -> str:
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    """Check whether an exception is a transient write conflict.
+
+    That is SQLite reporting a busy/locked database, or PostgreSQL aborting
+    the transaction on a deadlock or serialization failure.
+    """
+    if not isinstance(exc, DBAPIError):
+        return False
+    if getattr(exc.orig, "sqlstate", None) in RETRYABLE_SQLSTATES:
+        return True
+    if not isinstance(exc, OperationalError):
+        return False
+    message = str(exc.orig).lower()
+    return any(marker in message for marker in BUSY_ERROR_MARKERS)
+
+
+def retry_on_busy(
+    method: Callable[..., Awaitable[T]],
+) -> Callable[..., Awaitable[T]]:
+    """Retry a service write method when the database is busy (see is_busy_error).
+
+    The decorated method must belong to an object with a ``db`` AsyncSession
+    and must be safe to re-run from the start: the session is rolled back
+    before each retry. Attempts and backoff come from PerformanceSettings.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+        performance = get_settings().performance
+        attempt = 0
+        while True:
+            try:
+                return await method(self, *args, **kwargs)
+            except DBAPIError as exc:
+                if (
+                    not is_busy_error(exc)
+                    or attempt >= performance.write_retry_attempts
+                ):
+                    raise
+                await self.db.rollback()
+                await asyncio.sleep(performance.write_retry_backoff * (2**attempt))
+                attempt += 1
+
+    return wrapper
@@ -4,8 +4,22 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.api.routes import conversations, exchanges, sessions
-from app.db.session import init_db
+from app.api.compression import CompressionMiddleware, compression_options
+from app.api.routes import (
+    archive,
+    cache,
+    conversations,
+    deletions,
+    exchanges,
+    ingest,
+    sessions,
+    storage,
+)
+from app.db.session import ARCHIVE_PATH, AsyncSessionLocal, async_engine, init_db
+from app.services.archive_service import ArchiveService
+from app.services.deletion_service import DeletionService
+from app.services.ingest_writer import ExchangeBatchWriter
+from app.services.settings import get_settings
 
 
 @asynccontextmanager
@@ -13,8 +27,38 @@ async def lifespan(app: FastAPI):  # pragma: no cover
     """Application lifespan handler."""
     # Initialize database tables on startup
     await init_db()
+
+    # Group-commit exchange writes when batched ingest is configured
+    performance = get_settings().performance
+    writer = None
+    if performance.ingest_mode == "batched":
+        writer = ExchangeBatchWriter.from_settings(AsyncSessionLocal, performance)
+        await writer.start()
+    app.state.exchange_writer = writer
+    # Archives are attached SQLite files, so other databases go without
+    archiver = None
+    if async_engine.dialect.name == "sqlite":
+        archiver = ArchiveService.from_settings(
+            AsyncSessionLocal, ARCHIVE_PATH, performance
+        )
+    app.state.archiver = archiver
+    # Large sessions and conversations are deleted a chunk at a time
+    deleter = DeletionService.from_settings(AsyncSessionLocal, performance)
+    app.state.deleter = deleter
+
     yield
 
+    # Deletions stopped between chunks leave consistent, smaller rows
+    await deleter.stop()
+
+    # A pass stopped between chunks leaves every moved row committed
+    if archiver is not None:
+        await archiver.stop()
+
+    # Drain queued exchanges before shutting down
+    if writer is not None:
+        await writer.stop()
+
 
 app = FastAPI(
     title="Clouseau",
@@ -23,10 +67,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Compress responses with the codec each client prefers
+performance = get_settings().performance
+if performance.response_compression:
+    app.add_middleware(CompressionMiddleware, **compression_options(performance))
+
 # Register API routers
 app.include_router(sessions.router, prefix="/api")
 app.include_router(conversations.router, prefix="/api")
 app.include_router(exchanges.router, prefix="/api")
+app.include_router(ingest.router, prefix="/api")
+app.include_router(storage.router, prefix="/api")
+app.include_router(archive.router, prefix="/api")
+app.include_router(deletions.router, prefix="/api")
+app.include_router(cache.router, prefix="/api")
 
 
 @app.get("/health")
@@ -1,7 +1,19 @@
 """Database models for Clouseau."""
 
+# Registers the flush hooks that store message blobs
+import app.db.blobs  # noqa: F401
+from app.models.cache_version import CacheVersion
 from app.models.conversation import Conversation
 from app.models.exchange import Exchange
+from app.models.exchange_body import ExchangeBody
+from app.models.message_blob import MessageBlob
 from app.models.session import Session
 
-__all__ = ["Session", "Conversation", "Exchange"]
+__all__ = [
+    "Session",
+    "Conversation",
+    "Exchange",
+    "ExchangeBody",
+    "MessageBlob",
+    "CacheVersion",
+]
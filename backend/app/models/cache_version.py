@@ -0,0 +1,26 @@
+"""Cache version database model."""
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CacheVersion(Base):
+    """Model representing a counter that invalidates per-process caches.
+
+    Writes that make cached entries wrong bump their cache's version in the
+    same transaction; every process compares it with the version it last
+    saw and drops its entries once it has moved (see
+    app.services.lookup_cache).
+    """
+
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
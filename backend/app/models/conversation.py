@@ -3,10 +3,11 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.sqlite import precise_now
 
 if TYPE_CHECKING:
     from app.models.exchange import Exchange
@@ -17,6 +18,17 @@ class Conversation(Base):
     """Model representing a conversation within a session."""
 
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Serves get_conversations_by_session: filter + ordered scan, no sort
+        Index(
+            "ix_conversations_session_id_updated_at",
+            "session_id",
+            "updated_at",
+            "id",
+        ),
+        # Never reuse ids: rows moved to an archive keep theirs
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     session_id: Mapped[int] = mapped_column(
@@ -27,13 +39,27 @@ class Conversation(Base):
         DateTime, server_default=func.now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+        DateTime, server_default=func.now(), onupdate=precise_now(), nullable=False
+    )
+
+    # Aggregates maintained by SessionService (avoid COUNT/SUM over exchanges)
+    exchange_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_input_tokens: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_output_tokens: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
     )
 
     # Relationships
     session: Mapped["Session"] = relationship("Session", back_populates="conversations")
     exchanges: Mapped[List["Exchange"]] = relationship(
-        "Exchange", back_populates="conversation", cascade="all, delete-orphan"
+        "Exchange",
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self) -> str:
@@ -3,26 +3,50 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.models.exchange_body import PREVIEW_LENGTH, ExchangeBody
+from app.models.message_blob import PENDING_BLOBS, content_hash
 
 if TYPE_CHECKING:
     from app.models.conversation import Conversation
 
 
 class Exchange(Base):
-    """Model representing a single exchange (user message + assistant response)."""
+    """Model representing a single exchange (user message + assistant response).
+
+    The ``exchanges`` table holds only fixed-size metadata; message hashes
+    and previews live in ``exchange_bodies`` (see ExchangeBody), loaded with
+    the exchange and exposed here as attributes.
+    """
 
     __tablename__ = "exchanges"
+    __table_args__ = (
+        # Serves get_exchanges_by_conversation: filter + ordered scan, no sort
+        Index(
+            "ix_exchanges_conversation_id_created_at",
+            "conversation_id",
+            "created_at",
+            "id",
+        ),
+        # Never reuse ids: rows moved to an archive keep theirs
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     conversation_id: Mapped[int] = mapped_column(
         ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False
     )
-    user_message: Mapped[str] = mapped_column(Text, nullable=False)
-    assistant_message: Mapped[str] = mapped_column(Text, nullable=False)
+    # Character counts of the message texts
+    user_message_length: Mapped[int] = mapped_column(
+        Integer, server_default="0", nullable=False
+    )
+    assistant_message_length: Mapped[int] = mapped_column(
+        Integer, server_default="0", nullable=False
+    )
     model: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     input_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     output_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -34,6 +58,61 @@ class Exchange(Base):
     conversation: Mapped["Conversation"] = relationship(
         "Conversation", back_populates="exchanges"
     )
+    body: Mapped[ExchangeBody] = relationship(
+        back_populates="exchange",
+        lazy="joined",
+        innerjoin=True,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # Body columns, read and written through the body row
+    user_message_hash = association_proxy("body", "user_message_hash")
+    assistant_message_hash = association_proxy("body", "assistant_message_hash")
+    user_message_preview = association_proxy("body", "user_message_preview")
+    assistant_message_preview = association_proxy("body", "assistant_message_preview")
+
+    @property
+    def user_message(self) -> str:
+        """The user's message text."""
+        return self._get_message("user_message")
+
+    @user_message.setter
+    def user_message(self, value: str) -> None:
+        self._set_message("user_message", value)
+
+    @property
+    def assistant_message(self) -> str:
+        """The assistant's response text."""
+        return self._get_message("assistant_message")
+
+    @assistant_message.setter
+    def assistant_message(self, value: str) -> None:
+        self._set_message("assistant_message", value)
+
+    def cache_messages(self, user_message: str, assistant_message: str) -> None:
+        """Record message texts already stored as blobs (by a bulk write)."""
+        self.__dict__["_messages"] = {
+            "user_message": user_message,
+            "assistant_message": assistant_message,
+        }
+
+    def _get_message(self, name: str) -> str:
+        cached: dict[str, str] = self.__dict__.get("_messages", {})
+        if name in cached:
+            return cached[name]
+        content: str = getattr(self.body, f"{name}_blob").content
+        return content
+
+    def _set_message(self, name: str, value: str) -> None:
+        if self.body is None:
+            self.body = ExchangeBody()
+        # The blob is stored (and any replaced one released) on flush
+        self.__dict__.setdefault("_messages", {})[name] = value
+        self.body.__dict__.setdefault(PENDING_BLOBS, {})[f"{name}_hash"] = value
+        setattr(self.body, f"{name}_hash", content_hash(value))
+        setattr(self.body, f"{name}_preview", value[:PREVIEW_LENGTH])
+        setattr(self, f"{name}_length", len(value))
 
     def __repr__(self) -> str:
         return f"<Exchange(id={self.id}, model='{self.model}')>"
@@ -0,0 +1,60 @@
+"""Exchange body database model."""
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, deferred, mapped_column, relationship
+
+from app.db.base import Base
+from app.models.message_blob import MessageBlob
+
+if TYPE_CHECKING:
+    from app.models.exchange import Exchange
+
+# Characters of each message kept in its preview column
+PREVIEW_LENGTH = 200
+
+
+class ExchangeBody(Base):
+    """Model holding the message references of an exchange.
+
+    Split from ``exchanges`` so that scans for token sums, model filters and
+    ordering only read the narrow metadata rows. Each exchange has exactly
+    one body, sharing its id; use the Exchange properties rather than this
+    model directly.
+    """
+
+    __tablename__ = "exchange_bodies"
+
+    exchange_id: Mapped[int] = mapped_column(
+        ForeignKey("exchanges.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Message texts live in message_blobs, shared between identical texts.
+    # Indexed so that deleting a blob checks its foreign keys without a scan
+    user_message_hash: Mapped[str] = mapped_column(
+        ForeignKey("message_blobs.hash"), nullable=False, index=True
+    )
+    assistant_message_hash: Mapped[str] = mapped_column(
+        ForeignKey("message_blobs.hash"), nullable=False, index=True
+    )
+    # Filled at ingest for summary listings; deferred so full loads skip them
+    user_message_preview: Mapped[str] = deferred(
+        mapped_column(String(PREVIEW_LENGTH), server_default="", nullable=False),
+        group="summary",
+    )
+    assistant_message_preview: Mapped[str] = deferred(
+        mapped_column(String(PREVIEW_LENGTH), server_default="", nullable=False),
+        group="summary",
+    )
+
+    # Relationships
+    exchange: Mapped["Exchange"] = relationship(back_populates="body")
+    user_message_blob: Mapped[MessageBlob] = relationship(
+        foreign_keys=[user_message_hash], lazy="joined", innerjoin=True
+    )
+    assistant_message_blob: Mapped[MessageBlob] = relationship(
+        foreign_keys=[assistant_message_hash], lazy="joined", innerjoin=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<ExchangeBody(exchange_id={self.exchange_id})>"
@@ -0,0 +1,45 @@
+"""Message blob database model."""
+
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.compression import CompressedText
+
+# Instance attribute holding {hash column attribute: text} assigned through
+# the ORM but not yet flushed; app.db.blobs stores them before the flush
+PENDING_BLOBS = "_pending_blobs"
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest identifying a message text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class MessageBlob(Base):
+    """Model representing a deduplicated message body.
+
+    Blobs are content-addressed by the SHA-256 of their text and shared by
+    every exchange message with that text. ``ref_count`` counts those
+    references; it is maintained by app.db.blobs, and a blob is deleted
+    once it drops to zero.
+    """
+
+    __tablename__ = "message_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
+    # UTF-8 length of the uncompressed content
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<MessageBlob(hash='{self.hash[:12]}', ref_count={self.ref_count})>"
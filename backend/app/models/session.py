@@ -3,10 +3,11 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.sqlite import precise_now
 
 if TYPE_CHECKING:
     from app.models.conversation import Conversation
@@ -16,6 +17,12 @@ class Session(Base):
     """Model representing an LLM interaction session."""
 
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Serves get_sessions: most recently updated first, no sort
+        Index("ix_sessions_updated_at", "updated_at", "id"),
+        # Never reuse ids: rows moved to an archive keep theirs
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -24,12 +31,29 @@ class Session(Base):
         DateTime, server_default=func.now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+        DateTime, server_default=func.now(), onupdate=precise_now(), nullable=False
+    )
+
+    # Aggregates maintained by SessionService (rolled up from conversations)
+    conversation_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    exchange_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_input_tokens: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_output_tokens: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
     )
 
     # Relationships
     conversations: Mapped[List["Conversation"]] = relationship(
-        "Conversation", back_populates="session", cascade="all, delete-orphan"
+        "Conversation",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self) -> str:
@@ -1,15 +1,30 @@
 """Pydantic schemas for validation."""
 
+from app.schemas.archive import ArchiveFileResponse, ArchiveStatusResponse
+from app.schemas.cache import LookupCacheMetricsResponse, ResponseCacheMetricsResponse
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationListResponse,
     ConversationResponse,
     ConversationUpdate,
 )
+from app.schemas.deletion import DeletionListResponse, DeletionStatusResponse
 from app.schemas.exchange import (
+    ExchangeBulkCreate,
+    ExchangeBulkError,
+    ExchangeBulkResponse,
     ExchangeCreate,
     ExchangeListResponse,
     ExchangeResponse,
+    ExchangeSummaryListResponse,
+    ExchangeSummaryResponse,
+)
+from app.schemas.ingest import (
+    IngestAck,
+    IngestMetricsResponse,
+    IngestRecord,
+    IngestRecordAck,
+    IngestRecordError,
 )
 from app.schemas.session import (
     SessionCreate,
@@ -17,8 +32,11 @@ from app.schemas.session import (
     SessionResponse,
     SessionUpdate,
 )
+from app.schemas.storage import StorageReportResponse
 
 __all__ = [
+    "ArchiveFileResponse",
+    "ArchiveStatusResponse",
     "SessionCreate",
     "SessionUpdate",
     "SessionResponse",
@@ -27,7 +45,22 @@ __all__ = [
     "ConversationUpdate",
     "ConversationResponse",
     "ConversationListResponse",
+    "DeletionListResponse",
+    "DeletionStatusResponse",
     "ExchangeCreate",
+    "ExchangeBulkCreate",
+    "ExchangeBulkError",
+    "ExchangeBulkResponse",
     "ExchangeResponse",
     "ExchangeListResponse",
+    "ExchangeSummaryResponse",
+    "ExchangeSummaryListResponse",
+    "IngestAck",
+    "IngestMetricsResponse",
+    "IngestRecord",
+    "IngestRecordAck",
+    "IngestRecordError",
+    "LookupCacheMetricsResponse",
+    "ResponseCacheMetricsResponse",
+    "StorageReportResponse",
 ]
@@ -0,0 +1,28 @@
+"""Pydantic schemas for the exchange archiver."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ArchiveFileResponse(BaseModel):
+    """Schema for one archive database file."""
+
+    schema_name: str = Field(..., description="Schema the file is attached as")
+    path: str
+    size_bytes: int
+
+
+class ArchiveStatusResponse(BaseModel):
+    """Schema for the archiver's progress and archive files."""
+
+    running: bool = False
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    cutoff: datetime | None = Field(None, description="Rows older than this are moved")
+    exchanges_moved: int = 0
+    conversations_moved: int = 0
+    sessions_moved: int = 0
+    chunks: int = 0
+    last_error: str | None = None
+    archives: list[ArchiveFileResponse] = Field(default_factory=list)
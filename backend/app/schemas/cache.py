@@ -0,0 +1,38 @@
+"""Pydantic schemas for cache reporting."""
+
+from pydantic import BaseModel, Field
+
+
+class LookupCacheMetricsResponse(BaseModel):
+    """Schema for the session/conversation lookup cache's metrics."""
+
+    size: int = Field(..., description="Entries currently cached")
+    max_size: int = Field(..., description="Entries kept before evicting (0: disabled)")
+    ttl: float = Field(..., description="Seconds an entry stays valid")
+    hits: int = 0
+    misses: int = 0
+    hit_ratio: float = Field(0.0, description="hits / (hits + misses)")
+    evictions: int = Field(0, description="Entries dropped to stay within max_size")
+    expirations: int = Field(0, description="Entries found past their ttl")
+    invalidations: int = Field(0, description="Deletes that dropped entries")
+    version: int | None = Field(
+        None, description="Shared cache_versions counter last seen by this process"
+    )
+
+
+class ResponseCacheMetricsResponse(BaseModel):
+    """Schema for the LLM response cache's metrics."""
+
+    size: int = Field(..., description="Responses currently stored")
+    max_entries: int = Field(..., description="Responses kept before evicting")
+    ttl: float = Field(..., description="Seconds a response stays valid")
+    hits: int = Field(0, description="Requests found under their exact key")
+    misses: int = Field(0, description="Requests not found under their exact key")
+    hit_ratio: float = Field(0.0, description="(hits + near_hits) / (hits + misses)")
+    near_hits: int = Field(0, description="Exact misses served by a near duplicate")
+    near_misses: int = Field(0, description="Exact misses with no near duplicate")
+    stores: int = Field(0, description="Responses written after a miss")
+    evictions: int = Field(
+        0, description="Responses dropped to stay within max_entries"
+    )
+    expirations: int = Field(0, description="Responses found past their ttl")
@@ -1,7 +1,6 @@
 """Pydantic schemas for Conversation API."""
 
 from datetime import datetime
-from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -21,7 +20,7 @@ class ConversationCreate(ConversationBase):
 class ConversationUpdate(BaseModel):
     """Schema for updating a conversation."""
 
-    title: Optional[str] = Field(None, min_length=1, max_length=255)
+    title: str | None = Field(None, min_length=1, max_length=255)
 
 
 class ConversationResponse(ConversationBase):
@@ -33,6 +32,9 @@ class ConversationResponse(ConversationBase):
     session_id: int
     created_at: datetime
     updated_at: datetime
+    exchange_count: int = 0
+    total_input_tokens: int = 0
+    total_output_tokens: int = 0
 
 
 class ConversationListResponse(BaseModel):
@@ -42,3 +44,6 @@ class ConversationListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: str | None = Field(
+        None, description="Cursor for the next page (None on the last page)"
+    )
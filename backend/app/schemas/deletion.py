@@ -0,0 +1,28 @@
+"""Pydantic schemas for background deletions."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class DeletionStatusResponse(BaseModel):
+    """Schema for the progress of a background deletion."""
+
+    id: int
+    kind: str = Field(..., description='"session" or "conversation"')
+    target_id: int = Field(..., description="Id of the session or conversation")
+    running: bool = False
+    started_at: datetime
+    finished_at: datetime | None = None
+    exchanges_total: int = Field(
+        0, description="Live exchanges when the deletion started"
+    )
+    exchanges_deleted: int = 0
+    chunks: int = 0
+    last_error: str | None = None
+
+
+class DeletionListResponse(BaseModel):
+    """Schema for the running and recent background deletions."""
+
+    items: list[DeletionStatusResponse]
@@ -1,19 +1,21 @@
 """Pydantic schemas for Exchange API."""
 
 from datetime import datetime
-from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+# Upper bound on items accepted by one bulk request
+MAX_BULK_EXCHANGES = 5000
+
 
 class ExchangeBase(BaseModel):
     """Base schema for exchange data."""
 
     user_message: str = Field(..., min_length=1, description="User's message")
-    assistant_message: str = Field(..., min_length=1, description="Assistant's response")
-    model: Optional[str] = Field(None, max_length=100, description="Model used")
-    input_tokens: Optional[int] = Field(None, ge=0, description="Input token count")
-    output_tokens: Optional[int] = Field(None, ge=0, description="Output token count")
+    assistant_message: str = Field(..., min_length=1, description="Assistant's reply")
+    model: str | None = Field(None, max_length=100, description="Model used")
+    input_tokens: int | None = Field(None, ge=0, description="Input token count")
+    output_tokens: int | None = Field(None, ge=0, description="Output token count")
 
 
 class ExchangeCreate(ExchangeBase):
@@ -32,6 +34,56 @@ class ExchangeResponse(ExchangeBase):
     created_at: datetime
 
 
+class ExchangeSummaryResponse(BaseModel):
+    """Schema for an exchange in a summary listing (previews, no bodies)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    conversation_id: int
+    model: str | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    created_at: datetime
+    user_message_preview: str = Field(..., description="Start of the user's message")
+    assistant_message_preview: str = Field(
+        ..., description="Start of the assistant's response"
+    )
+    user_message_length: int = Field(
+        ..., description="Length of the user's message in characters"
+    )
+    assistant_message_length: int = Field(
+        ..., description="Length of the assistant's response in characters"
+    )
+
+
+class ExchangeBulkCreate(BaseModel):
+    """Schema for creating many exchanges, possibly across conversations."""
+
+    items: list[ExchangeCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BULK_EXCHANGES,
+        description="Exchanges to create, in order",
+    )
+
+
+class ExchangeBulkError(BaseModel):
+    """An item of a bulk request that could not be created."""
+
+    index: int = Field(..., description="Position of the item in the request")
+    detail: str
+
+
+class ExchangeBulkResponse(BaseModel):
+    """Schema for bulk exchange creation response."""
+
+    ids: list[int | None] = Field(
+        ..., description="Created exchange ids in request order (None if rejected)"
+    )
+    errors: list[ExchangeBulkError]
+
+
 class ExchangeListResponse(BaseModel):
     """Schema for paginated exchange list response."""
 
@@ -39,3 +91,18 @@ class ExchangeListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: str | None = Field(
+        None, description="Cursor for the next page (None on the last page)"
+    )
+
+
+class ExchangeSummaryListResponse(BaseModel):
+    """Schema for paginated exchange summary list response."""
+
+    items: list[ExchangeSummaryResponse]
+    total: int
+    page: int
+    page_size: int
+    next_cursor: str | None = Field(
+        None, description="Cursor for the next page (None on the last page)"
+    )
@@ -0,0 +1,57 @@
+"""Pydantic schemas for exchange ingest."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.schemas.exchange import ExchangeCreate
+
+
+class IngestMetricsResponse(BaseModel):
+    """Schema for exchange ingest writer metrics."""
+
+    mode: str = Field(..., description='Ingest mode: "direct" or "batched"')
+    running: bool = False
+    queue_depth: int = 0
+    records_written: int = 0
+    batches_flushed: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    avg_batch_size: float = 0.0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    avg_flush_ms: float = 0.0
+
+
+class IngestRecord(ExchangeCreate):
+    """Schema for an exchange record sent over the ingest WebSocket."""
+
+    seq: int = Field(..., description="Client sequence number, echoed in the ack")
+
+
+class IngestRecordAck(BaseModel):
+    """Schema for a committed ingest record."""
+
+    seq: int
+    id: int
+
+
+class IngestRecordError(BaseModel):
+    """Schema for a rejected ingest record."""
+
+    seq: int | None = None
+    detail: str
+
+
+class IngestAck(BaseModel):
+    """Schema for the ingest WebSocket's acknowledgements.
+
+    The first message grants the initial credit with no records; each later
+    one acknowledges a committed batch or rejected records and returns their
+    credit.
+    """
+
+    type: Literal["ack"] = "ack"
+    acks: list[IngestRecordAck] = Field(default_factory=list)
+    errors: list[IngestRecordError] = Field(default_factory=list)
+    credit: int = Field(..., description="Further records the client may send")
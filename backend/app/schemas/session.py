@@ -1,7 +1,6 @@
 """Pydantic schemas for Session API."""
 
 from datetime import datetime
-from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -10,7 +9,7 @@ class SessionBase(BaseModel):
     """Base schema for session data."""
 
     name: str = Field(..., min_length=1, max_length=255, description="Session name")
-    description: Optional[str] = Field(None, description="Optional session description")
+    description: str | None = Field(None, description="Optional session description")
 
 
 class SessionCreate(SessionBase):
@@ -22,8 +21,8 @@ class SessionCreate(SessionBase):
 class SessionUpdate(BaseModel):
     """Schema for updating a session."""
 
-    name: Optional[str] = Field(None, min_length=1, max_length=255)
-    description: Optional[str] = None
+    name: str | None = Field(None, min_length=1, max_length=255)
+    description: str | None = None
 
 
 class SessionResponse(SessionBase):
@@ -34,6 +33,10 @@ class SessionResponse(SessionBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    conversation_count: int = 0
+    exchange_count: int = 0
+    total_input_tokens: int = 0
+    total_output_tokens: int = 0
 
 
 class SessionListResponse(BaseModel):
@@ -43,3 +46,6 @@ class SessionListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: str | None = Field(
+        None, description="Cursor for the next page (None on the last page)"
+    )
@@ -0,0 +1,17 @@
+"""Pydantic schemas for storage reporting."""
+
+from pydantic import BaseModel, Field
+
+
+class StorageReportResponse(BaseModel):
+    """Schema for the message storage savings report."""
+
+    blob_count: int = Field(..., description="Distinct message bodies stored")
+    reference_count: int = Field(..., description="Messages pointing at a blob")
+    logical_bytes: int = Field(..., description="Size of messages before deduplication")
+    unique_bytes: int = Field(..., description="Size of the distinct message bodies")
+    stored_bytes: int = Field(..., description="Size of the bodies as compressed")
+    deduplication_savings: int = Field(..., description="logical_bytes - unique_bytes")
+    compression_savings: int = Field(..., description="unique_bytes - stored_bytes")
+    deduplication_ratio: float = Field(..., description="logical_bytes / unique_bytes")
+    overall_ratio: float = Field(..., description="logical_bytes / stored_bytes")
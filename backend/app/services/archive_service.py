@@ -0,0 +1,249 @@
+"""Background archiving of old exchanges into monthly SQLite files."""
+
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import exists, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.archive import (
+    archive_for,
+    compact_archives,
+    list_archives,
+    move_exchanges,
+    move_rows,
+)
+from app.db.sqlite import is_busy_error
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.session import Session
+from app.schemas.archive import ArchiveFileResponse, ArchiveStatusResponse
+from app.services.settings import PerformanceSettings, get_settings
+
+
+class ArchiveService:
+    """Moves old rows out of the live database, one small transaction at a time.
+
+    A pass moves exchanges created before the cutoff into the archive file
+    for their month, then conversations not updated since the cutoff that
+    have no live exchanges left (into the month of their last update), then
+    sessions likewise. Each chunk commits on its own and the pass pauses
+    between chunks, so writers never wait behind more than one chunk.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        directory: Path,
+        after_days: int = 90,
+        chunk_size: int = 500,
+        chunk_pause_ms: int = 50,
+    ) -> None:
+        """Initialize the archiver.
+
+        Args:
+            session_factory: Factory for the AsyncSession used per chunk
+            directory: Directory holding the archive files
+            after_days: Default age, in days, beyond which rows are archived
+            chunk_size: Rows moved per transaction
+            chunk_pause_ms: Pause between chunks
+        """
+        self._session_factory = session_factory
+        self.directory = directory
+        self.after_days = after_days
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause_ms / 1000
+        self._task: asyncio.Task[ArchiveStatusResponse] | None = None
+        self._running = False
+
+        self._started_at: datetime | None = None
+        self._finished_at: datetime | None = None
+        self._cutoff: datetime | None = None
+        self._moved = {"exchanges": 0, "conversations": 0, "sessions": 0}
+        self._chunks = 0
+        self._last_error: str | None = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        session_factory: async_sessionmaker[AsyncSession],
+        directory: Path,
+        performance: PerformanceSettings,
+    ) -> "ArchiveService":
+        """Create an archiver configured by PerformanceSettings."""
+        return cls(
+            session_factory,
+            directory,
+            after_days=performance.archive_after_days,
+            chunk_size=performance.archive_chunk_size,
+            chunk_pause_ms=performance.archive_chunk_pause_ms,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether a pass is in progress."""
+        return self._running
+
+    def start(self, after_days: int | None = None) -> bool:
+        """Start a pass in the background.
+
+        Returns:
+            False if a pass is already running
+        """
+        if self._running:
+            return False
+        self._running = True
+        self._task = asyncio.create_task(self._run(after_days))
+        return True
+
+    async def run(self, after_days: int | None = None) -> ArchiveStatusResponse:
+        """Run a pass to completion.
+
+        Raises:
+            RuntimeError: If a pass is already running
+        """
+        if self._running:
+            raise RuntimeError("An archive pass is already running")
+        self._running = True
+        return await self._run(after_days)
+
+    async def stop(self) -> None:
+        """Cancel the background pass, if any; chunks already moved stay moved."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def wait(self) -> ArchiveStatusResponse:
+        """Wait for the background pass, if any, and return the final status."""
+        if self._task is not None:
+            await self._task
+        return self.status()
+
+    def status(self) -> ArchiveStatusResponse:
+        """Progress of the current (or last) pass and the archive files."""
+        return ArchiveStatusResponse(
+            running=self._running,
+            started_at=self._started_at,
+            finished_at=self._finished_at,
+            cutoff=self._cutoff,
+            exchanges_moved=self._moved["exchanges"],
+            conversations_moved=self._moved["conversations"],
+            sessions_moved=self._moved["sessions"],
+            chunks=self._chunks,
+            last_error=self._last_error,
+            archives=[
+                ArchiveFileResponse(
+                    schema_name=schema, path=str(path), size_bytes=path.stat().st_size
+                )
+                for schema, path in list_archives(self.directory).items()
+            ],
+        )
+
+    async def _run(self, after_days: int | None) -> ArchiveStatusResponse:
+        """One pass: exchanges first, so their parents can follow."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        days = self.after_days if after_days is None else after_days
+        self._started_at, self._finished_at = now, None
+        self._cutoff = now - timedelta(days=days)
+        self._moved = dict.fromkeys(self._moved, 0)
+        self._chunks = 0
+        self._last_error = None
+        try:
+            await self._archive(
+                "exchanges",
+                Exchange,
+                Exchange.created_at,
+                Exchange.created_at < self._cutoff,
+            )
+            await self._archive(
+                "conversations",
+                Conversation,
+                Conversation.updated_at,
+                Conversation.updated_at < self._cutoff,
+                ~exists().where(Exchange.conversation_id == Conversation.id),
+            )
+            await self._archive(
+                "sessions",
+                Session,
+                Session.updated_at,
+                Session.updated_at < self._cutoff,
+                ~exists().where(Conversation.session_id == Session.id),
+            )
+        except Exception as exc:
+            self._last_error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self._running = False
+            self._finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        return self.status()
+
+    async def _archive(
+        self, kind: str, model: Any, date_column: Any, *conditions: Any
+    ) -> None:
+        """Move the matching rows of ``model`` in id-ordered chunks."""
+        last_id = 0
+        while True:
+            async with self._session_factory() as db:
+                result = await db.execute(
+                    select(model.id, date_column)
+                    .where(model.id > last_id, *conditions)
+                    .order_by(model.id)
+                    .limit(self.chunk_size)
+                )
+                rows = result.all()
+            if not rows:
+                return
+
+            # Archive files are created (and attached on the next checkout)
+            # before the transaction that fills them
+            targets = await asyncio.to_thread(self._targets, [row[1] for row in rows])
+            by_schema: dict[str, list[int]] = {}
+            for (row_id, _), schema in zip(rows, targets):
+                by_schema.setdefault(schema, []).append(row_id)
+            await self._move_chunk(kind, by_schema)
+
+            self._moved[kind] += len(rows)
+            self._chunks += 1
+            last_id = rows[-1][0]
+            await asyncio.sleep(self.chunk_pause)
+
+    def _targets(self, dates: Sequence[datetime]) -> list[str]:
+        """Archive schema per row date, compacting and creating files as needed."""
+        compact_archives(self.directory, set(dates))
+        schemas: dict[tuple[int, int], str] = {}
+        return [
+            schemas.setdefault(
+                (when.year, when.month), archive_for(self.directory, when)
+            )
+            for when in dates
+        ]
+
+    async def _move_chunk(self, kind: str, by_schema: dict[str, list[int]]) -> None:
+        """Move one chunk in a single transaction, retrying while SQLite is busy."""
+        performance = get_settings().performance
+        attempt = 0
+        while True:
+            try:
+                async with self._session_factory() as db:
+                    for schema, ids in by_schema.items():
+                        if kind == "exchanges":
+                            await db.run_sync(move_exchanges, ids, schema)
+                        else:
+                            await db.run_sync(move_rows, kind, ids, schema)
+                    await db.commit()
+                return
+            except OperationalError as exc:
+                if (
+                    not is_busy_error(exc)
+                    or attempt >= performance.write_retry_attempts
+                ):
+                    raise
+                await asyncio.sleep(performance.write_retry_backoff * (2**attempt))
+                attempt += 1
@@ -0,0 +1,159 @@
+"""Background deletion of large sessions and conversations."""
+
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.deletion import DeletionStatusResponse
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings
+
+# Finished deletions kept for status queries
+MAX_FINISHED = 100
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DeletionService:
+    """Deletes sessions and conversations too large for one transaction.
+
+    Their exchanges are deleted ``chunk_size`` at a time, each chunk in its
+    own transaction with a pause between chunks, so writers never wait
+    behind more than one chunk; the emptied session or conversation then
+    goes with a single cascading DELETE. Counters shrink as chunks commit,
+    and a stopped deletion leaves a consistent, smaller row behind.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        chunk_size: int = 1000,
+        chunk_pause_ms: int = 50,
+    ) -> None:
+        """Initialize the deleter.
+
+        Args:
+            session_factory: Factory for the AsyncSession used per chunk
+            chunk_size: Exchanges deleted per transaction; larger sessions
+                and conversations are deleted in the background
+            chunk_pause_ms: Pause between chunks
+        """
+        self._session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause_ms / 1000
+        self._deletions: dict[int, DeletionStatusResponse] = {}
+        self._tasks: dict[int, asyncio.Task[None]] = {}
+        self._next_id = 1
+
+    @classmethod
+    def from_settings(
+        cls,
+        session_factory: async_sessionmaker[AsyncSession],
+        performance: PerformanceSettings,
+    ) -> "DeletionService":
+        """Create a deleter configured by PerformanceSettings."""
+        return cls(
+            session_factory,
+            chunk_size=performance.delete_chunk_size,
+            chunk_pause_ms=performance.delete_chunk_pause_ms,
+        )
+
+    def needs_background(self, exchange_count: int) -> bool:
+        """Whether deleting this many exchanges takes more than one chunk."""
+        return exchange_count > self.chunk_size
+
+    def start(
+        self, kind: str, target_id: int, exchange_count: int = 0
+    ) -> DeletionStatusResponse:
+        """Start deleting a session or conversation in the background.
+
+        Args:
+            kind: "session" or "conversation"
+            target_id: Id of the row to delete
+            exchange_count: Its live exchanges, for progress reporting
+
+        Returns:
+            The new deletion, or the running one for the same row
+        """
+        if kind not in ("session", "conversation"):
+            raise ValueError(f"Unknown deletion kind: {kind!r}")
+        for deletion in self._deletions.values():
+            if deletion.running and (deletion.kind, deletion.target_id) == (
+                kind,
+                target_id,
+            ):
+                return deletion
+
+        deletion = DeletionStatusResponse(
+            id=self._next_id,
+            kind=kind,
+            target_id=target_id,
+            running=True,
+            started_at=_now(),
+            exchanges_total=exchange_count,
+        )
+        self._next_id += 1
+        self._deletions[deletion.id] = deletion
+        self._tasks[deletion.id] = asyncio.create_task(self._run(deletion))
+        self._forget_finished()
+        return deletion
+
+    def status(self, deletion_id: int) -> DeletionStatusResponse | None:
+        """Progress of a running or recent deletion."""
+        return self._deletions.get(deletion_id)
+
+    def list(self) -> list[DeletionStatusResponse]:
+        """Running and recent deletions, newest first."""
+        return sorted(self._deletions.values(), key=lambda d: d.id, reverse=True)
+
+    async def wait(self, deletion_id: int) -> DeletionStatusResponse | None:
+        """Wait for a deletion to finish and return its final status."""
+        task = self._tasks.get(deletion_id)
+        if task is not None:
+            await task
+        return self.status(deletion_id)
+
+    async def stop(self) -> None:
+        """Cancel running deletions; chunks already deleted stay deleted."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self, deletion: DeletionStatusResponse) -> None:
+        """Empty the row chunk by chunk, then delete it."""
+        target = {f"{deletion.kind}_id": deletion.target_id}
+        try:
+            while True:
+                async with self._session_factory() as db:
+                    deleted = await SessionService(db).delete_exchanges_chunk(
+                        self.chunk_size, **target
+                    )
+                if not deleted:
+                    break
+                deletion.exchanges_deleted += deleted
+                deletion.chunks += 1
+                await asyncio.sleep(self.chunk_pause)
+
+            async with self._session_factory() as db:
+                service = SessionService(db)
+                if deletion.kind == "session":
+                    await service.delete_session(deletion.target_id)
+                else:
+                    await service.delete_conversation(deletion.target_id)
+        except Exception as exc:
+            deletion.last_error = f"{type(exc).__name__}: {exc}"
+        finally:
+            deletion.running = False
+            deletion.finished_at = _now()
+            self._tasks.pop(deletion.id, None)
+
+    def _forget_finished(self) -> None:
+        """Keep only the newest MAX_FINISHED finished deletions."""
+        finished = [d.id for d in self._deletions.values() if not d.running]
+        for deletion_id in sorted(finished)[:-MAX_FINISHED]:
+            del self._deletions[deletion_id]
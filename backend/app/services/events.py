@@ -0,0 +1,135 @@
+"""In-process pub/sub of exchange events for the server-sent event streams.
+
+SessionService publishes a frame after committing each exchange it creates
+or deletes; GET /api/conversations/{id}/events and /api/sessions/{id}/events
+subscribe to the conversation's or session's topic. A frame is encoded once
+and the same bytes are queued for every subscriber, so fanning out costs a
+``put_nowait`` per subscriber and no database work. Subscribers that fall
+``queue_size`` frames behind are dropped rather than buffered without bound:
+their stream ends, and the client reconnects with ``Last-Event-ID``.
+
+The broker is per process: with several workers, a subscriber only sees
+the writes made by its own worker.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from app.schemas.exchange import ExchangeResponse
+
+# A topic is ("conversation", id) or ("session", id)
+Topic = tuple[str, int]
+
+# A queued frame with its event id (None for events without one)
+Event = tuple[int | None, bytes]
+
+EXCHANGE_CREATED = "exchange.created"
+EXCHANGE_DELETED = "exchange.deleted"
+
+
+def event_frame(event: str, data: str, event_id: int | None = None) -> bytes:
+    """One server-sent event: optional ``id``, ``event`` and ``data``.
+
+    ``data`` is compact JSON, which never holds a raw newline.
+    """
+    frame = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{frame}event: {event}\ndata: {data}\n\n".encode()
+
+
+def exchange_created_frame(exchange: Any) -> bytes:
+    """Frame announcing a new exchange; its id is the event id to resume from."""
+    data = ExchangeResponse.model_validate(exchange).model_dump_json()
+    return event_frame(EXCHANGE_CREATED, data, exchange.id)
+
+
+def exchange_deleted_frame(exchange_id: int, conversation_id: int) -> bytes:
+    """Frame announcing a deleted exchange.
+
+    It has no event id: ids are those of created exchanges, and resuming
+    replays exchanges created since, not deletions.
+    """
+    data = json.dumps(
+        {"id": exchange_id, "conversation_id": conversation_id}, separators=(",", ":")
+    )
+    return event_frame(EXCHANGE_DELETED, data)
+
+
+def exchange_topics(conversation_id: int, session_id: int | None) -> list[Topic]:
+    """Topics an exchange event is published to."""
+    topics: list[Topic] = [("conversation", conversation_id)]
+    if session_id is not None:
+        topics.append(("session", session_id))
+    return topics
+
+
+class Subscription:
+    """A subscriber's bounded queue of frames."""
+
+    def __init__(self, broker: "EventBroker", topic: Topic, queue_size: int) -> None:
+        self.topic = topic
+        self.dropped = False
+        self._broker = broker
+        self._queue: asyncio.Queue[Event | None] = asyncio.Queue(queue_size)
+
+    def offer(self, event: Event) -> None:
+        """Queue an event, or drop the subscription if its queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self._broker.unsubscribe(self)
+            # Queued frames are discarded: the client resumes from the last
+            # event it actually received
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self) -> Event | None:
+        """Next event, or None once the subscription has been dropped."""
+        return await self._queue.get()
+
+
+class EventBroker:
+    """Fans exchange event frames out to the subscribers of each topic."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[Topic, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topic: Topic, queue_size: int = 256) -> Subscription:
+        """Start receiving the frames published to ``topic``."""
+        subscription = Subscription(self, topic, queue_size)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering to ``subscription`` (idempotent)."""
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.topic]
+
+    def has_subscribers(self, topics: Iterable[Topic]) -> bool:
+        """Whether anyone listens to any of ``topics`` (publishers skip encoding)."""
+        return any(topic in self._subscribers for topic in topics)
+
+    def publish(
+        self, topics: Iterable[Topic], frame: bytes, event_id: int | None = None
+    ) -> None:
+        """Queue ``frame`` for every subscriber of ``topics``."""
+        event = (event_id, frame)
+        for topic in topics:
+            for subscription in list(self._subscribers.get(topic, ())):
+                subscription.offer(event)
+
+    def subscriber_count(self, topic: Topic) -> int:
+        """Number of current subscribers to ``topic``."""
+        return len(self._subscribers.get(topic, ()))
+
+
+# The process's broker
+exchange_events = EventBroker()
@@ -0,0 +1,221 @@
+"""Group-commit write-behind queue for exchange recording."""
+
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.exchange import Exchange
+from app.schemas.exchange import ExchangeCreate
+from app.schemas.ingest import IngestMetricsResponse
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings
+
+# A queued record and the future its caller awaits for the ack
+_Pending = tuple[ExchangeCreate, "asyncio.Future[Exchange | None]"]
+
+_TIMED_OUT = object()
+
+
+class ExchangeBatchWriter:
+    """Batches exchange inserts from many callers into group commits.
+
+    Callers await :meth:`submit`, which resolves once their record has been
+    committed. A background task flushes a batch, in one transaction, as soon
+    as ``max_batch_size`` records are queued or ``max_delay_ms`` has passed
+    since the first record of the batch arrived. A full queue applies
+    backpressure to submitters.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch_size: int = 500,
+        max_delay_ms: int = 10,
+        max_queue_size: int = 10000,
+    ) -> None:
+        """Initialize the writer (call :meth:`start` before submitting).
+
+        Args:
+            session_factory: Factory for the AsyncSession used per flush
+            max_batch_size: Flush once this many records are queued
+            max_delay_ms: Flush at most this long after a batch's first record
+            max_queue_size: Records that may wait before submit blocks
+        """
+        self._session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: asyncio.Queue[_Pending | None] = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+
+        self._records_written = 0
+        self._batches_flushed = 0
+        self._last_batch_size = 0
+        self._max_batch_size_seen = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @classmethod
+    def from_settings(
+        cls,
+        session_factory: async_sessionmaker[AsyncSession],
+        performance: PerformanceSettings,
+    ) -> "ExchangeBatchWriter":
+        """Create a writer sized by PerformanceSettings."""
+        return cls(
+            session_factory,
+            max_batch_size=performance.ingest_batch_size,
+            max_delay_ms=performance.ingest_batch_delay_ms,
+            max_queue_size=performance.ingest_queue_size,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer accepts new records."""
+        return self._task is not None and not self._stopping
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting records, flush everything queued and stop the task."""
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, data: ExchangeCreate) -> Exchange | None:
+        """Queue an exchange and wait until it has been committed.
+
+        Returns:
+            The created exchange, or None if its conversation does not exist
+
+        Raises:
+            RuntimeError: If the writer is not running
+        """
+        if not self.running:
+            raise RuntimeError("Exchange batch writer is not running")
+        future: asyncio.Future[Exchange | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        await self._queue.put((data, future))
+        return await future
+
+    def metrics(self) -> IngestMetricsResponse:
+        """Snapshot of queue depth, batch size and flush latency."""
+        return IngestMetricsResponse(
+            mode="batched",
+            running=self.running,
+            queue_depth=self._queue.qsize(),
+            records_written=self._records_written,
+            batches_flushed=self._batches_flushed,
+            last_batch_size=self._last_batch_size,
+            max_batch_size=self._max_batch_size_seen,
+            avg_batch_size=(
+                self._records_written / self._batches_flushed
+                if self._batches_flushed
+                else 0.0
+            ),
+            last_flush_ms=self._last_flush_ms,
+            max_flush_ms=self._max_flush_ms,
+            avg_flush_ms=(
+                self._total_flush_ms / self._batches_flushed
+                if self._batches_flushed
+                else 0.0
+            ),
+        )
+
+    async def _get(self, timeout: float) -> Any:
+        """Get the next queued item, or _TIMED_OUT after ``timeout`` seconds.
+
+        Uses asyncio.wait rather than wait_for so a get that completes as the
+        timeout fires is never discarded.
+        """
+        getter = asyncio.ensure_future(self._queue.get())
+        done, _ = await asyncio.wait({getter}, timeout=timeout)
+        if getter in done or not getter.cancel():
+            return getter.result()
+        return _TIMED_OUT
+
+    async def _run(self) -> None:
+        """Collect records into batches and flush them until stopped."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+
+            batch: list[_Pending] = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                item = self._get_nowait()
+                if item is _TIMED_OUT:
+                    item = await self._get(max(deadline - loop.time(), 0))
+                if item is _TIMED_OUT:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Records that raced with stop() are still written before exiting
+        leftovers = []
+        while (item := self._get_nowait()) is not _TIMED_OUT:
+            if item is not None:
+                leftovers.append(item)
+        for start in range(0, len(leftovers), self.max_batch_size):
+            await self._flush(leftovers[start : start + self.max_batch_size])
+
+    def _get_nowait(self) -> Any:
+        """Get a queued item without waiting, or _TIMED_OUT if none is queued."""
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return _TIMED_OUT
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        """Write a batch in one transaction and resolve its callers' futures.
+
+        If the transaction fails, its records are written again one at a
+        time, so only the callers whose own record fails get the error.
+        """
+        started = time.perf_counter()
+        try:
+            async with self._session_factory() as db:
+                exchanges, _ = await SessionService(db).create_exchanges_bulk(
+                    [data for data, _ in batch]
+                )
+        except Exception as exc:
+            if len(batch) > 1:
+                for pending in batch:
+                    await self._flush([pending])
+                return
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(exc)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._records_written += len(batch)
+        self._batches_flushed += 1
+        self._last_batch_size = len(batch)
+        self._max_batch_size_seen = max(self._max_batch_size_seen, len(batch))
+        self._last_flush_ms = elapsed_ms
+        self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+        for (_, future), exchange in zip(batch, exchanges):
+            if not future.done():
+                future.set_result(exchange)
@@ -8,6 +8,12 @@ from app.services.llm_providers.base import (
     ProviderConfig,
 )
 from app.services.llm_providers.anthropic import AnthropicProvider
+from app.services.llm_providers.cache import (
+    CachingLLMProvider,
+    ResponseCache,
+    cached_provider,
+    get_response_cache_path,
+)
 from app.services.llm_providers.mock import MockLLMProvider
 
 __all__ = [
@@ -18,4 +24,8 @@ __all__ = [
     "ProviderConfig",
     "AnthropicProvider",
     "MockLLMProvider",
+    "CachingLLMProvider",
+    "ResponseCache",
+    "cached_provider",
+    "get_response_cache_path",
 ]
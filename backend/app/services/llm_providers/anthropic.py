@@ -1,8 +1,9 @@
 """Anthropic Claude provider implementation."""
 
-from typing import AsyncGenerator, List, Optional
+from collections.abc import AsyncGenerator
+from typing import Any
 
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from app.services.llm_providers.base import (
     BaseLLMProvider,
@@ -12,7 +13,6 @@ from app.services.llm_providers.base import (
     ProviderConfig,
 )
 
-
 # Model context window sizes
 MODEL_CONTEXT_SIZES = {
     "claude-3-5-sonnet-20241022": 200000,
@@ -35,27 +35,30 @@ class AnthropicProvider(BaseLLMProvider):
         """Initialize Anthropic provider.
 
         Args:
-            config: Provider configuration with API key
+            config: Provider configuration with API key (and optionally an
+                endpoint replacing the default API URL)
         """
         super().__init__(config)
-        self._client = Anthropic(api_key=config.api_key)
+        self._client = AsyncAnthropic(
+            api_key=config.api_key,
+            base_url=config.endpoint,
+            timeout=config.timeout,
+        )
 
-    async def send_message(
-        self,
-        messages: List[LLMMessage],
-        **kwargs,
-    ) -> LLMResponse:
-        """Send messages to Claude and get a response.
+    def _request_params(
+        self, messages: list[LLMMessage], **kwargs: Any
+    ) -> dict[str, Any]:
+        """Build the Messages API parameters shared by both request kinds.
 
         Args:
             messages: List of messages in the conversation
-            **kwargs: Additional parameters (max_tokens, temperature, etc.)
+            **kwargs: Additional parameters (max_tokens, temperature)
 
         Returns:
-            LLMResponse containing Claude's response
+            Keyword arguments for messages.create / messages.stream
         """
         # Extract system message if present
-        system_message: Optional[str] = None
+        system_message: str | None = None
         api_messages = []
 
         for msg in messages:
@@ -67,8 +70,7 @@ class AnthropicProvider(BaseLLMProvider):
                     "content": msg.content,
                 })
 
-        # Build request parameters
-        request_params = {
+        request_params: dict[str, Any] = {
             "model": self.config.model,
             "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
             "messages": api_messages,
@@ -77,11 +79,31 @@ class AnthropicProvider(BaseLLMProvider):
         if system_message:
             request_params["system"] = system_message
 
-        if self.config.temperature is not None:
-            request_params["temperature"] = self.config.temperature
+        # Sent in the body directly: recent SDKs no longer take temperature
+        # as a keyword argument
+        temperature = kwargs.get("temperature", self.config.temperature)
+        if temperature is not None:
+            request_params["extra_body"] = {"temperature": temperature}
 
-        # Make the API call
-        response = self._client.messages.create(**request_params)
+        return request_params
+
+    async def send_message(
+        self,
+        messages: list[LLMMessage],
+        **kwargs,
+    ) -> LLMResponse:
+        """Send messages to Claude and get a response.
+
+        Args:
+            messages: List of messages in the conversation
+            **kwargs: Additional parameters (max_tokens, temperature, etc.)
+
+        Returns:
+            LLMResponse containing Claude's response
+        """
+        response = await self._client.messages.create(
+            **self._request_params(messages, **kwargs)
+        )
 
         # Extract response content
         content = ""
@@ -98,47 +120,22 @@ class AnthropicProvider(BaseLLMProvider):
 
     async def stream_message(
         self,
-        messages: List[LLMMessage],
+        messages: list[LLMMessage],
         **kwargs,
     ) -> AsyncGenerator[str, None]:
         """Stream messages from Claude.
 
         Args:
             messages: List of messages in the conversation
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters (max_tokens, temperature, etc.)
 
         Yields:
             String chunks of the response as they arrive
         """
-        # Extract system message if present
-        system_message: Optional[str] = None
-        api_messages = []
-
-        for msg in messages:
-            if msg.role == "system":
-                system_message = msg.content
-            else:
-                api_messages.append({
-                    "role": msg.role,
-                    "content": msg.content,
-                })
-
-        # Build request parameters
-        request_params = {
-            "model": self.config.model,
-            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
-            "messages": api_messages,
-        }
-
-        if system_message:
-            request_params["system"] = system_message
-
-        if self.config.temperature is not None:
-            request_params["temperature"] = self.config.temperature
-
-        # Stream the response
-        with self._client.messages.stream(**request_params) as stream:
-            for event in stream:
+        async with self._client.messages.stream(
+            **self._request_params(messages, **kwargs)
+        ) as stream:
+            async for event in stream:
                 if event.type == "content_block_delta":
                     yield event.delta.text
 
@@ -1,9 +1,9 @@
 """Abstract base class for LLM providers."""
 
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, List, Optional
+from collections.abc import AsyncGenerator
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
 
 class LLMMessage(BaseModel):
@@ -20,7 +20,11 @@ class LLMResponse(BaseModel):
     model: str
     input_tokens: int = 0
     output_tokens: int = 0
-    stop_reason: Optional[str] = None
+    stop_reason: str | None = None
+    # True when replayed from the response cache instead of the provider,
+    # and the tier that matched: "exact", or "near" for a near duplicate
+    cached: bool = False
+    cache_tier: str | None = None
 
     @property
     def total_tokens(self) -> int:
@@ -44,8 +48,8 @@ class ProviderConfig(BaseModel):
 
     name: str
     model: str
-    api_key: Optional[str] = None
-    endpoint: Optional[str] = None
+    api_key: str | None = None
+    endpoint: str | None = None
     max_tokens: int = 4096
     temperature: float = 1.0
     timeout: int = 60
@@ -69,7 +73,7 @@ class BaseLLMProvider(ABC):
     @abstractmethod
     async def send_message(
         self,
-        messages: List[LLMMessage],
+        messages: list[LLMMessage],
         **kwargs,
     ) -> LLMResponse:
         """Send messages to the LLM and get a response.
@@ -84,9 +88,9 @@ class BaseLLMProvider(ABC):
         pass
 
     @abstractmethod
-    async def stream_message(
+    def stream_message(
         self,
-        messages: List[LLMMessage],
+        messages: list[LLMMessage],
         **kwargs,
     ) -> AsyncGenerator[str, None]:
         """Stream messages from the LLM.
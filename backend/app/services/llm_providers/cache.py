@@ -0,0 +1,579 @@
+"""Disk-backed cache of LLM responses, wrapping any provider.
+
+A request is keyed on a SHA-256 of its canonical JSON: the provider, the
+model, the system prompt, the other messages, max_tokens, temperature and
+any further keyword arguments. ``send_message`` stores the LLMResponse and
+``stream_message`` the chunks it yielded, under separate keys, so a cached
+stream replays the same chunks. Streams are stored only once they have run
+to completion; an abandoned or failed stream leaves nothing behind.
+
+Entries live in a SQLite file (``<data_directory>/llm_cache.db``), so they
+survive restarts and are shared by every process using the same file.
+They expire ``response_cache_ttl`` seconds after they were stored, and the
+least recently used are evicted beyond ``response_cache_max_entries``.
+
+With ``near_duplicate_cache`` on, ``send_message`` gets a second tier for
+prompts that differ only in timestamps, request ids, whitespace or a few
+words. Each stored response is also indexed by the MinHash signature of
+its normalized messages (see ``similarity``), under one LSH bucket per
+band. An exact miss looks up the buckets of the request's signature,
+compares the candidates' signatures with it, and replays the most similar
+response if it reaches ``near_duplicate_threshold``. Only requests with
+the same provider, model and parameters are compared.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    NamedTuple,
+)
+
+from app.schemas.cache import ResponseCacheMetricsResponse
+from app.services.llm_providers.base import (
+    BaseLLMProvider,
+    LLMMessage,
+    LLMResponse,
+    ModelInfo,
+)
+from app.services.llm_providers.similarity import (
+    MinHasher,
+    Signature,
+    normalize_messages,
+    similarity,
+)
+from app.services.settings import PerformanceSettings
+
+RESPONSE_CACHE_FILENAME = "llm_cache.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+
+-- Entry count, kept by triggers so bounding the size needs no COUNT(*)
+CREATE TABLE IF NOT EXISTS response_count (entries INTEGER NOT NULL);
+INSERT INTO response_count
+    SELECT COUNT(*) FROM responses WHERE NOT EXISTS (SELECT 1 FROM response_count);
+CREATE TRIGGER IF NOT EXISTS responses_inserted AFTER INSERT ON responses
+    BEGIN UPDATE response_count SET entries = entries + 1; END;
+CREATE TRIGGER IF NOT EXISTS responses_deleted AFTER DELETE ON responses
+    BEGIN UPDATE response_count SET entries = entries - 1; END;
+
+-- Near-duplicate index: a signature per response, and its LSH buckets
+CREATE TABLE IF NOT EXISTS near_entries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    signature BLOB NOT NULL,
+    buckets BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS near_buckets (
+    bucket INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (bucket, id)
+) WITHOUT ROWID;
+"""
+
+
+class NearKey(NamedTuple):
+    """Where a request sits in the near-duplicate index."""
+
+    signature: Signature
+    buckets: list[int]
+
+
+def get_response_cache_path(data_directory: str | None = None) -> Path:
+    """Resolve the response cache file from the configured data directory.
+
+    Args:
+        data_directory: GeneralSettings.data_directory (None or empty means
+            the current working directory)
+
+    Returns:
+        Path to the cache file
+    """
+    if not data_directory:
+        return Path(".") / RESPONSE_CACHE_FILENAME
+    return Path(data_directory).expanduser() / RESPONSE_CACHE_FILENAME
+
+
+def request_key(
+    provider: str, model: str, messages: list[LLMMessage], mode: str, **params: Any
+) -> str:
+    """Canonical hash of a request.
+
+    Args:
+        provider: Provider name, as reported by get_model_info()
+        model: Model the request is sent to
+        messages: Messages in the conversation, system prompt included
+        mode: "send" or "stream"
+        **params: max_tokens, temperature and any other request parameters
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    canonical = {
+        "provider": provider,
+        "model": model,
+        "mode": mode,
+        "system": [m.content for m in messages if m.role == "system"],
+        "messages": [[m.role, m.content] for m in messages if m.role != "system"],
+        "params": params,
+    }
+    encoded = json.dumps(
+        canonical,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """A SQLite table of cached values with expiry and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10000,
+        ttl: float = 86400,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open (creating if needed) the cache file.
+
+        Args:
+            path: SQLite file, or ":memory:"
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid after it was stored
+            clock: Wall-clock time source, in seconds (entries outlive the
+                process)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used under _lock, from whichever worker thread holds it
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._near_hits = 0
+        self._near_misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_settings(
+        cls, path: str | Path, performance: PerformanceSettings
+    ) -> "ResponseCache":
+        """Create a cache at ``path`` bounded by PerformanceSettings."""
+        return cls(
+            path,
+            max_entries=performance.response_cache_max_entries,
+            ttl=performance.response_cache_ttl,
+        )
+
+    def get(self, key: str) -> Any | None:
+        """The value stored for ``key``, or None if absent or expired."""
+        with self._lock:
+            value = self._fetch(key, self._clock())
+            if value is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return json.loads(value)
+
+    def get_similar(self, near: NearKey, threshold: float) -> tuple[Any, float] | None:
+        """The value of the most similar indexed request, if similar enough.
+
+        Args:
+            near: The request's signature and LSH buckets
+            threshold: Least estimated similarity that counts as a hit
+
+        Returns:
+            (value, similarity), or None if no live entry reaches threshold
+        """
+        placeholders = ",".join("?" * len(near.buckets))
+        now = self._clock()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, signature FROM near_entries WHERE id IN"
+                f" (SELECT id FROM near_buckets WHERE bucket IN ({placeholders}))",
+                near.buckets,
+            ).fetchall()
+            scored = []
+            for key, blob in rows:
+                signature = array("I", blob)
+                if len(signature) == len(near.signature):
+                    score = similarity(signature, near.signature)
+                    if score >= threshold:
+                        scored.append((score, key))
+            for score, key in sorted(scored, reverse=True):
+                value = self._fetch(key, now)
+                if value is not None:
+                    self._near_hits += 1
+                    return json.loads(value), score
+            self._near_misses += 1
+        return None
+
+    def put(self, key: str, value: Any, near: NearKey | None = None) -> None:
+        """Store ``value`` (JSON-serializable), evicting beyond max_entries.
+
+        Args:
+            key: Exact request key
+            value: What to replay for it
+            near: Signature and buckets to index the entry under, if any
+        """
+        if self.max_entries <= 0:
+            return
+        now = self._clock()
+        with self._lock, self._transaction():
+            self._connection.execute(
+                "INSERT INTO responses (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET"
+                " value = excluded.value, created_at = excluded.created_at,"
+                " accessed_at = excluded.accessed_at",
+                (key, json.dumps(value), now, now),
+            )
+            if near is not None:
+                self._unindex([key])
+                buckets = array("q", near.buckets)
+                entry = self._connection.execute(
+                    "INSERT INTO near_entries (key, signature, buckets)"
+                    " VALUES (?, ?, ?)",
+                    (key, near.signature.tobytes(), buckets.tobytes()),
+                ).lastrowid
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO near_buckets (bucket, id) VALUES (?, ?)",
+                    [(bucket, entry) for bucket in buckets],
+                )
+            self._stores += 1
+            excess = self._size() - self.max_entries
+            if excess > 0:
+                self._delete(
+                    [
+                        row[0]
+                        for row in self._connection.execute(
+                            "SELECT key FROM responses ORDER BY accessed_at LIMIT ?",
+                            (excess,),
+                        )
+                    ]
+                )
+                self._evictions += excess
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock, self._transaction():
+            for table in ("responses", "near_entries", "near_buckets"):
+                self._connection.execute(f"DELETE FROM {table}")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _fetch(self, key: str, now: float) -> str | None:
+        """The live stored JSON for ``key``, marked as used; drops it if expired."""
+        row = self._connection.execute(
+            "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] + self.ttl <= now:
+            with self._transaction():
+                self._delete([key])
+            self._expirations += 1
+            return None
+        self._connection.execute(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        return str(row[0])
+
+    def _delete(self, keys: list[str]) -> None:
+        self._unindex(keys)
+        self._connection.executemany(
+            "DELETE FROM responses WHERE key = ?", [(key,) for key in keys]
+        )
+
+    def _unindex(self, keys: list[str]) -> None:
+        for key in keys:
+            for entry, buckets in self._connection.execute(
+                "DELETE FROM near_entries WHERE key = ? RETURNING id, buckets", (key,)
+            ).fetchall():
+                self._connection.executemany(
+                    "DELETE FROM near_buckets WHERE bucket = ? AND id = ?",
+                    [(bucket, entry) for bucket in array("q", buckets)],
+                )
+
+    def close(self) -> None:
+        """Close the cache file."""
+        with self._lock:
+            self._connection.close()
+
+    def _size(self) -> int:
+        return int(
+            self._connection.execute("SELECT entries FROM response_count").fetchone()[0]
+        )
+
+    def metrics(self) -> ResponseCacheMetricsResponse:
+        """Snapshot of the cache's size and this process's counters."""
+        with self._lock:
+            size = self._size()
+        lookups = self._hits + self._misses
+        return ResponseCacheMetricsResponse(
+            size=size,
+            max_entries=self.max_entries,
+            ttl=self.ttl,
+            hits=self._hits,
+            misses=self._misses,
+            hit_ratio=(self._hits + self._near_hits) / lookups if lookups else 0.0,
+            near_hits=self._near_hits,
+            near_misses=self._near_misses,
+            stores=self._stores,
+            evictions=self._evictions,
+            expirations=self._expirations,
+        )
+
+
+class CachedStream(AsyncGenerator[str, None]):
+    """The chunks of one ``stream_message`` call.
+
+    ``cache_tier`` is "exact" when the chunks are replayed from the cache
+    and None when they come from the provider; it is set by the time the
+    first chunk arrives.
+    """
+
+    def __init__(
+        self, chunks: Callable[["CachedStream"], AsyncGenerator[str, None]]
+    ) -> None:
+        """Start the stream.
+
+        Args:
+            chunks: Makes the generator of the chunks, given this stream to
+                record the cache tier on
+        """
+        self.cache_tier: str | None = None
+        self._chunks = chunks(self)
+
+    @property
+    def cached(self) -> bool:
+        """Whether the chunks are replayed from the cache."""
+        return self.cache_tier is not None
+
+    async def asend(self, value: None) -> str:
+        return await self._chunks.asend(value)
+
+    async def athrow(self, *args: Any) -> str:
+        return await self._chunks.athrow(*args)
+
+    async def aclose(self) -> None:
+        await self._chunks.aclose()
+
+
+class CachingLLMProvider(BaseLLMProvider):
+    """Provider that answers repeated requests from a ResponseCache.
+
+    Cached responses come back with ``cached=True`` and the tier that
+    matched in ``cache_tier``; ``stream_message`` returns a CachedStream,
+    which yields the stored chunks when replayed and carries the same
+    ``cache_tier``.
+    """
+
+    def __init__(
+        self,
+        provider: BaseLLMProvider,
+        cache: ResponseCache,
+        hasher: MinHasher | None = None,
+    ) -> None:
+        """Wrap ``provider``.
+
+        Args:
+            provider: Provider to call on cache misses
+            cache: Where responses are stored
+            hasher: Enables the near-duplicate tier of send_message, matching
+                at its threshold
+        """
+        super().__init__(provider.config)
+        self.provider = provider
+        self.cache = cache
+        self.hasher = hasher
+
+    def _key(
+        self, messages: list[LLMMessage], mode: str, kwargs: dict[str, Any]
+    ) -> str:
+        params = dict(kwargs)
+        params.setdefault("max_tokens", self.config.max_tokens)
+        params.setdefault("temperature", self.config.temperature)
+        return request_key(
+            self.provider.get_model_info().provider,
+            self.config.model,
+            messages,
+            mode,
+            **params,
+        )
+
+    def _near_key(self, messages: list[LLMMessage], kwargs: dict[str, Any]) -> NearKey:
+        if self.hasher is None:
+            raise RuntimeError("The near-duplicate tier is not enabled")
+        signature = self.hasher.signature(normalize_messages(messages))
+        # Everything but the messages must match exactly
+        context = bytes.fromhex(self._key([], "near", kwargs))
+        return NearKey(signature, self.hasher.buckets(signature, context))
+
+    def _lookup(
+        self,
+        key: str,
+        messages: list[LLMMessage] | None = None,
+        kwargs: dict[str, Any] | None = None,
+    ) -> tuple[Any | None, str | None, NearKey | None]:
+        """Look ``key`` up, then ``messages`` in the near-duplicate tier if any.
+
+        The signature is only computed on an exact miss, and returned so a
+        miss can be indexed under it.
+
+        Returns:
+            (stored value, "exact" or "near" or None, near-duplicate key)
+        """
+        stored = self.cache.get(key)
+        if stored is not None:
+            return stored, "exact", None
+        if messages is None or self.hasher is None:
+            return None, None, None
+        near = self._near_key(messages, kwargs or {})
+        similar = self.cache.get_similar(near, self.hasher.threshold)
+        if similar is not None:
+            return similar[0], "near", near
+        return None, None, near
+
+    async def send_message(
+        self,
+        messages: list[LLMMessage],
+        **kwargs: Any,
+    ) -> LLMResponse:
+        """Return the cached response, or send and cache it.
+
+        Args:
+            messages: List of messages in the conversation
+            **kwargs: Parameters passed on to the provider (part of the key)
+
+        Returns:
+            LLMResponse, with cached=True and its cache_tier if it was replayed
+        """
+        key = self._key(messages, "send", kwargs)
+        stored, tier, near = await asyncio.to_thread(
+            self._lookup, key, messages, kwargs
+        )
+        if stored is not None:
+            return LLMResponse.model_validate(
+                {**stored, "cached": True, "cache_tier": tier}
+            )
+
+        response = await self.provider.send_message(messages, **kwargs)
+        value = response.model_dump(exclude={"cached", "cache_tier"})
+        await asyncio.to_thread(self.cache.put, key, value, near)
+        return response
+
+    def stream_message(
+        self,
+        messages: list[LLMMessage],
+        **kwargs: Any,
+    ) -> CachedStream:
+        """Replay cached chunks, or stream from the provider and cache them.
+
+        Args:
+            messages: List of messages in the conversation
+            **kwargs: Parameters passed on to the provider (part of the key)
+
+        Returns:
+            CachedStream of the response's string chunks
+        """
+        return CachedStream(lambda stream: self._stream(stream, messages, kwargs))
+
+    async def _stream(
+        self,
+        stream: CachedStream,
+        messages: list[LLMMessage],
+        kwargs: dict[str, Any],
+    ) -> AsyncGenerator[str, None]:
+        key = self._key(messages, "stream", kwargs)
+        stored, stream.cache_tier, _ = await asyncio.to_thread(self._lookup, key)
+        if stored is not None:
+            for chunk in stored:
+                yield chunk
+            return
+
+        chunks = []
+        async for chunk in self.provider.stream_message(messages, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        await asyncio.to_thread(self.cache.put, key, chunks)
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the wrapped provider."""
+        return self.provider.count_tokens(text)
+
+    def get_model_info(self) -> ModelInfo:
+        """The wrapped provider's model information."""
+        return self.provider.get_model_info()
+
+    def validate_config(self) -> bool:
+        """Validate the wrapped provider's configuration."""
+        return self.provider.validate_config()
+
+    def metrics(self) -> ResponseCacheMetricsResponse:
+        """The response cache's metrics."""
+        return self.cache.metrics()
+
+
+def cached_provider(
+    provider: BaseLLMProvider,
+    performance: PerformanceSettings,
+    path: str | Path,
+) -> BaseLLMProvider:
+    """Wrap ``provider`` in a response cache if cache_responses is enabled.
+
+    Args:
+        provider: Provider to wrap
+        performance: PerformanceSettings with the cache's switch and bounds
+        path: Cache file, see get_response_cache_path()
+
+    Returns:
+        A CachingLLMProvider, or ``provider`` itself when caching is off
+    """
+    if not performance.cache_responses:
+        return provider
+    hasher = None
+    if performance.near_duplicate_cache:
+        hasher = MinHasher(
+            num_perm=performance.near_duplicate_permutations,
+            threshold=performance.near_duplicate_threshold,
+        )
+    return CachingLLMProvider(
+        provider, ResponseCache.from_settings(path, performance), hasher
+    )
@@ -0,0 +1,178 @@
+"""MinHash signatures and LSH banding for near-duplicate prompts.
+
+Prompts are normalized first: timestamps, UUIDs and request ids become
+placeholders, whitespace is collapsed and case is folded, so prompts that
+differ only in those compare equal. The normalized text is cut into word
+shingles and summarized by a MinHash signature; the fraction of positions
+where two signatures agree estimates the Jaccard similarity of their
+shingle sets. Signatures use one-permutation hashing: each shingle is
+hashed once and its hash goes to one of ``num_perm`` bins, keeping each
+bin's minimum. An empty bin takes the value of the first filled bin in
+its own fixed random probe order (optimal densification), so short
+prompts still fill every position. That costs one hash per shingle rather
+than ``num_perm``. Signatures are split into bands, and each band is
+hashed into a bucket. Prompts sharing any bucket are candidates, which are then
+compared by their signatures. With ``bands`` bands of ``rows`` positions,
+a pair of similarity s shares a bucket with probability
+1 - (1 - s^rows)^bands.
+"""
+
+import hashlib
+import random
+import re
+from array import array
+from typing import TypeAlias
+
+from app.services.llm_providers.base import LLMMessage
+
+# A MinHash signature, as unsigned 32-bit ints
+Signature: TypeAlias = "array[int]"
+
+_TIMESTAMP = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?"
+    r"(?:Z|[+-]\d{2}:?\d{2})?)?\b|\b\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?\b"
+    r"|\b1\d{9}(?:\d{3})?\b"
+)
+_IDENTIFIER = re.compile(
+    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+    r"|\b(?:req|request|msg|trace|run|id)[_-][0-9a-z]{6,}\b"
+    r"|\b[0-9a-f]{16,}\b",
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Replace volatile tokens, collapse whitespace and fold case.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Text with timestamps as ``<time>`` and ids as ``<id>``
+    """
+    text = _TIMESTAMP.sub("<time>", text)
+    text = _IDENTIFIER.sub("<id>", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def normalize_messages(messages: list[LLMMessage]) -> str:
+    """Normalized text of a conversation, one ``role: content`` per message."""
+    return "\n".join(f"{m.role}: {normalize_text(m.content)}" for m in messages)
+
+
+def lsh_parameters(threshold: float, num_perm: int) -> tuple[int, int]:
+    """Bands and rows per band for a similarity threshold.
+
+    Picks the most rows per band whose approximate cut-off, (1/bands)^(1/rows),
+    stays at or below ``threshold``, so pairs above it are rarely missed
+    while fewer dissimilar pairs become candidates.
+
+    Args:
+        threshold: Jaccard similarity counted as a near duplicate
+        num_perm: Signature length
+
+    Returns:
+        (bands, rows)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) > threshold:
+            break
+        best = (bands, rows)
+    return best
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+class MinHasher:
+    """Computes MinHash signatures and their LSH buckets."""
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        threshold: float = 0.7,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        """Configure the signature and its bands.
+
+        Args:
+            num_perm: Signature length (more is more accurate)
+            threshold: Similarity the LSH bands are tuned for
+            shingle_size: Words per shingle
+            seed: Hash seed; signatures are only comparable between hashers
+                built with the same seed and num_perm
+        """
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self._key = seed.to_bytes(8, "little")
+        generator = random.Random(seed)
+        # Bins each empty bin borrows from, in order of preference
+        self._probes = [
+            generator.sample(range(num_perm), num_perm) for _ in range(num_perm)
+        ]
+        self.bands, self.rows = lsh_parameters(threshold, num_perm)
+
+    def shingles(self, text: str) -> set[str]:
+        """Word n-grams of ``text``, or the whole text if it is shorter."""
+        words = text.split()
+        size = self.shingle_size
+        if len(words) <= size:
+            return {" ".join(words)}
+        return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+    def signature(self, text: str) -> Signature:
+        """MinHash signature of ``text``'s shingles, as unsigned 32-bit ints."""
+        bins: list[int | None] = [None] * self.num_perm
+        for shingle in self.shingles(text):
+            digest = hashlib.blake2b(shingle.encode(), digest_size=8, key=self._key)
+            value = int.from_bytes(digest.digest(), "little")
+            index, value = value % self.num_perm, value >> 32
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+
+        signature = array("I", bytes(4 * self.num_perm))
+        for index, minimum in enumerate(bins):
+            signature[index] = self._borrow(bins, index) if minimum is None else minimum
+        return signature
+
+    def _borrow(self, bins: list[int | None], index: int) -> int:
+        """Value of the first filled bin in empty bin ``index``'s probe order."""
+        for probe in self._probes[index]:
+            value = bins[probe]
+            if value is not None:
+                return value
+        # Every text has a shingle, so some bin is filled
+        raise AssertionError("no bin filled")
+
+    def buckets(self, signature: Signature, context: bytes = b"") -> list[int]:
+        """One LSH bucket per band, as signed 64-bit ints.
+
+        Args:
+            signature: MinHash signature
+            context: Bytes hashed into every bucket, so only requests with the
+                same context (model, parameters) can collide
+
+        Returns:
+            Bucket ids, in band order
+        """
+        data = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [
+            int.from_bytes(
+                hashlib.blake2b(
+                    context + band.to_bytes(2, "little") + data[band * width :][:width],
+                    digest_size=8,
+                ).digest(),
+                "little",
+                signed=True,
+            )
+            for band in range(self.bands)
+        ]
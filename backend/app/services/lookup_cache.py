@@ -0,0 +1,179 @@
+"""Per-process LRU/TTL cache of session and conversation existence.
+
+Routes that list or stream a session's or conversation's children first
+check that the parent exists. The cache answers those checks without a
+query. It holds only what cannot change while a row lives: that a session
+exists, and which session a conversation belongs to. Names, titles and
+the maintained counters change with every write, so full rows are always
+read from the database. Updates therefore need no invalidation. Only rows
+found to exist are cached, so creations need none either. Deletes drop
+the row's entries (and a session's conversations) in this process.
+
+Other processes learn of deletes through the ``cache_versions`` table:
+every delete bumps the ``lookups`` counter in its own transaction. Each
+process reads the counter at most every ``cache_sync_interval_ms``, and
+clears its cache when the counter has moved. A row deleted by another
+worker can thus be reported as existing for up to that interval.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cache_version import CacheVersion
+from app.schemas.cache import LookupCacheMetricsResponse
+from app.services.settings import PerformanceSettings, get_settings
+
+# cache_versions row bumped by session and conversation deletes
+LOOKUPS = "lookups"
+
+
+class LookupCache:
+    """A bounded LRU mapping with per-entry expiry and hit/miss counters."""
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        ttl: float = 3600,
+        sync_interval_ms: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Entries kept before the least recently used is evicted
+                (0 disables the cache)
+            ttl: Seconds an entry stays valid after it was stored
+            sync_interval_ms: How often to compare the shared version
+            clock: Monotonic time source, in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sync_interval = sync_interval_ms / 1000
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Bumped by every invalidation, so a lookup that raced with one does
+        # not store what it read before it
+        self.generation = 0
+        self._version: int | None = None
+        self._synced_at: float | None = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_settings(cls, performance: PerformanceSettings) -> "LookupCache":
+        """Create a cache sized by PerformanceSettings."""
+        return cls(
+            max_size=performance.max_cache_size,
+            ttl=performance.cache_ttl,
+            sync_interval_ms=performance.cache_sync_interval_ms,
+        )
+
+    def get(self, key: Hashable) -> Any | None:
+        """The value stored for ``key``, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > self._clock():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            del self._entries[key]
+            self._expirations += 1
+        self._misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """Store ``value``, unless an invalidation happened since ``generation``."""
+        if self.max_size <= 0 or (
+            generation is not None and generation != self.generation
+        ):
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(
+        self, key: Hashable, where: Callable[[Any, Any], bool] | None = None
+    ) -> None:
+        """Drop ``key``, and every entry ``where(key, value)`` selects."""
+        self.generation += 1
+        self._invalidations += 1
+        self._entries.pop(key, None)
+        if where is not None:
+            for other in [k for k, (_, v) in self._entries.items() if where(k, v)]:
+                del self._entries[other]
+
+    def clear(self) -> None:
+        """Drop every entry and force a version check on the next lookup."""
+        self.generation += 1
+        self._entries.clear()
+        self._version = None
+        self._synced_at = None
+
+    def needs_sync(self) -> bool:
+        """Whether the shared version is due to be checked."""
+        return (
+            self._synced_at is None
+            or self._clock() - self._synced_at >= self.sync_interval
+        )
+
+    def synced(self, version: int) -> None:
+        """Record the shared version just read, clearing entries if it moved."""
+        if version != self._version:
+            self.generation += 1
+            self._entries.clear()
+            self._version = version
+        self._synced_at = self._clock()
+
+    def metrics(self) -> LookupCacheMetricsResponse:
+        """Snapshot of the cache's size and counters."""
+        lookups = self._hits + self._misses
+        return LookupCacheMetricsResponse(
+            size=len(self._entries),
+            max_size=self.max_size,
+            ttl=self.ttl,
+            hits=self._hits,
+            misses=self._misses,
+            hit_ratio=self._hits / lookups if lookups else 0.0,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+            version=self._version,
+        )
+
+
+async def sync_lookups(db: AsyncSession, cache: LookupCache) -> None:
+    """Check the shared version if it is due, clearing ``cache`` if it moved."""
+    if not cache.needs_sync():
+        return
+    result = await db.execute(
+        select(CacheVersion.version).where(CacheVersion.name == LOOKUPS)
+    )
+    cache.synced(result.scalar_one_or_none() or 0)
+
+
+async def bump_lookups_version(db: AsyncSession) -> None:
+    """Bump the shared version inside the caller's transaction."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(CacheVersion).values(name=LOOKUPS, version=1)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1},
+        )
+    )
+
+
+# The process's cache
+lookup_cache = LookupCache.from_settings(get_settings().performance)
@@ -0,0 +1,130 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from sqlalchemy import DateTime, String, literal, tuple_, type_coerce
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class Cursor(NamedTuple):
+    """Position of the last row of a page: its sort value and id."""
+
+    sort_value: str
+    id: int
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a row position as an opaque, URL-safe cursor string.
+
+    Args:
+        sort_value: Value of the sort column for the row (raw text on SQLite)
+        row_id: Primary key of the row
+
+    Returns:
+        Opaque cursor string
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([str(sort_value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column: ColumnElement[Any] | None = None) -> Cursor:
+    """Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+        sort_column: Column the listing is sorted by; when given, the sort
+            value must parse as that column's type
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+
+    if not isinstance(sort_value, str) or not isinstance(row_id, int):
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+    if sort_column is not None and isinstance(sort_column.type, DateTime):
+        try:
+            datetime.fromisoformat(sort_value)
+        except ValueError:
+            raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+    return Cursor(sort_value=sort_value, id=row_id)
+
+
+def sort_key(
+    column: ColumnElement[Any] | InstrumentedAttribute[Any], dialect_name: str
+) -> ColumnElement[Any]:
+    """Column expression whose value is recorded in the cursor.
+
+    SQLite stores DateTime columns as text and orders them by that text, and
+    rows written by CURRENT_TIMESTAMP lack the fractional seconds SQLAlchemy
+    binds. Seeking must therefore compare against the exact stored text, so
+    on SQLite the raw value is read back instead of a parsed datetime.
+    """
+    if dialect_name == "sqlite":
+        return type_coerce(column, String).label("sort_key")
+    return column.label("sort_key")
+
+
+def seek_predicate(
+    column: ColumnElement[Any],
+    id_column: ColumnElement[Any],
+    cursor: Cursor,
+    descending: bool,
+    dialect_name: str,
+) -> ColumnElement[Any]:
+    """Build the (sort column, id) seek predicate for rows after a cursor.
+
+    The cursor must have been decoded against ``column``.
+    """
+    if dialect_name == "sqlite":
+        bound_value = literal(cursor.sort_value, String)
+    else:
+        bound_value = literal(datetime.fromisoformat(cursor.sort_value), DateTime)
+
+    position = tuple_(column, id_column)
+    bound = tuple_(bound_value, literal(cursor.id))
+    return position < bound if descending else position > bound
+
+
+def split_page(
+    rows: Sequence[tuple[Any, Any]], page_size: int
+) -> tuple[list[Any], str | None]:
+    """Split ``page_size + 1`` fetched (entity, sort value) rows into a page.
+
+    Returns:
+        The page's entities and the cursor for the next page (None when this
+        is the last page)
+    """
+    items = [row[0] for row in rows[:page_size]]
+    if len(rows) <= page_size:
+        return items, None
+    last_entity, last_sort_value = rows[page_size - 1]
+    return items, encode_cursor(last_sort_value, last_entity.id)
+
+
+def split_rows(rows: Sequence[Any], page_size: int) -> tuple[list[Any], str | None]:
+    """split_page for Core rows carrying their own ``id`` and ``sort_key`` columns.
+
+    The rows are returned as they are, trailing ``sort_key`` included.
+    """
+    items = list(rows[:page_size])
+    if len(rows) <= page_size:
+        return items, None
+    last_row = rows[page_size - 1]
+    return items, encode_cursor(last_row.sort_key, last_row.id)
@@ -1,17 +1,86 @@
 """Session management service."""
 
-from typing import Optional, Sequence
+import functools
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
 
-from sqlalchemy import func, select
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+    union_all,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, joinedload, raiseload, undefer_group
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.db.archive import (
+    ARCHIVED_IN,
+    ATTACHED_ARCHIVES,
+    partition_table,
+    purge_archived,
+    restore_rows,
+)
+from app.db.blobs import acquire_blobs, release_blob_counts, release_blobs
+from app.db.sqlite import retry_on_busy
 from app.models.conversation import Conversation
 from app.models.exchange import Exchange
+from app.models.exchange_body import PREVIEW_LENGTH, ExchangeBody
+from app.models.message_blob import MessageBlob
 from app.models.session import Session
-from app.schemas.conversation import ConversationCreate, ConversationUpdate
-from app.schemas.exchange import ExchangeCreate
-from app.schemas.session import SessionCreate, SessionUpdate
+from app.schemas.conversation import (
+    ConversationCreate,
+    ConversationResponse,
+    ConversationUpdate,
+)
+from app.schemas.exchange import (
+    ExchangeCreate,
+    ExchangeResponse,
+    ExchangeSummaryResponse,
+)
+from app.schemas.session import SessionCreate, SessionResponse, SessionUpdate
+from app.services.events import (
+    Topic,
+    exchange_created_frame,
+    exchange_deleted_frame,
+    exchange_events,
+    exchange_topics,
+)
+from app.services.lookup_cache import (
+    bump_lookups_version,
+    lookup_cache,
+    sync_lookups,
+)
+from app.services.pagination import (
+    decode_cursor,
+    seek_predicate,
+    sort_key,
+    split_page,
+    split_rows,
+)
+
+# Rows fetched per round trip when streaming a conversation's exchanges
+STREAM_BATCH_SIZE = 200
+
+
+def _response_columns(schema: type[BaseModel], model: Any, **columns: Any) -> list[Any]:
+    """Columns for the fields of a response schema, labeled and in field order.
+
+    Fields read the same-named attribute of ``model`` unless ``columns``
+    gives their expression.
+    """
+    return [
+        (columns[name] if name in columns else getattr(model, name)).label(name)
+        for name in schema.model_fields
+    ]
 
 
 class SessionService:
@@ -21,194 +90,1174 @@ class SessionService:
         """Initialize service with database session."""
         self.db = db
 
+    @property
+    def _dialect(self) -> str:
+        """Name of the database dialect the session is bound to."""
+        return self.db.get_bind().dialect.name
+
+    def _paginate(
+        self,
+        query: Select[Any],
+        sort_column: Any,
+        id_column: Any,
+        descending: bool,
+        page: int,
+        page_size: int,
+        cursor: str | None,
+    ) -> Select[Any]:
+        """Apply cursor (keyset) or page/offset pagination to a list query.
+
+        One extra row is fetched so split_page can tell whether a next page
+        exists.
+        """
+        if cursor is not None:
+            position = decode_cursor(cursor, sort_column)
+            predicate = seek_predicate(
+                sort_column, id_column, position, descending, self._dialect
+            )
+            query = query.where(predicate)
+        else:
+            query = query.offset((page - 1) * page_size)
+        return query.limit(page_size + 1)
+
+    @staticmethod
+    def _response_select(model: Any, summary: bool = False) -> Select[Any]:
+        """Core SELECT of the response schema's columns for ``model`` rows.
+
+        Used by the list methods' ``rows`` mode: the rows come back as plain
+        tuples in the schema's field order, ready to be encoded as JSON
+        without building ORM instances or validating response models.
+        """
+        if model is Session:
+            return select(*_response_columns(SessionResponse, Session))
+        if model is Conversation:
+            return select(*_response_columns(ConversationResponse, Conversation))
+        if summary:
+            columns = _response_columns(
+                ExchangeSummaryResponse,
+                Exchange,
+                user_message_preview=ExchangeBody.user_message_preview,
+                assistant_message_preview=ExchangeBody.assistant_message_preview,
+            )
+            return (
+                select(*columns)
+                .select_from(Exchange)
+                .join(ExchangeBody, ExchangeBody.exchange_id == Exchange.id)
+            )
+        user_blob, assistant_blob = aliased(MessageBlob), aliased(MessageBlob)
+        columns = _response_columns(
+            ExchangeResponse,
+            Exchange,
+            user_message=user_blob.content,
+            assistant_message=assistant_blob.content,
+        )
+        return (
+            select(*columns)
+            .select_from(Exchange)
+            .join(ExchangeBody, ExchangeBody.exchange_id == Exchange.id)
+            .join(user_blob, user_blob.hash == ExchangeBody.user_message_hash)
+            .join(
+                assistant_blob,
+                assistant_blob.hash == ExchangeBody.assistant_message_hash,
+            )
+        )
+
+    async def _archives(self) -> list[str]:
+        """Archive schemas attached to this session's connection, newest first."""
+        connection = await self.db.connection()
+        archives: list[str] = connection.info.get(ATTACHED_ARCHIVES, [])
+        return archives
+
+    async def _get(self, model: Any, row_id: int) -> Any:
+        """Load a row by id from the live database, else from an archive.
+
+        Rows found in an archive are marked with the schema they came from.
+        """
+        query = select(model).where(model.id == row_id)
+        found = (await self.db.execute(query)).scalar_one_or_none()
+        if found is None:
+            for schema in await self._archives():
+                result = await self.db.execute(
+                    query, execution_options={"schema_translate_map": {None: schema}}
+                )
+                found = result.scalar_one_or_none()
+                if found is not None:
+                    found.__dict__[ARCHIVED_IN] = schema
+                    break
+        return found
+
+    async def _restore(self, row: Any) -> None:
+        """Move an archived session or conversation back before writing to it.
+
+        A conversation brings its session back too (first, for the foreign
+        key), so both can be updated and take new children.
+        """
+        if row.__dict__.pop(ARCHIVED_IN, None) is None:
+            return
+        if isinstance(row, Conversation):
+            await self.db.run_sync(restore_rows, "sessions", [row.session_id])
+            await self.db.run_sync(restore_rows, "conversations", [row.id])
+        else:
+            await self.db.run_sync(restore_rows, "sessions", [row.id])
+
+    async def _restore_archived(self, model: Any, row_id: int) -> bool:
+        """Restore an archived row for a write that found no live row to change.
+
+        Returns:
+            False if the row is not in an archive either
+        """
+        if not await self._archives():
+            return False
+        row = await self._get(model, row_id)
+        if row is None:
+            return False
+        await self._restore(row)
+        return True
+
+    async def _update_returning(
+        self, model: Any, row_id: int, values: dict[str, Any]
+    ) -> Any:
+        """UPDATE a session or conversation and return it, None if it is not found.
+
+        The row comes back from ``UPDATE ... RETURNING``, so a live row costs
+        one statement; an archived one is restored and updated.
+        """
+        if not values:
+            return await self._get(model, row_id)
+        statement = (
+            update(model).where(model.id == row_id).values(**values).returning(model)
+        )
+        row = (await self.db.execute(statement)).scalar_one_or_none()
+        if row is None and await self._restore_archived(model, row_id):
+            row = (await self.db.execute(statement)).scalar_one_or_none()
+        return row
+
+    async def _paginate_partitions(
+        self,
+        model: Any,
+        schemas: list[str | None],
+        condition: Callable[[Any], ColumnElement[bool]],
+        sort_name: str,
+        descending: bool,
+        page: int,
+        page_size: int,
+        cursor: str | None,
+        options: Sequence[Any] = (),
+        row_query: Select[Any] | None = None,
+    ) -> tuple[list[Any], str | None]:
+        """Page through live and archived rows of ``model`` with a UNION ALL.
+
+        Each partition contributes at most a page of (partition, id, sort key)
+        rows, already seeked and ordered; the union is ordered and cut to the
+        page, then each partition's rows are loaded from it: as entities, or
+        as Core rows of ``row_query`` when given.
+
+        Returns:
+            The page's entities and the cursor for the next page
+        """
+        position = None
+        if cursor is not None:
+            position = decode_cursor(cursor, model.__table__.c[sort_name])
+        offset = 0 if position else (page - 1) * page_size
+        branches = []
+        for index, schema in enumerate(schemas):
+            table = partition_table(model.__table__, schema)
+            sort_column = table.c[sort_name]
+            branch = select(
+                literal(index).label("partition"),
+                table.c.id,
+                sort_key(sort_column, self._dialect),
+            ).where(condition(table))
+            if position is not None:
+                branch = branch.where(
+                    seek_predicate(
+                        sort_column, table.c.id, position, descending, self._dialect
+                    )
+                )
+            order: tuple[Any, ...] = (sort_column, table.c.id)
+            if descending:
+                order = tuple(column.desc() for column in order)
+            branch = branch.order_by(*order).limit(offset + page_size + 1)
+            branches.append(select(branch.subquery()))
+
+        union = union_all(*branches).subquery()
+        order = (union.c.sort_key, union.c.id)
+        if descending:
+            order = tuple(column.desc() for column in order)
+        result = await self.db.execute(
+            select(union).order_by(*order).offset(offset).limit(page_size + 1)
+        )
+        rows = result.all()
+
+        ids_by_partition: dict[int, list[int]] = defaultdict(list)
+        for row in rows:
+            ids_by_partition[row.partition].append(row.id)
+        loaded: dict[tuple[int, int], Any] = {}
+        for index, ids in ids_by_partition.items():
+            schema = schemas[index]
+            query = row_query
+            if query is None:
+                query = select(model).options(*options)
+            result = await self.db.execute(
+                query.where(model.id.in_(ids)),
+                execution_options=(
+                    {"schema_translate_map": {None: schema}} if schema else {}
+                ),
+            )
+            items = result.scalars() if row_query is None else result
+            loaded.update((item.id, item) for item in items)
+        return split_page([(loaded[row.id], row.sort_key) for row in rows], page_size)
+
+    async def _adjust_counters(
+        self,
+        model: Any,
+        row_id: Any,
+        schema: str | None = None,
+        /,
+        returning: Any = None,
+        **deltas: int,
+    ) -> Any:
+        """Atomically add deltas to a session's or conversation's aggregates.
+
+        Runs as ``SET col = col + delta`` inside the caller's transaction.
+        updated_at is pinned so counter bookkeeping does not reorder lists.
+        ``schema`` targets a row in an attached archive.
+
+        Returns:
+            The ``returning`` column of the updated row, None if there is no
+            such row (or no ``returning`` column was asked for)
+        """
+        values = {
+            name: getattr(model, name) + delta
+            for name, delta in deltas.items()
+            if delta
+        }
+        if not values:
+            return None
+        statement = (
+            update(model)
+            .where(model.id == row_id)
+            .values(updated_at=model.updated_at, **values)
+        )
+        if returning is not None:
+            statement = statement.returning(returning)
+        result = await self.db.execute(
+            statement,
+            execution_options=(
+                {"schema_translate_map": {None: schema}} if schema else {}
+            ),
+        )
+        return result.scalar_one_or_none() if returning is not None else None
+
+    async def _adjust_counters_everywhere(
+        self, model: Any, row_id: Any, **deltas: int
+    ) -> None:
+        """_adjust_counters for a row that may be live or archived."""
+        for schema in (None, *await self._archives()):
+            await self._adjust_counters(model, row_id, schema, **deltas)
+
     # Session operations
+    @retry_on_busy
     async def create_session(self, data: SessionCreate) -> Session:
-        """Create a new session."""
-        session = Session(name=data.name, description=data.description)
-        self.db.add(session)
+        """Create a new session with one ``INSERT ... RETURNING``."""
+        result = await self.db.execute(
+            insert(Session)
+            .values(name=data.name, description=data.description)
+            .returning(Session)
+        )
+        session = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(session)
+        lookup_cache.put(("session", session.id), session.id)
+        return session
+
+    async def get_session(self, session_id: int) -> Session | None:
+        """Get a session by ID, live or archived."""
+        generation = lookup_cache.generation
+        session: Session | None = await self._get(Session, session_id)
+        if session is not None:
+            lookup_cache.put(("session", session_id), session_id, generation)
         return session
 
-    async def get_session(self, session_id: int) -> Optional[Session]:
-        """Get a session by ID."""
-        result = await self.db.execute(select(Session).where(Session.id == session_id))
-        return result.scalar_one_or_none()
+    async def session_exists(self, session_id: int) -> bool:
+        """Whether a session exists, live or archived.
+
+        Answered from the lookup cache when it can be, so a parent check
+        usually costs no query.
+        """
+        await sync_lookups(self.db, lookup_cache)
+        if lookup_cache.get(("session", session_id)) is not None:
+            return True
+        return await self.get_session(session_id) is not None
 
     async def get_sessions(
-        self, page: int = 1, page_size: int = 20
-    ) -> tuple[Sequence[Session], int]:
-        """Get paginated list of sessions."""
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: str | None = None,
+        rows: bool = False,
+    ) -> tuple[Sequence[Any], int, str | None]:
+        """Get paginated list of sessions, most recently updated first.
+
+        Pages are addressed either by ``page`` number or, for deep paging, by
+        the opaque ``cursor`` returned as the previous page's next cursor.
+        With ``rows`` the sessions are Core rows of SessionResponse's fields
+        instead of ORM instances.
+
+        Returns:
+            The sessions, the total count and the cursor for the next page
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        archives = await self._archives()
+        if archives:
+            return await self._get_sessions_with_archives(
+                archives, page, page_size, cursor, rows
+            )
+
         # Get total count
         count_result = await self.db.execute(select(func.count(Session.id)))
         total = count_result.scalar_one()
 
         # Get paginated results
-        offset = (page - 1) * page_size
-        result = await self.db.execute(
-            select(Session)
-            .order_by(Session.updated_at.desc())
-            .offset(offset)
-            .limit(page_size)
+        query = self._response_select(Session) if rows else select(Session)
+        query = query.add_columns(sort_key(Session.updated_at, self._dialect)).order_by(
+            Session.updated_at.desc(), Session.id.desc()
+        )
+        query = self._paginate(
+            query, Session.updated_at, Session.id, True, page, page_size, cursor
         )
-        sessions = result.scalars().all()
-        return sessions, total
+        result = await self.db.execute(query)
+        split = split_rows if rows else split_page
+        sessions, next_cursor = split(result.all(), page_size)
+        return sessions, total, next_cursor
 
-    async def update_session(
-        self, session_id: int, data: SessionUpdate
-    ) -> Optional[Session]:
-        """Update a session."""
-        session = await self.get_session(session_id)
-        if not session:
-            return None
+    async def _get_sessions_with_archives(
+        self,
+        archives: list[str],
+        page: int,
+        page_size: int,
+        cursor: str | None,
+        rows: bool,
+    ) -> tuple[Sequence[Any], int, str | None]:
+        """get_sessions across the live database and the archives."""
+        schemas = [None, *archives]
+        counts = [
+            select(func.count()).select_from(partition_table(Session.__table__, schema))
+            for schema in schemas
+        ]
+        total = (
+            await self.db.execute(
+                select(sum((count.scalar_subquery() for count in counts), literal(0)))
+            )
+        ).scalar_one()
+        sessions, next_cursor = await self._paginate_partitions(
+            Session,
+            schemas,
+            lambda table: true(),
+            "updated_at",
+            True,
+            page,
+            page_size,
+            cursor,
+            row_query=self._response_select(Session) if rows else None,
+        )
+        return sessions, total, next_cursor
 
-        update_data = data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(session, field, value)
+    async def get_sessions_version(self) -> tuple[Any, ...]:
+        """Fingerprint of the rows get_sessions pages through, for ETags.
 
+        Per partition (live, then each archive): the row count, the highest
+        id and updated_at (its raw text on SQLite, see sort_key), and the
+        sums of the maintained counters, which change with every exchange or
+        conversation written. One aggregate query, without loading any
+        session.
+        """
+        branches = []
+        for schema in (None, *await self._archives()):
+            table = partition_table(Session.__table__, schema)
+            branches.append(
+                select(
+                    func.count(),
+                    func.max(table.c.id),
+                    sort_key(func.max(table.c.updated_at), self._dialect),
+                    func.sum(table.c.conversation_count),
+                    func.sum(table.c.exchange_count),
+                    func.sum(table.c.total_input_tokens),
+                    func.sum(table.c.total_output_tokens),
+                )
+            )
+        query = branches[0] if len(branches) == 1 else union_all(*branches)
+        result = await self.db.execute(query)
+        return tuple(tuple(row) for row in result.all())
+
+    @retry_on_busy
+    async def update_session(
+        self, session_id: int, data: SessionUpdate
+    ) -> Session | None:
+        """Update a session with one ``UPDATE ... RETURNING``."""
+        session: Session | None = await self._update_returning(
+            Session, session_id, data.model_dump(exclude_unset=True)
+        )
         await self.db.commit()
-        await self.db.refresh(session)
         return session
 
+    @retry_on_busy
     async def delete_session(self, session_id: int) -> bool:
-        """Delete a session."""
+        """Delete a session with its conversations and exchanges.
+
+        The session row goes with one DELETE and the database cascades to its
+        conversations, exchanges and bodies, so no child row is loaded; only
+        the blob references of its exchanges are counted, grouped by hash.
+        Large sessions are emptied chunk by chunk first (see DeletionService).
+        """
         session = await self.get_session(session_id)
         if not session:
             return False
+        self.db.expunge(session)
 
-        await self.db.delete(session)
+        await bump_lookups_version(self.db)
+        if await self._archives():
+            await self.db.run_sync(purge_archived, session_ids=[session_id])
+            if session.__dict__.get(ARCHIVED_IN):
+                await self.db.commit()
+                self._forget_session(session_id)
+                return True
+
+        counts = await self._message_hash_counts(
+            Exchange.conversation_id.in_(
+                select(Conversation.id).where(Conversation.session_id == session_id)
+            )
+        )
+        await self.db.execute(delete(Session).where(Session.id == session_id))
+        await self.db.run_sync(release_blob_counts, counts)
         await self.db.commit()
+        self._forget_session(session_id)
         return True
 
+    @staticmethod
+    def _forget_session(session_id: int) -> None:
+        """Drop a deleted session, and its conversations, from the lookup cache."""
+        lookup_cache.invalidate(
+            ("session", session_id),
+            where=lambda key, value: key[0] == "conversation" and value == session_id,
+        )
+
     # Conversation operations
-    async def create_conversation(self, data: ConversationCreate) -> Optional[Conversation]:
-        """Create a new conversation in a session."""
-        # Verify session exists
-        session = await self.get_session(data.session_id)
-        if not session:
-            return None
+    @retry_on_busy
+    async def create_conversation(
+        self, data: ConversationCreate
+    ) -> Conversation | None:
+        """Create a new conversation in a session.
+
+        The session's counter UPDATE also tells whether the session exists,
+        and the conversation comes back from its ``INSERT ... RETURNING``.
+        """
+        adjust = functools.partial(
+            self._adjust_counters,
+            Session,
+            data.session_id,
+            returning=Session.id,
+            conversation_count=1,
+        )
+        if await adjust() is None:
+            if not await self._restore_archived(Session, data.session_id):
+                return None
+            await adjust()
 
-        conversation = Conversation(session_id=data.session_id, title=data.title)
-        self.db.add(conversation)
+        result = await self.db.execute(
+            insert(Conversation)
+            .values(session_id=data.session_id, title=data.title)
+            .returning(Conversation)
+        )
+        conversation = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(conversation)
+        lookup_cache.put(("conversation", conversation.id), data.session_id)
         return conversation
 
-    async def get_conversation(self, conversation_id: int) -> Optional[Conversation]:
-        """Get a conversation by ID."""
-        result = await self.db.execute(
-            select(Conversation).where(Conversation.id == conversation_id)
+    async def get_conversation(self, conversation_id: int) -> Conversation | None:
+        """Get a conversation by ID, live or archived."""
+        generation = lookup_cache.generation
+        conversation: Conversation | None = await self._get(
+            Conversation, conversation_id
         )
-        return result.scalar_one_or_none()
+        if conversation is not None:
+            lookup_cache.put(
+                ("conversation", conversation_id), conversation.session_id, generation
+            )
+        return conversation
+
+    async def conversation_exists(self, conversation_id: int) -> bool:
+        """Whether a conversation exists, live or archived.
+
+        Answered from the lookup cache when it can be, so a parent check
+        usually costs no query.
+        """
+        await sync_lookups(self.db, lookup_cache)
+        if lookup_cache.get(("conversation", conversation_id)) is not None:
+            return True
+        return await self.get_conversation(conversation_id) is not None
 
     async def get_conversations_by_session(
-        self, session_id: int, page: int = 1, page_size: int = 20
-    ) -> tuple[Sequence[Conversation], int]:
-        """Get paginated list of conversations for a session."""
-        # Get total count
-        count_result = await self.db.execute(
-            select(func.count(Conversation.id)).where(
-                Conversation.session_id == session_id
+        self,
+        session_id: int,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: str | None = None,
+        rows: bool = False,
+        total: int | None = None,
+    ) -> tuple[Sequence[Any], int, str | None]:
+        """Get paginated list of conversations for a session.
+
+        With ``rows`` the conversations are Core rows of ConversationResponse's
+        fields instead of ORM instances. A ``total`` the caller already knows
+        (e.g. from get_conversations_version) saves reading the session.
+
+        Returns:
+            The conversations, the total count and the cursor for the next page
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        # Total comes from the session's maintained counter
+        archives = await self._archives()
+        if total is None:
+            session = await self.db.get(Session, session_id)
+            if session is None and archives:
+                session = await self.get_session(session_id)
+            total = session.conversation_count if session else 0
+
+        if archives:
+            conversations, next_cursor = await self._paginate_partitions(
+                Conversation,
+                [None, *archives],
+                lambda table: table.c.session_id == session_id,
+                "updated_at",
+                True,
+                page,
+                page_size,
+                cursor,
+                row_query=self._response_select(Conversation) if rows else None,
             )
-        )
-        total = count_result.scalar_one()
+            return conversations, total, next_cursor
 
         # Get paginated results
-        offset = (page - 1) * page_size
-        result = await self.db.execute(
-            select(Conversation)
+        query = self._response_select(Conversation) if rows else select(Conversation)
+        query = (
+            query.add_columns(sort_key(Conversation.updated_at, self._dialect))
             .where(Conversation.session_id == session_id)
-            .order_by(Conversation.updated_at.desc())
-            .offset(offset)
-            .limit(page_size)
+            .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
         )
-        conversations = result.scalars().all()
-        return conversations, total
+        query = self._paginate(
+            query,
+            Conversation.updated_at,
+            Conversation.id,
+            True,
+            page,
+            page_size,
+            cursor,
+        )
+        result = await self.db.execute(query)
+        split = split_rows if rows else split_page
+        conversations, next_cursor = split(result.all(), page_size)
+        return conversations, total, next_cursor
 
-    async def update_conversation(
-        self, conversation_id: int, data: ConversationUpdate
-    ) -> Optional[Conversation]:
-        """Update a conversation."""
-        conversation = await self.get_conversation(conversation_id)
-        if not conversation:
-            return None
+    async def get_conversations_version(
+        self, session_id: int
+    ) -> tuple[Any, ...] | None:
+        """Fingerprint of a session's conversation list, for ETags.
+
+        The session's counters change with every conversation or exchange
+        added or removed, and a renamed conversation moves to the front of
+        the list (its updated_at changes), so the counters and the first
+        conversation in list order identify the list. One query, served by
+        the primary key and ix_conversations_session_id_updated_at.
 
-        update_data = data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(conversation, field, value)
+        Returns:
+            None if the session is not live (missing or archived)
+        """
+        first = (
+            select(Conversation.id, Conversation.updated_at)
+            .where(Conversation.session_id == session_id)
+            .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+            .limit(1)
+        )
+        result = await self.db.execute(
+            select(
+                Session.conversation_count,
+                Session.exchange_count,
+                Session.total_input_tokens,
+                Session.total_output_tokens,
+                first.with_only_columns(Conversation.id).scalar_subquery(),
+                first.with_only_columns(
+                    sort_key(Conversation.updated_at, self._dialect)
+                ).scalar_subquery(),
+            ).where(Session.id == session_id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
 
+    @retry_on_busy
+    async def update_conversation(
+        self, conversation_id: int, data: ConversationUpdate
+    ) -> Conversation | None:
+        """Update a conversation with one ``UPDATE ... RETURNING``."""
+        conversation: Conversation | None = await self._update_returning(
+            Conversation, conversation_id, data.model_dump(exclude_unset=True)
+        )
         await self.db.commit()
-        await self.db.refresh(conversation)
         return conversation
 
+    @retry_on_busy
     async def delete_conversation(self, conversation_id: int) -> bool:
-        """Delete a conversation."""
+        """Delete a conversation with its exchanges (cascaded, as delete_session)."""
         conversation = await self.get_conversation(conversation_id)
         if not conversation:
             return False
+        self.db.expunge(conversation)
 
-        await self.db.delete(conversation)
+        archives = await self._archives()
+        adjust = self._adjust_counters_everywhere if archives else self._adjust_counters
+        await adjust(
+            Session,
+            conversation.session_id,
+            conversation_count=-1,
+            exchange_count=-conversation.exchange_count,
+            total_input_tokens=-conversation.total_input_tokens,
+            total_output_tokens=-conversation.total_output_tokens,
+        )
+        await bump_lookups_version(self.db)
+        if archives:
+            await self.db.run_sync(purge_archived, conversation_ids=[conversation_id])
+            if conversation.__dict__.get(ARCHIVED_IN):
+                await self.db.commit()
+                lookup_cache.invalidate(("conversation", conversation_id))
+                return True
+        counts = await self._message_hash_counts(
+            Exchange.conversation_id == conversation_id
+        )
+        await self.db.execute(
+            delete(Conversation).where(Conversation.id == conversation_id)
+        )
+        await self.db.run_sync(release_blob_counts, counts)
         await self.db.commit()
+        lookup_cache.invalidate(("conversation", conversation_id))
         return True
 
+    @retry_on_busy
+    async def delete_exchanges_chunk(
+        self,
+        limit: int,
+        session_id: int | None = None,
+        conversation_id: int | None = None,
+    ) -> int:
+        """Delete up to ``limit`` live exchanges of a session or a conversation.
+
+        Counters are adjusted and blob references released in the same short
+        transaction, so a large session or conversation can be emptied in
+        steps before it is deleted.
+
+        Returns:
+            Number of exchanges deleted (0 once none are left)
+        """
+        if conversation_id is not None:
+            condition = Exchange.conversation_id == conversation_id
+        else:
+            condition = Exchange.conversation_id.in_(
+                select(Conversation.id).where(Conversation.session_id == session_id)
+            )
+        result = await self.db.execute(
+            select(
+                Exchange.id,
+                Exchange.conversation_id,
+                Exchange.input_tokens,
+                Exchange.output_tokens,
+            )
+            .where(condition)
+            # Conversation by conversation (along the list index), so a chunk
+            # adjusts the counters of few conversations
+            .order_by(Exchange.conversation_id, Exchange.created_at, Exchange.id)
+            .limit(limit)
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+
+        ids = [row.id for row in rows]
+        totals: dict[int, Counter[str]] = defaultdict(Counter)
+        for row in rows:
+            totals[row.conversation_id].update(
+                exchange_count=-1,
+                total_input_tokens=-(row.input_tokens or 0),
+                total_output_tokens=-(row.output_tokens or 0),
+            )
+        sessions = await self._conversation_sessions(totals.keys())
+        session_totals: dict[int, Counter[str]] = defaultdict(Counter)
+        for conversation, deltas in sorted(totals.items()):
+            await self._adjust_counters(Conversation, conversation, **deltas)
+            session_totals[sessions[conversation]].update(deltas)
+        for session, deltas in sorted(session_totals.items()):
+            await self._adjust_counters(Session, session, **deltas)
+
+        counts = await self._message_hash_counts(Exchange.id.in_(ids))
+        await self.db.execute(delete(Exchange).where(Exchange.id.in_(ids)))
+        await self.db.run_sync(release_blob_counts, counts)
+        await self.db.commit()
+        return len(ids)
+
     # Exchange operations
-    async def create_exchange(self, data: ExchangeCreate) -> Optional[Exchange]:
-        """Create a new exchange in a conversation."""
-        # Verify conversation exists
-        conversation = await self.get_conversation(data.conversation_id)
-        if not conversation:
-            return None
+    @retry_on_busy
+    async def create_exchange(self, data: ExchangeCreate) -> Exchange | None:
+        """Create a new exchange in a conversation.
 
-        exchange = Exchange(
-            conversation_id=data.conversation_id,
-            user_message=data.user_message,
-            assistant_message=data.assistant_message,
-            model=data.model,
-            input_tokens=data.input_tokens,
-            output_tokens=data.output_tokens,
+        The conversation's counter ``UPDATE ... RETURNING session_id`` also
+        tells whether the conversation exists, and the exchange comes back
+        from its ``INSERT ... RETURNING``, so nothing is read back.
+        """
+        deltas = {
+            "exchange_count": 1,
+            "total_input_tokens": data.input_tokens or 0,
+            "total_output_tokens": data.output_tokens or 0,
+        }
+        adjust = functools.partial(
+            self._adjust_counters,
+            Conversation,
+            data.conversation_id,
+            returning=Conversation.session_id,
+            **deltas,
         )
-        self.db.add(exchange)
+        session_id = await adjust()
+        if session_id is None:
+            if not await self._restore_archived(Conversation, data.conversation_id):
+                return None
+            session_id = await adjust()
+        await self._adjust_counters(Session, session_id, **deltas)
+
+        (exchange,) = await self._insert_exchanges([data])
+        events = self._created_events([exchange], {data.conversation_id: session_id})
         await self.db.commit()
-        await self.db.refresh(exchange)
+        self._publish(events)
         return exchange
 
-    async def get_exchange(self, exchange_id: int) -> Optional[Exchange]:
-        """Get an exchange by ID."""
+    @retry_on_busy
+    async def create_exchanges_bulk(
+        self, items: Sequence[ExchangeCreate]
+    ) -> tuple[list[Exchange | None], list[tuple[int, str]]]:
+        """Create many exchanges, possibly across conversations, in one transaction.
+
+        All parent conversations are checked with a single query and the rows
+        are written with one multi-row INSERT ... RETURNING. Items whose
+        conversation does not exist are skipped and reported.
+
+        Args:
+            items: Exchanges to create
+
+        Returns:
+            Created exchanges in input order (None for rejected items) and
+            (index, detail) pairs for the rejected items
+        """
+        conversation_ids = {item.conversation_id for item in items}
+        session_by_conversation = await self._conversation_sessions(conversation_ids)
+        missing = sorted(conversation_ids - session_by_conversation.keys())
+        archives = await self._archives() if missing else []
+        if archives:
+            # Archived conversations go live to take the rows, after their
+            # sessions (for the foreign key)
+            archived = await self._conversation_sessions(missing, archives)
+            if archived:
+                await self.db.run_sync(
+                    restore_rows, "sessions", sorted(set(archived.values()))
+                )
+                await self.db.run_sync(restore_rows, "conversations", sorted(archived))
+                session_by_conversation.update(archived)
+
+        created: list[Exchange | None] = [None] * len(items)
+        errors: list[tuple[int, str]] = []
+        accepted: list[int] = []
+        for index, item in enumerate(items):
+            if item.conversation_id in session_by_conversation:
+                accepted.append(index)
+            else:
+                errors.append(
+                    (index, f"Conversation with id {item.conversation_id} not found")
+                )
+        if not accepted:
+            return created, errors
+
+        exchanges = await self._insert_exchanges([items[index] for index in accepted])
+        for index, exchange in zip(accepted, exchanges):
+            created[index] = exchange
+
+        # Roll the new rows up into the maintained counters, one UPDATE per parent
+        conversation_deltas: dict[int, Counter[str]] = defaultdict(Counter)
+        for index in accepted:
+            item = items[index]
+            delta = conversation_deltas[item.conversation_id]
+            delta["exchange_count"] += 1
+            delta["total_input_tokens"] += item.input_tokens or 0
+            delta["total_output_tokens"] += item.output_tokens or 0
+
+        # In id order, so concurrent batches lock parent rows in the same order
+        session_deltas: dict[int, Counter[str]] = defaultdict(Counter)
+        for conversation_id, delta in sorted(conversation_deltas.items()):
+            await self._adjust_counters(Conversation, conversation_id, **delta)
+            session_deltas[session_by_conversation[conversation_id]].update(delta)
+        for session_id, delta in sorted(session_deltas.items()):
+            await self._adjust_counters(Session, session_id, **delta)
+
+        events = self._created_events(exchanges, session_by_conversation)
+        await self.db.commit()
+        self._publish(events)
+        return created, errors
+
+    @staticmethod
+    def _created_events(
+        exchanges: Sequence[Exchange], session_by_conversation: dict[int, int]
+    ) -> list[tuple[list[Topic], bytes, int]]:
+        """Event frames for new exchanges, for topics someone listens to.
+
+        Encoded before the commit, while the rows are loaded; published after.
+        """
+        events = []
+        for exchange in exchanges:
+            topics = exchange_topics(
+                exchange.conversation_id,
+                session_by_conversation.get(exchange.conversation_id),
+            )
+            if exchange_events.has_subscribers(topics):
+                frame = exchange_created_frame(exchange)
+                events.append((topics, frame, exchange.id))
+        return events
+
+    @staticmethod
+    def _publish(events: Sequence[tuple[list[Topic], bytes, int]]) -> None:
+        """Hand committed exchanges' event frames to their subscribers."""
+        for topics, frame, event_id in events:
+            exchange_events.publish(topics, frame, event_id)
+
+    async def _conversation_sessions(
+        self, conversation_ids: Any, schemas: Sequence[str | None] = (None,)
+    ) -> dict[int, int]:
+        """Session id of each conversation among ``conversation_ids``.
+
+        Only live conversations are found unless archive ``schemas`` are given.
+        """
+        found: dict[int, int] = {}
+        query = select(Conversation.id, Conversation.session_id).where(
+            Conversation.id.in_(conversation_ids)
+        )
+        for schema in schemas:
+            result = await self.db.execute(
+                query,
+                execution_options=(
+                    {"schema_translate_map": {None: schema}} if schema else {}
+                ),
+            )
+            found.update((row.id, row.session_id) for row in result)
+        return found
+
+    async def _insert_exchanges(
+        self, items: Sequence[ExchangeCreate]
+    ) -> list[Exchange]:
+        """Insert exchanges and their bodies, returning the new rows in order.
+
+        The caller checks the conversations and maintains the counters. The
+        rows come back from one multi-row ``INSERT ... RETURNING`` with their
+        message texts cached, so nothing is read back.
+        """
+        # Repeated messages only gain a reference to their existing blob
+        hashes = await self.db.run_sync(
+            acquire_blobs,
+            [
+                text
+                for item in items
+                for text in (item.user_message, item.assistant_message)
+            ],
+        )
+        result = await self.db.execute(
+            insert(Exchange).returning(Exchange, sort_by_parameter_order=True),
+            [
+                {
+                    **self._exchange_values(item),
+                    "user_message_length": len(item.user_message),
+                    "assistant_message_length": len(item.assistant_message),
+                }
+                for item in items
+            ],
+        )
+        exchanges = result.scalars().all()
         result = await self.db.execute(
-            select(Exchange).where(Exchange.id == exchange_id)
+            insert(ExchangeBody).returning(ExchangeBody, sort_by_parameter_order=True),
+            [
+                {
+                    "exchange_id": exchange.id,
+                    "user_message_hash": hashes[2 * position],
+                    "assistant_message_hash": hashes[2 * position + 1],
+                    "user_message_preview": item.user_message[:PREVIEW_LENGTH],
+                    "assistant_message_preview": item.assistant_message[
+                        :PREVIEW_LENGTH
+                    ],
+                }
+                for position, (item, exchange) in enumerate(zip(items, exchanges))
+            ],
         )
-        return result.scalar_one_or_none()
+        for item, exchange, body in zip(items, exchanges, result.scalars()):
+            set_committed_value(exchange, "body", body)
+            exchange.cache_messages(item.user_message, item.assistant_message)
+        return list(exchanges)
+
+    @staticmethod
+    def _exchange_values(data: ExchangeCreate) -> dict[str, Any]:
+        """Column values for a new exchange row, apart from its message blobs."""
+        return {
+            "conversation_id": data.conversation_id,
+            "model": data.model,
+            "input_tokens": data.input_tokens,
+            "output_tokens": data.output_tokens,
+        }
+
+    async def get_exchange(self, exchange_id: int) -> Exchange | None:
+        """Get an exchange by ID, live or archived."""
+        exchange: Exchange | None = await self._get(Exchange, exchange_id)
+        return exchange
 
     async def get_exchanges_by_conversation(
-        self, conversation_id: int, page: int = 1, page_size: int = 50
-    ) -> tuple[Sequence[Exchange], int]:
-        """Get paginated list of exchanges for a conversation."""
-        # Get total count
-        count_result = await self.db.execute(
-            select(func.count(Exchange.id)).where(
-                Exchange.conversation_id == conversation_id
+        self,
+        conversation_id: int,
+        page: int = 1,
+        page_size: int = 50,
+        cursor: str | None = None,
+        summary: bool = False,
+        rows: bool = False,
+        total: int | None = None,
+    ) -> tuple[Sequence[Any], int, str | None]:
+        """Get paginated list of exchanges for a conversation, oldest first.
+
+        With ``summary`` the message bodies are not loaded: only the stored
+        previews and lengths are, and reading a body raises. With ``rows``
+        the exchanges are Core rows of ExchangeResponse's fields (or
+        ExchangeSummaryResponse's) instead of ORM instances. A ``total`` the
+        caller already knows (e.g. from get_exchanges_version) saves reading
+        the conversation.
+
+        Returns:
+            The exchanges, the total count and the cursor for the next page
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        # Total comes from the conversation's maintained counter
+        archives = await self._archives()
+        if total is None:
+            conversation = await self.db.get(Conversation, conversation_id)
+            if conversation is None and archives:
+                conversation = await self.get_conversation(conversation_id)
+            total = conversation.exchange_count if conversation else 0
+
+        options = []
+        if summary:
+            options.append(
+                joinedload(Exchange.body).options(
+                    undefer_group("summary"),
+                    raiseload(ExchangeBody.user_message_blob),
+                    raiseload(ExchangeBody.assistant_message_blob),
+                )
             )
-        )
-        total = count_result.scalar_one()
+        if archives:
+            exchanges, next_cursor = await self._paginate_partitions(
+                Exchange,
+                [None, *archives],
+                lambda table: table.c.conversation_id == conversation_id,
+                "created_at",
+                False,
+                page,
+                page_size,
+                cursor,
+                options,
+                row_query=self._response_select(Exchange, summary) if rows else None,
+            )
+            return exchanges, total, next_cursor
 
         # Get paginated results (ordered by creation time, oldest first)
-        offset = (page - 1) * page_size
-        result = await self.db.execute(
-            select(Exchange)
+        if rows:
+            query = self._response_select(Exchange, summary)
+        else:
+            query = select(Exchange).options(*options)
+        query = (
+            query.add_columns(sort_key(Exchange.created_at, self._dialect))
             .where(Exchange.conversation_id == conversation_id)
-            .order_by(Exchange.created_at.asc())
-            .offset(offset)
-            .limit(page_size)
+            .order_by(Exchange.created_at.asc(), Exchange.id.asc())
         )
-        exchanges = result.scalars().all()
-        return exchanges, total
+        query = self._paginate(
+            query, Exchange.created_at, Exchange.id, False, page, page_size, cursor
+        )
+        result = await self.db.execute(query)
+        split = split_rows if rows else split_page
+        exchanges, next_cursor = split(result.all(), page_size)
+        return exchanges, total, next_cursor
+
+    async def stream_exchanges(
+        self, conversation_id: int, batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator[Sequence[Any]]:
+        """Stream every exchange of a conversation, oldest first, in batches.
+
+        The rows (Core tuples of ExchangeResponse's fields) come from a
+        server-side cursor ``batch_size`` at a time, so memory stays bounded
+        however long the conversation is. Archived exchanges, being older
+        than live ones, come first, the oldest archive first.
+        """
+        query = (
+            self._response_select(Exchange)
+            .where(Exchange.conversation_id == conversation_id)
+            .order_by(Exchange.created_at.asc(), Exchange.id.asc())
+        )
+        for schema in [*reversed(await self._archives()), None]:
+            options: dict[str, Any] = {"yield_per": batch_size}
+            if schema is not None:
+                options["schema_translate_map"] = {None: schema}
+            result = await self.db.stream(query, execution_options=options)
+            async for batch in result.partitions():
+                yield batch
+
+    async def stream_exchanges_after(
+        self,
+        after_id: int,
+        conversation_id: int | None = None,
+        session_id: int | None = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Any]]:
+        """Stream the exchanges created after ``after_id``, in id order, in batches.
 
+        Replays what an event stream resuming from ``Last-Event-ID`` missed,
+        for one conversation or every conversation of a session. Only live
+        exchanges are read: archived ones are older than any event.
+        """
+        query = (
+            self._response_select(Exchange)
+            .where(Exchange.id > after_id)
+            .order_by(Exchange.id)
+        )
+        if conversation_id is not None:
+            query = query.where(Exchange.conversation_id == conversation_id)
+        if session_id is not None:
+            query = query.join(
+                Conversation, Conversation.id == Exchange.conversation_id
+            ).where(Conversation.session_id == session_id)
+        result = await self.db.stream(
+            query, execution_options={"yield_per": batch_size}
+        )
+        async for batch in result.partitions():
+            yield batch
+
+    async def get_exchanges_version(
+        self, conversation_id: int
+    ) -> tuple[Any, ...] | None:
+        """Fingerprint of a conversation's exchange list, for ETags.
+
+        Exchanges are never modified, only added (at the end of the list)
+        or deleted, and each of those moves the conversation's counters, so
+        the counters and the last exchange in list order identify the list.
+        One query, served by the primary key and
+        ix_exchanges_conversation_id_created_at.
+
+        Returns:
+            None if the conversation is not live (missing or archived)
+        """
+        last = (
+            select(Exchange.id)
+            .where(Exchange.conversation_id == conversation_id)
+            .order_by(Exchange.created_at.desc(), Exchange.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(
+                Conversation.exchange_count,
+                Conversation.total_input_tokens,
+                Conversation.total_output_tokens,
+                last,
+            ).where(Conversation.id == conversation_id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    @retry_on_busy
     async def delete_exchange(self, exchange_id: int) -> bool:
         """Delete an exchange."""
         exchange = await self.get_exchange(exchange_id)
         if not exchange:
             return False
+        if exchange.__dict__.get(ARCHIVED_IN):
+            return await self._delete_archived_exchange(exchange)
 
+        deltas = {
+            "exchange_count": -1,
+            "total_input_tokens": -(exchange.input_tokens or 0),
+            "total_output_tokens": -(exchange.output_tokens or 0),
+        }
+        session_id = await self._adjust_counters(
+            Conversation,
+            exchange.conversation_id,
+            returning=Conversation.session_id,
+            **deltas,
+        )
+        await self._adjust_counters(Session, session_id, **deltas)
+        hashes = [exchange.user_message_hash, exchange.assistant_message_hash]
         await self.db.delete(exchange)
+        await self.db.flush()
+        await self.db.run_sync(release_blobs, hashes)
         await self.db.commit()
+        self._publish_deleted(exchange, session_id)
         return True
+
+    async def _delete_archived_exchange(self, exchange: Exchange) -> bool:
+        """delete_exchange for an exchange that lives in an archive."""
+        conversation = await self.get_conversation(exchange.conversation_id)
+        deltas = {
+            "exchange_count": -1,
+            "total_input_tokens": -(exchange.input_tokens or 0),
+            "total_output_tokens": -(exchange.output_tokens or 0),
+        }
+        await self._adjust_counters_everywhere(
+            Conversation, exchange.conversation_id, **deltas
+        )
+        if conversation is not None:
+            await self._adjust_counters_everywhere(
+                Session, conversation.session_id, **deltas
+            )
+        await self.db.run_sync(purge_archived, exchange_ids=[exchange.id])
+        self.db.expunge(exchange)
+        await self.db.commit()
+        self._publish_deleted(
+            exchange, conversation.session_id if conversation is not None else None
+        )
+        return True
+
+    @staticmethod
+    def _publish_deleted(exchange: Exchange, session_id: int | None) -> None:
+        """Announce a committed exchange deletion to its subscribers."""
+        topics = exchange_topics(exchange.conversation_id, session_id)
+        if exchange_events.has_subscribers(topics):
+            exchange_events.publish(
+                topics, exchange_deleted_frame(exchange.id, exchange.conversation_id)
+            )
+
+    async def _message_hash_counts(
+        self, condition: ColumnElement[bool]
+    ) -> Counter[str]:
+        """Blob references held by the exchanges matching ``condition``, per hash."""
+        references = union_all(
+            *(
+                select(column.label("hash"))
+                .join(Exchange, Exchange.id == ExchangeBody.exchange_id)
+                .where(condition)
+                for column in (
+                    ExchangeBody.user_message_hash,
+                    ExchangeBody.assistant_message_hash,
+                )
+            )
+        ).subquery()
+        result = await self.db.execute(
+            select(references.c.hash, func.count()).group_by(references.c.hash)
+        )
+        return Counter(dict(result.all()))
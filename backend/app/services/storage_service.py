@@ -0,0 +1,28 @@
+"""Storage reporting service."""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.blobs import storage_report
+from app.schemas.storage import StorageReportResponse
+
+
+class StorageService:
+    """Service reporting how message bodies are stored."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        """Initialize service with database session."""
+        self.db = db
+
+    async def get_report(self) -> StorageReportResponse:
+        """Summarize blob deduplication and compression savings."""
+        totals = await self.db.run_sync(storage_report)
+        logical = totals["logical_bytes"]
+        unique = totals["unique_bytes"]
+        stored = totals["stored_bytes"]
+        return StorageReportResponse(
+            **totals,
+            deduplication_savings=logical - unique,
+            compression_savings=unique - stored,
+            deduplication_ratio=logical / unique if unique else 1.0,
+            overall_ratio=logical / stored if stored else 1.0,
+        )
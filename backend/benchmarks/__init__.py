@@ -0,0 +1,4 @@
+"""Performance benchmarks for the Clouseau backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.sqlite_profile``.
+"""
@@ -0,0 +1,78 @@
+"""Concurrent single-exchange POSTs, direct commits versus group commit.
+
+Usage: python -m benchmarks.batched_ingest [--count 5000] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+
+from app.services.ingest_writer import ExchangeBatchWriter
+from benchmarks.bulk_ingest import exchange
+from benchmarks.common import Timer, api_client, report, temporary_database
+
+
+async def post_all(client, conversation_id: int, count: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(i: int) -> None:
+        async with semaphore:
+            response = await client.post(
+                "/api/exchanges", json=exchange(conversation_id, i)
+            )
+            response.raise_for_status()
+
+    await asyncio.gather(*(post(i) for i in range(count)))
+
+
+async def run(count: int, concurrency: int, batch_size: int, delay_ms: int) -> None:
+    from app.main import app
+
+    async with temporary_database() as (_, session_factory):
+        async with api_client(session_factory) as client:
+            session = (await client.post("/api/sessions", json={"name": "b"})).json()
+            conversation = (
+                await client.post(
+                    "/api/conversations",
+                    json={"session_id": session["id"], "title": "b"},
+                )
+            ).json()
+
+            app.state.exchange_writer = None
+            with Timer() as direct:
+                await post_all(client, conversation["id"], count, concurrency)
+            report(f"direct (concurrency {concurrency})", count, direct.elapsed)
+
+            writer = ExchangeBatchWriter(
+                session_factory, max_batch_size=batch_size, max_delay_ms=delay_ms
+            )
+            await writer.start()
+            app.state.exchange_writer = writer
+            try:
+                with Timer() as batched:
+                    await post_all(client, conversation["id"], count, concurrency)
+            finally:
+                app.state.exchange_writer = None
+                await writer.stop()
+            report(f"batched (concurrency {concurrency})", count, batched.elapsed)
+
+            metrics = writer.metrics()
+            print(
+                f"  batches {metrics.batches_flushed},"
+                f" avg size {metrics.avg_batch_size:.1f},"
+                f" avg flush {metrics.avg_flush_ms:.2f}ms,"
+                f" max flush {metrics.max_flush_ms:.2f}ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--delay-ms", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.concurrency, args.batch_size, args.delay_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Single-exchange POSTs versus the bulk endpoint.
+
+Usage: python -m benchmarks.bulk_ingest [--count 10000] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, api_client, report, temporary_database
+
+
+def exchange(conversation_id: int, i: int) -> dict:
+    return {
+        "conversation_id": conversation_id,
+        "user_message": f"prompt {i}",
+        "assistant_message": "y" * 512,
+        "model": "bench-model",
+        "input_tokens": 12,
+        "output_tokens": 128,
+    }
+
+
+async def run(count: int, batch_size: int) -> None:
+    async with temporary_database() as (_, session_factory):
+        async with api_client(session_factory) as client:
+            session = (await client.post("/api/sessions", json={"name": "b"})).json()
+            conversation = (
+                await client.post(
+                    "/api/conversations",
+                    json={"session_id": session["id"], "title": "b"},
+                )
+            ).json()
+
+            with Timer() as single:
+                for i in range(count):
+                    response = await client.post(
+                        "/api/exchanges", json=exchange(conversation["id"], i)
+                    )
+                    response.raise_for_status()
+            report("POST /api/exchanges (one per request)", count, single.elapsed)
+
+            with Timer() as bulk:
+                for start in range(0, count, batch_size):
+                    items = [
+                        exchange(conversation["id"], i)
+                        for i in range(start, min(start + batch_size, count))
+                    ]
+                    response = await client.post(
+                        "/api/exchanges/bulk", json={"items": items}
+                    )
+                    response.raise_for_status()
+            report(f"POST /api/exchanges/bulk (x{batch_size})", count, bulk.elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
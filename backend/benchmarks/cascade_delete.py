@@ -0,0 +1,128 @@
+"""Deleting a large session: ORM cascade versus database cascade versus chunks.
+
+The ORM cascade (the old delete_session) loads every conversation, exchange
+and body, then deletes them row by row; delete_session now issues one
+cascading DELETE; DeletionService's chunks (run inline here) bound the
+longest write transaction. Reports time and peak Python memory.
+
+Usage: python -m benchmarks.cascade_delete [--count 100000] [--conversations 50]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.db.blobs import release_blobs
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.session import Session
+from app.services.session_service import SessionService
+from benchmarks.bulk_ingest import exchange
+from benchmarks.common import Timer, api_client, temporary_database
+
+BATCH = 1000
+
+
+async def orm_cascade(db, session_id: int) -> None:
+    """The old delete_session: load the whole tree, delete through the ORM."""
+    session = (
+        await db.execute(
+            select(Session)
+            .where(Session.id == session_id)
+            .options(
+                selectinload(Session.conversations)
+                .selectinload(Conversation.exchanges)
+                .joinedload(Exchange.body)
+            )
+        )
+    ).scalar_one()
+    hashes = [
+        digest
+        for conversation in session.conversations
+        for item in conversation.exchanges
+        for digest in (item.user_message_hash, item.assistant_message_hash)
+    ]
+    for conversation in session.conversations:
+        for item in conversation.exchanges:
+            await db.delete(item)
+        await db.delete(conversation)
+    await db.delete(session)
+    await db.flush()
+    await db.run_sync(release_blobs, hashes)
+    await db.commit()
+
+
+async def run(count: int, conversations: int, chunk_size: int) -> None:
+    print(f"{'strategy':<26} {'seconds':>9} {'peak MiB':>9} {'longest tx ms':>14}")
+    for strategy in ("orm cascade", "database cascade", "background chunks"):
+        async with temporary_database() as (_, session_factory):
+            async with api_client(session_factory) as client:
+                session = (
+                    await client.post("/api/sessions", json={"name": "b"})
+                ).json()
+                ids = [
+                    (
+                        await client.post(
+                            "/api/conversations",
+                            json={"session_id": session["id"], "title": f"c{i}"},
+                        )
+                    ).json()["id"]
+                    for i in range(conversations)
+                ]
+                for start in range(0, count, BATCH):
+                    items = [
+                        exchange(ids[i % conversations], i)
+                        for i in range(start, min(count, start + BATCH))
+                    ]
+                    response = await client.post(
+                        "/api/exchanges/bulk", json={"items": items}
+                    )
+                    response.raise_for_status()
+
+            longest = 0.0
+            tracemalloc.start()
+            with Timer() as timer:
+                if strategy == "background chunks":
+                    while True:
+                        started = time.perf_counter()
+                        async with session_factory() as db:
+                            deleted = await SessionService(db).delete_exchanges_chunk(
+                                chunk_size, session_id=session["id"]
+                            )
+                        longest = max(longest, time.perf_counter() - started)
+                        if not deleted:
+                            break
+                    started = time.perf_counter()
+                    async with session_factory() as db:
+                        await SessionService(db).delete_session(session["id"])
+                    longest = max(longest, time.perf_counter() - started)
+                else:
+                    async with session_factory() as db:
+                        if strategy == "orm cascade":
+                            await orm_cascade(db, session["id"])
+                        else:
+                            await SessionService(db).delete_session(session["id"])
+                    longest = time.perf_counter() - timer.start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{strategy:<26} {timer.elapsed:>9.2f} {peak / 2**20:>9.1f}"
+                f" {longest * 1000:>14.0f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.conversations, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
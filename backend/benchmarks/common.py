@@ -0,0 +1,153 @@
+"""Shared helpers for backend benchmarks."""
+
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.db.base import Base
+from app.db.blobs import acquire_blobs
+from app.db.session import (
+    driver_url,
+    engine_options,
+    get_async_db,
+    get_async_read_db,
+)
+from app.db.sqlite import apply_foreign_keys, apply_storage_profile
+from app.models import Conversation, Exchange, ExchangeBody, Session  # noqa: F401
+from app.services.settings import DatabaseSettings, PerformanceSettings
+
+
+@asynccontextmanager
+async def temporary_database(
+    performance: PerformanceSettings | None = None,
+    metadata: MetaData = Base.metadata,
+    url: str | None = None,
+    foreign_keys: bool = True,
+) -> AsyncIterator[tuple[AsyncEngine, async_sessionmaker[AsyncSession]]]:
+    """Create a throwaway file database with the schema and storage profile.
+
+    ``metadata`` replaces the app schema, e.g. to compare a legacy layout.
+    ``url`` points at a scratch server database (e.g. PostgreSQL) instead;
+    its tables are dropped before and after the run. SQLite enforces
+    foreign keys as the app does unless ``foreign_keys`` is False, for
+    benchmarks that seed child rows without their parents.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = driver_url(
+            url or f"sqlite:///{Path(tmp_dir) / 'bench.db'}", asynchronous=True
+        )
+        engine = create_async_engine(
+            database_url,
+            **engine_options(database_url, DatabaseSettings(), asynchronous=True),
+        )
+        apply_storage_profile(engine.sync_engine, performance or PerformanceSettings())
+        if foreign_keys:
+            apply_foreign_keys(engine.sync_engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.drop_all)
+            await conn.run_sync(metadata.create_all)
+        try:
+            yield (
+                engine,
+                async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+            )
+        finally:
+            if url:
+                async with engine.begin() as conn:
+                    await conn.run_sync(metadata.drop_all)
+            await engine.dispose()
+
+
+@asynccontextmanager
+async def api_client(
+    session_factory: async_sessionmaker[AsyncSession],
+    read_session_factory: async_sessionmaker[AsyncSession] | None = None,
+) -> AsyncIterator[AsyncClient]:
+    """In-process HTTP client for the app, bound to a benchmark database.
+
+    GET routes use ``read_session_factory`` if given, else ``session_factory``.
+    """
+    from app.main import app
+
+    def override(factory: async_sessionmaker[AsyncSession]) -> Any:
+        async def get_session() -> AsyncIterator[AsyncSession]:
+            async with factory() as session:
+                yield session
+
+        return get_session
+
+    app.dependency_overrides[get_async_db] = override(session_factory)
+    app.dependency_overrides[get_async_read_db] = override(
+        read_session_factory or session_factory
+    )
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(get_async_read_db, None)
+
+
+async def insert_exchanges(db: AsyncSession, rows: list[dict]) -> None:
+    """Seed exchange rows given with user_message/assistant_message text."""
+    hashes = await db.run_sync(
+        acquire_blobs,
+        [
+            text
+            for row in rows
+            for text in (row["user_message"], row["assistant_message"])
+        ],
+    )
+    result = await db.execute(
+        insert(Exchange).returning(Exchange.id, sort_by_parameter_order=True),
+        [
+            {
+                k: v
+                for k, v in row.items()
+                if k not in ("user_message", "assistant_message")
+            }
+            for row in rows
+        ],
+    )
+    await db.execute(
+        insert(ExchangeBody),
+        [
+            {
+                "exchange_id": exchange_id,
+                "user_message_hash": hashes[2 * i],
+                "assistant_message_hash": hashes[2 * i + 1],
+            }
+            for i, exchange_id in enumerate(result.scalars())
+        ],
+    )
+
+
+class Timer:
+    """Context manager measuring wall-clock seconds."""
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(label: str, count: int, seconds: float) -> None:
+    """Print a throughput line."""
+    rate = count / seconds if seconds else float("inf")
+    print(f"{label:<40} {count:>8} ops {seconds:>8.3f}s {rate:>10.1f} ops/s")
@@ -0,0 +1,104 @@
+"""Offset versus cursor pagination over a large conversation.
+
+Usage: python -m benchmarks.keyset_pagination [--rows 100000] [--page-size 50]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.models import Conversation, Exchange, Session
+from app.services.session_service import SessionService
+from benchmarks.common import Timer, insert_exchanges, temporary_database
+
+REPEATS = 50
+
+
+async def seed(session_factory, rows: int) -> int:
+    """Insert one conversation holding ``rows`` exchanges; return its id.
+
+    Exchanges are spread at 100 per second, like a busy recorder, so that
+    created_at ties are realistic rather than one giant group.
+    """
+    start = datetime(2026, 1, 1)
+    async with session_factory() as db:
+        await db.execute(insert(Session).values(id=1, name="bench"))
+        await db.execute(insert(Conversation).values(id=1, session_id=1, title="bench"))
+        batch = [
+            {
+                "conversation_id": 1,
+                "user_message": f"message {i}",
+                "assistant_message": "x" * 256,
+                "input_tokens": 10,
+                "output_tokens": 20,
+                "created_at": start + timedelta(milliseconds=10 * i),
+            }
+            for i in range(rows)
+        ]
+        await insert_exchanges(db, batch)
+        await db.commit()
+    return 1
+
+
+async def run(rows: int, page_size: int) -> None:
+    async with temporary_database() as (_, session_factory):
+        conversation_id = await seed(session_factory, rows)
+        last_page = rows // page_size
+
+        async with session_factory() as db:
+            service = SessionService(db)
+
+            # Collect the cursor for every page start by walking once
+            cursors = [None]
+            next_cursor = None
+            for _ in range(last_page - 1):
+                _, _, next_cursor = await service.get_exchanges_by_conversation(
+                    conversation_id, page_size=page_size, cursor=next_cursor
+                )
+                cursors.append(next_cursor)
+
+            with Timer() as count_timer:
+                for _ in range(REPEATS):
+                    await db.execute(
+                        select(func.count(Exchange.id)).where(
+                            Exchange.conversation_id == conversation_id
+                        )
+                    )
+
+            print(f"{rows} exchanges, page_size={page_size}, {REPEATS} fetches/depth")
+            print(
+                "per-call COUNT(*) included in both columns:"
+                f" {count_timer.elapsed / REPEATS * 1000:.2f} ms"
+            )
+            print(f"{'page':>8} {'offset ms':>12} {'cursor ms':>12}")
+            for page in (1, last_page // 10, last_page // 2, last_page):
+                with Timer() as offset_timer:
+                    for _ in range(REPEATS):
+                        await service.get_exchanges_by_conversation(
+                            conversation_id, page=page, page_size=page_size
+                        )
+                with Timer() as cursor_timer:
+                    for _ in range(REPEATS):
+                        await service.get_exchanges_by_conversation(
+                            conversation_id,
+                            page_size=page_size,
+                            cursor=cursors[page - 1],
+                        )
+                print(
+                    f"{page:>8} {offset_timer.elapsed / REPEATS * 1000:>12.2f}"
+                    f" {cursor_timer.elapsed / REPEATS * 1000:>12.2f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
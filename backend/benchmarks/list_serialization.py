@@ -0,0 +1,182 @@
+"""List pages built from ORM instances versus Core rows encoded directly.
+
+For a 200-exchange page and a 100-session page, compares the previous
+route body (ORM entities, ``model_validate`` per row, then the response
+model's JSON) with the rows path the list routes use now (Core tuples of
+the schema's columns, encoded without validation). Each side opens its own
+database session per page, like a request; peak traced memory is measured
+in a separate pass so that tracing does not skew the timings.
+
+Usage: python -m benchmarks.list_serialization [--repeats 50] [--message-kb 2]
+"""
+
+import argparse
+import asyncio
+import random
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.api.responses import page_response
+from app.schemas import (
+    ExchangeListResponse,
+    ExchangeResponse,
+    SessionListResponse,
+    SessionResponse,
+)
+from app.services.session_service import SessionService
+from benchmarks.common import Timer, api_client, temporary_database
+from benchmarks.summary_view import large_message
+
+EXCHANGES = 200
+SESSIONS = 100
+
+
+async def measure(
+    label: str, render: Callable[[], Awaitable[bytes]], repeats: int
+) -> bytes:
+    body = await render()
+    with Timer() as timer:
+        for _ in range(repeats):
+            await render()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        await render()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    print(
+        f"{label:<32} {len(body):>10} {timer.elapsed / repeats * 1000:>12.2f}"
+        f" {peak / 1024:>12.0f}"
+    )
+    return body
+
+
+async def run(repeats: int, message_kb: int) -> None:
+    rng = random.Random(5)
+    async with temporary_database() as (_, session_factory):
+        async with api_client(session_factory) as client:
+            sessions = [
+                (await client.post("/api/sessions", json={"name": f"s{i}"})).json()
+                for i in range(SESSIONS)
+            ]
+            conversation = (
+                await client.post(
+                    "/api/conversations",
+                    json={"session_id": sessions[0]["id"], "title": "b"},
+                )
+            ).json()
+            items = [
+                {
+                    "conversation_id": conversation["id"],
+                    "user_message": large_message(rng, message_kb * 1024),
+                    "assistant_message": large_message(rng, message_kb * 1024),
+                    "model": "bench-model",
+                    "input_tokens": 500,
+                    "output_tokens": 250,
+                }
+                for _ in range(EXCHANGES)
+            ]
+            (
+                await client.post("/api/exchanges/bulk", json={"items": items})
+            ).raise_for_status()
+
+            page = {"page": 1, "page_size": EXCHANGES}
+
+            async def exchanges_orm() -> bytes:
+                async with session_factory() as db:
+                    found, total, cursor = await SessionService(
+                        db
+                    ).get_exchanges_by_conversation(
+                        conversation["id"], page_size=EXCHANGES
+                    )
+                    return (
+                        ExchangeListResponse(
+                            items=[ExchangeResponse.model_validate(e) for e in found],
+                            total=total,
+                            next_cursor=cursor,
+                            **page,
+                        )
+                        .model_dump_json()
+                        .encode()
+                    )
+
+            async def exchanges_rows() -> bytes:
+                async with session_factory() as db:
+                    found, total, cursor = await SessionService(
+                        db
+                    ).get_exchanges_by_conversation(
+                        conversation["id"], page_size=EXCHANGES, rows=True
+                    )
+                    return page_response(
+                        found,
+                        ExchangeResponse.model_fields,
+                        total,
+                        next_cursor=cursor,
+                        **page,
+                    ).body
+
+            async def sessions_orm() -> bytes:
+                async with session_factory() as db:
+                    found, total, cursor = await SessionService(db).get_sessions(
+                        page_size=SESSIONS
+                    )
+                    return (
+                        SessionListResponse(
+                            items=[SessionResponse.model_validate(s) for s in found],
+                            total=total,
+                            page=1,
+                            page_size=SESSIONS,
+                            next_cursor=cursor,
+                        )
+                        .model_dump_json()
+                        .encode()
+                    )
+
+            async def sessions_rows() -> bytes:
+                async with session_factory() as db:
+                    found, total, cursor = await SessionService(db).get_sessions(
+                        page_size=SESSIONS, rows=True
+                    )
+                    return page_response(
+                        found, SessionResponse.model_fields, total, 1, SESSIONS, cursor
+                    ).body
+
+            print(f"{'page':<32} {'bytes':>10} {'ms/page':>12} {'peak KiB':>12}")
+            pairs: list[tuple[str, Any, Any]] = [
+                (f"{EXCHANGES} exchanges", exchanges_orm, exchanges_rows),
+                (f"{SESSIONS} sessions", sessions_orm, sessions_rows),
+            ]
+            for label, orm, rows in pairs:
+                before = await measure(f"{label}, ORM + validate", orm, repeats)
+                after = await measure(f"{label}, Core rows", rows, repeats)
+                assert before == after, "row encoding differs from the response model"
+
+            print()
+            print(f"{'GET (whole request)':<32} {'bytes':>10} {'ms/request':>12}")
+            for label, url, params in (
+                (
+                    f"{EXCHANGES} exchanges",
+                    f"/api/exchanges/by-conversation/{conversation['id']}",
+                    {"page_size": EXCHANGES},
+                ),
+                (f"{SESSIONS} sessions", "/api/sessions", {"page_size": SESSIONS}),
+            ):
+                size = len((await client.get(url, params=params)).content)
+                with Timer() as timer:
+                    for _ in range(repeats):
+                        (await client.get(url, params=params)).raise_for_status()
+                print(f"{label:<32} {size:>10} {timer.elapsed / repeats * 1000:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--message-kb", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeats, args.message_kb))
+
+
+if __name__ == "__main__":
+    main()
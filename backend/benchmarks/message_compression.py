@@ -0,0 +1,149 @@
+"""Storage size and read latency of the message compression codecs.
+
+Usage: python -m benchmarks.message_compression [--rows 20000] [--page-size 200]
+"""
+
+import argparse
+import asyncio
+import random
+from unittest.mock import patch
+
+from sqlalchemy import func, insert, select
+
+from app.db.compression import MessageCodec, train_dictionary, zstandard
+from app.models import Conversation, MessageBlob, Session
+from app.services.session_service import SessionService
+from benchmarks.common import Timer, insert_exchanges, report, temporary_database
+
+REPEATS = 20
+
+SYSTEM_PROMPT = (
+    "You are a senior Python reviewer. Point out bugs, style issues and missing "
+    "tests. Answer in Markdown with a short summary followed by details.\n\n"
+)
+CODE_LINES = [
+    "def {name}(self, {arg}: int) -> Optional[str]:",
+    "    result = await self.db.execute(select(Model).where(Model.id == {arg}))",
+    "    if not result:",
+    '        raise HTTPException(status_code=404, detail="{name} not found")',
+    "    for item in items:",
+    "        total += item.{name}_count",
+    '    return json.dumps({{"{name}": {arg}}})',
+    'logger.info("processed %s rows in %.2fs", count, elapsed)',
+]
+WORDS = (
+    "the function returns none when id is missing so callers should check it".split()
+)
+
+
+def make_messages(rng: random.Random) -> tuple[str, str]:
+    """A pasted-code prompt and a prose-plus-code answer, like agent traffic."""
+    names = [
+        rng.choice(["user", "session", "token", "export", "search"]) for _ in range(3)
+    ]
+    code = "\n".join(
+        rng.choice(CODE_LINES).format(
+            name=rng.choice(names), arg=rng.choice(["idx", "limit"])
+        )
+        for _ in range(rng.randint(20, 120))
+    )
+    prose = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 200)))
+    return (
+        SYSTEM_PROMPT + "```python\n" + code + "\n```",
+        prose + "\n\n```python\n" + code[:400] + "\n```",
+    )
+
+
+def codecs(samples: list[str]) -> list[tuple[str, MessageCodec]]:
+    """Codec variants to compare; zstd ones only when zstandard is installed."""
+    variants = [
+        ("uncompressed", MessageCodec(enabled=False)),
+        ("zlib level 6", MessageCodec("zlib", 6)),
+        (
+            "zlib level 6 + dictionary",
+            MessageCodec("zlib", 6, dictionary=train_dictionary(samples)),
+        ),
+    ]
+    if zstandard is not None:
+        variants += [
+            ("zstd level 3", MessageCodec("zstd", 3)),
+            (
+                "zstd level 3 + dictionary",
+                MessageCodec(
+                    "zstd",
+                    3,
+                    dictionary=train_dictionary(samples, codec="zstd", size=64 * 1024),
+                ),
+            ),
+        ]
+    return variants
+
+
+async def measure(
+    label: str, codec: MessageCodec, messages: list[tuple[str, str]], page_size: int
+) -> int | None:
+    with patch("app.db.compression.get_codec", return_value=codec):
+        async with temporary_database() as (_, session_factory):
+            async with session_factory() as db:
+                await db.execute(insert(Session).values(id=1, name="bench"))
+                await db.execute(
+                    insert(Conversation).values(id=1, session_id=1, title="bench")
+                )
+                with Timer() as write:
+                    await insert_exchanges(
+                        db,
+                        [
+                            {
+                                "conversation_id": 1,
+                                "user_message": user,
+                                "assistant_message": answer,
+                            }
+                            for user, answer in messages
+                        ],
+                    )
+                    await db.commit()
+
+                stored = await db.scalar(
+                    select(func.sum(func.length(MessageBlob.content)))
+                )
+
+                service = SessionService(db)
+                with Timer() as read:
+                    for _ in range(REPEATS):
+                        db.expunge_all()
+                        await service.get_exchanges_by_conversation(
+                            1, page_size=page_size
+                        )
+
+    report(f"{label}: write", len(messages), write.elapsed)
+    report(f"{label}: read {page_size}-row page", REPEATS, read.elapsed)
+    return stored
+
+
+async def run(rows: int, page_size: int) -> None:
+    rng = random.Random(7)
+    messages = [make_messages(rng) for _ in range(rows)]
+    raw_size = sum(
+        len(user.encode()) + len(answer.encode()) for user, answer in messages
+    )
+    print(f"{rows} exchanges, {raw_size / 1024 / 1024:.1f} MiB of message text\n")
+
+    samples = [text_ for pair in messages[:2000] for text_ in pair]
+    for label, codec in codecs(samples):
+        stored = await measure(label, codec, messages, page_size)
+        print(
+            f"{label}: {stored / 1024 / 1024:.1f} MiB stored,"
+            f" {raw_size / stored:.2f}x\n"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""LLM response cache lookups at scale, exact versus near-duplicate tier.
+
+Fills a response cache file with ``--entries`` responses, each indexed by
+the MinHash signature of a generated prompt. Prompts come in families
+sharing a template, so candidates are not all trivially dissimilar.
+Then times ``send_message`` through CachingLLMProvider (with the mock
+provider behind it) for:
+
+- exact hits: a stored prompt sent again
+- near hits: a stored prompt with a new request id and timestamp and one
+  word changed, which the exact tier misses
+- misses: prompts from unseen templates, including the mock provider
+  call and storing the response
+
+Usage: python -m benchmarks.near_duplicate_cache [--entries 1000000]
+       [--queries 500] [--threshold 0.7]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from app.services.llm_providers import (
+    CachingLLMProvider,
+    LLMMessage,
+    LLMResponse,
+    MockLLMProvider,
+    ProviderConfig,
+    ResponseCache,
+)
+from app.services.llm_providers.cache import NearKey
+from app.services.llm_providers.similarity import MinHasher
+from benchmarks.common import Timer, report
+
+VOCABULARY = [f"word{i}" for i in range(20_000)]
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def prompt(rng: random.Random, template: list[str], changes: int = 4) -> str:
+    words = list(template)
+    for i in rng.sample(range(len(words)), changes):
+        words[i] = rng.choice(VOCABULARY)
+    request_id = "".join(rng.choice("0123456789abcdef") for _ in range(12))
+    timestamp = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00Z"
+    return f"[{timestamp}] req_{request_id}: " + " ".join(words)
+
+
+def messages(text: str) -> list[LLMMessage]:
+    return [
+        LLMMessage(role="system", content="You are a helpful AI assistant."),
+        LLMMessage(role="user", content=text),
+    ]
+
+
+def fill(
+    provider: CachingLLMProvider, rng: random.Random, entries: int, families: int
+) -> list[str]:
+    """Store ``entries`` responses; returns one stored prompt per family."""
+    templates = [rng.choices(VOCABULARY, k=40) for _ in range(families)]
+    value = LLMResponse(content="cached answer", model="mock-model").model_dump(
+        exclude={"cached", "cache_tier"}
+    )
+    stored = []
+    for i in range(entries):
+        text = prompt(rng, templates[i % families])
+        request = messages(text)
+        # The provider's own key and index entry, without calling the provider
+        key = provider._key(request, "send", {})
+        near: NearKey = provider._near_key(request, {})
+        provider.cache.put(key, value, near)
+        if i < families:
+            stored.append(text)
+        if (i + 1) % 100_000 == 0:
+            print(f"  stored {i + 1} entries")
+    return stored
+
+
+async def measure(
+    label: str, queries: list[str], send: Callable[[str], Awaitable[LLMResponse]]
+) -> None:
+    latencies = []
+    for text in queries:
+        start = time.perf_counter()
+        await send(text)
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"{label:<34} p50 {statistics.median(latencies) * 1000:>7.2f}ms"
+        f"  p95 {percentile(latencies, 0.95) * 1000:>7.2f}ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:>7.2f}ms"
+    )
+
+
+async def run(entries: int, queries: int, threshold: float) -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(Path(tmp_dir) / "llm_cache.db", max_entries=2 * entries)
+        provider = CachingLLMProvider(
+            MockLLMProvider(ProviderConfig(name="mock", model="mock-model")),
+            cache,
+            MinHasher(threshold=threshold),
+        )
+        print(
+            f"{entries} entries, {provider.hasher.bands} bands x"
+            f" {provider.hasher.rows} rows, threshold {threshold}"
+        )
+        with Timer() as timer:
+            stored = fill(provider, rng, entries, families=max(queries, entries // 20))
+        report("fill", entries, timer.elapsed)
+
+        sample = rng.sample(stored, queries)
+        near = []
+        for text in sample:
+            words = text.split()
+            words[0] = "[2025-01-01T00:00:00Z]"
+            words[1] = f"req_{rng.getrandbits(48):012x}:"
+            words[rng.randrange(2, len(words))] = "changed"
+            near.append(" ".join(words))
+        novel = [" ".join(rng.choices(VOCABULARY, k=40)) for _ in range(queries)]
+
+        async def send(text: str) -> LLMResponse:
+            return await provider.send_message(messages(text))
+
+        await measure("send_message, exact hit", sample, send)
+        await measure("send_message, near hit", near, send)
+        await measure("send_message, miss (incl. store)", novel, send)
+
+        metrics = provider.metrics()
+        print(
+            f"exact hits {metrics.hits}, near hits {metrics.near_hits},"
+            f" near misses {metrics.near_misses}, hit ratio {metrics.hit_ratio:.3f}"
+        )
+        size = sum(path.stat().st_size for path in Path(tmp_dir).iterdir())
+        print(f"cache files {size / 2**20:.0f} MiB")
+        cache.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+    asyncio.run(run(args.entries, args.queries, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Concurrent exchange ingest on SQLite versus PostgreSQL.
+
+Like ``uvicorn --workers N``, several processes each run the app and post
+exchanges with direct commits, every client to its own conversation. On
+SQLite all processes take turns on the single writer lock (retrying while
+it is busy); on PostgreSQL they only contend on the shared session row.
+
+Usage: python -m benchmarks.postgres_ingest
+    [--postgres-url postgresql://postgres@localhost/clouseau_bench]
+    [--count 2000] [--processes 1 2 4] [--concurrency 16]
+
+The PostgreSQL database must exist; its tables are dropped and recreated.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import driver_url, engine_options
+from app.db.sqlite import apply_foreign_keys, apply_storage_profile
+from app.services.settings import DatabaseSettings, PerformanceSettings
+from benchmarks.bulk_ingest import exchange
+from benchmarks.common import Timer, api_client, report, temporary_database
+
+
+async def post_exchanges(url: str, conversations: list[int], count: int) -> None:
+    """One worker process: post ``count`` exchanges spread over its conversations."""
+    database_url = driver_url(url, asynchronous=True)
+    engine = create_async_engine(
+        database_url, **engine_options(database_url, DatabaseSettings(), True)
+    )
+    apply_storage_profile(engine.sync_engine, PerformanceSettings())
+    apply_foreign_keys(engine.sync_engine)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    try:
+        async with api_client(session_factory) as client:
+
+            async def client_loop(index: int) -> None:
+                for i in range(index, count, len(conversations)):
+                    response = await client.post(
+                        "/api/exchanges", json=exchange(conversations[index], i)
+                    )
+                    response.raise_for_status()
+
+            await asyncio.gather(*(client_loop(i) for i in range(len(conversations))))
+    finally:
+        await engine.dispose()
+
+
+def worker(url: str, conversations: list[int], count: int) -> None:
+    asyncio.run(post_exchanges(url, conversations, count))
+
+
+async def ingest(
+    url: str | None, count: int, processes: int, concurrency: int
+) -> float:
+    async with temporary_database(url=url) as (engine, session_factory):
+        async with api_client(session_factory) as client:
+            session = (await client.post("/api/sessions", json={"name": "b"})).json()
+            conversations = [
+                (
+                    await client.post(
+                        "/api/conversations",
+                        json={"session_id": session["id"], "title": f"c{i}"},
+                    )
+                ).json()["id"]
+                for i in range(processes * concurrency)
+            ]
+        await engine.dispose()
+
+        worker_url = engine.url.render_as_string(hide_password=False)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=context) as pool:
+            # Warm the workers up (imports) before timing
+            list(pool.map(int, range(processes)))
+            with Timer() as timer:
+                futures = [
+                    pool.submit(
+                        worker,
+                        worker_url,
+                        conversations[p * concurrency : (p + 1) * concurrency],
+                        count // processes,
+                    )
+                    for p in range(processes)
+                ]
+                for future in futures:
+                    future.result()
+    return timer.elapsed
+
+
+async def run(
+    postgres_url: str, count: int, processes: list[int], concurrency: int
+) -> None:
+    for label, url in (("sqlite", None), ("postgresql", postgres_url)):
+        for workers in processes:
+            elapsed = await ingest(url, count, workers, concurrency)
+            report(f"{label} ({workers} processes x {concurrency})", count, elapsed)
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--postgres-url", default="postgresql://postgres@localhost/clouseau_bench"
+    )
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(run(args.postgres_url, args.count, args.processes, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
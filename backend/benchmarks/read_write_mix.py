@@ -0,0 +1,148 @@
+"""Read latency while ingesting, with a shared versus a read-only pool.
+
+Readers page through a conversation and the session list while writers
+post exchanges. GET routes either share the writers' pool or use the
+separate read-only engine (``PRAGMA query_only`` on SQLite).
+
+Usage: python -m benchmarks.read_write_mix [--seconds 10] [--writers 32] [--readers 4]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import engine_options
+from app.db.sqlite import apply_read_only, apply_storage_profile
+from app.services.settings import DatabaseSettings, PerformanceSettings
+from benchmarks.bulk_ingest import exchange
+from benchmarks.common import api_client, temporary_database
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure(
+    label: str,
+    session_factory: async_sessionmaker[AsyncSession],
+    read_factory: async_sessionmaker[AsyncSession] | None,
+    conversation_id: int,
+    seconds: float,
+    writers: int,
+    readers: int,
+) -> None:
+    latencies: list[float] = []
+    writes = 0
+    deadline = time.perf_counter() + seconds
+
+    async with api_client(session_factory, read_factory) as client:
+
+        async def write(index: int) -> None:
+            nonlocal writes
+            i = index
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/api/exchanges", json=exchange(conversation_id, i)
+                )
+                response.raise_for_status()
+                writes += 1
+                i += writers
+
+        async def read() -> None:
+            paths = [
+                f"/api/exchanges/by-conversation/{conversation_id}?view=summary",
+                "/api/sessions",
+            ]
+            i = 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        await asyncio.gather(
+            *(write(i) for i in range(writers)), *(read() for _ in range(readers))
+        )
+
+    print(
+        f"{label:<34} reads {len(latencies) / seconds:>7.1f}/s"
+        f"  p50 {statistics.median(latencies) * 1000:>7.1f}ms"
+        f"  p95 {percentile(latencies, 0.95) * 1000:>7.1f}ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:>7.1f}ms"
+        f"  writes {writes / seconds:>6.1f}/s"
+    )
+
+
+async def run(seconds: float, writers: int, readers: int) -> None:
+    async with temporary_database() as (engine, session_factory):
+        read_engine = create_async_engine(
+            engine.url, **engine_options(engine.url, DatabaseSettings(), True, True)
+        )
+        apply_storage_profile(read_engine.sync_engine, PerformanceSettings())
+        apply_read_only(read_engine.sync_engine)
+        read_factory = async_sessionmaker(
+            read_engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async with api_client(session_factory) as client:
+            session = (await client.post("/api/sessions", json={"name": "b"})).json()
+            conversation_id = (
+                await client.post(
+                    "/api/conversations",
+                    json={"session_id": session["id"], "title": "b"},
+                )
+            ).json()["id"]
+            response = await client.post(
+                "/api/exchanges/bulk",
+                json={"items": [exchange(conversation_id, i) for i in range(500)]},
+            )
+            response.raise_for_status()
+
+        try:
+            await measure(
+                "reads alone",
+                session_factory,
+                read_factory,
+                conversation_id,
+                seconds,
+                0,
+                readers,
+            )
+            await measure(
+                "reads + ingest, shared pool",
+                session_factory,
+                None,
+                conversation_id,
+                seconds,
+                writers,
+                readers,
+            )
+            await measure(
+                "reads + ingest, read-only pool",
+                session_factory,
+                read_factory,
+                conversation_id,
+                seconds,
+                writers,
+                readers,
+            )
+        finally:
+            await read_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.seconds, args.writers, args.readers))
+
+
+if __name__ == "__main__":
+    main()
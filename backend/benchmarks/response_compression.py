@@ -0,0 +1,174 @@
+"""Bytes on the wire and CPU per request for compressed exchange pages.
+
+Builds a conversation whose messages are slices of this repository's own
+source and prose (closer to real transcripts than random words), fetches
+typical exchange pages uncompressed, then runs each page through
+CompressionMiddleware per codec and level. Reports the body size, ratio,
+and the process CPU time compression adds to one request, once for the
+whole body and once streamed in 64 KiB chunks (each flushed, as the
+middleware does for streamed responses).
+
+Usage: python -m benchmarks.response_compression [--repeats 50]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+
+from starlette.responses import Response, StreamingResponse
+
+from app.api.compression import CompressionMiddleware, available_encoders
+from benchmarks.common import api_client, temporary_database
+
+EXCHANGES = 200
+STREAM_CHUNK = 64 * 1024
+LEVELS = {"gzip": (1, 6, 9), "zstd": (1, 3, 9), "br": (1, 4, 9)}
+
+
+def corpus() -> str:
+    """Source and Markdown text of the repository, to slice messages from."""
+    root = Path(__file__).resolve().parents[2]
+    paths = sorted(root.glob("backend/app/**/*.py")) + sorted(root.glob("docs/*.md"))
+    return "\n".join(path.read_text() for path in paths)
+
+
+def transcript_message(rng: random.Random, text: str, size: int) -> str:
+    start = rng.randrange(len(text) - size)
+    return text[start : start + size]
+
+
+async def compressed_request(middleware: CompressionMiddleware, codec: str) -> int:
+    """Send one request through ``middleware``; return the bytes sent."""
+    sent = 0
+
+    async def receive() -> dict:
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", codec.encode())],
+        "asgi": {"spec_version": "2.4"},
+    }
+    await middleware(scope, receive, send)
+    return sent
+
+
+def whole(body: bytes) -> Response:
+    return Response(body, media_type="application/json")
+
+
+def streamed(body: bytes) -> StreamingResponse:
+    chunks = [body[i : i + STREAM_CHUNK] for i in range(0, len(body), STREAM_CHUNK)]
+    return StreamingResponse(iter(chunks), media_type="application/json")
+
+
+async def measure(body: bytes, codec: str, level: int, stream: bool, repeats: int):
+    """Bytes sent and CPU milliseconds per request for one configuration."""
+    make = streamed if stream else whole
+    levels = {codec: level}
+    size = await compressed_request(
+        CompressionMiddleware(make(body), codecs=[codec], levels=levels), codec
+    )
+    # Build the responses up front so only the middleware's work is timed
+    apps = [
+        CompressionMiddleware(make(body), codecs=[codec], levels=levels)
+        for _ in range(repeats)
+    ]
+    started = time.process_time()
+    for app in apps:
+        await compressed_request(app, codec)
+    cpu = time.process_time() - started
+
+    identity = [make(body) for _ in range(repeats)]
+    started = time.process_time()
+    for app in identity:
+        await compressed_request(CompressionMiddleware(app, codecs=[]), "identity")
+    baseline = time.process_time() - started
+    return size, max(cpu - baseline, 0.0) / repeats * 1000
+
+
+async def run(repeats: int) -> None:
+    rng = random.Random(11)
+    text = corpus()
+    async with temporary_database() as (_, session_factory):
+        async with api_client(session_factory) as client:
+            session = (await client.post("/api/sessions", json={"name": "b"})).json()
+            conversation = (
+                await client.post(
+                    "/api/conversations",
+                    json={"session_id": session["id"], "title": "b"},
+                )
+            ).json()
+            items = [
+                {
+                    "conversation_id": conversation["id"],
+                    "user_message": transcript_message(
+                        rng, text, rng.randint(200, 2000)
+                    ),
+                    "assistant_message": transcript_message(
+                        rng, text, rng.randint(1000, 8000)
+                    ),
+                    "model": "bench-model",
+                    "input_tokens": 500,
+                    "output_tokens": 250,
+                }
+                for _ in range(EXCHANGES)
+            ]
+            (
+                await client.post("/api/exchanges/bulk", json={"items": items})
+            ).raise_for_status()
+
+            url = f"/api/exchanges/by-conversation/{conversation['id']}"
+            pages = {}
+            for label, params in (
+                ("20 exchanges, summary", {"page_size": 20, "view": "summary"}),
+                ("20 exchanges, full", {"page_size": 20}),
+                (f"{EXCHANGES} exchanges, full", {"page_size": EXCHANGES}),
+            ):
+                response = await client.get(
+                    url, params=params, headers={"Accept-Encoding": "identity"}
+                )
+                response.raise_for_status()
+                pages[label] = response.content
+
+    encoders = available_encoders()
+    print(
+        f"{'page':<24} {'codec':<8} {'bytes':>9} {'ratio':>7}"
+        f" {'CPU ms':>8} {'streamed':>9} {'CPU ms':>8}"
+    )
+    for label, body in pages.items():
+        print(f"{label:<24} {'identity':<8} {len(body):>9} {1:>7.2f}")
+        for codec, levels in LEVELS.items():
+            if codec not in encoders:
+                print(f"{'':<24} {codec:<8} (not installed)")
+                continue
+            for level in levels:
+                size, cpu = await measure(body, codec, level, False, repeats)
+                stream_size, stream_cpu = await measure(
+                    body, codec, level, True, repeats
+                )
+                print(
+                    f"{'':<24} {f'{codec}-{level}':<8} {size:>9}"
+                    f" {len(body) / size:>7.2f} {cpu:>8.2f}"
+                    f" {stream_size:>9} {stream_cpu:>8.2f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeats))
+
+
+if __name__ == "__main__":
+    main()
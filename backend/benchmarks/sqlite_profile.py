@@ -0,0 +1,56 @@
+"""Concurrent create_exchange throughput with and without the storage profile.
+
+Usage: python -m benchmarks.sqlite_profile [--workers 8] [--per-worker 250]
+"""
+
+import argparse
+import asyncio
+
+from app.schemas import ConversationCreate, ExchangeCreate, SessionCreate
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings
+from benchmarks.common import Timer, report, temporary_database
+
+
+async def run(profile: str, workers: int, per_worker: int) -> None:
+    performance = PerformanceSettings(storage_profile=profile)
+    async with temporary_database(performance) as (_, session_factory):
+        async with session_factory() as db:
+            service = SessionService(db)
+            session = await service.create_session(SessionCreate(name="bench"))
+            conversation = await service.create_conversation(
+                ConversationCreate(session_id=session.id, title="bench")
+            )
+
+        async def worker(index: int) -> None:
+            async with session_factory() as db:
+                service = SessionService(db)
+                for i in range(per_worker):
+                    await service.create_exchange(
+                        ExchangeCreate(
+                            conversation_id=conversation.id,
+                            user_message=f"worker {index} message {i}",
+                            assistant_message="x" * 512,
+                            input_tokens=10,
+                            output_tokens=20,
+                        )
+                    )
+
+        with Timer() as timer:
+            await asyncio.gather(*(worker(i) for i in range(workers)))
+        report(
+            f"create_exchange profile={profile}", workers * per_worker, timer.elapsed
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-worker", type=int, default=250)
+    args = parser.parse_args()
+    for profile in ("default", "production"):
+        asyncio.run(run(profile, args.workers, args.per_worker))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Full versus summary listing of a 200-exchange page of large messages.
+
+Usage: python -m benchmarks.summary_view [--page-size 200] [--message-kb 20]
+"""
+
+import argparse
+import asyncio
+import random
+
+from benchmarks.common import Timer, api_client, temporary_database
+
+REPEATS = 20
+
+
+def large_message(rng: random.Random, size: int) -> str:
+    words = "def return self import async await select where class value".split()
+    return " ".join(rng.choice(words) for _ in range(size // 6))[:size]
+
+
+async def run(page_size: int, message_kb: int) -> None:
+    rng = random.Random(3)
+    async with temporary_database() as (_, session_factory):
+        async with api_client(session_factory) as client:
+            session = (await client.post("/api/sessions", json={"name": "b"})).json()
+            conversation = (
+                await client.post(
+                    "/api/conversations",
+                    json={"session_id": session["id"], "title": "b"},
+                )
+            ).json()
+            items = [
+                {
+                    "conversation_id": conversation["id"],
+                    "user_message": large_message(rng, message_kb * 1024),
+                    "assistant_message": large_message(rng, message_kb * 512),
+                    "model": "bench-model",
+                    "input_tokens": 5000,
+                    "output_tokens": 2500,
+                }
+                for _ in range(page_size)
+            ]
+            (
+                await client.post("/api/exchanges/bulk", json={"items": items})
+            ).raise_for_status()
+
+            url = f"/api/exchanges/by-conversation/{conversation['id']}"
+            print(f"{'view':<10} {'bytes':>12} {'ms/request':>12}")
+            for view in ("full", "summary"):
+                params = {"page_size": page_size, "view": view}
+                size = len((await client.get(url, params=params)).content)
+                with Timer() as timer:
+                    for _ in range(REPEATS):
+                        (await client.get(url, params=params)).raise_for_status()
+                print(f"{view:<10} {size:>12} {timer.elapsed / REPEATS * 1000:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--message-kb", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.page_size, args.message_kb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Token-sum scans over the exchange table layouts.
+
+Compares the original layout (message text inline), the pre-split one
+(blob hashes and previews inline) and the current narrow ``exchanges``
+table with its ``exchange_bodies`` side table.
+
+Usage: python -m benchmarks.token_sum [--rows 1000000] [--message-size 500]
+"""
+
+import argparse
+import asyncio
+import os
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Select,
+    String,
+    Table,
+    Text,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.base import Base
+from app.models import Exchange
+from benchmarks.common import Timer, report, temporary_database
+
+REPEATS = 5
+
+
+def legacy_table(metadata: MetaData, *message_columns: Column) -> Table:
+    return Table(
+        "exchanges",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("conversation_id", Integer, nullable=False),
+        *message_columns,
+        Column("model", String(100)),
+        Column("input_tokens", Integer),
+        Column("output_tokens", Integer),
+        Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    )
+
+
+inline_metadata = MetaData()
+inline_exchanges = legacy_table(
+    inline_metadata, Column("user_message", Text), Column("assistant_message", Text)
+)
+hashed_metadata = MetaData()
+hashed_exchanges = legacy_table(
+    hashed_metadata,
+    Column("user_message_hash", String(64)),
+    Column("assistant_message_hash", String(64)),
+    Column("user_message_preview", String(200)),
+    Column("assistant_message_preview", String(200)),
+    Column("user_message_length", Integer),
+    Column("assistant_message_length", Integer),
+)
+
+# Rows are generated in SQL; hex(randomblob(n)) is 2n incompressible characters
+ROWS = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)"
+METADATA_VALUES = "i, i / 100 + 1, 'model-' || (i % 4), i % 5000, i % 3000"
+HASHES = "hex(randomblob(32)), hex(randomblob(32))"
+PREVIEWS = "hex(randomblob(100)), hex(randomblob(100))"
+
+LAYOUTS: list[tuple[str, MetaData, Table, list[str]]] = [
+    (
+        "inline text (original)",
+        inline_metadata,
+        inline_exchanges,
+        [
+            "INSERT INTO exchanges (id, conversation_id, model, input_tokens,"
+            " output_tokens, user_message, assistant_message) "
+            f"{ROWS} SELECT {METADATA_VALUES},"
+            " hex(randomblob(:size / 2)), hex(randomblob(:size / 2)) FROM n"
+        ],
+    ),
+    (
+        "hashes + previews (pre-split)",
+        hashed_metadata,
+        hashed_exchanges,
+        [
+            "INSERT INTO exchanges (id, conversation_id, model, input_tokens,"
+            " output_tokens, user_message_hash, assistant_message_hash,"
+            " user_message_preview, assistant_message_preview,"
+            " user_message_length, assistant_message_length) "
+            f"{ROWS} SELECT {METADATA_VALUES}, {HASHES}, {PREVIEWS},"
+            " :size, :size FROM n"
+        ],
+    ),
+    (
+        "narrow + exchange_bodies (split)",
+        Base.metadata,
+        Exchange.__table__,
+        [
+            "INSERT INTO exchanges (id, conversation_id, model, input_tokens,"
+            " output_tokens, user_message_length, assistant_message_length) "
+            f"{ROWS} SELECT {METADATA_VALUES}, :size, :size FROM n",
+            "INSERT INTO exchange_bodies (exchange_id, user_message_hash,"
+            " assistant_message_hash, user_message_preview, assistant_message_preview) "
+            f"{ROWS} SELECT i, {HASHES}, {PREVIEWS} FROM n",
+        ],
+    ),
+]
+
+
+def queries(table: Table) -> list[tuple[str, Select]]:
+    return [
+        (
+            "token sum",
+            select(func.sum(table.c.input_tokens), func.sum(table.c.output_tokens)),
+        ),
+        (
+            "token sum by model",
+            select(
+                table.c.model, func.sum(table.c.input_tokens + table.c.output_tokens)
+            ).group_by(table.c.model),
+        ),
+    ]
+
+
+async def time_query(engine: AsyncEngine, query: Select, repeats: int) -> float:
+    async with engine.connect() as conn:
+        with Timer() as timer:
+            for _ in range(repeats):
+                (await conn.execute(query)).all()
+    return timer.elapsed
+
+
+async def measure(
+    label: str,
+    metadata: MetaData,
+    table: Table,
+    inserts: list[str],
+    rows: int,
+    size: int,
+) -> None:
+    # Exchanges are generated without sessions, conversations or blobs
+    database = temporary_database(metadata=metadata, foreign_keys=False)
+    async with database as (engine, _):
+        async with engine.begin() as conn:
+            for statement in inserts:
+                await conn.execute(text(statement), {"rows": rows, "size": size})
+        path = engine.url.database
+        print(f"{label}: {os.path.getsize(path) / 1024 / 1024:.1f} MiB database")
+
+        for name, query in queries(table):
+            # A fresh pool means an empty SQLite page cache for the first run
+            await engine.dispose()
+            cold = await time_query(engine, query, 1)
+            warm = await time_query(engine, query, REPEATS)
+            report(f"  {name} (cold)", 1, cold)
+            report(f"  {name} (warm)", REPEATS, warm)
+        print()
+
+
+async def run(rows: int, size: int) -> None:
+    print(f"{rows} exchanges, {size}-character messages\n")
+    for label, metadata, table, inserts in LAYOUTS:
+        await measure(label, metadata, table, inserts, rows, size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--message-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.message_size))
+
+
+if __name__ == "__main__":
+    main()
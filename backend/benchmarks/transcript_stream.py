@@ -0,0 +1,208 @@
+"""Reading a whole 100k-exchange conversation: NDJSON stream versus pages.
+
+Seeds one conversation, then reads all of it three ways, each in a fresh
+process so that peak RSS is its own:
+
+- ndjson stream: GET /api/conversations/{id}/exchanges.ndjson
+- cursor pages: GET /api/exchanges/by-conversation/{id}, 200 at a time
+- one response: every exchange loaded and encoded as a single page
+
+The app is called directly as an ASGI application and the body is counted
+and dropped as it arrives, so the figures are the server's: time to first
+byte, total time, and peak RSS above the process's size before the read.
+
+Usage: python -m benchmarks.transcript_stream [--count 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.responses import page_response
+from app.db.session import engine_options, get_async_db, get_async_read_db
+from app.db.sqlite import apply_foreign_keys, apply_storage_profile
+from app.schemas import ExchangeResponse
+from app.services.session_service import SessionService
+from app.services.settings import DatabaseSettings, PerformanceSettings
+from benchmarks.bulk_ingest import exchange
+from benchmarks.common import api_client, temporary_database
+
+BATCH = 1000
+PAGE_SIZE = 200
+STRATEGIES = ("ndjson stream", "cursor pages", "one response")
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def asgi_get(
+    app: Any, path: str, query: str, on_body: Callable[[bytes], None]
+) -> int:
+    """GET ``path`` from ``app``, passing each body chunk to ``on_body``."""
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            on_body(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def read(database_url: str, conversation_id: int, strategy: str) -> dict:
+    from app.main import app
+
+    url = make_url(database_url)
+    engine = create_async_engine(
+        url, **engine_options(url, DatabaseSettings(), asynchronous=True)
+    )
+    apply_storage_profile(engine.sync_engine, PerformanceSettings())
+    apply_foreign_keys(engine.sync_engine)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_session():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = get_session
+    app.dependency_overrides[get_async_read_db] = get_session
+
+    received = 0
+    first_byte: float | None = None
+    chunks: list[bytes] = []
+
+    def on_body(body: bytes) -> None:
+        nonlocal received, first_byte
+        if body and first_byte is None:
+            first_byte = time.perf_counter()
+        received += len(body)
+
+    # Warm up: connect, compile the app's first queries
+    await asgi_get(app, f"/api/conversations/{conversation_id}", "", lambda _: None)
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+    if strategy == "ndjson stream":
+        path = f"/api/conversations/{conversation_id}/exchanges.ndjson"
+        await asgi_get(app, path, "", on_body)
+    elif strategy == "cursor pages":
+        cursor = None
+        while True:
+            query = f"page_size={PAGE_SIZE}" + (f"&cursor={cursor}" if cursor else "")
+
+            def keep(body: bytes) -> None:
+                on_body(body)
+                chunks.append(body)
+
+            await asgi_get(
+                app, f"/api/exchanges/by-conversation/{conversation_id}", query, keep
+            )
+            cursor = json.loads(b"".join(chunks))["next_cursor"]
+            chunks.clear()
+            if cursor is None:
+                break
+    else:
+        async with factory() as db:
+            rows, total, _ = await SessionService(db).get_exchanges_by_conversation(
+                conversation_id, page_size=10**9, rows=True
+            )
+            response = page_response(
+                rows, ExchangeResponse.model_fields, total, 1, len(rows), None
+            )
+            on_body(response.body)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return {
+        "ttfb": (first_byte or time.perf_counter()) - started,
+        "elapsed": elapsed,
+        "bytes": received,
+        "rss": peak_rss_mib() - baseline,
+    }
+
+
+def child(database_url: str, conversation_id: int, strategy: str, queue) -> None:
+    queue.put(asyncio.run(read(database_url, conversation_id, strategy)))
+
+
+async def seed(client, count: int) -> int:
+    session = (await client.post("/api/sessions", json={"name": "b"})).json()
+    conversation = (
+        await client.post(
+            "/api/conversations", json={"session_id": session["id"], "title": "b"}
+        )
+    ).json()
+    for start in range(0, count, BATCH):
+        items = [
+            exchange(conversation["id"], i)
+            for i in range(start, min(count, start + BATCH))
+        ]
+        response = await client.post("/api/exchanges/bulk", json={"items": items})
+        response.raise_for_status()
+    return conversation["id"]
+
+
+async def run(count: int) -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with api_client(session_factory) as client:
+            conversation_id = await seed(client, count)
+        database_url = engine.url.render_as_string(hide_password=False)
+
+        context = multiprocessing.get_context("spawn")
+        print(
+            f"{'strategy':<16} {'exchanges':>10} {'MiB sent':>9} {'TTFB ms':>9}"
+            f" {'total s':>8} {'peak RSS +MiB':>14}"
+        )
+        for strategy in STRATEGIES:
+            queue = context.Queue()
+            process = context.Process(
+                target=child, args=(database_url, conversation_id, strategy, queue)
+            )
+            process.start()
+            process.join()
+            if process.exitcode:
+                raise RuntimeError(f"{strategy} failed")
+            result = queue.get()
+            print(
+                f"{strategy:<16} {count:>10} {result['bytes'] / 2**20:>9.1f}"
+                f" {result['ttfb'] * 1000:>9.1f} {result['elapsed']:>8.2f}"
+                f" {result['rss']:>14.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(run(args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Sustained exchange ingest: the ingest WebSocket versus the REST endpoints.
+
+Runs the app under uvicorn on a loopback port and records ``--count``
+exchanges per strategy, each into a fresh conversation:
+
+- POST /api/exchanges from ``--clients`` concurrent keep-alive clients,
+  once committing each exchange and once through the batched writer
+  (``--single-count`` exchanges, as these are far slower)
+- POST /api/exchanges/bulk, ``--batch-size`` exchanges per request
+- /api/ingest/ws, one record per frame and ``--frame-size`` per frame,
+  sending whenever there is credit
+
+Client and server share one event loop (and CPU), as a local recorder
+would. Throughput is records acknowledged per second, end to end.
+
+Usage: python -m benchmarks.websocket_ingest [--count 20000] [--clients 8]
+       [--single-count 2000]
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+import uvicorn
+from websockets.asyncio.client import connect
+
+from app.services.ingest_writer import ExchangeBatchWriter
+from app.services.settings import PerformanceSettings
+from benchmarks.bulk_ingest import exchange
+from benchmarks.common import Timer, api_client, report, temporary_database
+
+
+async def post_single(base_url: str, conversation_id: int, count: int, clients: int):
+    next_index = iter(range(count))
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for i in next_index:
+            response = await client.post(
+                "/api/exchanges", json=exchange(conversation_id, i)
+            )
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+
+
+async def post_bulk(base_url: str, conversation_id: int, count: int, batch_size: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for start in range(0, count, batch_size):
+            items = [
+                exchange(conversation_id, i)
+                for i in range(start, min(start + batch_size, count))
+            ]
+            response = await client.post("/api/exchanges/bulk", json={"items": items})
+            response.raise_for_status()
+
+
+async def websocket_ingest(
+    base_url: str, conversation_id: int, count: int, frame_size: int
+) -> None:
+    uri = base_url.replace("http://", "ws://") + "/api/ingest/ws"
+    async with connect(uri, max_size=None) as websocket:
+        credit = json.loads(await websocket.recv())["credit"]
+        granted = asyncio.Event()
+        acked = 0
+
+        async def receive_acks() -> None:
+            nonlocal credit, acked
+            while acked < count:
+                ack = json.loads(await websocket.recv())
+                if ack["errors"]:
+                    raise RuntimeError(ack["errors"][0]["detail"])
+                acked += len(ack["acks"])
+                credit += ack["credit"]
+                granted.set()
+
+        receiver = asyncio.create_task(receive_acks())
+        sent = 0
+        while sent < count:
+            size = min(frame_size, count - sent, credit)
+            if size == 0:
+                granted.clear()
+                await granted.wait()
+                continue
+            records = [
+                {"seq": i, **exchange(conversation_id, i)}
+                for i in range(sent, sent + size)
+            ]
+            await websocket.send(json.dumps(records if frame_size > 1 else records[0]))
+            credit -= size
+            sent += size
+        await receiver
+
+
+async def run(
+    count: int, single_count: int, clients: int, batch_size: int, frame_size: int
+) -> None:
+    from app.main import app
+
+    async with temporary_database() as (_, session_factory):
+        async with api_client(session_factory) as seed_client:
+            server = uvicorn.Server(
+                uvicorn.Config(
+                    app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"
+                )
+            )
+            serving = asyncio.create_task(server.serve())
+            while not server.started:
+                await asyncio.sleep(0.01)
+            port = server.servers[0].sockets[0].getsockname()[1]
+            base_url = f"http://127.0.0.1:{port}"
+            writer = ExchangeBatchWriter.from_settings(
+                session_factory, PerformanceSettings()
+            )
+
+            async def conversation() -> int:
+                session = (
+                    await seed_client.post("/api/sessions", json={"name": "b"})
+                ).json()
+                created = await seed_client.post(
+                    "/api/conversations",
+                    json={"session_id": session["id"], "title": "b"},
+                )
+                return created.json()["id"]
+
+            strategies = [
+                (
+                    f"POST /api/exchanges, {clients} clients",
+                    lambda c, n: post_single(base_url, c, n, clients),
+                    single_count,
+                    False,
+                ),
+                (
+                    f"POST /api/exchanges, {clients} clients, batched",
+                    lambda c, n: post_single(base_url, c, n, clients),
+                    single_count,
+                    True,
+                ),
+                (
+                    f"POST /api/exchanges/bulk (x{batch_size})",
+                    lambda c, n: post_bulk(base_url, c, n, batch_size),
+                    count,
+                    False,
+                ),
+                (
+                    "ws /api/ingest/ws, 1 per frame",
+                    lambda c, n: websocket_ingest(base_url, c, n, 1),
+                    count,
+                    False,
+                ),
+                (
+                    f"ws /api/ingest/ws, {frame_size} per frame",
+                    lambda c, n: websocket_ingest(base_url, c, n, frame_size),
+                    count,
+                    False,
+                ),
+            ]
+            try:
+                for label, strategy, records, batched in strategies:
+                    conversation_id = await conversation()
+                    if batched:
+                        await writer.start()
+                    app.state.exchange_writer = writer if batched else None
+                    with Timer() as timer:
+                        await strategy(conversation_id, records)
+                    if batched:
+                        await writer.stop()
+                    report(label, records, timer.elapsed)
+            finally:
+                app.state.exchange_writer = None
+                server.should_exit = True
+                await serving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--single-count", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--frame-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(
+        run(
+            args.count,
+            args.single_count,
+            args.clients,
+            args.batch_size,
+            args.frame_size,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""API tests for the session/conversation lookup cache."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.models.conversation import Conversation
+from app.services.lookup_cache import bump_lookups_version, lookup_cache
+from tests.conftest import TestSessionLocal, statement_summary
+
+
+async def _conversation(client: AsyncClient) -> tuple[int, int]:
+    session = (await client.post("/api/sessions", json={"name": "s"})).json()
+    conversation = (
+        await client.post(
+            "/api/conversations", json={"session_id": session["id"], "title": "t"}
+        )
+    ).json()
+    return session["id"], conversation["id"]
+
+
+@pytest.mark.api
+class TestLookupCache:
+    """Test cases for the parent existence checks served from the lookup cache."""
+
+    async def test_list_routes_skip_existence_queries(
+        self, async_client: AsyncClient, query_recorder: list
+    ) -> None:
+        """Cached parents should cost list routes no existence query."""
+        session_id, conversation_id = await _conversation(async_client)
+        for url in (
+            f"/api/exchanges/by-conversation/{conversation_id}",
+            f"/api/conversations/by-session/{session_id}",
+        ):
+            lookup_cache.clear()
+            query_recorder.clear()
+            assert (await async_client.get(url)).status_code == 200
+            cold = statement_summary(query_recorder)
+
+            hits = lookup_cache.metrics().hits
+            query_recorder.clear()
+            assert (await async_client.get(url)).status_code == 200
+            warm = statement_summary(query_recorder)
+            assert lookup_cache.metrics().hits == hits + 1
+            # No version check and no parent lookup: the version query and the page
+            assert "SELECT cache_versions" in cold
+            assert len(warm) == 2
+            assert len(cold) == 4
+
+    async def test_delete_invalidates(self, async_client: AsyncClient) -> None:
+        """Deleted sessions and conversations should stop being found at once."""
+        session_id, conversation_id = await _conversation(async_client)
+        _, other = await _conversation(async_client)
+        for url in (
+            f"/api/conversations/{conversation_id}/exchanges.ndjson",
+            f"/api/conversations/{other}/exchanges.ndjson",
+            f"/api/conversations/by-session/{session_id}",
+        ):
+            assert (await async_client.get(url)).status_code == 200
+
+        await async_client.delete(f"/api/conversations/{other}")
+        response = await async_client.get(
+            f"/api/conversations/{other}/exchanges.ndjson"
+        )
+        assert response.status_code == 404
+
+        await async_client.delete(f"/api/sessions/{session_id}")
+        for url in (
+            f"/api/conversations/{conversation_id}/exchanges.ndjson",
+            f"/api/conversations/by-session/{session_id}",
+        ):
+            assert (await async_client.get(url)).status_code == 404
+
+    async def test_other_process_delete(
+        self, async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A delete elsewhere should be seen once the shared version is checked."""
+        _, conversation_id = await _conversation(async_client)
+        url = f"/api/conversations/{conversation_id}/exchanges.ndjson"
+        assert (await async_client.get(url)).status_code == 200
+
+        # Another worker deletes the conversation; this process's entry survives
+        async with TestSessionLocal() as db:
+            await db.execute(
+                delete(Conversation).where(Conversation.id == conversation_id)
+            )
+            await bump_lookups_version(db)
+            await db.commit()
+        assert (await async_client.get(url)).status_code == 200
+
+        monkeypatch.setattr(lookup_cache, "sync_interval", 0)
+        assert (await async_client.get(url)).status_code == 404
+
+    async def test_metrics(self, async_client: AsyncClient) -> None:
+        """GET /api/cache/metrics should report the counters."""
+        _, conversation_id = await _conversation(async_client)
+        await async_client.get(f"/api/conversations/{conversation_id}/exchanges.ndjson")
+        await async_client.get("/api/conversations/99999/exchanges.ndjson")
+        response = await async_client.get("/api/cache/metrics")
+        assert response.status_code == 200
+        metrics = response.json()
+        assert metrics["hits"] >= 1
+        assert metrics["misses"] >= 1
+        assert metrics["size"] >= 1
+        assert metrics["version"] == 0
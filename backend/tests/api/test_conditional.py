@@ -0,0 +1,154 @@
+"""API tests for ETags and conditional GETs."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.conditional import CACHE_CONTROL
+
+
+async def _create_conversation(client: AsyncClient) -> tuple[int, int]:
+    session = (await client.post("/api/sessions", json={"name": "Polled"})).json()
+    conversation = (
+        await client.post(
+            "/api/conversations", json={"session_id": session["id"], "title": "Polled"}
+        )
+    ).json()
+    return session["id"], conversation["id"]
+
+
+async def _add_exchange(client: AsyncClient, conversation_id: int) -> dict:
+    response = await client.post(
+        "/api/exchanges",
+        json={
+            "conversation_id": conversation_id,
+            "user_message": "Question",
+            "assistant_message": "Answer",
+            "input_tokens": 1,
+        },
+    )
+    return response.json()
+
+
+async def _revalidate(client: AsyncClient, url: str, **params) -> tuple[int, str]:
+    """GET ``url`` twice, the second time conditionally; return its status and ETag."""
+    first = await client.get(url, params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    second = await client.get(url, params=params, headers={"If-None-Match": etag})
+    return second.status_code, etag
+
+
+@pytest.mark.api
+class TestConditionalGet:
+    """Test cases for ETag, If-None-Match and Cache-Control handling."""
+
+    async def test_unchanged_list_answers_304_with_one_query(
+        self, async_client: AsyncClient, query_recorder: list
+    ) -> None:
+        """A matching If-None-Match should cost one query and send no body."""
+        session_id, conversation_id = await _create_conversation(async_client)
+        await _add_exchange(async_client, conversation_id)
+        for url in (
+            "/api/sessions",
+            f"/api/conversations/by-session/{session_id}",
+            f"/api/exchanges/by-conversation/{conversation_id}",
+        ):
+            response = await async_client.get(url)
+            assert response.headers["cache-control"] == CACHE_CONTROL
+            etag = response.headers["etag"]
+
+            query_recorder.clear()
+            response = await async_client.get(url, headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+            assert response.headers["cache-control"] == CACHE_CONTROL
+            assert len(query_recorder) == 1
+
+    async def test_exchange_list_changes(self, async_client: AsyncClient) -> None:
+        """Adding or deleting an exchange should change the list's ETag."""
+        _, conversation_id = await _create_conversation(async_client)
+        url = f"/api/exchanges/by-conversation/{conversation_id}"
+        etags = set()
+
+        status_code, etag = await _revalidate(async_client, url)
+        assert status_code == 304
+        etags.add(etag)
+        exchange = await _add_exchange(async_client, conversation_id)
+        status_code, etag = await _revalidate(async_client, url)
+        etags.add(etag)
+        await async_client.delete(f"/api/exchanges/{exchange['id']}")
+        await _add_exchange(async_client, conversation_id)
+        status_code, etag = await _revalidate(async_client, url)
+        etags.add(etag)
+        status_code, etag = await _revalidate(async_client, url, view="summary")
+        etags.add(etag)
+
+        assert len(etags) == 4
+
+    async def test_session_lists_follow_counters_and_renames(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Counter changes and renames should change the parents' list ETags."""
+        session_id, conversation_id = await _create_conversation(async_client)
+        conversations_url = f"/api/conversations/by-session/{session_id}"
+        _, sessions_etag = await _revalidate(async_client, "/api/sessions")
+        _, conversations_etag = await _revalidate(async_client, conversations_url)
+
+        await _add_exchange(async_client, conversation_id)
+        _, new_sessions_etag = await _revalidate(async_client, "/api/sessions")
+        assert new_sessions_etag != sessions_etag
+        _, new_conversations_etag = await _revalidate(async_client, conversations_url)
+        assert new_conversations_etag != conversations_etag
+
+        await async_client.put(
+            f"/api/conversations/{conversation_id}", json={"title": "Renamed"}
+        )
+        _, renamed_etag = await _revalidate(async_client, conversations_url)
+        assert renamed_etag != new_conversations_etag
+
+    async def test_single_resources(self, async_client: AsyncClient) -> None:
+        """Sessions, conversations and exchanges should revalidate by body."""
+        session_id, conversation_id = await _create_conversation(async_client)
+        exchange = await _add_exchange(async_client, conversation_id)
+        for url in (
+            f"/api/sessions/{session_id}",
+            f"/api/conversations/{conversation_id}",
+            f"/api/exchanges/{exchange['id']}",
+        ):
+            status_code, _ = await _revalidate(async_client, url)
+            assert status_code == 304
+
+        _, etag = await _revalidate(async_client, f"/api/sessions/{session_id}")
+        await async_client.put(f"/api/sessions/{session_id}", json={"name": "Renamed"})
+        response = await async_client.get(
+            f"/api/sessions/{session_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
+        assert response.headers["etag"] != etag
+
+    async def test_if_none_match_forms(self, async_client: AsyncClient) -> None:
+        """Lists of tags, weak tags and * should match; other tags should not."""
+        response = await async_client.get("/api/sessions")
+        etag = response.headers["etag"].removeprefix("W/")
+        for header, status_code in (
+            (f'"other", {etag}', 304),
+            (f"W/{etag}", 304),
+            ("*", 304),
+            ('"other"', 200),
+        ):
+            response = await async_client.get(
+                "/api/sessions", headers={"If-None-Match": header}
+            )
+            assert response.status_code == status_code
+
+    async def test_missing_resources_still_404(self, async_client: AsyncClient) -> None:
+        """Unknown parents should answer 404 whatever If-None-Match says."""
+        for url in (
+            "/api/exchanges/by-conversation/99999",
+            "/api/conversations/by-session/99999",
+            "/api/sessions/99999",
+        ):
+            response = await async_client.get(url, headers={"If-None-Match": "*"})
+            assert response.status_code == 404
@@ -1,8 +1,12 @@
 """API tests for conversation endpoints."""
 
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from tests.conftest import statement_summary
+
 
 @pytest.mark.api
 class TestConversationEndpoints:
@@ -142,6 +146,42 @@ class TestConversationEndpoints:
         assert len(data["items"]) == 2
         assert data["total"] == 5
 
+    async def test_list_conversations_cursor_pagination(
+        self, async_client: AsyncClient, sample_session_data: dict
+    ) -> None:
+        """Should walk every conversation exactly once by following next_cursor."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+        for i in range(5):
+            await async_client.post(
+                "/api/conversations",
+                json={"title": f"Conversation {i}", "session_id": session_id},
+            )
+
+        url = f"/api/conversations/by-session/{session_id}?page_size=2"
+        first = (await async_client.get(url)).json()
+        second = (await async_client.get(f"{url}&cursor={first['next_cursor']}")).json()
+        third = (await async_client.get(f"{url}&cursor={second['next_cursor']}")).json()
+
+        ids = [c["id"] for page in (first, second, third) for c in page["items"]]
+        assert len(set(ids)) == 5
+        assert third["next_cursor"] is None
+
+    async def test_list_conversations_invalid_cursor(
+        self, async_client: AsyncClient, sample_session_data: dict
+    ) -> None:
+        """Should reject a malformed cursor."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+        response = await async_client.get(
+            f"/api/conversations/by-session/{session_id}?cursor=%%%"
+        )
+        assert response.status_code == 400
+
     async def test_update_conversation(
         self,
         async_client: AsyncClient,
@@ -230,3 +270,118 @@ class TestConversationEndpoints:
         # Verify conversation is also deleted
         get_response = await async_client.get(f"/api/conversations/{conv_id}")
         assert get_response.status_code == 404
+
+    async def test_conversation_counters_maintained(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_exchange_data: dict,
+    ) -> None:
+        """Session counters should follow conversation creates and deletes."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+
+        conv_ids = []
+        for i in range(2):
+            response = await async_client.post(
+                "/api/conversations",
+                json={"title": f"Conversation {i}", "session_id": session_id},
+            )
+            conv_ids.append(response.json()["id"])
+        await async_client.post(
+            "/api/exchanges",
+            json={**sample_exchange_data, "conversation_id": conv_ids[0]},
+        )
+
+        session = (await async_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["conversation_count"] == 2
+        assert session["exchange_count"] == 1
+
+        await async_client.delete(f"/api/conversations/{conv_ids[0]}")
+
+        session = (await async_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["conversation_count"] == 1
+        assert session["exchange_count"] == 0
+        assert session["total_input_tokens"] == 0
+        listing = (
+            await async_client.get(f"/api/conversations/by-session/{session_id}")
+        ).json()
+        assert listing["total"] == 1
+
+    async def test_write_round_trips(
+        self, async_client: AsyncClient, query_recorder: list
+    ) -> None:
+        """Creating a conversation should take two statements, updating one."""
+        session = (await async_client.post("/api/sessions", json={"name": "s"})).json()
+        query_recorder.clear()
+        response = await async_client.post(
+            "/api/conversations", json={"session_id": session["id"], "title": "t"}
+        )
+        assert response.status_code == 201
+        assert statement_summary(query_recorder) == [
+            "UPDATE sessions",
+            "INSERT conversations",
+        ]
+
+        query_recorder.clear()
+        response = await async_client.post(
+            "/api/conversations", json={"session_id": 99999, "title": "t"}
+        )
+        assert response.status_code == 404
+        assert statement_summary(query_recorder) == ["UPDATE sessions"]
+
+        conversation_id = (
+            await async_client.get(f"/api/conversations/by-session/{session['id']}")
+        ).json()["items"][0]["id"]
+        query_recorder.clear()
+        response = await async_client.put(
+            f"/api/conversations/{conversation_id}", json={"title": "u"}
+        )
+        assert response.status_code == 200
+        assert response.json()["title"] == "u"
+        assert statement_summary(query_recorder) == ["UPDATE conversations"]
+
+    async def test_stream_exchanges_ndjson(self, async_client: AsyncClient) -> None:
+        """The NDJSON transcript should hold every exchange, oldest first."""
+        session = (await async_client.post("/api/sessions", json={"name": "s"})).json()
+        conversation = (
+            await async_client.post(
+                "/api/conversations", json={"session_id": session["id"], "title": "t"}
+            )
+        ).json()
+        url = f"/api/conversations/{conversation['id']}/exchanges.ndjson"
+
+        response = await async_client.get(url)
+        assert response.status_code == 200
+        assert response.content == b""
+
+        items = [
+            {
+                "conversation_id": conversation["id"],
+                "user_message": f"Question {i} é",
+                "assistant_message": f"Answer {i}",
+                "input_tokens": i,
+            }
+            for i in range(5)
+        ]
+        await async_client.post("/api/exchanges/bulk", json={"items": items})
+        page = (
+            await async_client.get(
+                f"/api/exchanges/by-conversation/{conversation['id']}"
+            )
+        ).json()
+
+        response = await async_client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.content.splitlines()
+        assert [json.loads(line) for line in lines] == page["items"]
+
+    async def test_stream_exchanges_ndjson_not_found(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Streaming an unknown conversation should answer 404."""
+        response = await async_client.get("/api/conversations/99999/exchanges.ndjson")
+        assert response.status_code == 404
@@ -0,0 +1,287 @@
+"""API tests for the server-sent exchange event streams."""
+
+import asyncio
+import json
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.events import exchange_events
+from app.services.settings import get_settings
+from tests.conftest import statement_summary
+
+
+async def _until(condition: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+class EventStream:
+    """An open SSE request, driven through ASGI directly.
+
+    httpx's ASGITransport collects the whole body before returning, which an
+    endless stream never finishes. gzip-encoded bodies are decoded.
+    """
+
+    def __init__(self, path: str, topic: tuple, headers: dict | None = None):
+        self.path = path
+        self.topic = topic
+        self.headers = [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ]
+        self.status: int | None = None
+        self.response_headers: dict[str, str] = {}
+        self._decode: Callable[[bytes], bytes] | None = None
+        self.events: asyncio.Queue[dict] = asyncio.Queue()
+        self.received = b""
+        self._buffer = b""
+        self._disconnect = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def _receive(self) -> dict:
+        await self._disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.response_headers = {
+                name.decode(): value.decode() for name, value in message["headers"]
+            }
+            if self.response_headers.get("content-encoding") == "gzip":
+                self._decode = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+            return
+        body = message.get("body", b"")
+        body = self._decode(body) if self._decode else body
+        self.received += body
+        self._buffer += body
+        *frames, self._buffer = self._buffer.split(b"\n\n")
+        for frame in frames:
+            fields: dict[str, Any] = {}
+            for line in frame.decode().split("\n"):
+                name, _, value = line.partition(": ")
+                if name:
+                    fields[name] = value
+            if "data" in fields:
+                fields["data"] = json.loads(fields["data"])
+                self.events.put_nowait(fields)
+
+    async def __aenter__(self) -> "EventStream":
+        path, _, query = self.path.partition("?")
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("test", 80),
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"test"), *self.headers],
+        }
+        self._task = asyncio.create_task(app(scope, self._receive, self._send))
+        await _until(
+            lambda: self._task.done() or exchange_events.subscriber_count(self.topic)
+        )
+        return self
+
+    async def next(self) -> dict:
+        return await asyncio.wait_for(self.events.get(), 5)
+
+    async def __aexit__(self, *exc: object) -> None:
+        self._disconnect.set()
+        await asyncio.wait_for(self._task, 5)
+
+
+async def _conversation(client: AsyncClient, session_id: int | None = None):
+    if session_id is None:
+        session = (await client.post("/api/sessions", json={"name": "s"})).json()
+        session_id = session["id"]
+    conversation = (
+        await client.post(
+            "/api/conversations", json={"session_id": session_id, "title": "t"}
+        )
+    ).json()
+    return session_id, conversation["id"]
+
+
+async def _exchange(client: AsyncClient, conversation_id: int, text: str) -> dict:
+    response = await client.post(
+        "/api/exchanges",
+        json={
+            "conversation_id": conversation_id,
+            "user_message": text,
+            "assistant_message": "answer",
+        },
+    )
+    return response.json()
+
+
+@pytest.mark.api
+class TestExchangeEvents:
+    """Test cases for GET /api/conversations|sessions/{id}/events."""
+
+    async def test_conversation_stream(self, async_client: AsyncClient) -> None:
+        """Created and deleted exchanges should be announced as they commit."""
+        _, conversation_id = await _conversation(async_client)
+        async with EventStream(
+            f"/api/conversations/{conversation_id}/events",
+            ("conversation", conversation_id),
+        ) as stream:
+            assert stream.status == 200
+            exchange = await _exchange(async_client, conversation_id, "first")
+            event = await stream.next()
+            assert event["event"] == "exchange.created"
+            assert event["id"] == str(exchange["id"])
+            assert event["data"] == exchange
+
+            await async_client.post(
+                "/api/exchanges/bulk",
+                json={
+                    "items": [
+                        {
+                            "conversation_id": conversation_id,
+                            "user_message": f"bulk {i}",
+                            "assistant_message": "answer",
+                        }
+                        for i in range(2)
+                    ]
+                },
+            )
+            assert [(await stream.next())["data"]["user_message"] for _ in "ab"] == [
+                "bulk 0",
+                "bulk 1",
+            ]
+
+            await async_client.delete(f"/api/exchanges/{exchange['id']}")
+            event = await stream.next()
+            assert event["event"] == "exchange.deleted"
+            assert "id" not in event
+            assert event["data"] == {
+                "id": exchange["id"],
+                "conversation_id": conversation_id,
+            }
+        assert exchange_events.subscriber_count(("conversation", conversation_id)) == 0
+
+    async def test_session_stream(self, async_client: AsyncClient) -> None:
+        """A session's stream should carry all its conversations, and only them."""
+        session_id, first = await _conversation(async_client)
+        _, second = await _conversation(async_client, session_id)
+        _, other = await _conversation(async_client)
+        async with EventStream(
+            f"/api/sessions/{session_id}/events", ("session", session_id)
+        ) as stream:
+            await _exchange(async_client, other, "elsewhere")
+            await _exchange(async_client, first, "one")
+            await _exchange(async_client, second, "two")
+            assert (await stream.next())["data"]["user_message"] == "one"
+            assert (await stream.next())["data"]["user_message"] == "two"
+            assert stream.events.empty()
+
+    async def test_compressed_stream_opens_at_once(
+        self, async_client: AsyncClient
+    ) -> None:
+        """A gzip client should get the headers before any event is sent."""
+        _, conversation_id = await _conversation(async_client)
+        async with EventStream(
+            f"/api/conversations/{conversation_id}/events",
+            ("conversation", conversation_id),
+            {"Accept-Encoding": "gzip"},
+        ) as stream:
+            assert stream.status == 200
+            await _until(lambda: stream.received == b"retry: 3000\n\n")
+            assert stream.response_headers["content-encoding"] == "gzip"
+            assert stream.response_headers["content-type"].startswith(
+                "text/event-stream"
+            )
+            exchange = await _exchange(async_client, conversation_id, "first")
+            assert (await stream.next())["data"] == exchange
+
+    async def test_resume_from_last_event_id(self, async_client: AsyncClient) -> None:
+        """Reconnecting should replay the exchanges created since the last id."""
+        _, conversation_id = await _conversation(async_client)
+        seen = await _exchange(async_client, conversation_id, "seen")
+        await _exchange(async_client, conversation_id, "missed 1")
+        await _exchange(async_client, conversation_id, "missed 2")
+        topic = ("conversation", conversation_id)
+        url = f"/api/conversations/{conversation_id}/events"
+
+        missed = ["missed 1", "missed 2"]
+        for headers, path in (
+            ({"Last-Event-ID": str(seen["id"])}, url),
+            ({}, f"{url}?last_event_id={seen['id']}"),
+        ):
+            async with EventStream(path, topic, headers) as stream:
+                for text in missed:
+                    assert (await stream.next())["data"]["user_message"] == text
+                live = await _exchange(async_client, conversation_id, "live")
+                assert (await stream.next())["id"] == str(live["id"])
+                assert stream.events.empty()
+            missed.append("live")
+
+        async with EventStream(url, topic) as stream:
+            await _exchange(async_client, conversation_id, "only live")
+            assert (await stream.next())["data"]["user_message"] == "only live"
+
+    async def test_fan_out_costs_no_queries(
+        self, async_client: AsyncClient, query_recorder: list
+    ) -> None:
+        """Hundreds of subscribers should share one frame and add no queries."""
+        session_id, conversation_id = await _conversation(async_client)
+        await _exchange(async_client, conversation_id, "warm up")
+        query_recorder.clear()
+        await _exchange(async_client, conversation_id, "unwatched")
+        unwatched = statement_summary(query_recorder)
+
+        subscriptions = [
+            exchange_events.subscribe(("conversation", conversation_id))
+            for _ in range(300)
+        ] + [exchange_events.subscribe(("session", session_id)) for _ in range(100)]
+        try:
+            query_recorder.clear()
+            exchange = await _exchange(async_client, conversation_id, "watched")
+            assert statement_summary(query_recorder) == unwatched
+            events = [await s.get() for s in subscriptions]
+            assert all(event is events[0] for event in events)
+            assert events[0][0] == exchange["id"]
+        finally:
+            for subscription in subscriptions:
+                exchange_events.unsubscribe(subscription)
+
+    async def test_slow_consumer_is_dropped(
+        self, async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A subscriber that falls behind should be cut off, not buffered."""
+        _, conversation_id = await _conversation(async_client)
+        topic = ("conversation", conversation_id)
+        subscription = exchange_events.subscribe(topic, queue_size=2)
+        for event_id in range(3):
+            exchange_events.publish([topic], b"data: {}\n\n", event_id)
+        assert subscription.dropped
+        assert await subscription.get() is None
+        assert exchange_events.subscriber_count(topic) == 0
+
+        monkeypatch.setattr(get_settings().performance, "events_queue_size", 1)
+        async with EventStream(
+            f"/api/conversations/{conversation_id}/events", topic
+        ) as stream:
+            for event_id in range(3):
+                exchange_events.publish([topic], b"data: {}\n\n", event_id)
+            # The response ends on its own; the client would reconnect
+            await asyncio.wait_for(asyncio.shield(stream._task), 5)
+            assert exchange_events.subscriber_count(topic) == 0
+
+    async def test_not_found(self, async_client: AsyncClient) -> None:
+        """Unknown conversations and sessions should answer 404."""
+        for url in ("/api/conversations/99999/events", "/api/sessions/99999/events"):
+            response = await async_client.get(url)
+            assert response.status_code == 404
@@ -1,8 +1,12 @@
 """API tests for exchange endpoints."""
 
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
+from tests.conftest import statement_summary
+
 
 @pytest.mark.api
 class TestExchangeEndpoints:
@@ -252,6 +256,65 @@ class TestExchangeEndpoints:
         assert len(data["items"]) == 2
         assert data["total"] == 5
 
+    async def test_list_exchanges_cursor_pagination(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+    ) -> None:
+        """Should return exchanges oldest first across cursor pages."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_response = await async_client.post("/api/conversations", json=conv_data)
+        conv_id = conv_response.json()["id"]
+
+        for i in range(5):
+            await async_client.post(
+                "/api/exchanges",
+                json={
+                    "user_message": f"Message {i}",
+                    "assistant_message": f"Response {i}",
+                    "conversation_id": conv_id,
+                },
+            )
+
+        messages = []
+        url = f"/api/exchanges/by-conversation/{conv_id}?page_size=2"
+        response = await async_client.get(url)
+        while True:
+            data = response.json()
+            messages.extend(item["user_message"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            response = await async_client.get(f"{url}&cursor={data['next_cursor']}")
+
+        assert messages == [f"Message {i}" for i in range(5)]
+
+    async def test_list_exchanges_invalid_cursor(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+    ) -> None:
+        """Should reject a malformed cursor."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_response = await async_client.post("/api/conversations", json=conv_data)
+        conv_id = conv_response.json()["id"]
+
+        response = await async_client.get(
+            f"/api/exchanges/by-conversation/{conv_id}?cursor=bm90LWpzb24"
+        )
+        assert response.status_code == 400
+
     async def test_delete_exchange(
         self,
         async_client: AsyncClient,
@@ -315,3 +378,288 @@ class TestExchangeEndpoints:
         # Verify exchange is also deleted
         get_response = await async_client.get(f"/api/exchanges/{exchange_id}")
         assert get_response.status_code == 404
+
+    async def test_exchange_counters_maintained(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+        sample_exchange_data: dict,
+    ) -> None:
+        """Creating and deleting exchanges should update the aggregate counters."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_response = await async_client.post("/api/conversations", json=conv_data)
+        conv_id = conv_response.json()["id"]
+
+        exchange_data = {**sample_exchange_data, "conversation_id": conv_id}
+        exchange_ids = []
+        for _ in range(2):
+            response = await async_client.post("/api/exchanges", json=exchange_data)
+            exchange_ids.append(response.json()["id"])
+
+        conversation = (await async_client.get(f"/api/conversations/{conv_id}")).json()
+        assert conversation["exchange_count"] == 2
+        assert conversation["total_input_tokens"] == 20
+        assert conversation["total_output_tokens"] == 30
+
+        session = (await async_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["exchange_count"] == 2
+        assert session["total_input_tokens"] == 20
+        assert session["total_output_tokens"] == 30
+
+        await async_client.delete(f"/api/exchanges/{exchange_ids[0]}")
+
+        listing = (
+            await async_client.get(f"/api/exchanges/by-conversation/{conv_id}")
+        ).json()
+        assert listing["total"] == 1
+        session = (await async_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["exchange_count"] == 1
+        assert session["total_input_tokens"] == 10
+        assert session["total_output_tokens"] == 15
+
+    async def test_bulk_create_exchanges(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+    ) -> None:
+        """Should create a batch across conversations and return ids in order."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+
+        conv_ids = []
+        for _ in range(2):
+            conv_data = {**sample_conversation_data, "session_id": session_id}
+            conv_response = await async_client.post(
+                "/api/conversations", json=conv_data
+            )
+            conv_ids.append(conv_response.json()["id"])
+
+        items = [
+            {
+                "user_message": f"Message {i}",
+                "assistant_message": f"Response {i}",
+                "conversation_id": conv_ids[i % 2],
+                "input_tokens": 1,
+                "output_tokens": 2,
+            }
+            for i in range(6)
+        ]
+        response = await async_client.post("/api/exchanges/bulk", json={"items": items})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["errors"] == []
+        assert len(data["ids"]) == 6
+        assert data["ids"] == sorted(data["ids"])
+
+        for i, exchange_id in enumerate(data["ids"]):
+            exchange = (await async_client.get(f"/api/exchanges/{exchange_id}")).json()
+            assert exchange["user_message"] == f"Message {i}"
+            assert exchange["conversation_id"] == conv_ids[i % 2]
+
+        session = (await async_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["exchange_count"] == 6
+        assert session["total_input_tokens"] == 6
+        assert session["total_output_tokens"] == 12
+        conversation = (
+            await async_client.get(f"/api/conversations/{conv_ids[0]}")
+        ).json()
+        assert conversation["exchange_count"] == 3
+
+    async def test_bulk_create_reports_missing_conversations(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+    ) -> None:
+        """Should report per-item errors and still create the valid items."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_response = await async_client.post("/api/conversations", json=conv_data)
+        conv_id = conv_response.json()["id"]
+
+        items = [
+            {"user_message": "a", "assistant_message": "b", "conversation_id": conv_id},
+            {"user_message": "a", "assistant_message": "b", "conversation_id": 99999},
+            {"user_message": "c", "assistant_message": "d", "conversation_id": conv_id},
+        ]
+        response = await async_client.post("/api/exchanges/bulk", json={"items": items})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ids"][0] is not None
+        assert data["ids"][1] is None
+        assert data["ids"][2] is not None
+        assert len(data["errors"]) == 1
+        assert data["errors"][0]["index"] == 1
+        assert "99999" in data["errors"][0]["detail"]
+
+    async def test_bulk_create_all_rejected(self, async_client: AsyncClient) -> None:
+        """Should create nothing when no conversation exists."""
+        items = [
+            {"user_message": "a", "assistant_message": "b", "conversation_id": 99999}
+        ]
+        response = await async_client.post("/api/exchanges/bulk", json={"items": items})
+        assert response.status_code == 200
+        assert response.json()["ids"] == [None]
+
+    async def test_bulk_create_empty_batch(self, async_client: AsyncClient) -> None:
+        """Should reject an empty batch."""
+        response = await async_client.post("/api/exchanges/bulk", json={"items": []})
+        assert response.status_code == 422
+
+    async def test_create_exchange_batched(
+        self,
+        async_client: AsyncClient,
+        exchange_writer,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+        sample_exchange_data: dict,
+    ) -> None:
+        """With batched ingest, concurrent creates should be group-committed."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_response = await async_client.post("/api/conversations", json=conv_data)
+        conv_id = conv_response.json()["id"]
+
+        exchange_data = {**sample_exchange_data, "conversation_id": conv_id}
+        responses = await asyncio.gather(
+            *(
+                async_client.post("/api/exchanges", json=exchange_data)
+                for _ in range(10)
+            )
+        )
+        assert all(r.status_code == 201 for r in responses)
+        assert len({r.json()["id"] for r in responses}) == 10
+
+        missing = await async_client.post(
+            "/api/exchanges", json={**exchange_data, "conversation_id": 99999}
+        )
+        assert missing.status_code == 404
+
+        metrics = (await async_client.get("/api/ingest/metrics")).json()
+        assert metrics["mode"] == "batched"
+        assert metrics["running"] is True
+        assert metrics["records_written"] == 11
+        assert metrics["batches_flushed"] < 11
+
+    async def test_ingest_metrics_direct_mode(self, async_client: AsyncClient) -> None:
+        """Without a writer the metrics endpoint should report direct mode."""
+        response = await async_client.get("/api/ingest/metrics")
+        assert response.status_code == 200
+        assert response.json()["mode"] == "direct"
+        assert response.json()["running"] is False
+
+    async def test_list_exchanges_summary_view(
+        self,
+        async_client: AsyncClient,
+        query_recorder: list,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+    ) -> None:
+        """view=summary should return previews and lengths without loading bodies."""
+        session_response = await async_client.post(
+            "/api/sessions", json=sample_session_data
+        )
+        session_id = session_response.json()["id"]
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_response = await async_client.post("/api/conversations", json=conv_data)
+        conv_id = conv_response.json()["id"]
+
+        long_message = "Explain this code:\n" + "print('hi')\n" * 100
+        await async_client.post(
+            "/api/exchanges",
+            json={
+                "conversation_id": conv_id,
+                "user_message": long_message,
+                "assistant_message": "ok",
+            },
+        )
+        await async_client.post(
+            "/api/exchanges/bulk",
+            json={
+                "items": [
+                    {
+                        "conversation_id": conv_id,
+                        "user_message": long_message,
+                        "assistant_message": "ok",
+                    }
+                ]
+            },
+        )
+
+        query_recorder.clear()
+        response = await async_client.get(
+            f"/api/exchanges/by-conversation/{conv_id}", params={"view": "summary"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        for item in data["items"]:
+            assert "user_message" not in item
+            assert item["user_message_preview"] == long_message[:200]
+            assert item["user_message_length"] == len(long_message)
+            assert item["assistant_message_preview"] == "ok"
+            assert item["assistant_message_length"] == 2
+        assert not any("message_blobs" in statement for statement, _ in query_recorder)
+
+        # Full bodies are still fetched per exchange
+        exchange_id = data["items"][0]["id"]
+        detail = await async_client.get(f"/api/exchanges/{exchange_id}")
+        assert detail.json()["user_message"] == long_message
+
+    async def test_list_exchanges_invalid_view(self, async_client: AsyncClient) -> None:
+        """An unknown view should be rejected."""
+        response = await async_client.get(
+            "/api/exchanges/by-conversation/1", params={"view": "tiny"}
+        )
+        assert response.status_code == 422
+
+    async def test_create_exchange_round_trips(
+        self, async_client: AsyncClient, query_recorder: list
+    ) -> None:
+        """Creating an exchange should not read anything back."""
+        session = (await async_client.post("/api/sessions", json={"name": "s"})).json()
+        conversation = (
+            await async_client.post(
+                "/api/conversations", json={"session_id": session["id"], "title": "t"}
+            )
+        ).json()
+        body = {"user_message": "q", "assistant_message": "a", "input_tokens": 1}
+
+        query_recorder.clear()
+        response = await async_client.post(
+            "/api/exchanges", json={**body, "conversation_id": conversation["id"]}
+        )
+        assert response.status_code == 201
+        assert response.json()["user_message"] == "q"
+        assert response.json()["created_at"] is not None
+        assert statement_summary(query_recorder) == [
+            "UPDATE conversations",
+            "UPDATE sessions",
+            "SELECT message_blobs",
+            "INSERT message_blobs",
+            "INSERT exchanges",
+            "INSERT exchange_bodies",
+        ]
+
+        query_recorder.clear()
+        response = await async_client.post(
+            "/api/exchanges", json={**body, "conversation_id": 99999}
+        )
+        assert response.status_code == 404
+        assert statement_summary(query_recorder) == ["UPDATE conversations"]
@@ -0,0 +1,218 @@
+"""API tests for the ingest WebSocket."""
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.session_service import SessionService
+from app.services.settings import get_settings
+
+
+class IngestConnection:
+    """A WebSocket connection to /api/ingest/ws, driven through ASGI directly."""
+
+    def __init__(self) -> None:
+        self.inbound: asyncio.Queue[dict] = asyncio.Queue()
+        self.outbound: asyncio.Queue[dict] = asyncio.Queue()
+        self.close_code: int | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _send(self, message: dict) -> None:
+        self.outbound.put_nowait(message)
+
+    async def __aenter__(self) -> "IngestConnection":
+        path = "/api/ingest/ws"
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0", "spec_version": "2.4"},
+            "http_version": "1.1",
+            "scheme": "ws",
+            "server": ("test", 80),
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"test")],
+            "subprotocols": [],
+        }
+        self.inbound.put_nowait({"type": "websocket.connect"})
+        self._task = asyncio.create_task(app(scope, self.inbound.get, self._send))
+        assert (await self._next())["type"] == "websocket.accept"
+        return self
+
+    async def _next(self) -> dict:
+        return await asyncio.wait_for(self.outbound.get(), 5)
+
+    def send(self, payload: Any) -> None:
+        self.inbound.put_nowait(
+            {"type": "websocket.receive", "text": json.dumps(payload)}
+        )
+
+    async def receive(self) -> dict | None:
+        """Next ack, or None once the server has closed the connection."""
+        message = await self._next()
+        if message["type"] == "websocket.close":
+            self.close_code = message["code"]
+            self.inbound.put_nowait({"type": "websocket.disconnect", "code": 1000})
+            return None
+        return json.loads(message["text"])
+
+    async def acks(self, count: int) -> list[dict]:
+        """Acks until ``count`` records have been acknowledged."""
+        messages = []
+        while count > 0:
+            message = await self.receive()
+            assert message is not None
+            messages.append(message)
+            count -= len(message["acks"]) + len(message["errors"])
+        return messages
+
+    async def __aexit__(self, *exc: object) -> None:
+        if self.close_code is None:
+            self.inbound.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self._task, 5)
+
+
+def _record(conversation_id: int, seq: int) -> dict:
+    return {
+        "seq": seq,
+        "conversation_id": conversation_id,
+        "user_message": f"prompt {seq}",
+        "assistant_message": "answer",
+        "input_tokens": 2,
+    }
+
+
+async def _conversation(client: AsyncClient) -> int:
+    session = (await client.post("/api/sessions", json={"name": "s"})).json()
+    conversation = (
+        await client.post(
+            "/api/conversations", json={"session_id": session["id"], "title": "t"}
+        )
+    ).json()
+    return conversation["id"]
+
+
+@pytest.mark.api
+class TestIngestWebSocket:
+    """Test cases for the /api/ingest/ws WebSocket."""
+
+    async def test_records_are_acknowledged(self, async_client: AsyncClient) -> None:
+        """Committed records should be acked with their exchange ids."""
+        conversation_id = await _conversation(async_client)
+        async with IngestConnection() as connection:
+            grant = await connection.receive()
+            assert grant == {
+                "type": "ack",
+                "acks": [],
+                "errors": [],
+                "credit": get_settings().performance.ingest_ws_credits,
+            }
+            connection.send([_record(conversation_id, 1), _record(conversation_id, 2)])
+            connection.send(_record(conversation_id, 3))
+            messages = await connection.acks(3)
+
+        acks = [ack for message in messages for ack in message["acks"]]
+        assert [ack["seq"] for ack in acks] == [1, 2, 3]
+        assert sum(message["credit"] for message in messages) == 3
+        for ack in acks:
+            exchange = (await async_client.get(f"/api/exchanges/{ack['id']}")).json()
+            assert exchange["user_message"] == f"prompt {ack['seq']}"
+        conversation = (
+            await async_client.get(f"/api/conversations/{conversation_id}")
+        ).json()
+        assert conversation["exchange_count"] == 3
+        assert conversation["total_input_tokens"] == 6
+
+    async def test_rejected_records(self, async_client: AsyncClient) -> None:
+        """Invalid records and unknown conversations should be reported by seq."""
+        conversation_id = await _conversation(async_client)
+        async with IngestConnection() as connection:
+            await connection.receive()
+            invalid = {"seq": 2, "conversation_id": conversation_id}
+            connection.send([_record(conversation_id, 1), invalid, _record(99999, 3)])
+            messages = await connection.acks(3)
+
+        assert [ack["seq"] for m in messages for ack in m["acks"]] == [1]
+        errors = {e["seq"]: e["detail"] for m in messages for e in m["errors"]}
+        assert errors[2].startswith("user_message: ")
+        assert errors[3] == "Conversation with id 99999 not found"
+        assert sum(message["credit"] for message in messages) == 3
+
+    async def test_records_are_batched(
+        self, async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Records should be written ingest_batch_size at a time."""
+        performance = get_settings().performance
+        monkeypatch.setattr(performance, "ingest_batch_size", 3)
+        monkeypatch.setattr(performance, "ingest_batch_delay_ms", 50)
+        conversation_id = await _conversation(async_client)
+        async with IngestConnection() as connection:
+            await connection.receive()
+            connection.send([_record(conversation_id, seq) for seq in range(7)])
+            messages = await connection.acks(7)
+        assert [len(message["acks"]) for message in messages] == [3, 3, 1]
+
+    async def test_credit_exceeded(
+        self, async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A client sending beyond its credit should be disconnected."""
+        monkeypatch.setattr(get_settings().performance, "ingest_ws_credits", 2)
+        conversation_id = await _conversation(async_client)
+        async with IngestConnection() as connection:
+            assert (await connection.receive())["credit"] == 2
+            connection.send([_record(conversation_id, seq) for seq in range(3)])
+            assert await connection.receive() is None
+            assert connection.close_code == 1008
+
+    async def test_credit_is_returned(
+        self, async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Acked credit should let the client keep sending within its window."""
+        monkeypatch.setattr(get_settings().performance, "ingest_ws_credits", 2)
+        conversation_id = await _conversation(async_client)
+        async with IngestConnection() as connection:
+            await connection.receive()
+            for seq in range(0, 6, 2):
+                connection.send(
+                    [_record(conversation_id, seq), _record(conversation_id, seq + 1)]
+                )
+                await connection.acks(2)
+            assert connection.close_code is None
+
+    async def test_write_failure_closes(
+        self,
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """A batch that fails to commit should close with 1011, and be logged."""
+
+        async def fail(self: SessionService, items: list) -> None:
+            raise RuntimeError("commit failed")
+
+        monkeypatch.setattr(SessionService, "create_exchanges_bulk", fail)
+        conversation_id = await _conversation(async_client)
+        async with IngestConnection() as connection:
+            await connection.receive()
+            connection.send(_record(conversation_id, 1))
+            assert await connection.receive() is None
+            assert connection.close_code == 1011
+        # The endpoint returned normally
+        assert connection._task.exception() is None
+        assert "commit failed" in caplog.text
+
+    async def test_malformed_frame(self) -> None:
+        """Frames that are not JSON records should close the connection."""
+        for text in ("not json", "[1, 2]"):
+            async with IngestConnection() as connection:
+                await connection.receive()
+                connection.inbound.put_nowait(
+                    {"type": "websocket.receive", "text": text}
+                )
+                assert await connection.receive() is None
+                assert connection.close_code == 1007
@@ -1,11 +1,26 @@
 """API tests for main application."""
 
 import pytest
+from fastapi.routing import APIRoute
 from fastapi.testclient import TestClient
 
+from app.api.routes import conversations, exchanges, sessions, storage
+from app.db.session import get_async_db, get_async_read_db
 from app.main import app
 
 
+def _database_dependencies(route: APIRoute) -> set:
+    """Database session dependencies anywhere in a route's dependency tree."""
+    found = set()
+    pending = [route.dependant]
+    while pending:
+        dependant = pending.pop()
+        if dependant.call in (get_async_db, get_async_read_db):
+            found.add(dependant.call)
+        pending.extend(dependant.dependencies)
+    return found
+
+
 class TestMainApp:
     """Test cases for main FastAPI application."""
 
@@ -37,3 +52,23 @@ class TestAPIEndpoints:
         response = await async_client.get("/health")
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
+
+    def test_get_routes_use_read_only_database(self) -> None:
+        """GET routes should read from the read-only pool; writes use the primary."""
+        checked = 0
+        routers = (
+            sessions.router,
+            conversations.router,
+            exchanges.router,
+            storage.router,
+        )
+        for route in (route for router in routers for route in router.routes):
+            if not isinstance(route, APIRoute):
+                continue
+            dependencies = _database_dependencies(route)
+            if not dependencies:
+                continue
+            expected = get_async_read_db if "GET" in route.methods else get_async_db
+            assert dependencies == {expected}, route.path
+            checked += 1
+        assert checked >= 10
@@ -3,6 +3,8 @@
 import pytest
 from httpx import AsyncClient
 
+from tests.conftest import statement_summary
+
 
 @pytest.mark.api
 class TestSessionEndpoints:
@@ -75,7 +77,8 @@ class TestSessionEndpoints:
         # Create multiple sessions
         for i in range(3):
             await async_client.post(
-                "/api/sessions", json={"name": f"Session {i}", "description": f"Desc {i}"}
+                "/api/sessions",
+                json={"name": f"Session {i}", "description": f"Desc {i}"},
             )
 
         response = await async_client.get("/api/sessions")
@@ -105,6 +108,44 @@ class TestSessionEndpoints:
         assert len(data["items"]) == 2
         assert data["page"] == 2
 
+    async def test_list_sessions_cursor_pagination(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Should walk every session exactly once by following next_cursor."""
+        for i in range(5):
+            await async_client.post("/api/sessions", json={"name": f"Session {i}"})
+
+        seen = []
+        response = await async_client.get("/api/sessions?page_size=2")
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            response = await async_client.get(
+                f"/api/sessions?page_size=2&cursor={data['next_cursor']}"
+            )
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+        # Sessions created in the same second fall back to newest id first
+        assert seen == sorted(seen, reverse=True)
+
+    async def test_list_sessions_invalid_cursor(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Should reject a malformed cursor."""
+        response = await async_client.get("/api/sessions?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    async def test_list_sessions_cursor_without_date(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Should reject a well-formed cursor whose sort value is not a date."""
+        response = await async_client.get("/api/sessions?cursor=WyJhIiwxXQ")
+        assert response.status_code == 400
+
     async def test_update_session(
         self, async_client: AsyncClient, sample_session_data: dict
     ) -> None:
@@ -173,3 +214,21 @@ class TestSessionEndpoints:
         """Should return 404 when deleting non-existent session."""
         response = await async_client.delete("/api/sessions/99999")
         assert response.status_code == 404
+
+    async def test_write_round_trips(
+        self, async_client: AsyncClient, query_recorder: list
+    ) -> None:
+        """Creating and updating a session should take one statement each."""
+        response = await async_client.post("/api/sessions", json={"name": "Trips"})
+        assert response.status_code == 201
+        assert statement_summary(query_recorder) == ["INSERT sessions"]
+        session_id = response.json()["id"]
+
+        for session, status_code in ((session_id, 200), (99999, 404)):
+            query_recorder.clear()
+            response = await async_client.put(
+                f"/api/sessions/{session}", json={"name": "Renamed"}
+            )
+            assert response.status_code == status_code
+            assert statement_summary(query_recorder) == ["UPDATE sessions"]
+        assert response.json()["detail"] == "Session with id 99999 not found"
@@ -0,0 +1,54 @@
+"""API tests for storage endpoints."""
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.api
+class TestStorageEndpoints:
+    """Test cases for storage API endpoints."""
+
+    async def test_storage_report_empty(self, async_client: AsyncClient) -> None:
+        """An empty database should report no blobs."""
+        response = await async_client.get("/api/storage/report")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["blob_count"] == 0
+        assert data["logical_bytes"] == 0
+        assert data["deduplication_ratio"] == 1.0
+
+    async def test_storage_report_savings(
+        self,
+        async_client: AsyncClient,
+        sample_session_data: dict,
+        sample_conversation_data: dict,
+    ) -> None:
+        """Repeated messages should show up as deduplication savings."""
+        session_id = (
+            await async_client.post("/api/sessions", json=sample_session_data)
+        ).json()["id"]
+        conv_data = {**sample_conversation_data, "session_id": session_id}
+        conv_id = (
+            await async_client.post("/api/conversations", json=conv_data)
+        ).json()["id"]
+
+        prompt = "Summarize this file:\n" + "x = 1\n" * 500
+        items = [
+            {
+                "conversation_id": conv_id,
+                "user_message": prompt,
+                "assistant_message": "done",
+            }
+            for _ in range(4)
+        ]
+        await async_client.post("/api/exchanges/bulk", json={"items": items})
+
+        data = (await async_client.get("/api/storage/report")).json()
+        assert data["blob_count"] == 2
+        assert data["reference_count"] == 8
+        assert data["unique_bytes"] == len(prompt) + len("done")
+        assert data["logical_bytes"] == 4 * (len(prompt) + len("done"))
+        assert data["deduplication_savings"] == 3 * (len(prompt) + len("done"))
+        assert data["deduplication_ratio"] == 4.0
+        assert data["stored_bytes"] < data["unique_bytes"]
+        assert data["overall_ratio"] > 4.0
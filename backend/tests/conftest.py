@@ -7,11 +7,17 @@ import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
 from app.db.base import Base
-from app.db.session import get_async_db
+from app.db.session import driver_url, get_async_db, get_async_read_db
+from app.db.sqlite import apply_foreign_keys, apply_read_only, apply_storage_profile
+from app.services.deletion_service import DeletionService
+from app.services.ingest_writer import ExchangeBatchWriter
+from app.services.lookup_cache import lookup_cache
+from app.services.settings import PerformanceSettings
 
 # Import all models to register them with SQLAlchemy metadata
 from app.models.session import Session  # noqa: F401
@@ -21,18 +27,45 @@ from app.models.exchange import Exchange  # noqa: F401
 # Import app AFTER models are registered
 from app.main import app
 
+TEST_DATABASE_URL_ENV = "CLOUSEAU_TEST_DATABASE_URL"
 
-# Use a temporary file for the test database to avoid connection sharing issues
+
+# Use a temporary file for the test database to avoid connection sharing issues.
+# Set CLOUSEAU_TEST_DATABASE_URL to run the suite against PostgreSQL instead
+# (the database is emptied and refilled by every test).
 _test_db_file = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
 _test_db_file.close()
-TEST_DATABASE_URL = f"sqlite+aiosqlite:///{_test_db_file.name}"
+TEST_DATABASE_URL = driver_url(
+    os.environ.get(TEST_DATABASE_URL_ENV) or f"sqlite:///{_test_db_file.name}",
+    asynchronous=True,
+)
+IS_SQLITE = TEST_DATABASE_URL.get_backend_name() == "sqlite"
+
+# Tests of SQLite-only features (pragmas, query plans, attached archives)
+sqlite_only = pytest.mark.skipif(not IS_SQLITE, reason="SQLite-only feature")
 
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
     poolclass=NullPool,  # NullPool doesn't keep connections, preventing hangs
     echo=False,
 )
+apply_storage_profile(test_engine.sync_engine, PerformanceSettings())
+apply_foreign_keys(test_engine.sync_engine)
+
+# Read-only engine on the same database, behind the GET routes
+test_read_engine = create_async_engine(
+    TEST_DATABASE_URL,
+    connect_args=(
+        {"check_same_thread": False}
+        if IS_SQLITE
+        else {"server_settings": {"default_transaction_read_only": "on"}}
+    ),
+    poolclass=NullPool,
+    echo=False,
+)
+apply_storage_profile(test_read_engine.sync_engine, PerformanceSettings())
+apply_read_only(test_read_engine.sync_engine)
 
 TestSessionLocal = async_sessionmaker(
     test_engine,
@@ -43,6 +76,15 @@ TestSessionLocal = async_sessionmaker(
 )
 
 
+TestReadSessionLocal = async_sessionmaker(
+    test_read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
 async def override_get_async_db():
     """Override database dependency for tests."""
     async with TestSessionLocal() as session:
@@ -52,16 +94,27 @@ async def override_get_async_db():
             await session.close()
 
 
-# Override the dependency at module load time
+async def override_get_async_read_db():
+    """Override read-only database dependency for tests."""
+    async with TestReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+# Override the dependencies at module load time
 app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_read_db
 
 
 def pytest_sessionfinish(session, exitstatus):
     """Clean up test database file after all tests complete."""
-    try:
-        os.unlink(_test_db_file.name)
-    except OSError:
-        pass
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.unlink(_test_db_file.name + suffix)
+        except OSError:
+            pass
 
 
 @pytest.fixture(autouse=True)
@@ -69,6 +122,8 @@ async def setup_database():
     """Set up and tear down test database for each test."""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Ids are reused once the tables are recreated
+    lookup_cache.clear()
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -95,6 +150,61 @@ async def db_session() -> AsyncSession:
         yield session
 
 
+@pytest.fixture
+def query_recorder() -> list:
+    """Record (statement, parameters) of every SQL statement on the test engines."""
+    statements: list = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engines = (test_engine.sync_engine, test_read_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def statement_summary(statements: list) -> list:
+    """Verb and table of each statement recorded by query_recorder.
+
+    For example ``["UPDATE sessions", "INSERT exchanges"]``.
+    """
+    summary = []
+    for statement, _ in statements:
+        words = statement.split()
+        verb = words[0].upper()
+        if verb == "UPDATE":
+            table = words[1]
+        else:
+            keyword = "INTO" if verb == "INSERT" else "FROM"
+            table = words[[word.upper() for word in words].index(keyword) + 1]
+        summary.append(f"{verb} {table}")
+    return summary
+
+
+@pytest.fixture
+async def exchange_writer():
+    """Batched exchange writer on the test database, installed on the app."""
+    writer = ExchangeBatchWriter(TestSessionLocal, max_batch_size=50, max_delay_ms=20)
+    await writer.start()
+    app.state.exchange_writer = writer
+    yield writer
+    app.state.exchange_writer = None
+    await writer.stop()
+
+
+@pytest.fixture
+async def deleter():
+    """Background deleter on the test database, installed on the app."""
+    deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+    app.state.deleter = deleter
+    yield deleter
+    app.state.deleter = None
+    await deleter.stop()
+
+
 @pytest.fixture
 def sample_session_data() -> dict:
     """Sample session data for testing."""
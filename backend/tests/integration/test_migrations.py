@@ -0,0 +1,342 @@
+"""Tests that the Alembic migrations apply cleanly."""
+
+from pathlib import Path
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from alembic import command
+from app.db.base import Base
+from app.db.compression import RAW, ZLIB, get_codec
+from app.db.session import driver_url
+from app.models.exchange import PREVIEW_LENGTH
+from app.models.message_blob import content_hash
+from tests.conftest import IS_SQLITE, TEST_DATABASE_URL
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+@pytest.fixture
+def alembic_config(tmp_path: Path) -> Config:
+    """Alembic config pointing at a throwaway database."""
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path / 'migrate.db'}")
+    return config
+
+
+@pytest.mark.integration
+class TestMigrations:
+    """Test cases for upgrading and downgrading the schema."""
+
+    def test_upgrade_creates_list_indexes(self, alembic_config: Config) -> None:
+        """Upgrading to head should create the list query indexes."""
+        command.upgrade(alembic_config, "head")
+
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            inspector = inspect(engine)
+            assert "ix_sessions_updated_at" in {
+                ix["name"] for ix in inspector.get_indexes("sessions")
+            }
+            assert "ix_conversations_session_id_updated_at" in {
+                ix["name"] for ix in inspector.get_indexes("conversations")
+            }
+            assert "ix_exchanges_conversation_id_created_at" in {
+                ix["name"] for ix in inspector.get_indexes("exchanges")
+            }
+        finally:
+            engine.dispose()
+
+    def test_counter_backfill(self, alembic_config: Config) -> None:
+        """Adding the aggregate counters should backfill them from existing rows."""
+        command.upgrade(alembic_config, "5b2d9c41e7a3")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO sessions (id, name) VALUES (1, 's')"))
+                conn.execute(
+                    text(
+                        "INSERT INTO conversations (id, session_id, title)"
+                        " VALUES (1, 1, 'a'), (2, 1, 'b')"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO exchanges (conversation_id, user_message,"
+                        " assistant_message, input_tokens, output_tokens)"
+                        " VALUES (1, 'u', 'a', 3, 4), (1, 'u', 'a', NULL, 6),"
+                        " (2, 'u', 'a', 1, 1)"
+                    )
+                )
+
+            command.upgrade(alembic_config, "9e4f1a6c2d08")
+
+            with engine.connect() as conn:
+                assert conn.execute(
+                    text(
+                        "SELECT exchange_count, total_input_tokens, total_output_tokens"
+                        " FROM conversations WHERE id = 1"
+                    )
+                ).one() == (2, 3, 10)
+                assert conn.execute(
+                    text(
+                        "SELECT conversation_count, exchange_count,"
+                        " total_input_tokens, total_output_tokens"
+                        " FROM sessions WHERE id = 1"
+                    )
+                ).one() == (2, 3, 4, 11)
+        finally:
+            engine.dispose()
+
+    def test_message_compression_roundtrip(self, alembic_config: Config) -> None:
+        """Messages should be compressed on upgrade and restored on downgrade."""
+        long_message = "def handler(event):\n    return event\n" * 50
+        command.upgrade(alembic_config, "9e4f1a6c2d08")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO sessions (id, name) VALUES (1, 's')"))
+                conn.execute(
+                    text(
+                        "INSERT INTO conversations (id, session_id, title)"
+                        " VALUES (1, 1, 'a')"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO exchanges"
+                        " (conversation_id, user_message, assistant_message)"
+                        " VALUES (1, :long, 'short')"
+                    ),
+                    {"long": long_message},
+                )
+
+            command.upgrade(alembic_config, "c3b8e1f47a20")
+
+            codec = get_codec()
+            with engine.connect() as conn:
+                user_message, assistant_message = conn.execute(
+                    text("SELECT user_message, assistant_message FROM exchanges")
+                ).one()
+            assert isinstance(user_message, bytes)
+            assert user_message[0] == ZLIB
+            assert len(user_message) < len(long_message) / 10
+            assert codec.decode(user_message) == long_message
+            assert assistant_message == bytes([RAW]) + b"short"
+
+            command.downgrade(alembic_config, "9e4f1a6c2d08")
+
+            with engine.connect() as conn:
+                assert conn.execute(
+                    text("SELECT user_message, assistant_message FROM exchanges")
+                ).one() == (long_message, "short")
+        finally:
+            engine.dispose()
+
+    def test_message_deduplication(self, alembic_config: Config) -> None:
+        """Existing messages should be moved into shared, ref-counted blobs."""
+        command.upgrade(alembic_config, "9e4f1a6c2d08")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO sessions (id, name) VALUES (1, 's')"))
+                conn.execute(
+                    text(
+                        "INSERT INTO conversations (id, session_id, title)"
+                        " VALUES (1, 1, 'a')"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO exchanges"
+                        " (conversation_id, user_message, assistant_message)"
+                        " VALUES (1, 'same', 'one'), (1, 'same', 'two'),"
+                        " (1, 'one', 'same')"
+                    )
+                )
+
+            command.upgrade(alembic_config, "e5d1a9b36c42")
+
+            with engine.connect() as conn:
+                blobs = dict(
+                    conn.execute(
+                        text("SELECT hash, ref_count FROM message_blobs")
+                    ).all()
+                )
+                assert blobs == {
+                    content_hash("same"): 3,
+                    content_hash("one"): 2,
+                    content_hash("two"): 1,
+                }
+                assert conn.execute(
+                    text(
+                        "SELECT user_message_hash, assistant_message_hash"
+                        " FROM exchanges"
+                        " WHERE id = 2"
+                    )
+                ).one() == (content_hash("same"), content_hash("two"))
+            assert "user_message" not in {
+                column["name"] for column in inspect(engine).get_columns("exchanges")
+            }
+
+            command.downgrade(alembic_config, "9e4f1a6c2d08")
+
+            with engine.connect() as conn:
+                assert conn.execute(
+                    text(
+                        "SELECT user_message, assistant_message"
+                        " FROM exchanges ORDER BY id"
+                    )
+                ).all() == [("same", "one"), ("same", "two"), ("one", "same")]
+        finally:
+            engine.dispose()
+
+    def test_message_preview_backfill(self, alembic_config: Config) -> None:
+        """Existing exchanges should get previews and lengths from their blobs."""
+        long_message = "x" * 500
+        command.upgrade(alembic_config, "9e4f1a6c2d08")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO sessions (id, name) VALUES (1, 's')"))
+                conn.execute(
+                    text(
+                        "INSERT INTO conversations (id, session_id, title)"
+                        " VALUES (1, 1, 'a')"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO exchanges"
+                        " (conversation_id, user_message, assistant_message)"
+                        " VALUES (1, :long, 'héllo')"
+                    ),
+                    {"long": long_message},
+                )
+
+            command.upgrade(alembic_config, "a8f3c6d2e915")
+
+            with engine.connect() as conn:
+                assert conn.execute(
+                    text(
+                        "SELECT user_message_preview, user_message_length,"
+                        " assistant_message_preview, assistant_message_length"
+                        " FROM exchanges"
+                    )
+                ).one() == ("x" * PREVIEW_LENGTH, 500, "héllo", 5)
+        finally:
+            engine.dispose()
+
+    def test_exchange_body_split(self, alembic_config: Config) -> None:
+        """Message references should move to exchange_bodies and back."""
+        command.upgrade(alembic_config, "9e4f1a6c2d08")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO sessions (id, name) VALUES (1, 's')"))
+                conn.execute(
+                    text(
+                        "INSERT INTO conversations (id, session_id, title)"
+                        " VALUES (1, 1, 'a')"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO exchanges (conversation_id, user_message,"
+                        " assistant_message, input_tokens) VALUES (1, 'hi', 'hello', 3)"
+                    )
+                )
+
+            command.upgrade(alembic_config, "f2c7a4e8b153")
+
+            with engine.connect() as conn:
+                assert conn.execute(
+                    text(
+                        "SELECT exchange_id, user_message_hash, user_message_preview,"
+                        " assistant_message_preview FROM exchange_bodies"
+                    )
+                ).one() == (1, content_hash("hi"), "hi", "hello")
+            columns = {
+                column["name"] for column in inspect(engine).get_columns("exchanges")
+            }
+            assert "user_message_hash" not in columns
+            assert "user_message_preview" not in columns
+            assert {"input_tokens", "user_message_length"} <= columns
+
+            command.downgrade(alembic_config, "a8f3c6d2e915")
+
+            with engine.connect() as conn:
+                assert conn.execute(
+                    text(
+                        "SELECT assistant_message_hash, assistant_message_preview"
+                        " FROM exchanges"
+                    )
+                ).one() == (content_hash("hello"), "hello")
+        finally:
+            engine.dispose()
+
+    def test_autoincrement_ids(self, alembic_config: Config) -> None:
+        """Ids of deleted (or archived) rows should not be handed out again."""
+        command.upgrade(alembic_config, "f2c7a4e8b153")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO sessions (id, name) VALUES (1, 's'), (2, 't')")
+                )
+
+            command.upgrade(alembic_config, "b4e9d27c5a61")
+
+            with engine.begin() as conn:
+                assert conn.execute(text("SELECT count(*) FROM sessions")).scalar() == 2
+                conn.execute(text("DELETE FROM sessions WHERE id = 2"))
+                conn.execute(text("INSERT INTO sessions (name) VALUES ('u')"))
+                assert conn.execute(text("SELECT max(id) FROM sessions")).scalar() == 3
+        finally:
+            engine.dispose()
+
+    def test_head_matches_models(self, alembic_config: Config) -> None:
+        """Migrations should build the models' schema on the test database's backend.
+
+        Runs on a scratch SQLite file, or on the PostgreSQL test database when
+        CLOUSEAU_TEST_DATABASE_URL points at one.
+        """
+        if not IS_SQLITE:
+            url = driver_url(
+                TEST_DATABASE_URL.render_as_string(hide_password=False), False
+            )
+            alembic_config.set_main_option(
+                "sqlalchemy.url",
+                url.render_as_string(hide_password=False).replace("%", "%%"),
+            )
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            Base.metadata.drop_all(engine)
+            command.upgrade(alembic_config, "head")
+            with engine.connect() as conn:
+                assert (
+                    compare_metadata(MigrationContext.configure(conn), Base.metadata)
+                    == []
+                )
+
+            command.downgrade(alembic_config, "base")
+            with engine.begin() as conn:
+                conn.execute(text("DROP TABLE alembic_version"))
+            assert inspect(engine).get_table_names() == []
+        finally:
+            engine.dispose()
+
+    def test_downgrade_to_base(self, alembic_config: Config) -> None:
+        """Every migration should be reversible."""
+        command.upgrade(alembic_config, "head")
+        command.downgrade(alembic_config, "base")
+
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            assert "exchanges" not in inspect(engine).get_table_names()
+        finally:
+            engine.dispose()
@@ -0,0 +1,112 @@
+"""Query plan tests for the hot list queries."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas import ConversationCreate, ExchangeCreate, SessionCreate
+from app.services.session_service import SessionService
+from tests.conftest import sqlite_only
+
+
+async def _explain(db: AsyncSession, statement: str, parameters) -> str:
+    """Return the EXPLAIN QUERY PLAN output of a captured statement as text."""
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)
+    )
+    return "\n".join(row[-1] for row in result.all())
+
+
+async def _plan_for(db: AsyncSession, statements: list, table: str) -> str:
+    """Find the paginated SELECT against a table and explain it."""
+    for statement, parameters in reversed(statements):
+        is_list_query = (
+            statement.lstrip().startswith("SELECT")
+            and f"FROM {table}" in statement
+            and "ORDER BY" in statement
+        )
+        if is_list_query:
+            return await _explain(db, statement, parameters)
+    raise AssertionError(f"no list query against {table} was executed")
+
+
+@pytest.fixture
+async def populated(db_session: AsyncSession) -> tuple[int, int]:
+    """Create a session with a conversation holding a few exchanges."""
+    service = SessionService(db_session)
+    session = await service.create_session(SessionCreate(name="Plans"))
+    conversation = await service.create_conversation(
+        ConversationCreate(session_id=session.id, title="Plans")
+    )
+    for i in range(3):
+        await service.create_exchange(
+            ExchangeCreate(
+                conversation_id=conversation.id,
+                user_message=f"Message {i}",
+                assistant_message=f"Response {i}",
+            )
+        )
+    return session.id, conversation.id
+
+
+@pytest.mark.integration
+@sqlite_only
+class TestListQueryPlans:
+    """The list queries must be served by their composite indexes."""
+
+    async def test_sessions_list_uses_index(
+        self, db_session: AsyncSession, populated, query_recorder: list
+    ) -> None:
+        """get_sessions should walk ix_sessions_updated_at instead of sorting."""
+        await SessionService(db_session).get_sessions(page=1, page_size=20)
+        plan = await _plan_for(db_session, query_recorder, "sessions")
+        assert "ix_sessions_updated_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_conversations_list_uses_index(
+        self, db_session: AsyncSession, populated, query_recorder: list
+    ) -> None:
+        """get_conversations_by_session should use the session/updated_at index."""
+        session_id, _ = populated
+        await SessionService(db_session).get_conversations_by_session(session_id)
+        plan = await _plan_for(db_session, query_recorder, "conversations")
+        assert "ix_conversations_session_id_updated_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_exchanges_list_uses_index(
+        self, db_session: AsyncSession, populated, query_recorder: list
+    ) -> None:
+        """get_exchanges_by_conversation should use its conversation index."""
+        _, conversation_id = populated
+        await SessionService(db_session).get_exchanges_by_conversation(conversation_id)
+        plan = await _plan_for(db_session, query_recorder, "exchanges")
+        assert "ix_exchanges_conversation_id_created_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_exchanges_cursor_page_uses_index(
+        self, db_session: AsyncSession, populated, query_recorder: list
+    ) -> None:
+        """Cursor pages should seek into the index rather than scan and sort."""
+        _, conversation_id = populated
+        service = SessionService(db_session)
+        _, _, next_cursor = await service.get_exchanges_by_conversation(
+            conversation_id, page_size=1
+        )
+        await service.get_exchanges_by_conversation(
+            conversation_id, page_size=1, cursor=next_cursor
+        )
+        plan = await _plan_for(db_session, query_recorder, "exchanges")
+        assert "ix_exchanges_conversation_id_created_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_exchange_rows_use_index(
+        self, db_session: AsyncSession, populated, query_recorder: list
+    ) -> None:
+        """Row pages joining the bodies and blobs should still walk the index."""
+        _, conversation_id = populated
+        await SessionService(db_session).get_exchanges_by_conversation(
+            conversation_id, rows=True
+        )
+        plan = await _plan_for(db_session, query_recorder, "exchanges")
+        assert "ix_exchanges_conversation_id_created_at" in plan
+        assert "TEMP B-TREE" not in plan
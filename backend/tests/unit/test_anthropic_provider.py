@@ -1,8 +1,18 @@
 """Tests for Anthropic LLM provider."""
 
-import pytest
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
 from app.services.llm_providers.anthropic import AnthropicProvider
 from app.services.llm_providers.base import (
     LLMMessage,
@@ -40,10 +50,14 @@ class TestAnthropicProviderInit:
         assert provider.config == provider_config
 
     def test_init_creates_client(self, provider_config: ProviderConfig) -> None:
-        """Should create Anthropic client on init."""
-        with patch("app.services.llm_providers.anthropic.Anthropic") as mock_client:
+        """Should create an async Anthropic client on init."""
+        with patch(
+            "app.services.llm_providers.anthropic.AsyncAnthropic"
+        ) as mock_client:
             provider = AnthropicProvider(provider_config)
-            mock_client.assert_called_once_with(api_key="test-api-key")
+            mock_client.assert_called_once_with(
+                api_key="test-api-key", base_url=None, timeout=60
+            )
 
 
 class TestSendMessage:
@@ -64,7 +78,10 @@ class TestSendMessage:
         mock_response.stop_reason = "end_turn"
 
         with patch.object(
-            provider._client.messages, "create", return_value=mock_response
+            provider._client.messages,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_response,
         ):
             response = await provider.send_message(messages)
 
@@ -92,7 +109,10 @@ class TestSendMessage:
         mock_response.stop_reason = "end_turn"
 
         with patch.object(
-            provider._client.messages, "create", return_value=mock_response
+            provider._client.messages,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_response,
         ) as mock_create:
             await provider.send_message(messages)
 
@@ -103,6 +123,33 @@ class TestSendMessage:
         assert len(call_kwargs["messages"]) == 1
         assert call_kwargs["messages"][0]["role"] == "user"
         assert call_kwargs["messages"][0]["content"] == "Hi there!"
+        assert call_kwargs["extra_body"] == {"temperature": 1.0}
+
+    @pytest.mark.asyncio
+    async def test_send_message_parameter_overrides(
+        self, provider: AnthropicProvider
+    ) -> None:
+        """Should prefer max_tokens and temperature given with the call."""
+        mock_response = MagicMock()
+        mock_response.content = []
+        mock_response.model = "claude-3-5-sonnet-20241022"
+        mock_response.usage.input_tokens = 2
+        mock_response.usage.output_tokens = 0
+        mock_response.stop_reason = "end_turn"
+
+        with patch.object(
+            provider._client.messages,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_response,
+        ) as mock_create:
+            await provider.send_message(
+                [LLMMessage(role="user", content="Hi")], max_tokens=10, temperature=0.0
+            )
+
+        call_kwargs = mock_create.call_args.kwargs
+        assert call_kwargs["max_tokens"] == 10
+        assert call_kwargs["extra_body"] == {"temperature": 0.0}
 
 
 class TestStreamMessage:
@@ -129,11 +176,9 @@ class TestStreamMessage:
         mock_delta3.delta.text = "a time..."
 
         mock_stream = MagicMock()
-        mock_stream.__enter__ = MagicMock(return_value=mock_stream)
-        mock_stream.__exit__ = MagicMock(return_value=False)
-        mock_stream.__iter__ = MagicMock(
-            return_value=iter([mock_delta1, mock_delta2, mock_delta3])
-        )
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+        mock_stream.__aiter__.return_value = [mock_delta1, mock_delta2, mock_delta3]
 
         with patch.object(
             provider._client.messages, "stream", return_value=mock_stream
@@ -225,7 +270,10 @@ class TestSendMessageBranches:
         mock_response.stop_reason = "end_turn"
 
         with patch.object(
-            provider._client.messages, "create", return_value=mock_response
+            provider._client.messages,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_response,
         ) as mock_create:
             response = await provider.send_message(messages)
 
@@ -249,7 +297,10 @@ class TestSendMessageBranches:
         mock_response.stop_reason = "end_turn"
 
         with patch.object(
-            provider._client.messages, "create", return_value=mock_response
+            provider._client.messages,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_response,
         ):
             response = await provider.send_message(messages)
 
@@ -273,13 +324,16 @@ class TestSendMessageBranches:
         mock_response.stop_reason = "end_turn"
 
         with patch.object(
-            provider._client.messages, "create", return_value=mock_response
+            provider._client.messages,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_response,
         ) as mock_create:
             await provider.send_message(messages)
 
         # Verify temperature is not in kwargs when None
         call_kwargs = mock_create.call_args.kwargs
-        assert "temperature" not in call_kwargs
+        assert "extra_body" not in call_kwargs
 
 
 class TestStreamMessageBranches:
@@ -297,9 +351,9 @@ class TestStreamMessageBranches:
         mock_delta.delta.text = "Hi"
 
         mock_stream = MagicMock()
-        mock_stream.__enter__ = MagicMock(return_value=mock_stream)
-        mock_stream.__exit__ = MagicMock(return_value=False)
-        mock_stream.__iter__ = MagicMock(return_value=iter([mock_delta]))
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+        mock_stream.__aiter__.return_value = [mock_delta]
 
         with patch.object(
             provider._client.messages, "stream", return_value=mock_stream
@@ -331,11 +385,9 @@ class TestStreamMessageBranches:
         mock_delta3.type = "message_end"
 
         mock_stream = MagicMock()
-        mock_stream.__enter__ = MagicMock(return_value=mock_stream)
-        mock_stream.__exit__ = MagicMock(return_value=False)
-        mock_stream.__iter__ = MagicMock(
-            return_value=iter([mock_delta1, mock_delta2, mock_delta3])
-        )
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+        mock_stream.__aiter__.return_value = [mock_delta1, mock_delta2, mock_delta3]
 
         with patch.object(
             provider._client.messages, "stream", return_value=mock_stream
@@ -362,9 +414,9 @@ class TestStreamMessageBranches:
         mock_delta.delta.text = "Hi"
 
         mock_stream = MagicMock()
-        mock_stream.__enter__ = MagicMock(return_value=mock_stream)
-        mock_stream.__exit__ = MagicMock(return_value=False)
-        mock_stream.__iter__ = MagicMock(return_value=iter([mock_delta]))
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+        mock_stream.__aiter__.return_value = [mock_delta]
 
         with patch.object(
             provider._client.messages, "stream", return_value=mock_stream
@@ -374,7 +426,7 @@ class TestStreamMessageBranches:
 
         # Verify temperature is not in kwargs when None
         call_kwargs = mock_stream_call.call_args.kwargs
-        assert "temperature" not in call_kwargs
+        assert "extra_body" not in call_kwargs
 
     @pytest.mark.asyncio
     async def test_stream_message_with_system_message(
@@ -391,9 +443,9 @@ class TestStreamMessageBranches:
         mock_delta.delta.text = "Hi"
 
         mock_stream = MagicMock()
-        mock_stream.__enter__ = MagicMock(return_value=mock_stream)
-        mock_stream.__exit__ = MagicMock(return_value=False)
-        mock_stream.__iter__ = MagicMock(return_value=iter([mock_delta]))
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+        mock_stream.__aiter__.return_value = [mock_delta]
 
         with patch.object(
             provider._client.messages, "stream", return_value=mock_stream
@@ -403,3 +455,131 @@ class TestStreamMessageBranches:
 
         call_kwargs = mock_stream_call.call_args.kwargs
         assert call_kwargs["system"] == "Be helpful"
+
+
+# Seconds the stub Messages API takes to answer each request
+STUB_DELAY = 0.5
+STUB_TEXT = "Hello from the stub"
+
+
+def _stub_message(model: str, text: str) -> dict:
+    return {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}] if text else [],
+        "stop_reason": "end_turn" if text else None,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 3, "output_tokens": 4},
+    }
+
+
+async def _stub_events(model: str) -> AsyncIterator[str]:
+    events = [
+        {"type": "message_start", "message": _stub_message(model, "")},
+        {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""},
+        },
+        *(
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": word + " "},
+            }
+            for word in STUB_TEXT.split()
+        ),
+        {"type": "content_block_stop", "index": 0},
+        {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": 4},
+        },
+        {"type": "message_stop"},
+    ]
+    await asyncio.sleep(STUB_DELAY)
+    for event in events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _stub_messages(request: Request) -> Response:
+    body = await request.json()
+    if body.get("stream"):
+        return StreamingResponse(
+            _stub_events(body["model"]), media_type="text/event-stream"
+        )
+    await asyncio.sleep(STUB_DELAY)
+    return JSONResponse(_stub_message(body["model"], STUB_TEXT))
+
+
+@pytest.fixture
+async def stub_provider(
+    provider_config: ProviderConfig,
+) -> AsyncIterator[AnthropicProvider]:
+    """Provider pointed at a local stub of the Messages API."""
+    app = Starlette(routes=[Route("/v1/messages", _stub_messages, methods=["POST"])])
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    provider_config.endpoint = f"http://127.0.0.1:{port}"
+    try:
+        yield AnthropicProvider(provider_config)
+    finally:
+        server.should_exit = True
+        await serving
+
+
+class TestConcurrency:
+    """Test that calls do not block the event loop."""
+
+    CALLS = 8
+
+    @pytest.mark.asyncio
+    async def test_send_message_calls_overlap(
+        self, stub_provider: AnthropicProvider
+    ) -> None:
+        """Should finish concurrent calls in about the time of one."""
+        messages = [LLMMessage(role="user", content="Hello")]
+        # The stub shares this event loop, so a blocking client could not
+        # even be answered
+        response = await stub_provider.send_message(messages)
+        assert response.content == STUB_TEXT
+        assert response.input_tokens == 3
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(stub_provider.send_message(messages) for _ in range(self.CALLS))
+        )
+        elapsed = time.perf_counter() - start
+
+        assert [r.content for r in responses] == [STUB_TEXT] * self.CALLS
+        assert elapsed < 2 * STUB_DELAY
+
+    @pytest.mark.asyncio
+    async def test_stream_message_calls_overlap(
+        self, stub_provider: AnthropicProvider
+    ) -> None:
+        """Should stream concurrent responses in about the time of one."""
+        messages = [
+            LLMMessage(role="system", content="Be brief"),
+            LLMMessage(role="user", content="Hello"),
+        ]
+
+        async def collect() -> str:
+            return "".join(
+                [chunk async for chunk in stub_provider.stream_message(messages)]
+            )
+
+        assert await collect() == STUB_TEXT + " "
+        start = time.perf_counter()
+        texts = await asyncio.gather(*(collect() for _ in range(self.CALLS)))
+        elapsed = time.perf_counter() - start
+
+        assert texts == [STUB_TEXT + " "] * self.CALLS
+        assert elapsed < 2 * STUB_DELAY
@@ -0,0 +1,609 @@
+"""Unit tests for archiving old rows into attached monthly SQLite files."""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.pool import NullPool
+
+from app.db.archive import (
+    archive_filename,
+    archive_for,
+    attach_archives,
+    compact_archives,
+    list_archives,
+    merge_archives,
+    move_exchanges,
+    move_rows,
+)
+from app.db.session import get_async_db, get_async_read_db
+from app.db.sqlite import apply_foreign_keys
+from app.main import app
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.message_blob import MessageBlob
+from app.models.session import Session
+from app.schemas.conversation import ConversationCreate
+from app.schemas.exchange import ExchangeCreate
+from app.schemas.session import SessionCreate
+from app.services.archive_service import ArchiveService
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings, get_settings
+from tests.conftest import TEST_DATABASE_URL, TestSessionLocal, sqlite_only
+
+OLD = datetime(2024, 1, 15, 12, 0)
+OLDER = datetime(2023, 11, 3, 8, 30)
+
+
+@pytest.fixture
+async def archive_factory(tmp_path):
+    """Session factory on the test database with ``tmp_path`` archives attached."""
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    apply_foreign_keys(engine.sync_engine)
+    attach_archives(engine.sync_engine, tmp_path)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def archiver(archive_factory, tmp_path) -> ArchiveService:
+    return ArchiveService(archive_factory, tmp_path, after_days=30, chunk_pause_ms=0)
+
+
+async def _create_conversation(factory, exchanges: int = 3) -> tuple[int, int]:
+    async with factory() as db:
+        service = SessionService(db)
+        session = await service.create_session(SessionCreate(name="Archive Session"))
+        conversation = await service.create_conversation(
+            ConversationCreate(session_id=session.id, title="Archive Conversation")
+        )
+        for index in range(exchanges):
+            await service.create_exchange(
+                ExchangeCreate(
+                    conversation_id=conversation.id,
+                    user_message=f"Question {index}",
+                    assistant_message="Shared answer",
+                    input_tokens=2,
+                    output_tokens=3,
+                )
+            )
+        return session.id, conversation.id
+
+
+async def _backdate(factory, model, ids, when: datetime, column: str) -> None:
+    async with factory() as db:
+        await db.execute(update(model).where(model.id.in_(ids)).values({column: when}))
+        await db.commit()
+
+
+async def _live_ids(factory, model) -> list[int]:
+    async with factory() as db:
+        return list((await db.execute(select(model.id).order_by(model.id))).scalars())
+
+
+async def _archive_all(factory, archiver, exchanges: int = 3) -> tuple[int, int]:
+    """A session whose conversation and exchanges all end up archived."""
+    session_id, conversation_id = await _create_conversation(factory, exchanges)
+    ids = await _live_ids(factory, Exchange)
+    await _backdate(factory, Exchange, ids, OLD, "created_at")
+    await _backdate(factory, Conversation, [conversation_id], OLD, "updated_at")
+    await _backdate(factory, Session, [session_id], OLD, "updated_at")
+    assert (await archiver.run()).last_error is None
+    return session_id, conversation_id
+
+
+@pytest.mark.unit
+@sqlite_only
+class TestArchiveService:
+    """Test cases for moving rows into the archive files."""
+
+    async def test_moves_old_exchanges(
+        self, archive_factory, archiver, tmp_path
+    ) -> None:
+        """Old exchanges should move to their month's file and stay readable."""
+        _, conversation_id = await _create_conversation(archive_factory)
+        ids = await _live_ids(archive_factory, Exchange)
+        await _backdate(archive_factory, Exchange, ids[:1], OLDER, "created_at")
+        await _backdate(archive_factory, Exchange, ids[1:2], OLD, "created_at")
+
+        status = await archiver.run()
+
+        assert status.last_error is None
+        assert status.exchanges_moved == 2
+        assert status.conversations_moved == 0
+        assert list(list_archives(tmp_path)) == ["archive_2024_01", "archive_2023_11"]
+        assert await _live_ids(archive_factory, Exchange) == ids[2:]
+
+        async with archive_factory() as db:
+            service = SessionService(db)
+            archived = await service.get_exchange(ids[0])
+            assert archived.user_message == "Question 0"
+            assert archived.assistant_message == "Shared answer"
+
+            exchanges, total, _ = await service.get_exchanges_by_conversation(
+                conversation_id
+            )
+            assert total == 3
+            assert [e.id for e in exchanges] == ids
+
+            first, _, cursor = await service.get_exchanges_by_conversation(
+                conversation_id, page_size=2
+            )
+            rest, _, end = await service.get_exchanges_by_conversation(
+                conversation_id, page_size=2, cursor=cursor
+            )
+            assert [e.id for e in first + rest] == ids
+            assert end is None
+
+            summaries, _, _ = await service.get_exchanges_by_conversation(
+                conversation_id, summary=True
+            )
+            assert summaries[0].user_message_preview == "Question 0"
+
+            rows, _, _ = await service.get_exchanges_by_conversation(
+                conversation_id, rows=True
+            )
+            assert [row.id for row in rows] == ids
+            assert rows[0].user_message == "Question 0"
+            assert rows[0].assistant_message == "Shared answer"
+
+            batches = [
+                batch
+                async for batch in service.stream_exchanges(
+                    conversation_id, batch_size=2
+                )
+            ]
+            assert [row.id for batch in batches for row in batch] == ids
+            assert batches[0][0].user_message == "Question 0"
+
+    async def test_archived_blobs_are_reference_counted(
+        self, archive_factory, archiver
+    ) -> None:
+        """Each archive file should hold its own references to shared blobs."""
+        await _create_conversation(archive_factory)
+        ids = await _live_ids(archive_factory, Exchange)
+        await _backdate(archive_factory, Exchange, ids[:2], OLD, "created_at")
+
+        await archiver.run()
+
+        async with archive_factory() as db:
+            live = await db.execute(
+                select(MessageBlob.hash, MessageBlob.ref_count).order_by(
+                    MessageBlob.hash
+                )
+            )
+            archived = await db.execute(
+                text("SELECT ref_count FROM archive_2024_01.message_blobs")
+            )
+            # Questions 0 and 1 moved; the shared answer is referenced from both
+            assert len(live.all()) == 2
+            assert sorted(archived.scalars()) == [1, 1, 2]
+
+    async def test_moves_cold_conversations_and_sessions(
+        self, archive_factory, archiver
+    ) -> None:
+        """Parents with nothing live left should follow their exchanges."""
+        session_id, conversation_id = await _create_conversation(archive_factory)
+        await _backdate(
+            archive_factory,
+            Exchange,
+            await _live_ids(archive_factory, Exchange),
+            OLD,
+            "created_at",
+        )
+        await _backdate(
+            archive_factory, Conversation, [conversation_id], OLD, "updated_at"
+        )
+        await _backdate(archive_factory, Session, [session_id], OLD, "updated_at")
+
+        status = await archiver.run()
+
+        assert (status.exchanges_moved, status.conversations_moved) == (3, 1)
+        assert status.sessions_moved == 1
+        assert await _live_ids(archive_factory, Session) == []
+
+        async with archive_factory() as db:
+            service = SessionService(db)
+            session = await service.get_session(session_id)
+            assert session.exchange_count == 3
+            sessions, total, _ = await service.get_sessions()
+            assert total == 1
+            assert [s.id for s in sessions] == [session_id]
+            conversations, total, _ = await service.get_conversations_by_session(
+                session_id
+            )
+            assert (total, [c.id for c in conversations]) == (1, [conversation_id])
+            sessions, _, _ = await service.get_sessions(rows=True)
+            assert [s.exchange_count for s in sessions] == [3]
+
+    async def test_write_restores_archived_parents(
+        self, archive_factory, archiver
+    ) -> None:
+        """A new exchange should bring its archived conversation and session back."""
+        session_id, conversation_id = await _create_conversation(archive_factory, 1)
+        await _backdate(
+            archive_factory,
+            Exchange,
+            await _live_ids(archive_factory, Exchange),
+            OLD,
+            "created_at",
+        )
+        await _backdate(
+            archive_factory, Conversation, [conversation_id], OLD, "updated_at"
+        )
+        await _backdate(archive_factory, Session, [session_id], OLD, "updated_at")
+        await archiver.run()
+
+        async with archive_factory() as db:
+            exchange = await SessionService(db).create_exchange(
+                ExchangeCreate(
+                    conversation_id=conversation_id,
+                    user_message="Back again",
+                    assistant_message="Welcome back",
+                    input_tokens=1,
+                    output_tokens=1,
+                )
+            )
+            assert exchange is not None
+
+        assert await _live_ids(archive_factory, Session) == [session_id]
+        assert await _live_ids(archive_factory, Conversation) == [conversation_id]
+        async with archive_factory() as db:
+            service = SessionService(db)
+            conversation = await service.get_conversation(conversation_id)
+            assert conversation.exchange_count == 2
+            _, total, _ = await service.get_exchanges_by_conversation(conversation_id)
+            assert total == 2
+
+    async def test_delete_purges_archives(
+        self, archive_factory, archiver, tmp_path
+    ) -> None:
+        """Deleting a live session should delete its archived descendants too."""
+        session_id, _ = await _create_conversation(archive_factory)
+        ids = await _live_ids(archive_factory, Exchange)
+        await _backdate(archive_factory, Exchange, ids[:2], OLD, "created_at")
+        await archiver.run()
+
+        async with archive_factory() as db:
+            assert await SessionService(db).delete_session(session_id)
+
+        async with archive_factory() as db:
+            for table in ("exchanges", "exchange_bodies", "message_blobs"):
+                count = await db.execute(
+                    text(f"SELECT count(*) FROM archive_2024_01.{table}")
+                )
+                assert count.scalar_one() == 0
+            assert (
+                await db.execute(select(func.count(MessageBlob.hash)))
+            ).scalar_one() == 0
+
+    async def test_archived_ids_are_not_reused(self, archive_factory, archiver) -> None:
+        """New rows should never take the id of an archived row."""
+        _, conversation_id = await _create_conversation(archive_factory)
+        ids = await _live_ids(archive_factory, Exchange)
+        await _backdate(archive_factory, Exchange, ids[-1:], OLD, "created_at")
+        await archiver.run()
+
+        async with archive_factory() as db:
+            exchange = await SessionService(db).create_exchange(
+                ExchangeCreate(
+                    conversation_id=conversation_id,
+                    user_message="New",
+                    assistant_message="Row",
+                )
+            )
+            assert exchange.id > ids[-1]
+
+    async def test_failure_is_reported(self, archiver, monkeypatch) -> None:
+        """A chunk that fails should end the pass and record the error."""
+        await _create_conversation(archiver._session_factory, 1)
+        ids = await _live_ids(archiver._session_factory, Exchange)
+        await _backdate(archiver._session_factory, Exchange, ids, OLD, "created_at")
+
+        def fail(session, ids, schema) -> None:
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr("app.services.archive_service.move_exchanges", fail)
+        status = await archiver.run()
+
+        assert status.running is False
+        assert status.finished_at is not None
+        assert status.last_error == "RuntimeError: disk full"
+        assert await _live_ids(archiver._session_factory, Exchange) == ids
+
+    async def test_busy_chunk_is_retried(self, archiver, monkeypatch) -> None:
+        """A chunk that finds SQLite busy should be retried, not fail the pass."""
+        monkeypatch.setattr(get_settings().performance, "write_retry_backoff", 0)
+        await _create_conversation(archiver._session_factory, 1)
+        ids = await _live_ids(archiver._session_factory, Exchange)
+        await _backdate(archiver._session_factory, Exchange, ids, OLD, "created_at")
+        calls = []
+
+        def busy_once(session, ids, schema) -> None:
+            calls.append(ids)
+            if len(calls) == 1:
+                raise OperationalError(
+                    "INSERT", {}, sqlite3.OperationalError("database is locked")
+                )
+            move_exchanges(session, ids, schema)
+
+        monkeypatch.setattr("app.services.archive_service.move_exchanges", busy_once)
+        status = await archiver.run()
+
+        assert status.last_error is None
+        assert (status.exchanges_moved, len(calls)) == (1, 2)
+        assert await _live_ids(archiver._session_factory, Exchange) == []
+
+    async def test_stop_cancels_running_pass(self, archive_factory, tmp_path) -> None:
+        """Stopping should cancel between chunks, keeping the chunks moved."""
+        archiver = ArchiveService(
+            archive_factory, tmp_path, chunk_size=1, chunk_pause_ms=60_000
+        )
+        await _create_conversation(archive_factory)
+        ids = await _live_ids(archive_factory, Exchange)
+        await _backdate(archive_factory, Exchange, ids, OLD, "created_at")
+
+        assert archiver.start(after_days=30) is True
+        assert archiver.start(after_days=30) is False
+        with pytest.raises(RuntimeError):
+            await archiver.run()
+        while archiver.status().chunks == 0:
+            await asyncio.sleep(0.01)
+        await archiver.stop()
+
+        status = await archiver.wait()
+        assert status.running is False
+        assert status.exchanges_moved == 1
+        assert await _live_ids(archive_factory, Exchange) == ids[1:]
+        await archiver.stop()
+
+    def test_from_settings(self, tmp_path) -> None:
+        """Should configure the archiver from PerformanceSettings."""
+        archiver = ArchiveService.from_settings(
+            TestSessionLocal,
+            tmp_path,
+            PerformanceSettings(
+                archive_after_days=7, archive_chunk_size=10, archive_chunk_pause_ms=5
+            ),
+        )
+        assert (archiver.after_days, archiver.chunk_size) == (7, 10)
+        assert archiver.chunk_pause == 0.005
+
+
+@pytest.mark.unit
+class TestArchiveFiles:
+    """Test cases for archive file management."""
+
+    def test_compaction_merges_oldest_year(self, tmp_path) -> None:
+        """Month files of the oldest year should be merged to stay under the limit."""
+        for month in (1, 2, 3):
+            archive_for(tmp_path, datetime(2023, month, 1))
+        engine = create_engine(f"sqlite:///{tmp_path / 'live.db'}")
+        attach_archives(engine, tmp_path)
+        Session.__table__.create(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                Session.__table__.insert(),
+                [{"id": month, "name": f"Session {month}"} for month in (1, 2, 3)],
+            )
+        for month in (1, 2, 3):
+            with engine.begin() as conn:
+                move_rows(
+                    OrmSession(conn), "sessions", [month], f"archive_2023_{month:02d}"
+                )
+        engine.dispose()
+
+        compact_archives(tmp_path, [datetime(2024, 5, 1)], limit=2)
+
+        assert list(list_archives(tmp_path)) == ["archive_2023"]
+        assert archive_for(tmp_path, datetime(2023, 7, 1)) == "archive_2023"
+        engine = create_engine(f"sqlite:///{tmp_path / 'live.db'}")
+        attach_archives(engine, tmp_path)
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT id FROM archive_2023.sessions ORDER BY id")
+            )
+            assert rows.scalars().all() == [1, 2, 3]
+        engine.dispose()
+
+    def test_merge_fails_writes_to_merged_files(self, tmp_path) -> None:
+        """A connection still attaching a merged file should fail, not lose writes."""
+        for month in (1, 2):
+            archive_for(tmp_path, datetime(2023, month, 1))
+        engine = create_engine(f"sqlite:///{tmp_path / 'live.db'}")
+        attach_archives(engine, tmp_path)
+        insert_session = text(
+            "INSERT INTO archive_2023_01.sessions (id, name) VALUES (:id, 'Stale')"
+        )
+        with engine.connect() as stale:
+            stale.execute(insert_session, {"id": 1})
+            stale.commit()
+
+            merge_archives(
+                tmp_path / archive_filename(2023),
+                list(list_archives(tmp_path).values()),
+            )
+
+            # Still attached to the unlinked month file, whose tables are gone
+            with pytest.raises(OperationalError, match="no such table"):
+                stale.execute(insert_session, {"id": 2})
+            stale.rollback()
+        engine.dispose()
+
+        assert list(list_archives(tmp_path)) == ["archive_2023"]
+        engine = create_engine(f"sqlite:///{tmp_path / 'live.db'}")
+        attach_archives(engine, tmp_path)
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT id FROM archive_2023.sessions"))
+            assert rows.scalars().all() == [1]
+        engine.dispose()
+
+
+@pytest.mark.unit
+@sqlite_only
+class TestArchiveAPI:
+    """Test cases for the archive routes."""
+
+    @pytest.fixture
+    async def archive_client(self, archive_factory, archiver):
+        async def override():
+            async with archive_factory() as session:
+                yield session
+
+        dependencies = (get_async_db, get_async_read_db)
+        previous = {dep: app.dependency_overrides[dep] for dep in dependencies}
+        app.dependency_overrides.update(dict.fromkeys(dependencies, override))
+        app.state.archiver = archiver
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+        app.state.archiver = None
+        app.dependency_overrides.update(previous)
+
+    async def test_run_and_status(
+        self, archive_client, archive_factory, archiver
+    ) -> None:
+        """POST /run should start a pass whose progress GET /status reports."""
+        _, conversation_id = await _create_conversation(archive_factory)
+        ids = await _live_ids(archive_factory, Exchange)
+        await _backdate(archive_factory, Exchange, ids[:1], OLD, "created_at")
+
+        response = await archive_client.post("/api/archive/run")
+        assert response.status_code == 202
+        assert response.json()["running"] is True
+        await archiver.wait()
+
+        response = await archive_client.get("/api/archive/status")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["running"] is False
+        assert data["exchanges_moved"] == 1
+        assert [a["schema_name"] for a in data["archives"]] == ["archive_2024_01"]
+
+        response = await archive_client.get(f"/api/exchanges/{ids[0]}")
+        assert response.status_code == 200
+        assert response.json()["user_message"] == "Question 0"
+
+    async def test_archived_rows_can_be_updated(
+        self, archive_client, archive_factory, archiver
+    ) -> None:
+        """PUT on an archived session or conversation should restore and update it."""
+        session_id, conversation_id = await _archive_all(archive_factory, archiver)
+
+        response = await archive_client.put(
+            f"/api/conversations/{conversation_id}", json={"title": "Renamed"}
+        )
+        assert response.status_code == 200
+        assert response.json()["title"] == "Renamed"
+        assert response.json()["exchange_count"] == 3
+        assert await _live_ids(archive_factory, Session) == [session_id]
+        assert await _live_ids(archive_factory, Conversation) == [conversation_id]
+
+        session_id, _ = await _archive_all(archive_factory, archiver)
+        response = await archive_client.put(
+            f"/api/sessions/{session_id}", json={"name": "Renamed"}
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
+        assert session_id in await _live_ids(archive_factory, Session)
+
+        response = await archive_client.put("/api/sessions/9999", json={"name": "x"})
+        assert response.status_code == 404
+
+    async def test_archived_parents_take_new_rows(
+        self, archive_client, archive_factory, archiver
+    ) -> None:
+        """New conversations and bulk exchanges should restore archived parents."""
+        session_id, conversation_id = await _archive_all(archive_factory, archiver)
+
+        response = await archive_client.post(
+            "/api/exchanges/bulk",
+            json={
+                "items": [
+                    {
+                        "conversation_id": conversation_id,
+                        "user_message": "Back again",
+                        "assistant_message": "Welcome back",
+                        "input_tokens": 1,
+                    },
+                    {
+                        "conversation_id": 9999,
+                        "user_message": "Nowhere",
+                        "assistant_message": "Lost",
+                    },
+                ]
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["ids"][1] is None
+        assert await _live_ids(archive_factory, Conversation) == [conversation_id]
+        response = await archive_client.get(f"/api/conversations/{conversation_id}")
+        assert response.json()["exchange_count"] == 4
+
+        session_id, _ = await _archive_all(archive_factory, archiver)
+        response = await archive_client.post(
+            "/api/conversations", json={"session_id": session_id, "title": "New"}
+        )
+        assert response.status_code == 201
+        assert session_id in await _live_ids(archive_factory, Session)
+        response = await archive_client.get(f"/api/sessions/{session_id}")
+        assert response.json()["conversation_count"] == 2
+
+    async def test_archived_rows_can_be_deleted(
+        self, archive_client, archive_factory, archiver
+    ) -> None:
+        """DELETE should remove archived exchanges, conversations and sessions."""
+        session_id, conversation_id = await _archive_all(archive_factory, archiver)
+        async with archive_factory() as db:
+            result = await db.execute(
+                text("SELECT id FROM archive_2024_01.exchanges ORDER BY id")
+            )
+            ids = result.scalars().all()
+
+        response = await archive_client.delete(f"/api/exchanges/{ids[0]}")
+        assert response.status_code == 204
+        response = await archive_client.get(f"/api/exchanges/{ids[0]}")
+        assert response.status_code == 404
+        conversation = (
+            await archive_client.get(f"/api/conversations/{conversation_id}")
+        ).json()
+        assert conversation["exchange_count"] == 2
+        assert conversation["total_input_tokens"] == 4
+        session = (await archive_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["exchange_count"] == 2
+
+        response = await archive_client.delete(f"/api/conversations/{conversation_id}")
+        assert response.status_code == 204
+        session = (await archive_client.get(f"/api/sessions/{session_id}")).json()
+        assert (session["conversation_count"], session["exchange_count"]) == (0, 0)
+        response = await archive_client.delete(f"/api/sessions/{session_id}")
+        assert response.status_code == 204
+        response = await archive_client.get(f"/api/sessions/{session_id}")
+        assert response.status_code == 404
+
+        async with archive_factory() as db:
+            for table in ("sessions", "conversations", "exchanges", "message_blobs"):
+                count = await db.execute(
+                    text(f"SELECT count(*) FROM archive_2024_01.{table}")
+                )
+                assert count.scalar_one() == 0
+
+    async def test_run_conflict(self, archive_client, archiver) -> None:
+        """A second pass should be refused while one is running."""
+        archiver.start(after_days=30)
+        response = await archive_client.post("/api/archive/run")
+        assert response.status_code == 409
+        await archiver.wait()
+
+    async def test_unavailable_without_archiver(self, async_client) -> None:
+        """The routes should answer 503 when no archiver is configured."""
+        app.state.archiver = None
+        response = await async_client.get("/api/archive/status")
+        assert response.status_code == 503
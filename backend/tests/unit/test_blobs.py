@@ -0,0 +1,164 @@
+"""Unit tests for content-addressed message blobs."""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.blobs import acquire_blobs, release_blobs
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.message_blob import MessageBlob, content_hash
+from app.models.session import Session
+from app.schemas.exchange import ExchangeCreate
+from app.services.session_service import SessionService
+
+PASTED_FILE = "import os\n\nprint(os.getcwd())\n" * 100
+
+
+async def _ref_counts(db: AsyncSession) -> dict:
+    result = await db.execute(select(MessageBlob.hash, MessageBlob.ref_count))
+    return dict(result.all())
+
+
+async def _create_conversation(db: AsyncSession) -> Conversation:
+    session = Session(name="Blobs")
+    db.add(session)
+    await db.flush()
+    conversation = Conversation(session_id=session.id, title="Blobs")
+    db.add(conversation)
+    await db.commit()
+    return conversation
+
+
+def _exchange(conversation_id: int, user: str, assistant: str) -> ExchangeCreate:
+    return ExchangeCreate(
+        conversation_id=conversation_id, user_message=user, assistant_message=assistant
+    )
+
+
+@pytest.mark.unit
+class TestMessageBlobs:
+    """Test cases for blob deduplication and garbage collection."""
+
+    async def test_create_exchange_dedupes(self, db_session: AsyncSession) -> None:
+        """Repeated messages should share one blob with a reference per use."""
+        conversation = await _create_conversation(db_session)
+        service = SessionService(db_session)
+        first = await service.create_exchange(
+            _exchange(conversation.id, PASTED_FILE, "a")
+        )
+        second = await service.create_exchange(
+            _exchange(conversation.id, PASTED_FILE, "b")
+        )
+
+        assert first.user_message_hash == second.user_message_hash
+        assert await _ref_counts(db_session) == {
+            content_hash(PASTED_FILE): 2,
+            content_hash("a"): 1,
+            content_hash("b"): 1,
+        }
+
+        db_session.expunge_all()
+        loaded = await service.get_exchange(second.id)
+        assert loaded.user_message == PASTED_FILE
+        assert loaded.assistant_message == "b"
+
+    async def test_bulk_dedupes(self, db_session: AsyncSession) -> None:
+        """Bulk creation should dedupe within the batch and against stored blobs."""
+        conversation = await _create_conversation(db_session)
+        service = SessionService(db_session)
+        await service.create_exchange(_exchange(conversation.id, PASTED_FILE, "ok"))
+        exchanges, _ = await service.create_exchanges_bulk(
+            [_exchange(conversation.id, PASTED_FILE, "ok") for _ in range(3)]
+        )
+
+        assert [e.user_message for e in exchanges] == [PASTED_FILE] * 3
+        assert await _ref_counts(db_session) == {
+            content_hash(PASTED_FILE): 4,
+            content_hash("ok"): 4,
+        }
+
+    async def test_delete_exchange_collects_garbage(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Deleting an exchange should release its blobs and drop unreferenced ones."""
+        conversation = await _create_conversation(db_session)
+        service = SessionService(db_session)
+        first = await service.create_exchange(
+            _exchange(conversation.id, PASTED_FILE, "a")
+        )
+        await service.create_exchange(_exchange(conversation.id, PASTED_FILE, "b"))
+
+        assert await service.delete_exchange(first.id) is True
+        assert await _ref_counts(db_session) == {
+            content_hash(PASTED_FILE): 1,
+            content_hash("b"): 1,
+        }
+
+    async def test_delete_conversation_collects_garbage(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Deleting a conversation should release the blobs of all its exchanges."""
+        conversation = await _create_conversation(db_session)
+        other = Conversation(session_id=conversation.session_id, title="Other")
+        db_session.add(other)
+        await db_session.commit()
+        service = SessionService(db_session)
+        await service.create_exchanges_bulk(
+            [_exchange(conversation.id, PASTED_FILE, "a") for _ in range(3)]
+        )
+        await service.create_exchange(_exchange(other.id, PASTED_FILE, "kept"))
+
+        assert await service.delete_conversation(conversation.id) is True
+        assert await _ref_counts(db_session) == {
+            content_hash(PASTED_FILE): 1,
+            content_hash("kept"): 1,
+        }
+
+    async def test_delete_session_collects_garbage(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Deleting a session should leave no blobs behind."""
+        conversation = await _create_conversation(db_session)
+        service = SessionService(db_session)
+        await service.create_exchanges_bulk(
+            [_exchange(conversation.id, PASTED_FILE, f"answer {i}") for i in range(5)]
+        )
+
+        assert await service.delete_session(conversation.session_id) is True
+        assert await _ref_counts(db_session) == {}
+
+    async def test_reassigning_message_releases_old_blob(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Changing a message through the ORM should move its reference."""
+        conversation = await _create_conversation(db_session)
+        exchange = Exchange(
+            conversation_id=conversation.id,
+            user_message="old",
+            assistant_message="reply",
+        )
+        db_session.add(exchange)
+        await db_session.commit()
+
+        exchange.user_message = "new"
+        await db_session.commit()
+
+        assert exchange.user_message == "new"
+        assert await _ref_counts(db_session) == {
+            content_hash("new"): 1,
+            content_hash("reply"): 1,
+        }
+
+    async def test_acquire_and_release(self, db_session: AsyncSession) -> None:
+        """acquire_blobs/release_blobs should keep counts and collect at zero."""
+        hashes = await db_session.run_sync(acquire_blobs, ["x", "y", "x"])
+        assert hashes == [content_hash("x"), content_hash("y"), content_hash("x")]
+        assert await _ref_counts(db_session) == {
+            content_hash("x"): 2,
+            content_hash("y"): 1,
+        }
+
+        collected = await db_session.run_sync(release_blobs, hashes[:2])
+        assert collected == 1
+        assert await _ref_counts(db_session) == {content_hash("x"): 1}
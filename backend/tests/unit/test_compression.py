@@ -0,0 +1,242 @@
+"""Unit tests for message compression."""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.compression import (
+    RAW,
+    ZLIB,
+    ZLIB_DICT,
+    ZSTD,
+    ZSTD_DICT,
+    CompressedText,
+    CompressionError,
+    MessageCodec,
+    main,
+    train_dictionary,
+)
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.session import Session
+from app.services.settings import PerformanceSettings
+from tests.conftest import sqlite_only
+
+LONG_TEXT = 'Traceback (most recent call last):\n  File "app.py", line 1\n' * 40
+
+
+@pytest.mark.unit
+class TestMessageCodec:
+    """Test cases for MessageCodec."""
+
+    def test_zlib_roundtrip(self) -> None:
+        """Long values should be zlib-compressed and decode to the original."""
+        codec = MessageCodec()
+        encoded = codec.encode(LONG_TEXT)
+        assert encoded[0] == ZLIB
+        assert len(encoded) < len(LONG_TEXT)
+        assert codec.decode(encoded) == LONG_TEXT
+
+    def test_short_values_stored_raw(self) -> None:
+        """Values below min_size should be stored raw."""
+        codec = MessageCodec(min_size=128)
+        assert codec.encode("héllo") == bytes([RAW]) + "héllo".encode()
+        assert codec.decode(codec.encode("héllo")) == "héllo"
+
+    def test_disabled_stores_raw(self) -> None:
+        """With compression disabled every value should be stored raw."""
+        encoded = MessageCodec(enabled=False).encode(LONG_TEXT)
+        assert encoded[0] == RAW
+        # Any codec can read raw values
+        assert MessageCodec().decode(encoded) == LONG_TEXT
+
+    def test_incompressible_values_stored_raw(self) -> None:
+        """Values that do not shrink should be stored raw."""
+        # Level 0 only adds zlib framing, so the output is always larger
+        codec = MessageCodec(level=0, min_size=0)
+        assert codec.encode(LONG_TEXT)[0] == RAW
+        assert codec.decode(codec.encode(LONG_TEXT)) == LONG_TEXT
+
+    def test_decode_legacy_text(self) -> None:
+        """Plain strings from before compression should be returned unchanged."""
+        assert MessageCodec().decode("plain text") == "plain text"
+
+    def test_decode_unknown_marker(self) -> None:
+        """An unknown marker byte should raise CompressionError."""
+        with pytest.raises(CompressionError):
+            MessageCodec().decode(b"\xffdata")
+        with pytest.raises(CompressionError):
+            MessageCodec().decode(b"")
+
+    def test_unknown_codec(self) -> None:
+        """An unknown codec name should raise CompressionError."""
+        with pytest.raises(CompressionError):
+            MessageCodec(codec="lz4")
+
+    def test_zlib_dictionary(self) -> None:
+        """A preset dictionary should improve compression of similar values."""
+        samples = [LONG_TEXT] * 3 + ["You are a helpful assistant."] * 5
+        dictionary = train_dictionary(samples)
+        with_dictionary = MessageCodec(dictionary=dictionary)
+        encoded = with_dictionary.encode(LONG_TEXT)
+        assert encoded[0] == ZLIB_DICT
+        assert len(encoded) < len(MessageCodec().encode(LONG_TEXT))
+        assert with_dictionary.decode(encoded) == LONG_TEXT
+
+    def test_missing_dictionary(self) -> None:
+        """Decoding a dictionary value without that dictionary should raise."""
+        encoded = MessageCodec(dictionary=b"some dictionary" * 10).encode(LONG_TEXT)
+        with pytest.raises(CompressionError):
+            MessageCodec().decode(encoded)
+        with pytest.raises(CompressionError):
+            MessageCodec(dictionary=b"another dictionary").decode(encoded)
+
+    def test_train_zlib_dictionary_size(self) -> None:
+        """A zlib dictionary should be trimmed to the requested size."""
+        dictionary = train_dictionary([LONG_TEXT, "other"], size=100)
+        assert len(dictionary) == 100
+
+    def test_from_settings(self, tmp_path: Path) -> None:
+        """Should build the codec from PerformanceSettings."""
+        dictionary_path = tmp_path / "messages.dict"
+        dictionary_path.write_bytes(b"dictionary")
+        codec = MessageCodec.from_settings(
+            PerformanceSettings(
+                compress_data=False,
+                compression_level=9,
+                compression_min_size=10,
+                compression_dictionary=str(dictionary_path),
+            )
+        )
+        assert codec.enabled is False
+        assert codec.level == 9
+        assert codec.min_size == 10
+        assert codec.dictionary == b"dictionary"
+
+    def test_zstd_roundtrip(self) -> None:
+        """The zstd codec should roundtrip, with and without a dictionary."""
+        pytest.importorskip("zstandard")
+        codec = MessageCodec(codec="zstd", level=3)
+        encoded = codec.encode(LONG_TEXT)
+        assert encoded[0] == ZSTD
+        assert codec.decode(encoded) == LONG_TEXT
+
+        dictionary = train_dictionary([LONG_TEXT] * 20, codec="zlib")
+        with_dictionary = MessageCodec(codec="zstd", dictionary=dictionary)
+        encoded = with_dictionary.encode(LONG_TEXT)
+        assert encoded[0] == ZSTD_DICT
+        assert with_dictionary.decode(encoded) == LONG_TEXT
+
+    def test_zstd_unavailable(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Without zstandard, zstd encoding, decoding and training should raise."""
+        monkeypatch.setattr("app.db.compression.zstandard", None)
+        with pytest.raises(CompressionError, match="zstandard"):
+            MessageCodec(codec="zstd")
+        with pytest.raises(CompressionError, match="zstandard"):
+            MessageCodec().decode(bytes([ZSTD]) + b"payload")
+        with pytest.raises(CompressionError, match="zstandard"):
+            train_dictionary([LONG_TEXT], codec="zstd")
+
+    def test_train_zstd_dictionary(self) -> None:
+        """A zstd dictionary should be trained with zstandard's trainer."""
+        pytest.importorskip("zstandard")
+        samples = [f"{LONG_TEXT}request {index}\n" for index in range(200)]
+        dictionary = train_dictionary(samples, codec="zstd", size=4096)
+        assert 0 < len(dictionary) <= 4096
+        codec = MessageCodec(codec="zstd", dictionary=dictionary)
+        assert codec.decode(codec.encode(samples[0])) == samples[0]
+
+    def test_cli_writes_dictionary(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """The command line should train from stored messages and save the file."""
+        db = MagicMock()
+        db.__enter__.return_value = db
+        db.execute.return_value.scalars.return_value = [LONG_TEXT, "other"]
+        monkeypatch.setattr("app.db.session.SessionLocal", lambda: db)
+        output = tmp_path / "messages.dict"
+        monkeypatch.setattr(
+            "sys.argv", ["compression", str(output), "--codec", "zlib", "--size", "64"]
+        )
+        main()
+
+        assert output.read_bytes() == train_dictionary([LONG_TEXT, "other"], size=64)
+        assert "Wrote 64 byte zlib dictionary from 2 samples" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+class TestCompressedText:
+    """Test cases for the CompressedText column type on message blobs."""
+
+    async def _create_exchange(self, db: AsyncSession, message: str) -> Exchange:
+        session = Session(name="Compression")
+        db.add(session)
+        await db.flush()
+        conversation = Conversation(session_id=session.id, title="Compression")
+        db.add(conversation)
+        await db.flush()
+        exchange = Exchange(
+            conversation_id=conversation.id,
+            user_message=message,
+            assistant_message="ok",
+        )
+        db.add(exchange)
+        await db.commit()
+        return exchange
+
+    async def test_stored_compressed_read_as_text(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Messages should be stored compressed and loaded back as str."""
+        exchange = await self._create_exchange(db_session, LONG_TEXT)
+
+        stored = await db_session.scalar(
+            text("SELECT content FROM message_blobs WHERE hash = :hash"),
+            {"hash": exchange.user_message_hash},
+        )
+        assert stored[0] == ZLIB
+        assert len(stored) < len(LONG_TEXT)
+
+        db_session.expunge_all()
+        loaded = await db_session.get(Exchange, exchange.id)
+        assert loaded.user_message == LONG_TEXT
+        assert loaded.assistant_message == "ok"
+
+    @sqlite_only
+    async def test_reads_legacy_text_rows(self, db_session: AsyncSession) -> None:
+        """Rows holding plain text should still load."""
+        exchange = await self._create_exchange(db_session, "before")
+        await db_session.execute(
+            text("UPDATE message_blobs SET content = 'legacy' WHERE hash = :hash"),
+            {"hash": exchange.user_message_hash},
+        )
+        await db_session.commit()
+
+        db_session.expunge_all()
+        loaded = await db_session.get(Exchange, exchange.id)
+        assert loaded.user_message == "legacy"
+
+    async def test_honors_compress_data(self, db_session: AsyncSession) -> None:
+        """With compress_data disabled messages should be stored raw."""
+        with patch(
+            "app.db.compression.get_codec", return_value=MessageCodec(enabled=False)
+        ):
+            exchange = await self._create_exchange(db_session, LONG_TEXT)
+        stored = await db_session.scalar(
+            text("SELECT content FROM message_blobs WHERE hash = :hash"),
+            {"hash": exchange.user_message_hash},
+        )
+        assert stored[0] == RAW
+
+    def test_null_passes_through(self) -> None:
+        """NULL should be neither compressed nor decoded."""
+        column = CompressedText()
+        assert column.process_bind_param(None, sqlite.dialect()) is None
+        assert column.process_result_value(None, sqlite.dialect()) is None
@@ -0,0 +1,130 @@
+"""Tests for resolving the database URL and engine options."""
+
+from pathlib import Path
+
+import pytest
+
+from app.db.session import (
+    DATABASE_READ_URL_ENV,
+    DATABASE_URL_ENV,
+    driver_url,
+    engine_options,
+    get_database_url,
+    get_read_database_url,
+)
+from app.services.settings import AppSettings, DatabaseSettings, GeneralSettings
+
+
+@pytest.mark.unit
+class TestDatabaseUrl:
+    """Test cases for get_database_url and driver_url."""
+
+    def test_defaults_to_sqlite_in_data_directory(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Without a configured URL the SQLite file in data_directory is used."""
+        monkeypatch.delenv(DATABASE_URL_ENV, raising=False)
+        settings = AppSettings(general=GeneralSettings(data_directory=str(tmp_path)))
+        assert get_database_url(settings) == f"sqlite:///{tmp_path / 'clouseau.db'}"
+
+    def test_settings_url(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """database.url should replace the SQLite default."""
+        monkeypatch.delenv(DATABASE_URL_ENV, raising=False)
+        settings = AppSettings(database=DatabaseSettings(url="postgresql://db/app"))
+        assert get_database_url(settings) == "postgresql://db/app"
+
+    def test_environment_overrides_settings(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """$CLOUSEAU_DATABASE_URL should win over settings.yaml."""
+        monkeypatch.setenv(DATABASE_URL_ENV, "postgresql://env/app")
+        settings = AppSettings(database=DatabaseSettings(url="postgresql://db/app"))
+        assert get_database_url(settings) == "postgresql://env/app"
+
+    def test_read_url_defaults_to_primary(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Reads should go to the replica when one is configured."""
+        monkeypatch.delenv(DATABASE_URL_ENV, raising=False)
+        monkeypatch.delenv(DATABASE_READ_URL_ENV, raising=False)
+        settings = AppSettings(database=DatabaseSettings(url="postgresql://db/app"))
+        assert get_read_database_url(settings) == "postgresql://db/app"
+
+        settings.database.read_url = "postgresql://replica/app"
+        assert get_read_database_url(settings) == "postgresql://replica/app"
+        monkeypatch.setenv(DATABASE_READ_URL_ENV, "postgresql://env-replica/app")
+        assert get_read_database_url(settings) == "postgresql://env-replica/app"
+
+    def test_driver_url_fills_in_drivers(self) -> None:
+        """Bare backends should get the async and sync drivers the app uses."""
+        url = "postgresql://user:secret@db:5432/app"
+        assert driver_url(url, asynchronous=True).drivername == "postgresql+asyncpg"
+        assert driver_url(url, asynchronous=False).drivername == "postgresql+psycopg"
+        assert driver_url(url, asynchronous=True).password == "secret"
+        assert driver_url("sqlite:///x.db", True).drivername == "sqlite+aiosqlite"
+        assert driver_url("sqlite:///x.db", False).drivername == "sqlite+pysqlite"
+
+    def test_driver_url_keeps_explicit_sync_driver(self) -> None:
+        """An explicit sync driver is kept; an async one is swapped for sync use."""
+        assert (
+            driver_url("postgresql+psycopg2://db/app", False).drivername
+            == "postgresql+psycopg2"
+        )
+        assert (
+            driver_url("postgresql+asyncpg://db/app", False).drivername
+            == "postgresql+psycopg"
+        )
+        assert (
+            driver_url("postgresql+psycopg2://db/app", True).drivername
+            == "postgresql+asyncpg"
+        )
+
+    def test_unsupported_backend(self) -> None:
+        """Databases other than SQLite and PostgreSQL should be rejected."""
+        with pytest.raises(ValueError, match="mysql"):
+            driver_url("mysql://db/app", asynchronous=True)
+
+
+@pytest.mark.unit
+class TestEngineOptions:
+    """Test cases for engine_options."""
+
+    def test_postgres_pool_and_statement_cache(self) -> None:
+        """PostgreSQL engines should get the configured pool and statement cache."""
+        database = DatabaseSettings(
+            pool_size=4,
+            max_overflow=2,
+            pool_timeout=5,
+            pool_recycle=60,
+            pool_pre_ping=False,
+            statement_cache_size=0,
+        )
+        options = engine_options(
+            driver_url("postgresql://db/app", True), database, asynchronous=True
+        )
+        assert options["pool_size"] == 4
+        assert options["max_overflow"] == 2
+        assert options["pool_timeout"] == 5
+        assert options["pool_recycle"] == 60
+        assert options["pool_pre_ping"] is False
+        assert options["connect_args"] == {"prepared_statement_cache_size": 0}
+
+        read_options = engine_options(
+            driver_url("postgresql://db/app", True), database, True, read_only=True
+        )
+        assert read_options["connect_args"]["server_settings"] == {
+            "default_transaction_read_only": "on"
+        }
+
+        sync_options = engine_options(
+            driver_url("postgresql://db/app", False), database, asynchronous=False
+        )
+        assert "connect_args" not in sync_options
+        assert sync_options["pool_size"] == 4
+
+    def test_sqlite_keeps_default_pool(self) -> None:
+        """SQLite engines should only get the thread check disabled."""
+        options = engine_options(
+            driver_url("sqlite:///x.db", True), DatabaseSettings(echo=True), True
+        )
+        assert options == {"echo": True, "connect_args": {"check_same_thread": False}}
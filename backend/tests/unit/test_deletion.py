@@ -0,0 +1,295 @@
+"""Unit tests for cascading and background deletes."""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.exchange_body import ExchangeBody
+from app.models.message_blob import MessageBlob
+from app.models.session import Session
+from app.schemas.conversation import ConversationCreate
+from app.schemas.exchange import ExchangeCreate
+from app.schemas.session import SessionCreate
+from app.services.deletion_service import DeletionService
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings
+from tests.conftest import TestSessionLocal
+
+
+async def _create_session(
+    conversations: int = 2, exchanges: int = 3
+) -> tuple[int, list[int]]:
+    """A session whose exchanges all repeat one user message."""
+    async with TestSessionLocal() as db:
+        service = SessionService(db)
+        session = await service.create_session(SessionCreate(name="Delete Session"))
+        conversation_ids = []
+        for c in range(conversations):
+            conversation = await service.create_conversation(
+                ConversationCreate(session_id=session.id, title=f"Conversation {c}")
+            )
+            conversation_ids.append(conversation.id)
+            await service.create_exchanges_bulk(
+                [
+                    ExchangeCreate(
+                        conversation_id=conversation.id,
+                        user_message="Same question",
+                        assistant_message=f"Answer {c}.{i}",
+                        input_tokens=2,
+                        output_tokens=3,
+                    )
+                    for i in range(exchanges)
+                ]
+            )
+        return session.id, conversation_ids
+
+
+async def _count(model) -> int:
+    async with TestSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def _counters(model, row_id: int) -> tuple[int, int, int]:
+    async with TestSessionLocal() as db:
+        return (
+            await db.execute(
+                select(
+                    model.exchange_count,
+                    model.total_input_tokens,
+                    model.total_output_tokens,
+                ).where(model.id == row_id)
+            )
+        ).one()
+
+
+@pytest.mark.unit
+class TestCascadingDeletes:
+    """Test cases for deletes cascaded by the database."""
+
+    async def test_delete_session_cascades(self, query_recorder: list) -> None:
+        """One DELETE should remove the session's rows without loading them."""
+        session_id, _ = await _create_session()
+        query_recorder.clear()
+
+        async with TestSessionLocal() as db:
+            assert await SessionService(db).delete_session(session_id) is True
+
+        statements = [statement for statement, _ in query_recorder]
+        deletes = [s for s in statements if s.startswith("DELETE")]
+        assert [s.split()[2] for s in deletes] == ["sessions", "message_blobs"]
+        assert not any("exchanges.user_message_length" in s for s in statements)
+        for model in (Session, Conversation, Exchange, ExchangeBody, MessageBlob):
+            assert await _count(model) == 0
+
+    async def test_delete_conversation_keeps_shared_blobs(self) -> None:
+        """Blobs still referenced by another conversation should survive."""
+        session_id, conversation_ids = await _create_session()
+
+        async with TestSessionLocal() as db:
+            assert await SessionService(db).delete_conversation(conversation_ids[0])
+
+        assert await _count(Exchange) == 3
+        async with TestSessionLocal() as db:
+            ref_counts = dict(
+                (
+                    await db.execute(select(MessageBlob.hash, MessageBlob.ref_count))
+                ).all()
+            )
+        assert sorted(ref_counts.values()) == [1, 1, 1, 3]
+        assert await _counters(Session, session_id) == (3, 6, 9)
+
+    async def test_delete_exchanges_chunk(self, db_session: AsyncSession) -> None:
+        """A chunk should delete the oldest exchanges and shrink the counters."""
+        session_id, conversation_ids = await _create_session()
+        service = SessionService(db_session)
+
+        assert await service.delete_exchanges_chunk(4, session_id=session_id) == 4
+
+        assert await _count(Exchange) == 2
+        assert await _counters(Conversation, conversation_ids[0]) == (0, 0, 0)
+        assert await _counters(Conversation, conversation_ids[1]) == (2, 4, 6)
+        assert await _counters(Session, session_id) == (2, 4, 6)
+        assert await _count(MessageBlob) == 3
+        assert await service.delete_exchanges_chunk(4, session_id=session_id) == 2
+        assert await service.delete_exchanges_chunk(4, session_id=session_id) == 0
+        assert await _count(MessageBlob) == 0
+
+
+@pytest.mark.unit
+class TestDeletionService:
+    """Test cases for DeletionService."""
+
+    async def test_session_deleted_in_chunks(self) -> None:
+        """The session should be emptied a chunk at a time, then deleted."""
+        session_id, _ = await _create_session()
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+
+        deletion = deleter.start("session", session_id, 6)
+        assert deletion.running is True
+        status = await deleter.wait(deletion.id)
+
+        assert status.running is False
+        assert status.last_error is None
+        assert (status.exchanges_total, status.exchanges_deleted) == (6, 6)
+        assert status.chunks == 3
+        for model in (Session, Conversation, Exchange, MessageBlob):
+            assert await _count(model) == 0
+
+    async def test_conversation_deleted_in_chunks(self) -> None:
+        """Deleting a conversation should leave the session's counters consistent."""
+        session_id, conversation_ids = await _create_session()
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+
+        deletion = deleter.start("conversation", conversation_ids[0], 3)
+        status = await deleter.wait(deletion.id)
+
+        assert status.chunks == 2
+        assert await _count(Conversation) == 1
+        async with TestSessionLocal() as db:
+            session = await db.get(Session, session_id)
+        assert session.conversation_count == 1
+        assert await _counters(Session, session_id) == (3, 6, 9)
+
+    async def test_start_twice_returns_running_deletion(self) -> None:
+        """A second request for the same row should join the running deletion."""
+        session_id, _ = await _create_session()
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+
+        first = deleter.start("session", session_id, 6)
+        assert deleter.start("session", session_id, 6) is first
+        await deleter.wait(first.id)
+        assert [d.id for d in deleter.list()] == [first.id]
+
+    async def test_start_dedupes_only_the_same_row(self) -> None:
+        """Deletions of other rows, or of another kind, should run on their own."""
+        session_id, conversation_ids = await _create_session()
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+
+        first = deleter.start("conversation", conversation_ids[0], 3)
+        second = deleter.start("conversation", conversation_ids[1], 3)
+        assert second is not first
+        # Another kind of row (no such session exists)
+        assert deleter.start("session", conversation_ids[0] + 100) is not first
+        with pytest.raises(ValueError):
+            deleter.start("exchange", session_id)
+        for deletion in deleter.list():
+            await deleter.wait(deletion.id)
+
+    async def test_failure_is_reported(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A chunk that fails should end the deletion and record the error."""
+        session_id, _ = await _create_session()
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+
+        async def fail(self: SessionService, limit: int, **target: int) -> int:
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(SessionService, "delete_exchanges_chunk", fail)
+        deletion = deleter.start("session", session_id, 6)
+        status = await deleter.wait(deletion.id)
+
+        assert status.running is False
+        assert status.finished_at is not None
+        assert status.last_error == "RuntimeError: database is locked"
+        assert await _count(Session) == 1
+
+    async def test_stop_cancels_running_deletions(self) -> None:
+        """Stopping should cancel between chunks, keeping what was deleted."""
+        session_id, _ = await _create_session()
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=60_000)
+
+        deletion = deleter.start("session", session_id, 6)
+        while deletion.chunks == 0:
+            await asyncio.sleep(0.01)
+        await deleter.stop()
+
+        assert deletion.running is False
+        assert deletion.last_error is None
+        assert await deleter.wait(deletion.id) is deletion
+        assert await _count(Exchange) == 4
+        assert await _counters(Session, session_id) == (4, 8, 12)
+        await deleter.stop()
+
+    async def test_finished_deletions_are_forgotten(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Only the newest MAX_FINISHED finished deletions should be kept."""
+        monkeypatch.setattr("app.services.deletion_service.MAX_FINISHED", 1)
+        _, conversation_ids = await _create_session(conversations=3)
+        deleter = DeletionService(TestSessionLocal, chunk_size=2, chunk_pause_ms=0)
+
+        ids = []
+        for conversation_id in conversation_ids:
+            deletion = deleter.start("conversation", conversation_id, 3)
+            await deleter.wait(deletion.id)
+            ids.append(deletion.id)
+
+        # Pruned as the third started, when two had finished
+        assert [d.id for d in deleter.list()] == ids[1:][::-1]
+        assert deleter.status(ids[0]) is None
+        assert await deleter.wait(ids[0]) is None
+
+    def test_from_settings(self) -> None:
+        """Should size the deleter from PerformanceSettings."""
+        deleter = DeletionService.from_settings(
+            TestSessionLocal,
+            PerformanceSettings(delete_chunk_size=10, delete_chunk_pause_ms=5),
+        )
+        assert deleter.chunk_size == 10
+        assert deleter.chunk_pause == 0.005
+
+    def test_needs_background(self) -> None:
+        """Only rows with more exchanges than one chunk go to the background."""
+        deleter = DeletionService(TestSessionLocal, chunk_size=1000)
+        assert deleter.needs_background(1000) is False
+        assert deleter.needs_background(1001) is True
+
+
+@pytest.mark.unit
+class TestDeletionAPI:
+    """Test cases for background deletes through the API."""
+
+    async def test_large_session_deleted_in_background(
+        self, async_client: AsyncClient, deleter: DeletionService
+    ) -> None:
+        """DELETE should answer 202 with the deletion, then report its progress."""
+        session_id, _ = await _create_session()
+
+        response = await async_client.delete(f"/api/sessions/{session_id}")
+        assert response.status_code == 202
+        data = response.json()
+        assert data["kind"] == "session"
+        assert data["target_id"] == session_id
+        await deleter.wait(data["id"])
+
+        response = await async_client.get(f"/api/deletions/{data['id']}")
+        assert response.status_code == 200
+        assert response.json()["running"] is False
+        assert response.json()["exchanges_deleted"] == 6
+        response = await async_client.get(f"/api/sessions/{session_id}")
+        assert response.status_code == 404
+
+    async def test_small_conversation_deleted_inline(
+        self, async_client: AsyncClient, deleter: DeletionService
+    ) -> None:
+        """Rows that fit in one chunk should be deleted before the response."""
+        _, conversation_ids = await _create_session(exchanges=2)
+
+        response = await async_client.delete(
+            f"/api/conversations/{conversation_ids[0]}"
+        )
+        assert response.status_code == 204
+        assert deleter.list() == []
+
+    async def test_unknown_deletion(
+        self, async_client: AsyncClient, deleter: DeletionService
+    ) -> None:
+        """Unknown deletion ids should answer 404."""
+        response = await async_client.get("/api/deletions/99")
+        assert response.status_code == 404
+        response = await async_client.get("/api/deletions")
+        assert response.json() == {"items": []}
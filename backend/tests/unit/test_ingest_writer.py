@@ -0,0 +1,331 @@
+"""Unit tests for the group-commit exchange writer."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation
+from app.models.exchange import Exchange
+from app.models.session import Session
+from app.schemas.exchange import ExchangeCreate
+from app.services.ingest_writer import ExchangeBatchWriter
+from app.services.session_service import SessionService
+from app.services.settings import PerformanceSettings
+from tests.conftest import TestSessionLocal
+
+
+async def _create_conversation(db: AsyncSession) -> Conversation:
+    session = Session(name="Writer Session")
+    db.add(session)
+    await db.flush()
+    conversation = Conversation(session_id=session.id, title="Writer Conversation")
+    db.add(conversation)
+    await db.commit()
+    return conversation
+
+
+def _exchange(conversation_id: int, index: int = 0) -> ExchangeCreate:
+    return ExchangeCreate(
+        conversation_id=conversation_id,
+        user_message=f"Question {index}",
+        assistant_message=f"Answer {index}",
+        input_tokens=2,
+        output_tokens=3,
+    )
+
+
+@pytest.mark.unit
+class TestExchangeBatchWriter:
+    """Test cases for ExchangeBatchWriter."""
+
+    async def test_concurrent_submits_share_a_batch(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Concurrent submits should be committed in one flush and acked with ids."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=50
+        )
+        await writer.start()
+        try:
+            exchanges = await asyncio.gather(
+                *(writer.submit(_exchange(conversation.id, i)) for i in range(20))
+            )
+        finally:
+            await writer.stop()
+
+        assert [e.user_message for e in exchanges] == [
+            f"Question {i}" for i in range(20)
+        ]
+        assert len({e.id for e in exchanges}) == 20
+        metrics = writer.metrics()
+        assert metrics.batches_flushed == 1
+        assert metrics.records_written == 20
+        assert metrics.last_batch_size == 20
+        assert metrics.queue_depth == 0
+
+        await db_session.refresh(conversation)
+        assert conversation.exchange_count == 20
+        assert conversation.total_output_tokens == 60
+
+    async def test_flushes_at_batch_size(self, db_session: AsyncSession) -> None:
+        """A batch should be flushed as soon as it reaches max_batch_size."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=4, max_delay_ms=10000
+        )
+        await writer.start()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *(writer.submit(_exchange(conversation.id, i)) for i in range(8))
+                ),
+                timeout=5,
+            )
+        finally:
+            await writer.stop()
+
+        metrics = writer.metrics()
+        assert metrics.batches_flushed == 2
+        assert metrics.max_batch_size == 4
+        assert metrics.avg_batch_size == 4.0
+
+    async def test_flushes_after_delay(self, db_session: AsyncSession) -> None:
+        """A partial batch should be flushed once max_delay_ms has passed."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=10
+        )
+        await writer.start()
+        try:
+            exchange = await asyncio.wait_for(
+                writer.submit(_exchange(conversation.id)), timeout=5
+            )
+        finally:
+            await writer.stop()
+
+        assert exchange.id is not None
+        assert writer.metrics().last_batch_size == 1
+
+    async def test_missing_conversation_acks_none(
+        self, db_session: AsyncSession
+    ) -> None:
+        """A record for a missing conversation should resolve to None."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=20
+        )
+        await writer.start()
+        try:
+            created, missing = await asyncio.gather(
+                writer.submit(_exchange(conversation.id)),
+                writer.submit(_exchange(99999)),
+            )
+        finally:
+            await writer.stop()
+
+        assert created is not None
+        assert missing is None
+
+    async def test_stop_drains_queue(self, db_session: AsyncSession) -> None:
+        """Stopping should write every record queued before stop()."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=5, max_delay_ms=10000
+        )
+        await writer.start()
+        pending = [
+            asyncio.create_task(writer.submit(_exchange(conversation.id, i)))
+            for i in range(12)
+        ]
+        await asyncio.sleep(0)
+        await writer.stop()
+
+        exchanges = await asyncio.gather(*pending)
+        assert all(e.id is not None for e in exchanges)
+        count = await db_session.scalar(select(func.count()).select_from(Exchange))
+        assert count == 12
+        assert not writer.running
+
+    async def test_submit_requires_running_writer(self) -> None:
+        """Submitting to a writer that is not running should raise."""
+        writer = ExchangeBatchWriter(TestSessionLocal)
+        with pytest.raises(RuntimeError):
+            await writer.submit(_exchange(1))
+
+    async def test_flush_failure_propagates_to_callers(
+        self, db_session: AsyncSession
+    ) -> None:
+        """A failing flush should raise in every caller of the batch."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=20
+        )
+        await writer.start()
+        try:
+            with patch(
+                "app.services.ingest_writer.SessionService.create_exchanges_bulk",
+                side_effect=RuntimeError("disk full"),
+            ):
+                results = await asyncio.gather(
+                    writer.submit(_exchange(conversation.id, 0)),
+                    writer.submit(_exchange(conversation.id, 1)),
+                    return_exceptions=True,
+                )
+            # The writer keeps running after a failed flush
+            exchange = await writer.submit(_exchange(conversation.id, 2))
+        finally:
+            await writer.stop()
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert exchange.id is not None
+
+    async def test_flush_failure_isolated_to_its_record(
+        self, db_session: AsyncSession
+    ) -> None:
+        """A record failing its batch should fail alone; the others are written."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=20
+        )
+        create_exchanges_bulk = SessionService.create_exchanges_bulk
+
+        async def reject_poison(self: SessionService, items: list) -> tuple:
+            if any(item.user_message == "poison" for item in items):
+                raise RuntimeError("constraint failed")
+            return await create_exchanges_bulk(self, items)
+
+        await writer.start()
+        try:
+            with patch.object(SessionService, "create_exchanges_bulk", reject_poison):
+                results = await asyncio.gather(
+                    writer.submit(_exchange(conversation.id, 0)),
+                    writer.submit(
+                        _exchange(conversation.id).model_copy(
+                            update={"user_message": "poison"}
+                        )
+                    ),
+                    writer.submit(_exchange(conversation.id, 2)),
+                    return_exceptions=True,
+                )
+        finally:
+            await writer.stop()
+
+        first, poisoned, last = results
+        assert isinstance(poisoned, RuntimeError)
+        assert (first.user_message, last.user_message) == ("Question 0", "Question 2")
+        count = await db_session.scalar(select(func.count()).select_from(Exchange))
+        assert count == 2
+        assert writer.metrics().records_written == 2
+
+    async def test_commit_failure_fails_every_record(
+        self, db_session: AsyncSession
+    ) -> None:
+        """When commits fail, each record is retried alone and fails alone."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=20
+        )
+        await writer.start()
+        try:
+            with patch.object(
+                AsyncSession, "commit", side_effect=RuntimeError("disk I/O error")
+            ) as commit:
+                results = await asyncio.gather(
+                    *(writer.submit(_exchange(conversation.id, i)) for i in range(3)),
+                    return_exceptions=True,
+                )
+        finally:
+            await writer.stop()
+
+        assert [str(result) for result in results] == ["disk I/O error"] * 3
+        # The batch, then each of its records
+        assert commit.call_count == 4
+        count = await db_session.scalar(select(func.count()).select_from(Exchange))
+        assert count == 0
+        assert writer.metrics().batches_flushed == 0
+
+    async def test_cancelled_submits_are_skipped(
+        self, db_session: AsyncSession
+    ) -> None:
+        """A caller that gave up should not break the flush of its batch."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(
+            TestSessionLocal, max_batch_size=100, max_delay_ms=50
+        )
+        await writer.start()
+        try:
+            abandoned = asyncio.create_task(writer.submit(_exchange(conversation.id)))
+            kept = asyncio.create_task(writer.submit(_exchange(conversation.id, 1)))
+            await asyncio.sleep(0)
+            abandoned.cancel()
+            exchange = await kept
+
+            with patch(
+                "app.services.ingest_writer.SessionService.create_exchanges_bulk",
+                side_effect=RuntimeError("disk full"),
+            ):
+                failed = asyncio.create_task(writer.submit(_exchange(conversation.id)))
+                await asyncio.sleep(0)
+                failed.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await failed
+                # Let the failed flush run before the patch is lifted
+                await asyncio.sleep(0.1)
+        finally:
+            await writer.stop()
+
+        assert abandoned.cancelled()
+        assert exchange.user_message == "Question 1"
+        # The abandoned record was still written with its batch
+        count = await db_session.scalar(select(func.count()).select_from(Exchange))
+        assert count == 2
+
+    async def test_records_racing_stop_are_written(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Records queued behind the stop marker should still be flushed."""
+        conversation = await _create_conversation(db_session)
+        writer = ExchangeBatchWriter(TestSessionLocal, max_batch_size=2)
+        await writer.start()
+        # As if these submits passed the running check just before stop()
+        # queued its marker
+        writer._queue.put_nowait(None)
+        loop = asyncio.get_running_loop()
+        pending = [loop.create_future() for _ in range(3)]
+        for index, future in enumerate(pending):
+            writer._queue.put_nowait((_exchange(conversation.id, index), future))
+        await writer.stop()
+
+        exchanges = await asyncio.gather(*pending)
+        assert [e.user_message for e in exchanges] == [
+            "Question 0",
+            "Question 1",
+            "Question 2",
+        ]
+        assert writer.metrics().batches_flushed == 2
+
+    async def test_start_and_stop_are_idempotent(self) -> None:
+        """Starting twice should keep one task; stopping an idle writer is a no-op."""
+        writer = ExchangeBatchWriter(TestSessionLocal)
+        await writer.stop()
+        await writer.start()
+        task = writer._task
+        await writer.start()
+        assert writer._task is task
+        await writer.stop()
+        await writer.stop()
+        assert not writer.running
+
+    def test_from_settings(self) -> None:
+        """Should size the writer from PerformanceSettings."""
+        performance = PerformanceSettings(
+            ingest_batch_size=64, ingest_batch_delay_ms=5, ingest_queue_size=128
+        )
+        writer = ExchangeBatchWriter.from_settings(TestSessionLocal, performance)
+        assert writer.max_batch_size == 64
+        assert writer.max_delay == 0.005
+        assert writer._queue.maxsize == 128
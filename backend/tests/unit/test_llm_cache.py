@@ -0,0 +1,291 @@
+"""Unit tests for the LLM response cache."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.services.llm_providers import (
+    CachingLLMProvider,
+    LLMMessage,
+    MockLLMProvider,
+    ProviderConfig,
+    ResponseCache,
+    cached_provider,
+)
+from app.services.llm_providers.similarity import MinHasher
+from app.services.settings import PerformanceSettings
+
+
+class FakeClock:
+    """Wall clock advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+PROMPT = (
+    "Request req_{id} at {time}: summarize the attached incident report about"
+    " the database failover and list the follow-up actions for the team"
+)
+
+
+def _messages(prompt: str = "Hello") -> list[LLMMessage]:
+    return [
+        LLMMessage(role="system", content="Be brief."),
+        LLMMessage(role="user", content=prompt),
+    ]
+
+
+@pytest.fixture
+def mock_provider() -> MockLLMProvider:
+    return MockLLMProvider(ProviderConfig(name="mock", model="mock-model"))
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResponseCache:
+    cache = ResponseCache(tmp_path / "llm_cache.db")
+    yield cache
+    cache.close()
+
+
+@pytest.mark.unit
+class TestCachingLLMProvider:
+    """Test cases for CachingLLMProvider."""
+
+    async def test_send_message_is_replayed(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should answer a repeated request from the cache, marked cached."""
+        provider = CachingLLMProvider(mock_provider, cache)
+        first = await provider.send_message(_messages())
+        assert not first.cached
+        assert first.cache_tier is None
+
+        second = await provider.send_message(_messages())
+        assert second.cached
+        assert second.cache_tier == "exact"
+        exclude = {"cached", "cache_tier"}
+        assert second.model_dump(exclude=exclude) == first.model_dump(exclude=exclude)
+        assert len(mock_provider.message_history) == 1
+
+        metrics = provider.metrics()
+        assert (metrics.hits, metrics.misses, metrics.stores) == (1, 1, 1)
+        assert metrics.hit_ratio == 0.5
+
+    async def test_key_covers_request(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should miss when the prompt, system prompt or parameters differ."""
+        provider = CachingLLMProvider(mock_provider, cache)
+        await provider.send_message(_messages())
+        variants = [
+            (_messages("Goodbye"), {}),
+            ([LLMMessage(role="user", content="Hello")], {}),
+            (_messages(), {"max_tokens": 10}),
+            (_messages(), {"temperature": 0.0}),
+        ]
+        for messages, kwargs in variants:
+            response = await provider.send_message(messages, **kwargs)
+            assert not response.cached
+        # The defaults are part of the key, so spelling them out still hits
+        response = await provider.send_message(
+            _messages(), max_tokens=4096, temperature=1.0
+        )
+        assert response.cached
+
+    async def test_stream_is_replayed(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should replay the chunks of a completed stream."""
+        provider = CachingLLMProvider(mock_provider, cache)
+        stream = provider.stream_message(_messages())
+        first = [chunk async for chunk in stream]
+        assert not stream.cached
+        mock_provider.set_response("something else entirely")
+        stream = provider.stream_message(_messages())
+        second = [chunk async for chunk in stream]
+        assert stream.cached
+        assert stream.cache_tier == "exact"
+        assert second == first
+
+    async def test_concurrent_calls_report_their_own_tier(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Each response should say how it was served, however calls overlap."""
+        provider = CachingLLMProvider(mock_provider, cache, MinHasher())
+        await provider.send_message(_messages(PROMPT.format(id="7f3a9c", time="09:00")))
+        responses = await asyncio.gather(
+            provider.send_message(_messages(PROMPT.format(id="7f3a9c", time="09:00"))),
+            provider.send_message(_messages(PROMPT.format(id="0be41d", time="10:00"))),
+            provider.send_message(_messages("Write a haiku about failover")),
+        )
+        assert [response.cache_tier for response in responses] == [
+            "exact",
+            "near",
+            None,
+        ]
+
+    async def test_abandoned_stream_is_not_stored(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should store nothing for a stream the caller stopped reading."""
+        provider = CachingLLMProvider(mock_provider, cache)
+        stream = provider.stream_message(_messages())
+        await anext(stream)
+        await stream.aclose()
+        assert cache.metrics().size == 0
+
+    async def test_persists_across_instances(
+        self, mock_provider: MockLLMProvider, tmp_path: Path
+    ) -> None:
+        """Should serve responses stored by an earlier cache on the same file."""
+        path = tmp_path / "llm_cache.db"
+        first = ResponseCache(path)
+        await CachingLLMProvider(mock_provider, first).send_message(_messages())
+        first.close()
+
+        second = ResponseCache(path)
+        response = await CachingLLMProvider(mock_provider, second).send_message(
+            _messages()
+        )
+        second.close()
+        assert response.cached
+
+    async def test_near_duplicates_are_replayed(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should replay prompts differing in ids, timestamps or a few words."""
+        provider = CachingLLMProvider(mock_provider, cache, MinHasher())
+        first = await provider.send_message(
+            _messages(PROMPT.format(id="a8f9c0d1e2", time="2024-05-01T10:22:33Z"))
+        )
+        variants = [
+            PROMPT.format(id="ffff00001111", time="2024-06-11 11:00"),
+            PROMPT.format(id="b1b2b3b4", time="09:15").replace("team", "on-call team"),
+            PROMPT.format(id="c2c2c2c2", time="1714558953").upper(),
+        ]
+        for prompt in variants:
+            response = await provider.send_message(_messages(prompt))
+            assert response.cached
+            assert response.cache_tier == "near"
+            assert response.content == first.content
+        assert len(mock_provider.message_history) == 1
+
+        response = await provider.send_message(
+            _messages("Write a haiku about failover")
+        )
+        assert response.cache_tier is None
+        metrics = provider.metrics()
+        assert (metrics.hits, metrics.near_hits, metrics.near_misses) == (0, 3, 2)
+        assert metrics.misses == 5
+        assert metrics.hit_ratio == 0.6
+
+    async def test_near_tier_requires_same_parameters(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should not replay a near duplicate sent with other parameters."""
+        provider = CachingLLMProvider(mock_provider, cache, MinHasher())
+        await provider.send_message(_messages(PROMPT.format(id="7f3a9c", time="09:00")))
+        response = await provider.send_message(
+            _messages(PROMPT.format(id="0be41d", time="10:00")), temperature=0.0
+        )
+        assert not response.cached
+        response = await provider.send_message(
+            _messages(PROMPT.format(id="c55e02", time="11:00")), temperature=0.0
+        )
+        assert response.cache_tier == "near"
+
+    async def test_near_tier_threshold(
+        self, mock_provider: MockLLMProvider, cache: ResponseCache
+    ) -> None:
+        """Should not replay prompts below the similarity threshold."""
+        provider = CachingLLMProvider(mock_provider, cache, MinHasher(threshold=0.95))
+        await provider.send_message(_messages(PROMPT.format(id="7f3a9c", time="09:00")))
+        response = await provider.send_message(
+            _messages(PROMPT.format(id="0be41d", time="09:00").replace("team", "staff"))
+        )
+        assert not response.cached
+
+    async def test_evicted_entries_leave_the_index(
+        self, mock_provider: MockLLMProvider, tmp_path: Path
+    ) -> None:
+        """Should drop a response's index entries when it is evicted."""
+        cache = ResponseCache(tmp_path / "llm_cache.db", max_entries=1)
+        provider = CachingLLMProvider(mock_provider, cache, MinHasher())
+        await provider.send_message(_messages(PROMPT.format(id="7f3a9c", time="09:00")))
+        await provider.send_message(_messages("Write a haiku about failover"))
+        response = await provider.send_message(
+            _messages(PROMPT.format(id="0be41d", time="10:00"))
+        )
+        assert not response.cached
+        connection = cache._connection
+        assert connection.execute("SELECT COUNT(*) FROM near_entries").fetchone() == (
+            1,
+        )
+        buckets = connection.execute("SELECT COUNT(*) FROM near_buckets").fetchone()
+        assert buckets[0] <= provider.hasher.bands
+        cache.close()
+
+    def test_cached_provider_honors_setting(
+        self, mock_provider: MockLLMProvider, tmp_path: Path
+    ) -> None:
+        """Should wrap the provider only when cache_responses is enabled."""
+        path = tmp_path / "llm_cache.db"
+        off = PerformanceSettings(cache_responses=False)
+        assert cached_provider(mock_provider, off, path) is mock_provider
+        on = PerformanceSettings(response_cache_max_entries=5)
+        wrapped = cached_provider(mock_provider, on, path)
+        assert isinstance(wrapped, CachingLLMProvider)
+        assert wrapped.cache.max_entries == 5
+        assert wrapped.get_model_info() == mock_provider.get_model_info()
+        assert wrapped.hasher is None
+        wrapped.cache.close()
+
+        near = PerformanceSettings(
+            near_duplicate_cache=True, near_duplicate_threshold=0.9
+        )
+        wrapped = cached_provider(mock_provider, near, path)
+        assert wrapped.hasher.threshold == 0.9
+        wrapped.cache.close()
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_entries_expire(self) -> None:
+        """Should drop entries once older than the ttl."""
+        clock = FakeClock()
+        cache = ResponseCache(":memory:", ttl=10, clock=clock)
+        cache.put("a", {"content": "x"})
+        clock.now += 9.9
+        assert cache.get("a") == {"content": "x"}
+        clock.now += 0.1
+        assert cache.get("a") is None
+        metrics = cache.metrics()
+        assert (metrics.size, metrics.expirations) == (0, 1)
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Should evict the entry used longest ago beyond max_entries."""
+        clock = FakeClock()
+        cache = ResponseCache(":memory:", max_entries=2, clock=clock)
+        for key in ("a", "b"):
+            cache.put(key, key)
+            clock.now += 1
+        assert cache.get("a") == "a"
+        clock.now += 1
+        cache.put("c", "c")
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == ("a", "c")
+        assert cache.metrics().evictions == 1
+        assert cache.metrics().size == 2
+
+    def test_disabled(self) -> None:
+        """A max_entries of 0 should cache nothing."""
+        cache = ResponseCache(":memory:", max_entries=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
@@ -0,0 +1,96 @@
+"""Unit tests for MinHash signatures of prompts."""
+
+import random
+
+import pytest
+
+from app.services.llm_providers.base import LLMMessage
+from app.services.llm_providers.similarity import (
+    MinHasher,
+    lsh_parameters,
+    normalize_messages,
+    normalize_text,
+    similarity,
+)
+
+
+def _jaccard(hasher: MinHasher, first: str, second: str) -> float:
+    a, b = hasher.shingles(first), hasher.shingles(second)
+    return len(a & b) / len(a | b)
+
+
+@pytest.mark.unit
+class TestNormalization:
+    """Test cases for prompt normalization."""
+
+    def test_volatile_tokens_are_replaced(self) -> None:
+        """Should make prompts differing in timestamps, ids and spacing equal."""
+        first = normalize_text(
+            "At 2024-05-01T10:22:33Z (req_8f9c0d1e2a) Summarize  the log\n"
+        )
+        second = normalize_text(
+            "at 2024-06-11 11:00:00+02:00 (req_ffff00001111) summarize the log"
+        )
+        assert first == second == "at <time> (<id>) summarize the log"
+
+    def test_uuids_epochs_and_times(self) -> None:
+        """Should replace UUIDs, epoch seconds and clock times."""
+        text = normalize_text(
+            "id 123e4567-e89b-12d3-a456-426614174000 at 1714558953 or 09:15"
+        )
+        assert text == "id <id> at <time> or <time>"
+
+    def test_messages_keep_roles(self) -> None:
+        """Should prefix each message with its role."""
+        messages = [
+            LLMMessage(role="system", content="Be  brief."),
+            LLMMessage(role="user", content="Hi"),
+        ]
+        assert normalize_messages(messages) == "system: be brief.\nuser: hi"
+
+
+@pytest.mark.unit
+class TestMinHasher:
+    """Test cases for MinHasher."""
+
+    def test_lsh_parameters(self) -> None:
+        """Should tune the bands just below the threshold."""
+        for threshold in (0.5, 0.7, 0.9):
+            bands, rows = lsh_parameters(threshold, 128)
+            assert bands * rows <= 128
+            assert (1 / bands) ** (1 / rows) <= threshold
+            assert (1 / (128 // (rows + 1))) ** (1 / (rows + 1)) > threshold
+
+    def test_similarity_estimates_jaccard(self) -> None:
+        """Should estimate Jaccard similarity of long and short prompts."""
+        hasher = MinHasher()
+        generator = random.Random(0)
+        for length, changes in ((400, 20), (20, 1)):
+            errors = []
+            for _ in range(20):
+                words = [f"w{generator.randrange(5000)}" for _ in range(length)]
+                edited = list(words)
+                for i in generator.sample(range(length), changes):
+                    edited[i] = "changed"
+                first, second = " ".join(words), " ".join(edited)
+                estimate = similarity(hasher.signature(first), hasher.signature(second))
+                errors.append(estimate - _jaccard(hasher, first, second))
+            assert abs(sum(errors) / len(errors)) < 0.05
+
+    def test_signatures_are_deterministic(self) -> None:
+        """Should give equal signatures and buckets across hashers."""
+        text = "summarize the following document"
+        first, second = MinHasher(), MinHasher()
+        assert first.signature(text) == second.signature(text)
+        assert first.buckets(first.signature(text)) == second.buckets(
+            second.signature(text)
+        )
+        assert similarity(first.signature(text), first.signature("other words")) < 0.2
+
+    def test_context_separates_buckets(self) -> None:
+        """Should put equal signatures with different contexts in other buckets."""
+        hasher = MinHasher()
+        signature = hasher.signature("summarize the following document")
+        assert len(hasher.buckets(signature)) == hasher.bands
+        first = set(hasher.buckets(signature, b"a"))
+        assert not first & set(hasher.buckets(signature, b"b"))
@@ -0,0 +1,122 @@
+"""Unit tests for the session/conversation lookup cache."""
+
+import pytest
+from sqlalchemy import select
+
+from app.models.cache_version import CacheVersion
+from app.services.lookup_cache import (
+    LOOKUPS,
+    LookupCache,
+    bump_lookups_version,
+    sync_lookups,
+)
+from tests.conftest import TestSessionLocal
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.unit
+class TestLookupCache:
+    """Test cases for LookupCache."""
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """A full cache should evict the entry used longest ago."""
+        cache = LookupCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+        metrics = cache.metrics()
+        assert (metrics.size, metrics.hits, metrics.misses) == (2, 3, 1)
+        assert metrics.evictions == 1
+        assert metrics.hit_ratio == 0.75
+
+    def test_entries_expire(self) -> None:
+        """Entries should be dropped once older than the ttl."""
+        clock = FakeClock()
+        cache = LookupCache(ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.metrics().expirations == 1
+        assert cache.metrics().size == 0
+
+    def test_invalidate(self) -> None:
+        """Invalidation should drop the key and the entries selected with it."""
+        cache = LookupCache()
+        cache.put(("session", 1), 1)
+        cache.put(("conversation", 5), 1)
+        cache.put(("conversation", 6), 2)
+        cache.invalidate(
+            ("session", 1),
+            where=lambda key, value: key[0] == "conversation" and value == 1,
+        )
+        assert cache.get(("session", 1)) is None
+        assert cache.get(("conversation", 5)) is None
+        assert cache.get(("conversation", 6)) == 2
+        assert cache.metrics().invalidations == 1
+
+    def test_stale_fill_is_ignored(self) -> None:
+        """A lookup that raced with an invalidation should not be stored."""
+        cache = LookupCache()
+        generation = cache.generation
+        cache.invalidate(("session", 1))
+        cache.put(("session", 1), 1, generation)
+        assert cache.get(("session", 1)) is None
+        cache.put(("session", 1), 1, cache.generation)
+        assert cache.get(("session", 1)) == 1
+
+    def test_disabled(self) -> None:
+        """A max_size of 0 should cache nothing."""
+        cache = LookupCache(max_size=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+
+    def test_version_sync(self) -> None:
+        """A moved shared version should clear the cache, checked at intervals."""
+        clock = FakeClock()
+        cache = LookupCache(sync_interval_ms=1000, clock=clock)
+        assert cache.needs_sync()
+        cache.synced(3)
+        cache.put("a", 1)
+        assert not cache.needs_sync()
+        clock.now = 1
+        assert cache.needs_sync()
+        cache.synced(3)
+        assert cache.get("a") == 1
+        cache.synced(4)
+        assert cache.get("a") is None
+        assert cache.metrics().version == 4
+
+    async def test_shared_version(self) -> None:
+        """Bumps in one process should be seen by another's sync."""
+        cache = LookupCache(sync_interval_ms=0)
+        async with TestSessionLocal() as db:
+            await sync_lookups(db, cache)
+            assert cache.metrics().version == 0
+            cache.put("a", 1)
+
+            for _ in range(2):
+                await bump_lookups_version(db)
+            await db.commit()
+            version = await db.scalar(
+                select(CacheVersion.version).where(CacheVersion.name == LOOKUPS)
+            )
+            assert version == 2
+
+            await sync_lookups(db, cache)
+            assert cache.metrics().version == 2
+            assert cache.get("a") is None
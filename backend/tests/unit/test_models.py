@@ -207,3 +207,30 @@ class TestExchangeModel:
         db_session.commit()
 
         assert exchange.model == "claude-3-sonnet"
+
+    def test_exchange_messages_stored_in_body(self, db_session: DBSession) -> None:
+        """Message references should live in exchange_bodies, not exchanges."""
+        session = Session(name="Test")
+        db_session.add(session)
+        db_session.commit()
+
+        conversation = Conversation(session_id=session.id, title="Test")
+        db_session.add(conversation)
+        db_session.commit()
+
+        exchange = Exchange(
+            conversation_id=conversation.id,
+            user_message="Test",
+            assistant_message="Response"
+        )
+        db_session.add(exchange)
+        db_session.commit()
+        exchange_id = exchange.id
+        db_session.expunge_all()
+
+        loaded = db_session.get(Exchange, exchange_id)
+        assert loaded.body.exchange_id == exchange_id
+        assert loaded.user_message == "Test"
+        assert loaded.assistant_message_preview == "Response"
+        assert loaded.assistant_message_length == len("Response")
+        assert "user_message_hash" not in Exchange.__table__.c
@@ -0,0 +1,71 @@
+"""Tests for keyset pagination helpers."""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, DateTime, String
+
+from app.services.pagination import (
+    Cursor,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+
+
+class TestCursorEncoding:
+    """Test cases for opaque cursor round trips."""
+
+    def test_round_trip_text_sort_value(self) -> None:
+        """Should round-trip the raw SQLite text value and id."""
+        cursor = encode_cursor("2026-01-01 12:00:00", 42)
+        assert decode_cursor(cursor) == Cursor("2026-01-01 12:00:00", 42)
+
+    def test_round_trip_datetime_sort_value(self) -> None:
+        """Should encode datetimes as ISO strings."""
+        value = datetime(2026, 1, 1, 12, 0, 0, 123456)
+        decoded = decode_cursor(encode_cursor(value, 7))
+        assert datetime.fromisoformat(decoded.sort_value) == value
+        assert decoded.id == 7
+
+    def test_cursor_is_url_safe(self) -> None:
+        """Cursor should not need escaping in a query string."""
+        cursor = encode_cursor("2026-01-01 12:00:00", 123456789)
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    @pytest.mark.parametrize(
+        "cursor", ["", "%%%", "bm90LWpzb24", "WzEsMl0", "WyJhIiwiYiJd"]
+    )
+    def test_decode_rejects_malformed(self, cursor: str) -> None:
+        """Should raise InvalidCursorError for garbage input."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
+
+    def test_decode_checks_sort_column_type(self) -> None:
+        """Should reject a date-sorted cursor whose sort value is no date."""
+        cursor = encode_cursor("a", 1)
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, Column("created_at", DateTime))
+        assert decode_cursor(cursor, Column("name", String)) == Cursor("a", 1)
+        cursor = encode_cursor("2026-01-01 12:00:00", 1)
+        assert decode_cursor(cursor, Column("created_at", DateTime)).id == 1
+
+
+class TestSplitPage:
+    """Test cases for splitting an over-fetched result into a page."""
+
+    def test_last_page_has_no_cursor(self) -> None:
+        """Should return no cursor when no extra row was fetched."""
+        rows = [(SimpleNamespace(id=1), "a"), (SimpleNamespace(id=2), "b")]
+        items, next_cursor = split_page(rows, page_size=2)
+        assert [i.id for i in items] == [1, 2]
+        assert next_cursor is None
+
+    def test_cursor_points_at_last_returned_row(self) -> None:
+        """Should build the cursor from the last row of the page."""
+        rows = [(SimpleNamespace(id=i), f"t{i}") for i in range(1, 4)]
+        items, next_cursor = split_page(rows, page_size=2)
+        assert [i.id for i in items] == [1, 2]
+        assert decode_cursor(next_cursor) == Cursor("t2", 2)
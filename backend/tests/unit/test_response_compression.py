@@ -0,0 +1,239 @@
+"""Unit tests for negotiated response compression."""
+
+import asyncio
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from starlette.responses import Response, StreamingResponse
+
+from app.api import compression
+from app.api.compression import CompressionMiddleware, negotiate
+
+BODY = b'{"assistant_message": "Traceback (most recent call last)"}\n' * 100
+
+
+def _decoder(codec: str) -> Callable[[bytes], bytes]:
+    """Incremental decoder for ``codec``: feed chunks, get their output."""
+    if codec == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    if codec == "zstd":
+        return compression.zstandard.ZstdDecompressor().decompressobj().decompress
+    return compression.brotli.Decompressor().process
+
+
+async def _call(
+    app: Any, accept_encoding: str | None, messages: list[dict] | None = None
+) -> list[dict]:
+    """Run one GET through ``app`` and return the messages it sent.
+
+    Messages are appended to ``messages``, if given, as they are sent.
+    """
+    headers = []
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": headers,
+    }
+    if messages is None:
+        messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive() -> dict:
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # the client stays connected
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+def _headers(start: dict) -> dict[str, str]:
+    return {name.decode(): value.decode() for name, value in start["headers"]}
+
+
+def _installed_codecs() -> list[str]:
+    return list(compression.available_encoders())
+
+
+@pytest.mark.unit
+class TestNegotiate:
+    """Test cases for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ("gzip, deflate, br, zstd", "zstd"),
+            ("gzip, zstd;q=0.5", "gzip"),
+            ("GZIP", "gzip"),
+            ("deflate", None),
+            ("", None),
+            ("identity", None),
+            ("*", "zstd"),
+            ("*, zstd;q=0", "br"),
+            ("gzip;q=0", None),
+            ("gzip;q=bogus, br", "br"),
+        ],
+    )
+    def test_choice(self, header: str, expected: str | None) -> None:
+        """Should pick the highest q-value, breaking ties by server order."""
+        assert negotiate(header, ["zstd", "br", "gzip"]) == expected
+
+    def test_unknown_codec(self) -> None:
+        """Unknown codecs in the configuration should be rejected."""
+        with pytest.raises(ValueError, match="deflate"):
+            CompressionMiddleware(Response(), codecs=["deflate"])
+
+
+@pytest.mark.unit
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware."""
+
+    @pytest.mark.parametrize("codec", _installed_codecs())
+    async def test_whole_body_roundtrip(self, codec: str) -> None:
+        """Bodies should decode to the original and carry fixed-up headers."""
+        app = Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+        start, body = await _call(CompressionMiddleware(app, codecs=[codec]), codec)
+        headers = _headers(start)
+        assert headers["content-encoding"] == codec
+        assert headers["content-length"] == str(len(body["body"]))
+        assert headers["vary"] == "Accept-Encoding"
+        assert headers["etag"] == 'W/"v1"'
+        assert len(body["body"]) < len(BODY) / 5
+        assert _decoder(codec)(body["body"]) == BODY
+
+    async def test_small_body_sent_as_is(self) -> None:
+        """Bodies under the threshold should go out uncompressed."""
+        app = Response(BODY[:100], media_type="application/json")
+        start, body = await _call(CompressionMiddleware(app, minimum_size=1024), "gzip")
+        assert "content-encoding" not in _headers(start)
+        assert _headers(start)["vary"] == "Accept-Encoding"
+        assert body["body"] == BODY[:100]
+
+    async def test_uncompressed_body_keeps_strong_etag(self) -> None:
+        """Only a compressed response's ETag should be weakened."""
+        app = Response(
+            BODY[:100], media_type="application/json", headers={"ETag": '"v1"'}
+        )
+        start, _ = await _call(CompressionMiddleware(app, minimum_size=1024), "gzip")
+        assert _headers(start)["etag"] == '"v1"'
+
+    async def test_not_modified_untouched(self) -> None:
+        """A 304 has no body, so it should get no content coding."""
+        app = Response(status_code=304, headers={"ETag": '"v1"'})
+        start, body = await _call(CompressionMiddleware(app), "gzip")
+        assert "content-encoding" not in _headers(start)
+        assert _headers(start)["etag"] == '"v1"'
+        assert body["body"] == b""
+
+    @pytest.mark.parametrize(
+        ("headers", "media_type", "accept_encoding"),
+        [
+            ({}, "application/json", None),
+            ({}, "application/json", "identity"),
+            ({}, "image/png", "gzip"),
+            ({"Content-Encoding": "gzip"}, "application/json", "gzip"),
+        ],
+    )
+    async def test_untouched(
+        self, headers: dict, media_type: str, accept_encoding: str | None
+    ) -> None:
+        """Refused codings, compressed media and encoded bodies should pass through."""
+        app = Response(BODY, media_type=media_type, headers=headers)
+        start, body = await _call(CompressionMiddleware(app), accept_encoding)
+        assert _headers(start).get("content-encoding") == headers.get(
+            "Content-Encoding"
+        )
+        assert body["body"] == BODY
+
+    @pytest.mark.parametrize("codec", _installed_codecs())
+    async def test_stream_decodes_chunk_by_chunk(self, codec: str) -> None:
+        """Each streamed chunk should decode as soon as it is received."""
+        lines = [b'{"id": %d, "text": "%s"}\n' % (i, b"x" * i) for i in range(20)]
+
+        async def generate():
+            for line in lines:
+                yield line
+
+        app = StreamingResponse(generate(), media_type="application/x-ndjson")
+        start, *chunks = await _call(CompressionMiddleware(app), codec)
+        headers = _headers(start)
+        assert headers["content-encoding"] == codec
+        assert "content-length" not in headers
+
+        decode = _decoder(codec)
+        bodies = [chunk for chunk in chunks if chunk["more_body"]]
+        assert len(bodies) == len(lines)
+        for line, chunk in zip(lines, bodies):
+            assert decode(chunk["body"]) == line
+        decode(chunks[-1]["body"])
+
+    async def test_stream_headers_sent_before_body(self) -> None:
+        """A stream's headers should go out before its first chunk exists."""
+        ready = asyncio.Event()
+
+        async def generate():
+            await ready.wait()
+            yield b"data: {}\n\n"
+
+        app = StreamingResponse(generate(), media_type="text/event-stream")
+        messages: list[dict] = []
+        call = asyncio.create_task(_call(CompressionMiddleware(app), "gzip", messages))
+        for _ in range(100):
+            if messages:
+                break
+            await asyncio.sleep(0.01)
+        assert [message["type"] for message in messages] == ["http.response.start"]
+        assert _headers(messages[0])["content-encoding"] == "gzip"
+
+        ready.set()
+        await call
+        decode = _decoder("gzip")
+        assert decode(messages[1]["body"]) == b"data: {}\n\n"
+
+
+@pytest.mark.api
+class TestAppCompression:
+    """The application should compress large JSON pages."""
+
+    async def test_exchange_page(self, async_client: AsyncClient) -> None:
+        """A large exchange page should come back compressed and revalidate."""
+        session = (await async_client.post("/api/sessions", json={"name": "z"})).json()
+        conversation = (
+            await async_client.post(
+                "/api/conversations", json={"session_id": session["id"], "title": "z"}
+            )
+        ).json()
+        items = [
+            {
+                "conversation_id": conversation["id"],
+                "user_message": "Why does this fail? " * 50,
+                "assistant_message": "Because the cursor is stale. " * 50,
+            }
+            for _ in range(5)
+        ]
+        await async_client.post("/api/exchanges/bulk", json={"items": items})
+        url = f"/api/exchanges/by-conversation/{conversation['id']}"
+
+        response = await async_client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(response.content) / 5
+        assert len(response.json()["items"]) == 5
+
+        etag = response.headers["etag"]
+        assert etag.startswith("W/")
+        response = await async_client.get(
+            url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        # Weakly equal: the 304 has no body to compress
+        assert response.headers["etag"] == etag.removeprefix("W/")
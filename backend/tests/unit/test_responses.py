@@ -0,0 +1,153 @@
+"""Unit tests for list responses encoded from Core rows."""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import responses
+from app.schemas import (
+    ConversationListResponse,
+    ConversationResponse,
+    ExchangeListResponse,
+    ExchangeResponse,
+    ExchangeSummaryListResponse,
+    ExchangeSummaryResponse,
+    SessionListResponse,
+    SessionResponse,
+)
+from app.services.session_service import SessionService
+
+# Characters JSON encoders disagree on: non-ASCII, separators, quotes, controls
+AWKWARD_TEXT = 'héllo   "quoted" </script>\\ \x7f\t\n😀'
+
+
+@pytest.fixture
+async def populated(async_client: AsyncClient) -> tuple[int, int]:
+    """A session and a conversation with exchanges of awkward text."""
+    session = (
+        await async_client.post(
+            "/api/sessions", json={"name": AWKWARD_TEXT, "description": None}
+        )
+    ).json()
+    conversation = (
+        await async_client.post(
+            "/api/conversations",
+            json={"session_id": session["id"], "title": AWKWARD_TEXT},
+        )
+    ).json()
+    items = [
+        {
+            "conversation_id": conversation["id"],
+            "user_message": AWKWARD_TEXT * (i + 1),
+            "assistant_message": "x" * 300,
+            "model": "model" if i % 2 else None,
+            "input_tokens": i,
+        }
+        for i in range(3)
+    ]
+    await async_client.post("/api/exchanges/bulk", json={"items": items})
+    return session["id"], conversation["id"]
+
+
+@pytest.mark.unit
+class TestDumps:
+    """Test cases for the row encoder."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_matches_response_model_json(self, use_orjson: bool) -> None:
+        """Encoded rows should equal the response model's own JSON."""
+        model = ExchangeResponse(
+            user_message=AWKWARD_TEXT,
+            assistant_message="a",
+            model=None,
+            input_tokens=1,
+            output_tokens=None,
+            id=1,
+            conversation_id=2,
+            created_at=datetime(2024, 1, 2, 3, 4, 5, 120000),
+        )
+        orjson = responses.orjson if use_orjson else None
+        if use_orjson and orjson is None:
+            pytest.skip("orjson is not installed")
+        with patch.object(responses, "orjson", orjson):
+            for created_at in (model.created_at, datetime(2024, 1, 2, 3, 4, 5)):
+                model.created_at = created_at
+                assert (
+                    responses.dumps(model.model_dump())
+                    == model.model_dump_json().encode()
+                )
+
+    def test_unknown_type(self) -> None:
+        """Values with no JSON form should raise rather than be stringified."""
+        with patch.object(responses, "orjson", None), pytest.raises(TypeError):
+            responses.dumps({"value": object()})
+
+
+@pytest.mark.unit
+class TestRowListResponses:
+    """The list routes should return exactly what their response models would."""
+
+    async def test_sessions(
+        self, async_client: AsyncClient, db_session: AsyncSession, populated
+    ) -> None:
+        """GET /api/sessions should match SessionListResponse byte for byte."""
+        sessions, total, next_cursor = await SessionService(db_session).get_sessions()
+        expected = SessionListResponse(
+            items=[SessionResponse.model_validate(s) for s in sessions],
+            total=total,
+            page=1,
+            page_size=20,
+            next_cursor=next_cursor,
+        )
+        response = await async_client.get("/api/sessions")
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == expected.model_dump_json().encode()
+
+    async def test_conversations(
+        self, async_client: AsyncClient, db_session: AsyncSession, populated
+    ) -> None:
+        """Conversation pages should match ConversationListResponse byte for byte."""
+        session_id, _ = populated
+        conversations, total, next_cursor = await SessionService(
+            db_session
+        ).get_conversations_by_session(session_id)
+        expected = ConversationListResponse(
+            items=[ConversationResponse.model_validate(c) for c in conversations],
+            total=total,
+            page=1,
+            page_size=20,
+            next_cursor=next_cursor,
+        )
+        response = await async_client.get(f"/api/conversations/by-session/{session_id}")
+        assert response.content == expected.model_dump_json().encode()
+
+    async def test_exchanges(
+        self, async_client: AsyncClient, db_session: AsyncSession, populated
+    ) -> None:
+        """Full and summary exchange pages should match their list responses."""
+        _, conversation_id = populated
+        service = SessionService(db_session)
+        url = f"/api/exchanges/by-conversation/{conversation_id}"
+        for view, item, page_type in (
+            ("full", ExchangeResponse, ExchangeListResponse),
+            ("summary", ExchangeSummaryResponse, ExchangeSummaryListResponse),
+        ):
+            exchanges, total, next_cursor = await service.get_exchanges_by_conversation(
+                conversation_id, page_size=2, summary=view == "summary"
+            )
+            expected = page_type(
+                items=[item.model_validate(e) for e in exchanges],
+                total=total,
+                page=1,
+                page_size=2,
+                next_cursor=next_cursor,
+            )
+            response = await async_client.get(
+                url, params={"page_size": 2, "view": view}
+            )
+            assert response.content == expected.model_dump_json().encode()
+            assert response.json()["next_cursor"] is not None
+            db_session.expunge_all()
@@ -4,7 +4,15 @@ import os
 import pytest
 from pathlib import Path
 
-from app.services.settings import SettingsParser, AppSettings, CLISettings, GUISettings
+from app.services.settings import (
+    SETTINGS_PATH_ENV,
+    AppSettings,
+    CLISettings,
+    GUISettings,
+    PerformanceSettings,
+    SettingsParser,
+    get_settings,
+)
 
 
 class TestSettingsParser:
@@ -113,3 +121,49 @@ class TestGUISettings:
         assert settings.theme == "dark"
         assert settings.font_size == "16px"
         assert settings.show_line_numbers is False
+
+
+class TestPerformanceSettings:
+    """Test cases for performance settings model."""
+
+    def test_storage_profile_defaults(self) -> None:
+        """Should default to the production SQLite storage profile."""
+        settings = PerformanceSettings()
+        assert settings.storage_profile == "production"
+        assert settings.sqlite_journal_mode == "WAL"
+        assert settings.sqlite_synchronous == "NORMAL"
+        assert settings.sqlite_busy_timeout > 0
+
+
+class TestGetSettings:
+    """Test cases for loading process-wide settings."""
+
+    def test_get_settings_reads_env_path(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Should load the settings file named by the environment variable."""
+        settings_file = tmp_path / "settings.yaml"
+        settings_file.write_text(
+            """
+clouseau_settings:
+  performance:
+    storage_profile: "default"
+"""
+        )
+        monkeypatch.setenv(SETTINGS_PATH_ENV, str(settings_file))
+        get_settings.cache_clear()
+        try:
+            assert get_settings().performance.storage_profile == "default"
+        finally:
+            get_settings.cache_clear()
+
+    def test_get_settings_defaults_when_missing(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Should fall back to defaults when no settings file exists."""
+        monkeypatch.setenv(SETTINGS_PATH_ENV, str(tmp_path / "missing.yaml"))
+        get_settings.cache_clear()
+        try:
+            assert get_settings() == AppSettings()
+        finally:
+            get_settings.cache_clear()
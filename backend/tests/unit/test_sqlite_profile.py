@@ -0,0 +1,237 @@
+"""Tests for the SQLite storage profile and busy retry handling."""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import String, create_engine, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+
+from app.db.session import get_database_path
+from app.db.sqlite import (
+    apply_foreign_keys,
+    apply_read_only,
+    apply_storage_profile,
+    is_busy_error,
+    precise_now,
+    retry_on_busy,
+    storage_pragmas,
+)
+from app.services.settings import AppSettings, PerformanceSettings
+
+
+def _locked_error() -> OperationalError:
+    """Build the error SQLAlchemy raises for a locked SQLite database."""
+    return OperationalError(
+        "INSERT", {}, sqlite3.OperationalError("database is locked")
+    )
+
+
+class TestStoragePragmas:
+    """Test cases for building storage profile pragmas."""
+
+    def test_production_profile_pragmas(self) -> None:
+        """Should emit every configured pragma for the production profile."""
+        pragmas = storage_pragmas(PerformanceSettings(sqlite_busy_timeout=1234))
+        assert "PRAGMA journal_mode=WAL" in pragmas
+        assert "PRAGMA synchronous=NORMAL" in pragmas
+        assert "PRAGMA busy_timeout=1234" in pragmas
+        assert any(p.startswith("PRAGMA mmap_size=") for p in pragmas)
+        assert any(p.startswith("PRAGMA cache_size=") for p in pragmas)
+        assert "PRAGMA temp_store=MEMORY" in pragmas
+
+    def test_default_profile_has_no_pragmas(self) -> None:
+        """Should leave SQLite defaults alone for the default profile."""
+        assert storage_pragmas(PerformanceSettings(storage_profile="default")) == []
+
+
+class TestApplyStorageProfile:
+    """Test cases for applying the profile to pooled connections."""
+
+    def test_pragmas_set_on_connect(self, tmp_path: Path) -> None:
+        """Every new connection should carry the profile pragmas."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+        apply_storage_profile(engine, PerformanceSettings(sqlite_busy_timeout=2500))
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+                assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+        finally:
+            engine.dispose()
+
+    def test_default_profile_leaves_connection_untouched(self, tmp_path: Path) -> None:
+        """The default profile should keep the rollback journal."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'default.db'}")
+        apply_storage_profile(engine, PerformanceSettings(storage_profile="default"))
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        finally:
+            engine.dispose()
+
+
+class TestApplyReadOnly:
+    """Test cases for read-only connections."""
+
+    def test_read_only_connections_reject_writes(self, tmp_path: Path) -> None:
+        """Connections should read under the profile but refuse to write."""
+        path = tmp_path / "read.db"
+        writer = create_engine(f"sqlite:///{path}")
+        reader = create_engine(f"sqlite:///{path}")
+        apply_storage_profile(reader, PerformanceSettings())
+        apply_read_only(reader)
+        try:
+            with writer.begin() as conn:
+                conn.execute(text("CREATE TABLE t (x INTEGER)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+            with reader.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+                with pytest.raises(OperationalError, match="readonly"):
+                    conn.execute(text("INSERT INTO t VALUES (2)"))
+        finally:
+            writer.dispose()
+            reader.dispose()
+
+
+class TestApplyForeignKeys:
+    """Test cases for foreign key enforcement."""
+
+    def test_deletes_cascade(self, tmp_path: Path) -> None:
+        """ON DELETE CASCADE should remove child rows once foreign keys are on."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'fk.db'}")
+        apply_foreign_keys(engine)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE p (id INTEGER PRIMARY KEY)"))
+                conn.execute(
+                    text(
+                        "CREATE TABLE c (p_id INTEGER REFERENCES p (id)"
+                        " ON DELETE CASCADE)"
+                    )
+                )
+                conn.execute(text("INSERT INTO p VALUES (1)"))
+                conn.execute(text("INSERT INTO c VALUES (1)"))
+            with pytest.raises(IntegrityError):
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO c VALUES (2)"))
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM p"))
+                assert conn.execute(text("SELECT count(*) FROM c")).scalar() == 0
+        finally:
+            engine.dispose()
+
+
+class TestPreciseNow:
+    """Test cases for the sub-second update timestamp."""
+
+    def test_sqlite_keeps_milliseconds(self) -> None:
+        """On SQLite the timestamp should parse back with its fraction."""
+        engine = create_engine("sqlite://")
+        try:
+            with engine.connect() as conn:
+                now = conn.execute(select(precise_now())).scalar_one()
+                stored = conn.execute(select(precise_now().cast(String))).scalar_one()
+        finally:
+            engine.dispose()
+        assert isinstance(now, datetime)
+        assert now.microsecond % 1000 == 0
+        assert len(stored) == len("2024-01-01 00:00:00.000000")
+
+    def test_other_dialects_use_now(self) -> None:
+        """Elsewhere the timestamp should be the dialect's now()."""
+        compiled = select(precise_now()).compile(dialect=postgresql.dialect())
+        assert "now()" in str(compiled)
+
+
+class TestDatabasePath:
+    """Test cases for resolving the database file location."""
+
+    def test_defaults_to_working_directory(self) -> None:
+        """Should use ./clouseau.db without a data directory."""
+        assert get_database_path(None) == Path(".") / "clouseau.db"
+        assert get_database_path("") == Path(".") / "clouseau.db"
+
+    def test_uses_data_directory(self, tmp_path: Path) -> None:
+        """Should place the database inside the data directory."""
+        assert get_database_path(str(tmp_path)) == tmp_path / "clouseau.db"
+
+
+class _FakeService:
+    """Minimal object shaped like SessionService for the retry decorator."""
+
+    def __init__(self, failures: int, error: Exception) -> None:
+        self.db = AsyncMock()
+        self.calls = 0
+        self._failures = failures
+        self._error = error
+
+    @retry_on_busy
+    async def write(self) -> str:
+        self.calls += 1
+        if self.calls <= self._failures:
+            raise self._error
+        return "ok"
+
+
+@pytest.fixture
+def fast_retry_settings():
+    """Patch settings so retries do not sleep."""
+    settings = AppSettings(
+        performance=PerformanceSettings(write_retry_attempts=3, write_retry_backoff=0)
+    )
+    with patch("app.db.sqlite.get_settings", return_value=settings):
+        yield settings
+
+
+class TestRetryOnBusy:
+    """Test cases for retrying writes on a busy database."""
+
+    def test_is_busy_error(self) -> None:
+        """Should recognise locked errors only."""
+        assert is_busy_error(_locked_error())
+        assert not is_busy_error(
+            OperationalError("SELECT", {}, sqlite3.OperationalError("no such table"))
+        )
+        assert not is_busy_error(ValueError("database is locked"))
+
+    def test_is_busy_error_postgres(self) -> None:
+        """Should recognise PostgreSQL deadlocks and serialization failures."""
+
+        class PostgresError(Exception):
+            def __init__(self, sqlstate: str) -> None:
+                super().__init__(sqlstate)
+                self.sqlstate = sqlstate
+
+        assert is_busy_error(DBAPIError("UPDATE", {}, PostgresError("40P01")))
+        assert is_busy_error(DBAPIError("UPDATE", {}, PostgresError("40001")))
+        assert not is_busy_error(DBAPIError("INSERT", {}, PostgresError("23505")))
+
+    async def test_retries_until_success(self, fast_retry_settings) -> None:
+        """Should roll back and retry while the database is locked."""
+        service = _FakeService(failures=2, error=_locked_error())
+        assert await service.write() == "ok"
+        assert service.calls == 3
+        assert service.db.rollback.await_count == 2
+
+    async def test_gives_up_after_max_attempts(self, fast_retry_settings) -> None:
+        """Should re-raise once the retry budget is spent."""
+        service = _FakeService(failures=10, error=_locked_error())
+        with pytest.raises(OperationalError):
+            await service.write()
+        assert service.calls == 4
+
+    async def test_other_errors_not_retried(self, fast_retry_settings) -> None:
+        """Should not retry errors unrelated to locking."""
+        error = OperationalError(
+            "SELECT", {}, sqlite3.OperationalError("no such table")
+        )
+        service = _FakeService(failures=1, error=error)
+        with pytest.raises(OperationalError):
+            await service.write()
+        assert service.calls == 1
@@ -29,6 +29,8 @@ function SessionItem({
       )}
       <div className="text-xs text-gray-400 dark:text-gray-500 mt-1">
         {formatRelativeDate(session.updatedAt)}
+        {session.conversationCount !== undefined &&
+          ` · ${session.conversationCount} conversations · ${session.exchangeCount ?? 0} exchanges`}
       </div>
     </button>
   );
@@ -55,6 +57,8 @@ function ConversationItem({
       <div className="text-sm truncate">{conversation.title}</div>
       <div className="text-xs text-gray-400 dark:text-gray-500">
         {formatRelativeDate(conversation.createdAt)}
+        {conversation.exchangeCount !== undefined &&
+          ` · ${conversation.exchangeCount} exchanges`}
       </div>
     </button>
   );
@@ -10,6 +10,10 @@ export function transformSession(api: ApiSession): Session {
     description: api.description ?? undefined,
     createdAt: new Date(api.created_at),
     updatedAt: new Date(api.updated_at),
+    conversationCount: api.conversation_count,
+    exchangeCount: api.exchange_count,
+    totalInputTokens: api.total_input_tokens,
+    totalOutputTokens: api.total_output_tokens,
   };
 }
 
@@ -20,6 +24,9 @@ export function transformConversation(api: ApiConversation): Conversation {
     title: api.title,
     createdAt: new Date(api.created_at),
     updatedAt: new Date(api.updated_at),
+    exchangeCount: api.exchange_count,
+    totalInputTokens: api.total_input_tokens,
+    totalOutputTokens: api.total_output_tokens,
   };
 }
 
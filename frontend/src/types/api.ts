@@ -6,6 +6,10 @@ export interface ApiSession {
   description: string | null;
   created_at: string;
   updated_at: string;
+  conversation_count?: number;
+  exchange_count?: number;
+  total_input_tokens?: number;
+  total_output_tokens?: number;
 }
 
 export interface ApiConversation {
@@ -14,6 +18,9 @@ export interface ApiConversation {
   title: string;
   created_at: string;
   updated_at: string;
+  exchange_count?: number;
+  total_input_tokens?: number;
+  total_output_tokens?: number;
 }
 
 export interface ApiExchange {
@@ -33,4 +40,5 @@ export interface ApiPaginatedResponse<T> {
   total: number;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }
@@ -6,6 +6,10 @@ export interface Session {
   description?: string;
   createdAt: Date;
   updatedAt: Date;
+  conversationCount?: number;
+  exchangeCount?: number;
+  totalInputTokens?: number;
+  totalOutputTokens?: number;
 }
 
 export interface Conversation {
@@ -14,6 +18,9 @@ export interface Conversation {
   title: string;
   createdAt: Date;
   updatedAt: Date;
+  exchangeCount?: number;
+  totalInputTokens?: number;
+  totalOutputTokens?: number;
 }
 
 export interface Exchange {
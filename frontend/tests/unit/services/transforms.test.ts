@@ -40,6 +40,27 @@ describe('transformSession', () => {
 
     expect(result.description).toBeUndefined();
   });
+
+  it('maps aggregate counters', () => {
+    const apiSession: ApiSession = {
+      id: 3,
+      name: 'Counted',
+      description: null,
+      created_at: '2024-01-15T10:30:00Z',
+      updated_at: '2024-01-16T14:45:00Z',
+      conversation_count: 2,
+      exchange_count: 5,
+      total_input_tokens: 100,
+      total_output_tokens: 250,
+    };
+
+    const result = transformSession(apiSession);
+
+    expect(result.conversationCount).toBe(2);
+    expect(result.exchangeCount).toBe(5);
+    expect(result.totalInputTokens).toBe(100);
+    expect(result.totalOutputTokens).toBe(250);
+  });
 });
 
 describe('transformConversation', () => {